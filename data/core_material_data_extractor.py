@@ -1,20 +1,16 @@
 # from BH_extractor import *
 from mu_extractor import *
 
+# Relative permeability (mu_r) and permeability loss angle (mu_phi) measurements
+mu_r_directory = f"C:/Users/tillp/sciebo/Exchange_FEMMT/05_Materials/data/Loss_Data_PHD_Keuck/mu_r_Plot"
+mu_phi_directory = f"C:/Users/tillp/sciebo/Exchange_FEMMT/05_Materials/data/Loss_Data_PHD_Keuck/mu_phi_Plot"
 
-# Relative Permeability
-directory = f"C:/Users/tillp/sciebo/Exchange_FEMMT/05_Materials/data/Loss_Data_PHD_Keuck/mu_r_Plot"
-temperatures = [30, 60, 80, 100]
-frequencies = [300000]
-load_and_extract(parameter="mu_r", read_directory=directory, write_directory="materials/N95/mu_r/", temperatures=temperatures, frequencies=frequencies, material="N95", do_plot=True)
+# All files are read and fitted at once, the complex permeability is written to the femmt user material database
+# (replaces load_and_extract() and create_arithmetic_form() with one csv file per temperature and frequency)
+femmt.import_measurements([mu_r_directory, mu_phi_directory], material="N95", name="N95_measured",
+                          flux_density_bounds=(0.03, 0.25), mu_r_frequency=300000, mu_r_degree=2, mu_phi_degree=1)
 
-# Permeability loss angle
-directory = f"C:/Users/tillp/sciebo/Exchange_FEMMT/05_Materials/data/Loss_Data_PHD_Keuck/mu_phi_Plot"
-temperatures = [30, 60, 80, 100]
-frequencies = [100000, 200000, 300000, 400000]
-load_and_extract(parameter="mu_phi", read_directory=directory, write_directory="materials/N95/mu_phi/", temperatures=temperatures, frequencies=frequencies, material="N95", do_plot=True)
-
-# create_arithmetic_form
-temperatures = [30, 60, 80, 100]
-frequencies = [100000, 200000, 300000, 400000]
-create_arithmetic_form(temperatures=temperatures, frequencies=frequencies, material="N95", mu_r_frequency=300000, poly_degree=2)
+# Single curves can still be extracted and plotted
+# temperatures = [30, 60, 80, 100]
+# load_and_extract(parameter="mu_phi", read_directory=mu_phi_directory, write_directory="materials/N95/mu_phi/",
+#                  temperatures=temperatures, frequencies=[100000, 200000, 300000, 400000], material="N95", do_plot=True)
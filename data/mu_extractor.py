@@ -2,26 +2,18 @@ import femmt
 from femmt import MagneticComponent
 import numpy as np
 import itertools
-import re
 import os
-import csv
 from matplotlib import pyplot as plt
 from scipy.interpolate import interp1d
 
 
 def get_data(directory: str, file_name: str):
-    with open(directory + "/" + file_name, newline='\n') as file:
-        raw_data = [re.split(r'\t+', line[0]) for line in list(csv.reader(file))]
-
-    return np.array([[float(i) for i in j] for j in raw_data])
+    return np.loadtxt(os.path.join(directory, file_name), ndmin=2)
 
 
 def crop_data(raw_data, lower_bound: float, upper_bound: float):
-    data = []
-    for dat in raw_data:
-        if (lower_bound < dat[0] < upper_bound):
-            data.append(dat)
-    return np.array(data)
+    raw_data = np.asarray(raw_data)
+    return raw_data[(lower_bound < raw_data[:, 0]) & (raw_data[:, 0] < upper_bound)]
 
 
 def load_and_extract(parameter: str, read_directory: str, write_directory: str, temperatures: list[int], frequencies: list[int], material: str, save_data: bool = False, do_plot: bool = False, save_plot: bool = False):
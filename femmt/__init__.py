@@ -2,3 +2,19 @@ from .femmt_classes import *
 from .femmt_functions import *
 from .electro_magnetic import *
 from .thermal import *
+from .femmt_batch import *
+from .femmt_results import *
+from .femmt_mesh_cache import *
+from .femmt_screening import *
+from .femmt_paths import *
+from .femmt_litz_coefficients import *
+from .femmt_superposition import *
+from .femmt_frequency_response import *
+from .femmt_profiling import *
+from .femmt_winding_placement import *
+from .femmt_feasibility import *
+from .femmt_symmetry import *
+from .femmt_fields import *
+from .femmt_materials import *
+from .femmt_material_import import *
+from .femmt_electro_thermal import *
@@ -1,5 +1,7 @@
 // === Field Quantities ===
 
+// Only the field maps with Flag_field_<name> = 1 (postquantities.pro) are written, see set_outputs() in python.
+// GetDP is started with the option -bin for field maps in the binary gmsh format.
 PostOperation Map_local UsingPost MagDyn_a {
 
   // Potentials
@@ -18,12 +20,14 @@ PostOperation Map_local UsingPost MagDyn_a {
   //Print[ Mag_h_imag,  OnElementsOf Domain,  File StrCat[DirResFields, "Mag_h_imag", ExtGmsh],  LastTimeStepOnly ] ;
 
   // Core Loss Density
-  If(Flag_Generalized_Steinmetz_loss)
+  If(Flag_Generalized_Steinmetz_loss && Flag_field_piGSE)
     Print[ piGSE,  OnElementsOf Domain,  File StrCat[DirResFields, "piGSE", ExtGmsh],  LastTimeStepOnly ] ;
   EndIf
 
-  If(Flag_Steinmetz_loss)
+  If(Flag_Steinmetz_loss && Flag_field_pSE)
     Print[ pSE,  OnElementsOf Domain,  File StrCat[DirResFields, "pSE", ExtGmsh],  LastTimeStepOnly ] ;
+  EndIf
+  If(Flag_Steinmetz_loss && Flag_field_pSE_density)
     Print[ pSE_density,  OnElementsOf Domain,  File StrCat[DirResFields, "pSE_density", ExtGmsh],  LastTimeStepOnly ] ;
   EndIf
 
@@ -31,10 +35,18 @@ PostOperation Map_local UsingPost MagDyn_a {
   //Print[ mur_norm,  OnElementsOf Domain,  File StrCat[DirResFields, "mur_norm", ExtGmsh],  LastTimeStepOnly ] ;
   //Print[ nur_re,  OnElementsOf Domain,  File StrCat[DirResFields, "nur_re", ExtGmsh],  LastTimeStepOnly ] ;
   //Print[ nur_im,  OnElementsOf Domain,  File StrCat[DirResFields, "nur_im", ExtGmsh],  LastTimeStepOnly ] ;
-  Print[ mur_re,  OnElementsOf Domain,  File StrCat[DirResFields, "mur_re", ExtGmsh],  LastTimeStepOnly ] ;
-  Print[ mur_im,  OnElementsOf Domain,  File StrCat[DirResFields, "mur_im", ExtGmsh],  LastTimeStepOnly ] ;
-  Print[ p_hyst,  OnElementsOf Domain,  File StrCat[DirResFields, "p_hyst", ExtGmsh],  LastTimeStepOnly ] ;
-  Print[ p_hyst_density,  OnElementsOf Domain,  File StrCat[DirResFields, "p_hyst_density", ExtGmsh],  LastTimeStepOnly ] ;
+  If(Flag_field_mur_re)
+    Print[ mur_re,  OnElementsOf Domain,  File StrCat[DirResFields, "mur_re", ExtGmsh],  LastTimeStepOnly ] ;
+  EndIf
+  If(Flag_field_mur_im)
+    Print[ mur_im,  OnElementsOf Domain,  File StrCat[DirResFields, "mur_im", ExtGmsh],  LastTimeStepOnly ] ;
+  EndIf
+  If(Flag_field_p_hyst)
+    Print[ p_hyst,  OnElementsOf Domain,  File StrCat[DirResFields, "p_hyst", ExtGmsh],  LastTimeStepOnly ] ;
+  EndIf
+  If(Flag_field_p_hyst_density)
+    Print[ p_hyst_density,  OnElementsOf Domain,  File StrCat[DirResFields, "p_hyst_density", ExtGmsh],  LastTimeStepOnly ] ;
+  EndIf
 
   // Magnetic Flux (Density)
   //Print[ b,  OnElementsOf Domain,  File StrCat[DirResFields, "b", ExtGmsh],  LastTimeStepOnly ] ;
@@ -42,7 +54,7 @@ PostOperation Map_local UsingPost MagDyn_a {
   //Print[ im_b_pol,  OnElementsOf Domain,  File StrCat[DirResFields, "im_b_pol", ExtGmsh],  LastTimeStepOnly ] ;
   //Print[ Mag_b_real,  OnElementsOf Domain,  File StrCat[DirResFields, "Mag_b_real", ExtGmsh],  LastTimeStepOnly] ;
   //Print[ Mag_b_imag,  OnElementsOf Domain,  File StrCat[DirResFields, "Mag_b_imag", ExtGmsh],  LastTimeStepOnly] ;
-  If(Flag_show_standard_fields)
+  If(Flag_field_Magb)
     Print[ Magb,  OnElementsOf Domain,  File StrCat[DirResFields, "Magb", ExtGmsh],  LastTimeStepOnly] ;
   EndIf
   //  , StoreInVariable $Magb maybe use this for Core Loss
@@ -60,12 +72,12 @@ PostOperation Map_local UsingPost MagDyn_a {
   //Print[ ir_norm, OnElementsOf Region[{Domain}], File StrCat[DirResFields, "ir_norm", ExtGmsh], LastTimeStepOnly ] ;
 
   // Ohmic Loss
-  If(Flag_show_standard_fields)
+  If(Flag_field_j2F)
     Print[ j2F, OnElementsOf Region[{DomainC}], File StrCat[DirResFields, "j2F", ExtGmsh], LastTimeStepOnly ] ;
   EndIf
   //Print[ j2F_density, OnElementsOf Region[{DomainC}], File StrCat[DirResFields, "j2F_density", ExtGmsh], LastTimeStepOnly ] ;
-  If(Flag_show_standard_fields)
-    Print[ j2H,   OnElementsOf DomainS, File StrCat[DirResFields,"jH",ExtGmsh] ] ;
+  If(Flag_field_jH)
+    Print[ j2H,   OnElementsOf DomainS, File StrCat[DirResFields,"jH",ExtGmsh], LastTimeStepOnly ] ;
   EndIf
   //Print[ j2H_density,   OnElementsOf DomainS, File StrCat[DirResFields,"jH_density",ExtGmsh] ] ;
   //Print[ j2Hprox,   OnElementsOf DomainS, File StrCat[DirResFields,"jHprox",ExtGmsh] ] ;
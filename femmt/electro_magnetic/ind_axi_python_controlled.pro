@@ -5,20 +5,31 @@ Include "Parameter.pro";
 Include "postquantities.pro";
 Include "BH.pro";
 //Include "mu_imag.pro";
-Include "core_materials.pro";
+// Permeability and B-H curve of the core material, exported from the material database
+Include "material_data.pro";
 ExtGmsh = ".pos";
 
 
 // ----------------------
 // All Variables - remove or create in python
 // ----------------------
-Nb_max_iter             = 20;
-relaxation_factor       = 1.;
-stop_criterion          = 1e-8;
+// Nonlinear solver (the values of Parameter.pro are used, if given)
+DefineConstant[ Nb_max_iter = 20, relaxation_factor = 1., stop_criterion = 1e-8 ];
+// Flag_adaptive_relaxation = 1: the relaxation factor of every Newton iteration is chosen from Relaxation_Factors()
+// Flag_warm_start = 1: every step of a frequency sweep starts from the solution of the previous step
+DefineConstant[ Flag_adaptive_relaxation = 0, Flag_warm_start = 0 ];
+Relaxation_Factors() = LinSpace[1, 0.1, 10];
+// Flag_turn_sigma_n = 1: every turn of winding n has its own conductivity sigma_turn_n(i) (Parameter.pro), e.g. at
+// its temperature in the coupled electro-thermal simulation
+DefineConstant[ Flag_turn_sigma_1 = 0, Flag_turn_sigma_2 = 0 ];
 Flag_Circuit            = Flag_ImposedVoltage;
+// Flag_Sweep (Parameter.pro) = 1: all steps of a frequency sweep are solved within one GetDP run
+// (lists Freq_List(), Val_EE_1_List(), ... are defined in Parameter.pro as well)
 // ----------------------
 // half inductor with axisymmetry
 // 1 means full zylinder
+// (stays 1 for the half model of mirror symmetric components: every modeled turn is a complete turn,
+// the integrated results are doubled in python when they are imported)
 SymFactor               = 1. ;
 CoefGeo                 = 2*Pi*SymFactor ; // axisymmetry +/* symmetry factor */
 
@@ -27,6 +38,7 @@ CoefGeo                 = 2*Pi*SymFactor ; // axisymmetry +/* symmetry factor */
 // Physical numbers
 // ----------------------
 OUTBND              = 1111;
+SYMMETRY            = 1112;
 AIR                 = 1000;
 AIR_EXT             = 1001;
 IRON                = 2000;
@@ -58,6 +70,8 @@ Group{
   // Boundary Conditions
   // including symmetry
   OuterBoundary = Region[{OUTBND}];
+  // Midplane of the window in the half model of mirror symmetric components
+  SymmetryPlane = Region[{SYMMETRY}];
 
   // Current Conducting Domains
   Winding1 =  Region[{}] ;
@@ -169,9 +183,21 @@ Function {
 
   // sigma: conductivity (= imaginary part of complex permitivity)
   //rho[] = 1/sigma[];
-  sigma[#{Winding1}] = sigma_winding_1 ;
+  If(!Flag_turn_sigma_1)
+    sigma[#{Winding1}] = sigma_winding_1 ;
+  Else
+    For iF In {1:nbturns1}
+      sigma[Turn1~{iF}] = sigma_turn_1(iF-1) ;
+    EndFor
+  EndIf
   If(Flag_Transformer)
-    sigma[#{Winding2}] = sigma_winding_2 ;
+    If(!Flag_turn_sigma_2)
+      sigma[#{Winding2}] = sigma_winding_2 ;
+    Else
+      For iF In {1:nbturns2}
+        sigma[Turn2~{iF}] = sigma_turn_2(iF-1) ;
+      EndFor
+    EndIf
   EndIf
   If(Flag_Conducting_Core)
     sigma[#{Iron}] = sigma_core;
@@ -198,7 +224,12 @@ Function {
         nu[#{Iron}]   = 1/mu[$1, $2] ;
     ElseIf(Flag_Permeability_From_Data)
         //mu[#{Iron}]   = Complex[mu0*(mur^2-f_N95_mu_imag[$1, $2]^2)^(0.5), mu0*f_N95_mu_imag[$1, $2]] ;  // TODO
-        mu[#{Iron}]   = Complex[mu0*f_N95_mu_real[$1], mu0*f_N95_mu_imag[$1]] ;
+        // Exported from the material database, interpolated in the flux density and the frequency
+        If(!Flag_Sweep)
+          mu[#{Iron}]   = Complex[mu0*f_mu_data_real[$1, Freq], mu0*f_mu_data_imag[$1, Freq]] ;
+        Else
+          mu[#{Iron}]   = Complex[mu0*f_mu_data_real[$1, $Freq], mu0*f_mu_data_imag[$1, $Freq]] ;
+        EndIf
         nu[#{Iron}]   = 1/mu[$1, $2] ;
     Else
         mu[#{Iron}]   = mu0*mur ;
@@ -206,30 +237,64 @@ Function {
     EndIf
 
   Else
-    //nu[ #{Iron} ] = nu_3kW[$1] ;
-    //h[ #{Iron} ]  = h_3kW[$1];
-    //dhdb_NL[ #{Iron} ]= dhdb_3kW_NL[$1] ;
-    //dhdb[ #{Iron} ]   = dhdb_3kW[$1] ;
-
-    //nu[ #{Iron} ] = nu_N95[$1] ;
-    nu[ #{Iron} ] = nu~{Core_Material}[$1] ;
-    h[ #{Iron} ]  = h~{Core_Material}[$1];
-    //dhdb_NL[ #{Iron} ]= dhdb_95_NL[$1] ;
-    dhdb_NL[ #{Iron} ]= dhdb_95100_NL[$1] ;
-    dhdb[ #{Iron} ]   = dhdb~{Core_Material}[$1] ;
+    // B-H curve of the core material
+    nu[ #{Iron} ] = nu_bh_data[$1] ;
+    h[ #{Iron} ]  = h_bh_data[$1];
+    dhdb_NL[ #{Iron} ]= dhdb_bh_data_NL[$1] ;
+    dhdb[ #{Iron} ]   = dhdb_bh_data[$1] ;
   EndIf
 
   // Excitation Current
-  FSinusoidal1[] = F_Cos_wt_p[]{2*Pi*Freq, Phase_1}; //Complex_MH[1,0]{Freq} ; //Cos F_Cos_wt_p[]{2*Pi*Freq, 0};
-  Fct_Src1[] = FSinusoidal1[];
+  If(!Flag_Sweep)
+    FSinusoidal1[] = F_Cos_wt_p[]{2*Pi*Freq, Phase_1}; //Complex_MH[1,0]{Freq} ; //Cos F_Cos_wt_p[]{2*Pi*Freq, 0};
+    Fct_Src1[] = FSinusoidal1[];
+    Val_Src_1 = Val_EE_1;
+  Else
+    // Amplitude and phase of the current sweep step are runtime variables (set in the Resolution)
+    Fct_Src1[] = $Val_EE_1 * Complex[Cos[$Phase_1], Sin[$Phase_1]];
+    Val_Src_1 = 1;
+  EndIf
   Sign1 = (Phase_1==Pi) ? -1 : 1;  //TODO: Inductance Calc
 
   If(Flag_Transformer)
-    FSinusoidal2[] = F_Cos_wt_p[]{2*Pi*Freq, Phase_2}; //Complex_MH[1, 0]{Freq} ; //Cos F_Cos_wt_p[]{2*Pi*Freq, 0};
-    Fct_Src2[] = FSinusoidal2[];
+    If(!Flag_Sweep)
+      FSinusoidal2[] = F_Cos_wt_p[]{2*Pi*Freq, Phase_2}; //Complex_MH[1, 0]{Freq} ; //Cos F_Cos_wt_p[]{2*Pi*Freq, 0};
+      Fct_Src2[] = FSinusoidal2[];
+      Val_Src_2 = Val_EE_2;
+    Else
+      Fct_Src2[] = $Val_EE_2 * Complex[Cos[$Phase_2], Sin[$Phase_2]];
+      Val_Src_2 = 1;
+    EndIf
     Sign2 = (Phase_2==Pi) ? -1 : 1;  //TODO: Inductance Calc
   EndIf
 
+  // Frequency dependent values of the current (sweep) step
+  If(!Flag_Sweep)
+    Freq_Step[] = Freq;
+    Rr_Step_1[] = Rr1;
+    If(Val_EE_1!=0)
+      L_Factor_1[] = Sign1 / Val_EE_1;
+      E_Factor_1[] = 1 / (Val_EE_1*Val_EE_1);
+    EndIf
+    If(Flag_Transformer)
+      Rr_Step_2[] = Rr2;
+      If(Val_EE_2!=0)
+        L_Factor_2[] = Sign2 / Val_EE_2;
+        E_Factor_2[] = 1 / (Val_EE_2*Val_EE_2);
+      EndIf
+    EndIf
+  Else
+    Freq_Step[] = $Freq;
+    Rr_Step_1[] = $Rr1;
+    L_Factor_1[] = $L_Factor_1;
+    E_Factor_1[] = $E_Factor_1;
+    If(Flag_Transformer)
+      Rr_Step_2[] = $Rr2;
+      L_Factor_2[] = $L_Factor_2;
+      E_Factor_2[] = $E_Factor_2;
+    EndIf
+  EndIf
+
   // Auxiliary functions for post-processing
   nuOm[#{Air}] = nu[]*Complex[0.,1.];
   nuOm[#{Iron}] = -nu[$1]*Complex[0.,1.];
@@ -242,10 +307,10 @@ Function {
   If(Flag_HomogenisedModel1)
     // Homogenization coefficients
     // Primary (Inductor + Transformer)
-    file_ZSkinRe_1  = Sprintf("Strands_Coefficients/coeff/pI_RS_la%.2g_%.2glayer.dat", Fill1, NbrLayers1);
-    file_ZSkinIm_1  = Sprintf("Strands_Coefficients/coeff/qI_RS_la%.2g_%.2glayer.dat", Fill1, NbrLayers1);
-    file_NuProxRe_1= Sprintf("Strands_Coefficients/coeff/qB_RS_la%.2g_%.2glayer.dat", Fill1, NbrLayers1);
-    file_NuProxIm_1 = Sprintf("Strands_Coefficients/coeff/pB_RS_la%.2g_%.2glayer.dat", Fill1, NbrLayers1);
+    file_ZSkinRe_1  = "Strands_Coefficients/coeff/pI_RS_winding1.dat";
+    file_ZSkinIm_1  = "Strands_Coefficients/coeff/qI_RS_winding1.dat";
+    file_NuProxRe_1= "Strands_Coefficients/coeff/qB_RS_winding1.dat";
+    file_NuProxIm_1 = "Strands_Coefficients/coeff/pB_RS_winding1.dat";
     skin_rhor_list_1() = ListFromFile[ file_ZSkinRe_1 ];
     skin_rhoi_list_1() = ListFromFile[ file_ZSkinIm_1 ];
     prox_nur_list_1()  = ListFromFile[ file_NuProxRe_1 ];
@@ -254,19 +319,19 @@ Function {
     skin_rhoi_1[] = InterpolationLinear[$1]{ skin_rhoi_list_1() };
     prox_nur_1[]  = InterpolationLinear[$1]{ prox_nur_list_1() } ;
     prox_nui_1[]  = InterpolationLinear[$1]{ prox_nui_list_1() } ;
-    nu[#{StrandedWinding1}] = nu0*Complex[prox_nur_1[Rr1], -prox_nui_1[Rr1]*Fill1*Rr1^2/2];
-    nuOm[#{StrandedWinding1}] = Complex[ 2 * Pi * Freq * Im[nu[]], -Re[nu[]] ]; // sTill
-    kkk[#{StrandedWinding1}] =  SymFactor * skin_rhor_1[Rr1] / sigma_winding_1 / Fill1 ;
-    sigma[#{StrandedWinding1}] = SymFactor * skin_rhor_1[Rr1] / sigma_winding_1 / Fill1 ;
+    nu[#{StrandedWinding1}] = nu0*Complex[prox_nur_1[Rr_Step_1[]], -prox_nui_1[Rr_Step_1[]]*Fill1*Rr_Step_1[]^2/2];
+    nuOm[#{StrandedWinding1}] = Complex[ 2 * Pi * Freq_Step[] * Im[nu[]], -Re[nu[]] ]; // sTill
+    kkk[#{StrandedWinding1}] =  SymFactor * skin_rhor_1[Rr_Step_1[]] / sigma_winding_1 / Fill1 ;
+    sigma[#{StrandedWinding1}] = SymFactor * skin_rhor_1[Rr_Step_1[]] / sigma_winding_1 / Fill1 ;
   EndIf
 
   If(Flag_Transformer)
     If(Flag_HomogenisedModel2)
       // Secondary
-      file_ZSkinRe_2  = Sprintf("Strands_Coefficients/coeff/pI_RS_la%.2g_%.2glayer.dat", Fill2, NbrLayers2);
-      file_ZSkinIm_2  = Sprintf("Strands_Coefficients/coeff/qI_RS_la%.2g_%.2glayer.dat", Fill2, NbrLayers2);
-      file_NuProxRe_2= Sprintf("Strands_Coefficients/coeff/qB_RS_la%.2g_%.2glayer.dat", Fill2, NbrLayers2);
-      file_NuProxIm_2 = Sprintf("Strands_Coefficients/coeff/pB_RS_la%.2g_%.2glayer.dat", Fill2, NbrLayers2);
+      file_ZSkinRe_2  = "Strands_Coefficients/coeff/pI_RS_winding2.dat";
+      file_ZSkinIm_2  = "Strands_Coefficients/coeff/qI_RS_winding2.dat";
+      file_NuProxRe_2= "Strands_Coefficients/coeff/qB_RS_winding2.dat";
+      file_NuProxIm_2 = "Strands_Coefficients/coeff/pB_RS_winding2.dat";
       skin_rhor_list_2() = ListFromFile[ file_ZSkinRe_2 ];
       skin_rhoi_list_2() = ListFromFile[ file_ZSkinIm_2 ];
       prox_nur_list_2()  = ListFromFile[ file_NuProxRe_2 ];
@@ -276,10 +341,10 @@ Function {
       prox_nur_2[]  = InterpolationLinear[$1]{ prox_nur_list_2() } ;
       prox_nui_2[]  = InterpolationLinear[$1]{ prox_nui_list_2() } ;
       // Formula from Paper:
-      nu[#{StrandedWinding2}] = nu0*Complex[prox_nur_2[Rr2], prox_nui_2[Rr2]*Fill2*Rr2^2/2];
-      nuOm[#{StrandedWinding2}] = Complex[ 2 * Pi * Freq * Im[nu[]], -Re[nu[]] ]; // sTill
-      kkk[#{StrandedWinding2}] =  SymFactor * skin_rhor_2[Rr2] / sigma_winding_2 / Fill2 ;
-      sigma[#{StrandedWinding2}] = SymFactor * skin_rhor_2[Rr2] / sigma_winding_2 / Fill2 ;
+      nu[#{StrandedWinding2}] = nu0*Complex[prox_nur_2[Rr_Step_2[]], prox_nui_2[Rr_Step_2[]]*Fill2*Rr_Step_2[]^2/2];
+      nuOm[#{StrandedWinding2}] = Complex[ 2 * Pi * Freq_Step[] * Im[nu[]], -Re[nu[]] ]; // sTill
+      kkk[#{StrandedWinding2}] =  SymFactor * skin_rhor_2[Rr_Step_2[]] / sigma_winding_2 / Fill2 ;
+      sigma[#{StrandedWinding2}] = SymFactor * skin_rhor_2[Rr_Step_2[]] / sigma_winding_2 / Fill2 ;
     EndIf
   EndIf
 
@@ -312,6 +377,8 @@ Constraint {
   { Name MVP_2D ;
     Case {
       { Region OuterBoundary ; Type Assign ;  Value 0. ; }
+      // No constraint on the SymmetryPlane: the natural (homogeneous Neumann) condition of the a-formulation
+      // forces the flux to cross the midplane perpendicularly, as in the full model of a mirror symmetric component
     }
   }
 
@@ -323,10 +390,10 @@ Constraint {
       //If(Val_EE_1!=0)
       If(1)
           If(Flag_Circuit==0 && Flag_HomogenisedModel1==0)
-            { Region Winding1 ; Value Val_EE_1/Parallel_1; TimeFunction Fct_Src1[] ; }
+            { Region Winding1 ; Value Val_Src_1/Parallel_1; TimeFunction Fct_Src1[] ; }
           EndIf
           If(Flag_Circuit==0 && Flag_HomogenisedModel1==1)
-            { Region StrandedWinding1 ; Value Val_EE_1/Parallel_1; TimeFunction Fct_Src1[] ; }
+            { Region StrandedWinding1 ; Value Val_Src_1/Parallel_1; TimeFunction Fct_Src1[] ; }
           EndIf
       EndIf
       // Transformer
@@ -334,10 +401,10 @@ Constraint {
         //If(Val_EE_2!=0)
         If(1)
             If(Flag_Circuit==0 && Flag_HomogenisedModel2==0)
-              { Region Winding2 ; Value Val_EE_2/Parallel_2; TimeFunction Fct_Src2[] ; }
+              { Region Winding2 ; Value Val_Src_2/Parallel_2; TimeFunction Fct_Src2[] ; }
             EndIf
             If(Flag_Circuit==0 && Flag_HomogenisedModel2==1)
-              { Region StrandedWinding2 ; Value Val_EE_2/Parallel_2; TimeFunction Fct_Src2[] ; }
+              { Region StrandedWinding2 ; Value Val_Src_2/Parallel_2; TimeFunction Fct_Src2[] ; }
             EndIf
         EndIf
       EndIf
@@ -413,18 +480,75 @@ Resolution {
       CreateDir[DirResValsPrimary];
       CreateDir[DirResValsSecondary];
 
-      If(!Flag_NL)
-          Generate[A] ; Solve[A] ;
-      Else
-          IterativeLoop[Nb_max_iter, stop_criterion, relaxation_factor]{
-              GenerateJac[A] ; SolveJac[A] ;
-          }
-      EndIf
-      SaveSolution[A] ;
+      If(!Flag_Sweep)
+        If(!Flag_NL)
+            Generate[A] ; Solve[A] ;
+        Else
+            Evaluate[ $NL_Iterations = 0 ];
+            IterativeLoop[Nb_max_iter, stop_criterion, relaxation_factor]{
+                GenerateJac[A] ;
+                If(Flag_adaptive_relaxation)
+                  SolveJac_AdaptRelax[A, List[Relaxation_Factors], 0] ;
+                Else
+                  SolveJac[A] ;
+                EndIf
+                Evaluate[ $NL_Iterations = $NL_Iterations + 1 ];
+            }
+        EndIf
+        SaveSolution[A] ;
 
 
-      PostOperation[Map_local] ;
-      PostOperation[Get_global] ;
+        If(Flag_write_fields)
+          PostOperation[Map_local] ;
+        EndIf
+        PostOperation[Get_global] ;
+
+      Else
+        // Frequency sweep: the model is parsed and the mesh is read only once,
+        // every sweep step is solved and post-processed within this loop
+        For iStep In {0:NbrSweepSteps-1}
+          Evaluate[ $Freq = Freq_List(iStep) ];
+          Evaluate[ $Val_EE_1 = Val_EE_1_List(iStep) ];
+          Evaluate[ $Phase_1 = Phase_1_List(iStep) ];
+          Evaluate[ $Rr1 = Rr1_List(iStep) ];
+          Evaluate[ $L_Factor_1 = L_Factor_1_List(iStep) ];
+          Evaluate[ $E_Factor_1 = E_Factor_1_List(iStep) ];
+          If(Flag_Transformer)
+            Evaluate[ $Val_EE_2 = Val_EE_2_List(iStep) ];
+            Evaluate[ $Phase_2 = Phase_2_List(iStep) ];
+            Evaluate[ $Rr2 = Rr2_List(iStep) ];
+            Evaluate[ $L_Factor_2 = L_Factor_2_List(iStep) ];
+            Evaluate[ $E_Factor_2 = E_Factor_2_List(iStep) ];
+          EndIf
+          SetFrequency[A, Freq_List(iStep)] ;
+
+          If(!Flag_NL)
+              Generate[A] ; Solve[A] ;
+          Else
+              If(!Flag_warm_start)
+                // Every step starts from zero, otherwise from the solution of the previous step
+                InitSolution[A] ;
+              EndIf
+              Evaluate[ $NL_Iterations = 0 ];
+              IterativeLoop[Nb_max_iter, stop_criterion, relaxation_factor]{
+                  GenerateJac[A] ;
+                  If(Flag_adaptive_relaxation)
+                    SolveJac_AdaptRelax[A, List[Relaxation_Factors], 0] ;
+                  Else
+                    SolveJac[A] ;
+                  EndIf
+                  Evaluate[ $NL_Iterations = $NL_Iterations + 1 ];
+              }
+          EndIf
+          SaveSolution[A] ;
+
+          // Field maps are only written for the last step of the run (python splits the sweep at selected steps)
+          If(Flag_write_fields && iStep == NbrSweepSteps-1)
+            PostOperation[Map_local] ;
+          EndIf
+          PostOperation[Get_global] ;
+        EndFor
+      EndIf
 
     }// Operation
   }
@@ -485,14 +609,14 @@ PostProcessing {
       // ------------------------------------------------------------------------------------------------
       // Permeability Plot
 
-      { Name nur ; Value { Term { [ Norm[ nu[{d a}, Freq] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
-      //{ Name mur ; Value { Term { [ 1 / Norm[ nu[{d a}, Freq] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
-      { Name mur ; Value { Term { [ 1 / Norm [Im[ nu[{d a}, Freq]] * mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
-      { Name mur_norm ; Value { Term { [ Norm [Im[ mu[{d a}, Freq]] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
-      { Name mur_re ; Value { Term { [ Re[ mu[{d a}, Freq] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
-      { Name mur_im ; Value { Term { [ Im[ mu[{d a}, Freq] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
-      { Name nur_re ; Value { Term { [ Re[ nu[{d a}, Freq] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
-      { Name nur_im ; Value { Term { [ Im[ nu[{d a}, Freq] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
+      { Name nur ; Value { Term { [ Norm[ nu[{d a}, Freq_Step[]] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
+      //{ Name mur ; Value { Term { [ 1 / Norm[ nu[{d a}, Freq_Step[]] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
+      { Name mur ; Value { Term { [ 1 / Norm [Im[ nu[{d a}, Freq_Step[]]] * mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
+      { Name mur_norm ; Value { Term { [ Norm [Im[ mu[{d a}, Freq_Step[]]] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
+      { Name mur_re ; Value { Term { [ Re[ mu[{d a}, Freq_Step[]] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
+      { Name mur_im ; Value { Term { [ Im[ mu[{d a}, Freq_Step[]] / mu0 ] ] ; In Iron ; Jacobian Vol ; } } }
+      { Name nur_re ; Value { Term { [ Re[ nu[{d a}, Freq_Step[]] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
+      { Name nur_im ; Value { Term { [ Im[ nu[{d a}, Freq_Step[]] / mu0 ] ] ; In Domain ; Jacobian Vol ; } } }
 
 
       // ------------------------------------------------------------------------------------------------
@@ -584,7 +708,7 @@ PostProcessing {
       // (Norm[{d a}]*2) is delta_B
 
       If(Flag_Generalized_Steinmetz_loss)
-        { Name piGSE ; Value { Integral { [ Freq * ki * (Norm[{d a}]*2)^(beta-alpha) * (
+        { Name piGSE ; Value { Integral { [ Freq_Step[] * ki * (Norm[{d a}]*2)^(beta-alpha) * (
                                         ((Norm[{d a}]*2 / t_rise )^alpha) * t_rise +
                                         ((Norm[{d a}]*2 / t_fall )^alpha) * t_fall
                                         // 10 abschnitte reinbauen
@@ -593,10 +717,10 @@ PostProcessing {
       EndIf
 
       If(Flag_Steinmetz_loss)
-        { Name pSE ; Value { Integral { [ CoefGeo * ki * Freq^alpha * (Norm[{d a}])^beta
+        { Name pSE ; Value { Integral { [ CoefGeo * ki * Freq_Step[]^alpha * (Norm[{d a}])^beta
                                      ] ; In Iron ; Jacobian Vol ; Integration II ;} } }
 
-        { Name pSE_density ; Value { Integral { [ CoefGeo* ki * Freq^alpha * (Norm[{d a}])^beta
+        { Name pSE_density ; Value { Integral { [ CoefGeo* ki * Freq_Step[]^alpha * (Norm[{d a}])^beta
                                      ] ; In Iron ; Jacobian Vol ; Integration II ;} } }
       EndIf
 
@@ -606,12 +730,12 @@ PostProcessing {
       // Hysteresis Losses (According To Complex Core Parameters)
 
       { Name p_hyst ; Value { Integral {
-        // [ 0.5 * CoefGeo * 2*Pi*Freq * Im[mu[Norm[{d a}], Freq]] * SquNorm[nu[Norm[{d a}], Freq] * Norm[{d a}]] ] ;
-        [ 0.5 * CoefGeo * 2*Pi*Freq * Im[mu[{d a}, Freq]] * SquNorm[nu[{d a}, Freq] * {d a}] ] ;
+        // [ 0.5 * CoefGeo * 2*Pi*Freq_Step[] * Im[mu[Norm[{d a}], Freq]] * SquNorm[nu[Norm[{d a}], Freq_Step[]] * Norm[{d a}]] ] ;
+        [ 0.5 * CoefGeo * 2*Pi*Freq_Step[] * Im[mu[{d a}, Freq_Step[]]] * SquNorm[nu[{d a}, Freq_Step[]] * {d a}] ] ;
         In Iron ; Jacobian Vol ; Integration II ;} } }          // TODO: mur 2350 | general mur; multiplication at simulation begin with loss angle
 
       { Name p_hyst_density ; Value { Integral {
-        [ 0.5 * CoefGeo/ElementVol[] * 2*Pi*Freq * Im[mu[{d a}, Freq]] * SquNorm[nu[Norm[{d a}], Freq] * {d a}] ] ;
+        [ 0.5 * CoefGeo/ElementVol[] * 2*Pi*Freq_Step[] * Im[mu[{d a}, Freq_Step[]]] * SquNorm[nu[Norm[{d a}], Freq_Step[]] * {d a}] ] ;
         In Iron ; Jacobian Vol ; Integration II ;} } }
 
 
@@ -620,7 +744,7 @@ PostProcessing {
       // Energy
 
       { Name MagEnergy ; Value {
-          Integral { [ 1/4*CoefGeo*nu[{d a}, Freq]*({d a}*{d a}) ] ;
+          Integral { [ 1/4*CoefGeo*nu[{d a}, Freq_Step[]]*({d a}*{d a}) ] ;
             In Domain ; Jacobian Vol ; Integration II ; } } }
 
       { Name ElectEnergy ; Value {
@@ -688,20 +812,23 @@ PostProcessing {
 
       If(Val_EE_1!=0)
         { Name L_11 ; Value { Integral {
-          [ Sign1 * CoefGeo / AreaCell1 * CompZ[{a}] / Val_EE_1 ]; In DomainCond1; Jacobian Vol; Integration II; } } }
+          [ L_Factor_1[] * CoefGeo / AreaCell1 * CompZ[{a}] ]; In DomainCond1; Jacobian Vol; Integration II; } } }
         { Name L_11_from_MagEnergy ; Value { Integral {
-          [ 2 * CoefGeo*nu[{d a}, Freq]*({d a}*{d a}) / (Val_EE_1*Val_EE_1) ]; In Domain; Jacobian Vol; Integration II; } } }
+          [ 2 * CoefGeo*nu[{d a}, Freq_Step[]]*({d a}*{d a}) * E_Factor_1[] ]; In Domain; Jacobian Vol; Integration II; } } }
       EndIf
       If(Flag_Transformer)
         If(Val_EE_2!=0)
           { Name L_22 ; Value { Integral {
-            [ Sign2 * CoefGeo / AreaCell2 * CompZ[{a}] / Val_EE_2 ]; In DomainCond2; Jacobian Vol; Integration II; } } }
+            [ L_Factor_2[] * CoefGeo / AreaCell2 * CompZ[{a}] ]; In DomainCond2; Jacobian Vol; Integration II; } } }
           { Name L_22_from_MagEnergy ; Value { Integral {
-            [ 2 * CoefGeo*nu[{d a}, Freq]*({d a}*{d a}) / (Val_EE_2*Val_EE_2) ]; In Domain; Jacobian Vol; Integration II; } } }
+            [ 2 * CoefGeo*nu[{d a}, Freq_Step[]]*({d a}*{d a}) * E_Factor_2[] ]; In Domain; Jacobian Vol; Integration II; } } }
         EndIf
       EndIf
 
 
+      // Number of iterations of the last nonlinear solve
+      { Name NL_Iterations ; Value { Term { Type Global ; [ $NL_Iterations ] ; In DomainDummy ; } } }
+
       // Circuit Quantities
       { Name U ; Value {
           Term { [ {U} ]   ; In DomainC ; }
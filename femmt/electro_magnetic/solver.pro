@@ -132,10 +132,10 @@ Formulation {
     Equation {
 
       // Nabla x ( 1/mu Nabla x A)
-      Galerkin { [ nu[Norm[{d a}], Freq] * Dof{d a} , {d a} ]  ;
+      Galerkin { [ nu[Norm[{d a}], Freq_Step[]] * Dof{d a} , {d a} ]  ;
         In Domain_Lin ; Jacobian Vol ; Integration II ; }
       If(Flag_NL)
-        Galerkin { [ nu[{d a}, Freq] * Dof{d a} , {d a} ]  ;
+        Galerkin { [ nu[{d a}, Freq_Step[]] * Dof{d a} , {d a} ]  ;
           In Domain_NonLin ; Jacobian Vol ; Integration II ; }
         Galerkin { JacNL [ dhdb_NL[{d a}] * Dof{d a} , {d a} ] ;
           In Domain_NonLin ; Jacobian Vol ; Integration II ; }
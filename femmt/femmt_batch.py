@@ -0,0 +1,560 @@
+import os
+import json
+import math
+import time
+import queue
+import collections
+import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Dict, Optional
+
+from .femmt_feasibility import check_design
+from .femmt_mesh_cache import _json_default
+
+
+# Keys of a design dictionary, which describe the geometry of the magnetic component.
+# Designs with equal values for all of these keys share one mesh.
+geometry_keys = ["component_type", "core", "stray_path", "air_gaps", "conductors", "skin_mesh_factor",
+                 "global_accuracy", "isolation_deltas"]
+
+
+def design_geometry_key(design: Dict) -> str:
+    """
+    Returns a string which is equal for all designs with identical geometry and mesh settings.
+    The first frequency of the sweep is part of the key, as the skin depth influences the mesh.
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :return: geometry key
+    :rtype: str
+    """
+    geometry = {key: design.get(key) for key in geometry_keys}
+    geometry["mesh_frequency"] = design["frequency_list"][0]
+    return json.dumps(geometry, sort_keys=True, default=_json_default)
+
+
+def create_component_from_design(design: Dict, working_directory: str, onelab_client=None):
+    """
+    Creates a MagneticComponent from a design dictionary, see run_batch().
+
+    :param design: design dictionary
+    :type design: Dict
+    :param working_directory: working directory of the component
+    :type working_directory: str
+    :param onelab_client: (optional) onelab client to be reused
+    :type onelab_client: onelab.client
+    :return: MagneticComponent
+    """
+    from .femmt_classes import MagneticComponent
+
+    geo = MagneticComponent(component_type=design.get("component_type", "inductor"),
+                            working_directory=working_directory, onelab_client=onelab_client)
+    if design.get("global_accuracy") is not None:
+        geo.mesh.global_accuracy = design["global_accuracy"]
+
+    geo.core.update(**design["core"])
+    if design.get("stray_path") is not None:
+        geo.stray_path.update(**design["stray_path"])
+    geo.air_gaps.update(**design["air_gaps"])
+    geo.update_conductors(**design["conductors"])
+
+    return geo
+
+
+def mesh_design(geo, design: Dict):
+    """
+    Creates the geometry and the electro magnetic mesh of a component, which was created by
+    create_component_from_design(). The mesh is taken from the mesh cache, if the geometry was meshed before.
+
+    :param geo: MagneticComponent
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    """
+    geo.high_level_geo_gen(frequency=design["frequency_list"][0],
+                           skin_mesh_factor=design.get("skin_mesh_factor", 0.5),
+                           isolation_deltas=design.get("isolation_deltas"))
+    if not geo.valid:
+        raise Exception("The model is not valid. The simulation won't start.")
+    geo.mesh.generate_hybrid_mesh(save_png=False)
+    geo.mesh.generate_electro_magnetic_mesh()
+
+
+def excite_design(geo, design: Dict):
+    """
+    Simulates the excitation sweep of a design on the already created mesh.
+
+    :param geo: MagneticComponent
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    """
+    phi_deg_list_list = design.get("phi_deg_list_list")
+    if phi_deg_list_list is None:
+        phi_deg_list_list = [[0] * len(currents) for currents in design["current_list_list"]]
+    geo.excitation_sweep(frequency_list=design["frequency_list"],
+                         current_list_list=design["current_list_list"],
+                         phi_deg_list_list=phi_deg_list_list,
+                         meshing=False)
+
+
+def _failed_result(name: str, error: Exception, working_directory: str) -> Dict:
+    return {"name": name, "status": "failed", "error": f"{type(error).__name__}: {error}",
+            "traceback": traceback.format_exc(), "working_directory": working_directory, "log": None}
+
+
+def _run_batch_chunk(chunk: List, working_directory: str) -> List:
+    """
+    Simulates a chunk of designs with identical geometry in one process.
+    The mesh is created once and reused for every design of the chunk.
+
+    :param chunk: list of (index, design) tuples
+    :type chunk: List
+    :param working_directory: private working directory of this chunk
+    :type working_directory: str
+    :return: list of (index, result) tuples
+    :rtype: List
+    """
+    results = []
+
+    first_design = chunk[0][1]
+    try:
+        geo = create_component_from_design(first_design, working_directory)
+        mesh_design(geo, first_design)
+    except Exception as e:
+        # Without a mesh, none of the designs in this chunk can be simulated
+        for index, design in chunk:
+            results.append((index, _failed_result(design.get("name", f"job_{index}"), e, working_directory)))
+        return results
+
+    for index, design in chunk:
+        name = design.get("name", f"job_{index}")
+        try:
+            excite_design(geo, design)
+            results.append((index, {"name": name, "status": "success", "error": None, "traceback": None,
+                                    "working_directory": working_directory, "log": geo.read_log()}))
+        except Exception as e:
+            results.append((index, _failed_result(name, e, working_directory)))
+
+    return results
+
+
+def split_designs_into_chunks(designs: List[Dict], workers: int) -> List[List]:
+    """
+    Groups the designs by their geometry (see design_geometry_key()). Every group shares one mesh.
+    If there are less groups than workers, large groups are split, so that all workers are busy.
+
+    :param designs: list of design dictionaries
+    :type designs: List[Dict]
+    :param workers: number of worker processes
+    :type workers: int
+    :return: list of chunks, every chunk is a list of (index, design) tuples
+    :rtype: List[List]
+    """
+    groups = {}
+    for index, design in enumerate(designs):
+        groups.setdefault(design_geometry_key(design), []).append((index, design))
+
+    chunks = []
+    splits_per_group = max(1, workers // max(1, len(groups)))
+    for group in groups.values():
+        chunk_size = math.ceil(len(group) / min(splits_per_group, len(group)))
+        for start in range(0, len(group), chunk_size):
+            chunks.append(group[start:start + chunk_size])
+
+    return chunks
+
+
+def read_onelab_folder_path() -> str:
+    """
+    Reads the onelab path from the config.json of the femmt folder.
+
+    :return: path to the onelab folder
+    :rtype: str
+    """
+    config_file_path = os.path.join(os.path.dirname(__file__), "config.json")
+    if not os.path.isfile(config_file_path):
+        raise Exception("onelab_folder_path is not given and no config.json is found in the femmt folder. "
+                        "Run a single simulation first or pass onelab_folder_path.")
+    with open(config_file_path, "r") as fd:
+        return json.loads(fd.read())["onelab"]
+
+
+def prepare_worker_directory(worker_directory: str, onelab_folder_path: str) -> str:
+    """
+    Creates the working directory of a worker and stores the onelab path there, so the worker does not ask for it.
+
+    :param worker_directory: working directory of the worker
+    :type worker_directory: str
+    :param onelab_folder_path: path to the onelab folder
+    :type onelab_folder_path: str
+    :return: worker_directory
+    :rtype: str
+    """
+    os.makedirs(worker_directory, exist_ok=True)
+    with open(os.path.join(worker_directory, "config.json"), "w", encoding="utf-8") as fd:
+        json.dump({"onelab": onelab_folder_path}, fd, indent=2, ensure_ascii=False)
+    return worker_directory
+
+
+def run_batch(designs: List[Dict], workers: Optional[int] = None, working_directory: Optional[str] = None,
+              onelab_folder_path: Optional[str] = None, check_feasibility: bool = True) -> List[Dict]:
+    """
+    Simulates many independent designs (geometries and excitations) in a pool of worker processes.
+
+    Designs with identical geometry are meshed only once. Every worker uses its own working directory (below the
+    given working_directory), so the GetDP runs do not interfere.
+
+    On Windows and macOS, worker processes are spawned, so the calling script must be protected by
+    `if __name__ == "__main__":`.
+
+    :Example Code for Inductor:
+
+    >>> import femmt as fmt
+    >>> design = {"component_type": "inductor",
+    >>>           "core": {"window_h": 0.03, "window_w": 0.011, "core_w": 0.02},
+    >>>           "air_gaps": {"method": "center", "n_air_gaps": 1, "air_gap_h": [0.0005], "position_tag": [0]},
+    >>>           "conductors": {"n_turns": [[9]], "conductor_type": ["solid"], "conductor_radii": [0.0015],
+    >>>                          "winding": ["primary"], "scheme": ["square"],
+    >>>                          "core_cond_isolation": [0.001, 0.001, 0.002, 0.001],
+    >>>                          "cond_cond_isolation": [0.0001], "conductivity_sigma": ["copper"]},
+    >>>           "frequency_list": [100000, 200000],
+    >>>           "current_list_list": [[3], [1]]}
+    >>> results = fmt.run_batch([design], workers=4)
+
+    :param designs: list of design dictionaries with the keys
+        - "name": (optional) name of the job used for progress messages
+        - "component_type": "inductor", "transformer" or "integrated_transformer"
+        - "core", "air_gaps", "stray_path" (optional), "conductors": keyword arguments for core.update(),
+          air_gaps.update(), stray_path.update() and update_conductors()
+        - "skin_mesh_factor", "global_accuracy", "isolation_deltas": (optional) mesh settings
+        - "frequency_list", "current_list_list", "phi_deg_list_list" (optional): excitation, see excitation_sweep()
+    :type designs: List[Dict]
+    :param workers: number of worker processes, defaults to the number of CPUs
+    :type workers: int
+    :param working_directory: folder for the working directories of the single jobs, defaults to ./batch
+    :type working_directory: str
+    :param onelab_folder_path: path to the onelab folder, defaults to the path stored in femmt's config.json
+    :type onelab_folder_path: str
+    :param check_feasibility: check the geometry of all designs before meshing (see check_design()), infeasible
+        designs are not simulated
+    :type check_feasibility: bool
+    :return: one result dictionary per design (same order as designs) with the keys "name", "status" ("success",
+        "failed" or "infeasible"), "error", "traceback", "working_directory" and "log" (content of the result log,
+        see write_log())
+    :rtype: List[Dict]
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if working_directory is None:
+        working_directory = os.path.join(os.getcwd(), "batch")
+    os.makedirs(working_directory, exist_ok=True)
+
+    if onelab_folder_path is None:
+        onelab_folder_path = read_onelab_folder_path()
+
+    results = [None] * len(designs)
+    feasible_indices = list(range(0, len(designs)))
+    if check_feasibility:
+        feasible_indices = []
+        for index, design in enumerate(designs):
+            violations = check_design(design)
+            if violations:
+                results[index] = {"name": design.get("name", f"job_{index}"), "status": "infeasible",
+                                  "error": " ".join(violations), "traceback": None, "working_directory": None,
+                                  "log": None}
+            else:
+                feasible_indices.append(index)
+
+    # The designs keep the names of their position in designs
+    chunks = split_designs_into_chunks([dict(designs[index], name=designs[index].get("name", f"job_{index}"))
+                                        for index in feasible_indices], workers)
+
+    # Every chunk gets its own working directory. The onelab path is stored there, so the workers do not ask for it.
+    chunk_directories = []
+    for n_chunk in range(0, len(chunks)):
+        chunk_directories.append(prepare_worker_directory(os.path.join(working_directory, f"chunk_{n_chunk}"),
+                                                          onelab_folder_path))
+
+    print(f"\n"
+          f"--- ---\n"
+          f"Batch simulation\n\n"
+          f"Number of designs         : {len(designs)}\n"
+          f"Infeasible designs        : {len(designs) - len(feasible_indices)}\n"
+          f"Number of meshes (chunks) : {len(chunks)}\n"
+          f"Number of workers         : {workers}\n")
+
+    n_done = 0
+    n_failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_batch_chunk, chunk, chunk_directories[n_chunk]): n_chunk
+                   for n_chunk, chunk in enumerate(chunks)}
+
+        for future in as_completed(futures):
+            chunk = chunks[futures[future]]
+            try:
+                chunk_results = future.result()
+            except Exception as e:
+                # The worker process itself died (e.g. crash of gmsh)
+                chunk_results = [(index, _failed_result(design.get("name", f"job_{index}"), e,
+                                                        chunk_directories[futures[future]]))
+                                 for index, design in chunk]
+
+            for index, result in chunk_results:
+                results[feasible_indices[index]] = result
+                n_done += 1
+                if result["status"] == "failed":
+                    n_failed += 1
+                    print(f"[{n_done}/{len(feasible_indices)}] {result['name']} failed: {result['error']}")
+                else:
+                    print(f"[{n_done}/{len(feasible_indices)}] {result['name']} finished")
+
+    print(f"\n"
+          f"Successful designs: {len(feasible_indices) - n_failed}\n"
+          f"Failed designs    : {n_failed}\n"
+          f"--- ---\n")
+
+    return results
+
+
+def _worker_main(n_worker: int, job_queue, result_queue, working_directory: str):
+    """
+    Main loop of a worker process of the WorkerPool. Python imports, gmsh and the onelab client are initialized
+    once and are reused for all jobs. All jobs of a worker use the same working directory, so the mesh cache of
+    this directory is shared between them.
+
+    :param n_worker: number of the worker
+    :type n_worker: int
+    :param job_queue: queue of (job_id, design) tuples of this worker, None stops the worker
+    :param result_queue: queue of (n_worker, job_id, result) tuples of all workers
+    :param working_directory: working directory of this worker
+    :type working_directory: str
+    """
+    from . import femmt_classes
+
+    onelab_client = femmt_classes.onelab.client(femmt_classes.__file__)
+
+    while True:
+        job = job_queue.get()
+        if job is None:
+            break
+
+        job_id, design = job
+        name = design.get("name", f"job_{job_id}")
+        try:
+            geo = create_component_from_design(design, working_directory, onelab_client=onelab_client)
+            mesh_design(geo, design)
+            excite_design(geo, design)
+            result = {"name": name, "status": "success", "error": None, "traceback": None,
+                      "working_directory": working_directory, "log": geo.read_log()}
+        except Exception as e:
+            result = _failed_result(name, e, working_directory)
+        result_queue.put((n_worker, job_id, result))
+
+
+class WorkerPool:
+    """
+    Pool of long-living worker processes, which simulate designs (see run_batch()) from a local job queue.
+
+    In contrast to run_batch(), the worker processes are kept alive between the calls of map(), so the startup cost
+    of a worker (Python imports, gmsh initialization, onelab client) is paid only once. This is useful for
+    optimizations, which create new designs depending on the results of the previous ones. Every worker has its own
+    working directory, meshes of already simulated geometries are reused from its mesh cache.
+
+    Every worker gets one job at a time. If a worker process dies (e.g. crash of gmsh or out of memory), its job is
+    reported as failed and the worker is restarted. A worker, which dies max_restarts times in a row without returning
+    a result (e.g. it can not be started at all), stops the pool with an exception.
+
+    The workers are spawned, so the calling script must be protected by `if __name__ == "__main__":`.
+
+    :Example Code:
+
+    >>> import femmt as fmt
+    >>> with fmt.WorkerPool(workers=4) as pool:
+    >>>     for generation in range(0, 10):
+    >>>         results = pool.map(designs)
+    >>>         designs = create_next_generation(results)
+    """
+
+    # Interval in seconds, in which the worker processes are checked while waiting for results
+    poll_interval = 1.0
+
+    # Number of restarts of a worker without any result in between, after which the pool gives up
+    max_restarts = 3
+
+    def __init__(self, workers: Optional[int] = None, working_directory: Optional[str] = None,
+                 onelab_folder_path: Optional[str] = None):
+        """
+        :param workers: number of worker processes, defaults to the number of CPUs
+        :type workers: int
+        :param working_directory: folder for the working directories of the workers, defaults to ./workers
+        :type working_directory: str
+        :param onelab_folder_path: path to the onelab folder, defaults to the path stored in femmt's config.json
+        :type onelab_folder_path: str
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.working_directory = working_directory or os.path.join(os.getcwd(), "workers")
+        self.onelab_folder_path = onelab_folder_path or read_onelab_folder_path()
+
+        self.context = multiprocessing.get_context("spawn")
+        self.result_queue = self.context.Queue()
+        self.processes = []
+        self.job_queues = []
+        self.running_jobs = []  # (job_id, design) of the job of every worker, None for idle workers
+        self.restarts = []  # restarts of every worker since its last result
+        self.pending_jobs = collections.deque()
+        self.n_submitted = 0
+        self.finished_results = {}
+
+        for n_worker in range(0, self.workers):
+            self.processes.append(None)
+            self.job_queues.append(None)
+            self.running_jobs.append(None)
+            self.restarts.append(0)
+            self.start_worker(n_worker)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.close()
+
+    def worker_directory(self, n_worker: int) -> str:
+        return os.path.join(self.working_directory, f"worker_{n_worker}")
+
+    def start_worker(self, n_worker: int):
+        """
+        Starts (or restarts) the process of a worker with a new job queue.
+
+        :param n_worker: number of the worker
+        :type n_worker: int
+        """
+        worker_directory = prepare_worker_directory(self.worker_directory(n_worker), self.onelab_folder_path)
+        self.job_queues[n_worker] = self.context.Queue()
+        self.processes[n_worker] = self.context.Process(target=_worker_main,
+                                                        args=(n_worker, self.job_queues[n_worker], self.result_queue,
+                                                              worker_directory), daemon=True)
+        self.processes[n_worker].start()
+        self.running_jobs[n_worker] = None
+
+    def dispatch(self):
+        """
+        Hands pending jobs to idle workers.
+        """
+        for n_worker in range(0, len(self.processes)):
+            if self.running_jobs[n_worker] is None and self.pending_jobs:
+                job = self.pending_jobs.popleft()
+                self.running_jobs[n_worker] = job
+                self.job_queues[n_worker].put(job)
+
+    def check_workers(self):
+        """
+        Reports the jobs of dead worker processes as failed and restarts these workers.
+        """
+        for n_worker, process in enumerate(self.processes):
+            if process.is_alive():
+                continue
+            if self.restarts[n_worker] >= self.max_restarts:
+                raise Exception(f"Worker process {n_worker} died {self.restarts[n_worker] + 1} times in a row "
+                                f"(exit code {process.exitcode}) without returning a result.")
+            job = self.running_jobs[n_worker]
+            if job is not None:
+                job_id, design = job
+                error = Exception(f"Worker process {n_worker} died (exit code {process.exitcode})")
+                self.finished_results[job_id] = _failed_result(design.get("name", f"job_{job_id}"), error,
+                                                               self.worker_directory(n_worker))
+            print(f"Worker process {n_worker} died (exit code {process.exitcode}), it is restarted")
+            self.restarts[n_worker] += 1
+            self.start_worker(n_worker)
+
+    def submit(self, design: Dict) -> int:
+        """
+        Adds a design to the job queue.
+
+        :param design: design dictionary, see run_batch()
+        :type design: Dict
+        :return: job id
+        :rtype: int
+        """
+        if not self.processes:
+            raise Exception("The worker pool is already closed.")
+        job_id = self.n_submitted
+        self.n_submitted += 1
+        self.pending_jobs.append((job_id, design))
+        self.dispatch()
+        return job_id
+
+    def result(self, job_id: int, timeout: Optional[float] = None) -> Dict:
+        """
+        Waits for the result of a job.
+
+        :param job_id: job id returned by submit()
+        :type job_id: int
+        :param timeout: maximum waiting time in seconds, None waits until the job is finished or its worker died
+        :type timeout: float
+        :return: result dictionary, see run_batch()
+        :rtype: Dict
+        """
+        if job_id not in self.finished_results and job_id >= self.n_submitted:
+            raise Exception(f"Job {job_id} was not submitted.")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while job_id not in self.finished_results:
+            # Dead workers are detected in every iteration, also while results of other workers arrive
+            self.check_workers()
+            self.dispatch()
+            if job_id in self.finished_results:
+                break
+            wait = self.poll_interval if deadline is None else \
+                min(self.poll_interval, max(deadline - time.monotonic(), 0))
+            try:
+                n_worker, finished_job_id, result = self.result_queue.get(timeout=wait)
+                self.finished_results[finished_job_id] = result
+                self.restarts[n_worker] = 0
+                if self.running_jobs[n_worker] is not None and self.running_jobs[n_worker][0] == finished_job_id:
+                    self.running_jobs[n_worker] = None
+            except queue.Empty:
+                pass
+            if job_id not in self.finished_results and deadline is not None and time.monotonic() >= deadline:
+                raise Exception(f"No result for job {job_id} within {timeout} s.")
+        return self.finished_results.pop(job_id)
+
+    def map(self, designs: List[Dict]) -> List[Dict]:
+        """
+        Simulates the designs in the worker processes and waits for all results.
+
+        :param designs: list of design dictionaries, see run_batch()
+        :type designs: List[Dict]
+        :return: one result dictionary per design (same order as designs), see run_batch()
+        :rtype: List[Dict]
+        """
+        job_ids = [self.submit(design) for design in designs]
+        results = []
+        for n_done, job_id in enumerate(job_ids):
+            result = self.result(job_id)
+            if result["status"] == "failed":
+                print(f"[{n_done + 1}/{len(designs)}] {result['name']} failed: {result['error']}")
+            else:
+                print(f"[{n_done + 1}/{len(designs)}] {result['name']} finished")
+            results.append(result)
+        return results
+
+    def close(self, timeout: Optional[float] = 60):
+        """
+        Stops the worker processes after their current jobs are done. Jobs, which were not handed to a worker yet,
+        are not simulated.
+
+        :param timeout: maximum waiting time in seconds for every worker, workers which are still running afterwards
+            are terminated. None waits forever.
+        :type timeout: float
+        """
+        self.pending_jobs.clear()
+        for job_queue in self.job_queues:
+            job_queue.put(None)
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        self.processes = []
+        self.job_queues = []
+        self.running_jobs = []
+        self.restarts = []
@@ -1,6 +1,4 @@
 # Usual Python libraries
-import csv
-import fileinput
 import numpy as np
 import os
 import sys
@@ -13,11 +11,28 @@ from scipy.integrate import quad
 from scipy.interpolate import interp1d
 import warnings
 import shutil
+import filecmp
+import subprocess
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 
-from typing import List, Union, Optional
+from typing import List, Union, Optional, Dict
 from .thermal.thermal_simulation import *
 from .thermal.thermal_functions import *
 from .femmt_functions import *
+from .femmt_results import ResultValues, ResultStore, value_files
+from .femmt_mesh_cache import MeshCache
+from .femmt_litz_coefficients import LitzCoefficientLibrary, generate_litz_coefficient_library
+from .femmt_superposition import SuperpositionModel, superposition_basis, quadratic_quantities, linear_quantities
+from .femmt_frequency_response import FrequencyResponseBuilder, FrequencyResponseModel
+from .femmt_profiling import profiler, timed_stage, mesh_statistics, run_sub_client
+from .femmt_winding_placement import round_conductor_points, rectangular_conductor_points, square_centers, \
+    hexa_centers, hexa_row_centers, interleaved_layer_centers
+from .femmt_symmetry import half_model_turn_map, upper_half_conductors, number_of_model_turns, symmetry_tolerance
+from .femmt_fields import FieldResults
+from .femmt_materials import material_database, default_temperature
+from .femmt_electro_thermal import AndersonAcceleration, conductivity_at_temperature, model_turn_values, \
+    default_temperature_coefficient, core_regions, core_region_means, core_region_getdp_conditions
 from .electro_magnetic.Analytical_Core_Data import *
 
 # Optional usage of FEMM tool by David Meeker
@@ -41,6 +56,11 @@ class MagneticComponent:
 
     onelab_folder_path = None
 
+    # Field maps of fields.pro (names of the .pos files), see set_outputs()
+    field_outputs = ["Magb", "j2F", "jH", "mur_re", "mur_im", "p_hyst", "p_hyst_density", "piGSE", "pSE",
+                     "pSE_density"]
+    standard_field_outputs = ["Magb", "j2F", "jH"]
+
     def __init__(self, component_type="inductor", **kwargs):
         """
         :param component_type: Available options:
@@ -48,20 +68,30 @@ class MagneticComponent:
                                - "transformer"
                                - "integrated_transformer" (Transformer with included stray-path)
         :type component_type: string
-        :param working_directory: Sets the working directory
+        :param working_directory: Sets the working directory. If None, the femmt package folder is used. Components,
+            which are simulated at the same time (e.g. run_batch() and WorkerPool), need their own working directories.
         :type working_directory: string
+        :param onelab_client: (optional) already initialized onelab client, e.g. of a worker process which simulates
+            many components
+        :type onelab_client: onelab.client
+        :param max_stored_runs: (optional) number of simulation runs kept in the result store, older runs are deleted.
+            None keeps all runs.
+        :type max_stored_runs: int
         """
         print(f"\n"
               f"Initialized a new Magnetic Component of type {component_type}\n"
               f"--- --- --- ---")
 
 
-        if "working_directory" in kwargs:
-            wkdir = kwargs["working_directory"]
-            if wkdir is not None and os.path.exists(wkdir):
-                self.update_paths(wkdir)
-        else:
-            self.update_paths(os.path.dirname(__file__))
+        self.max_stored_runs = kwargs.get("max_stored_runs", None)
+
+        # Every working directory is a self-contained workspace (solver files, mesh and results)
+        wkdir = kwargs.get("working_directory", None)
+        self.default_working_directory = wkdir is None
+        if wkdir is None:
+            wkdir = os.path.dirname(__file__)
+        os.makedirs(wkdir, exist_ok=True)
+        self.update_paths(wkdir)
 
         self.correct_outer_leg = False
 
@@ -80,6 +110,16 @@ class MagneticComponent:
         # Control Flags
         self.region = None  # Apply an outer Region or directly apply a constraint on the Core Boundary
         self.plot_fields = "standard"  # can be "standard" or False
+        self.outputs = None  # Output profile of the electro magnetic simulation, see set_outputs()
+        self.write_fields = True  # Field maps are written by the next GetDP run (switched off for sweep steps)
+
+        # Nonlinear solver (core.non_linear = True)
+        self.nl_max_iterations = 20
+        self.nl_stop_criterion = 1e-8
+        self.nl_relaxation = 1.0  # Fixed relaxation factor or "adaptive" (SolveJac_AdaptRelax)
+        # Steps of a sweep within one GetDP run start from the previous solution. There is no warm start across GetDP
+        # runs, so the first step of every sweep segment (see excitation_sweep()) starts from zero.
+        self.nl_warm_start = False
 
         # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
         # Core
@@ -176,7 +216,10 @@ class MagneticComponent:
         self.tot_loss_femm = None
 
         self.onelab_setup()
-        self.onelab_client = onelab.client(__file__)
+        if kwargs.get("onelab_client") is not None:
+            self.onelab_client = kwargs["onelab_client"]
+        else:
+            self.onelab_client = onelab.client(__file__)
 
     def create_folders(self, folders):
         if type(folders) is list:
@@ -191,9 +234,16 @@ class MagneticComponent:
         self.working_directory = working_directory
         self.femmt_folder_path = os.path.dirname(__file__)
         self.mesh_folder_path = os.path.join(self.working_directory, "mesh")
-        self.electro_magnetic_folder_path = os.path.join(self.femmt_folder_path, "electro_magnetic")
+        # The .pro templates are shipped with the package. Every component gets its own copy of them inside its
+        # working directory, so that the generated Parameter.pro, postquantities.pro and PreParameter.pro files of
+        # several components (running at the same time) do not overwrite each other.
+        self.electro_magnetic_template_folder_path = os.path.join(self.femmt_folder_path, "electro_magnetic")
+        self.thermal_template_folder_path = os.path.join(self.femmt_folder_path, "thermal", "solver")
+        self.electro_magnetic_folder_path = os.path.join(self.working_directory, "electro_magnetic")
+        self.thermal_solver_folder_path = os.path.join(self.working_directory, "thermal", "solver")
         self.results_folder_path = os.path.join(self.working_directory, "results")
         self.e_m_values_folder_path = os.path.join(self.results_folder_path, "values")
+        self.e_m_result_store_folder_path = os.path.join(self.results_folder_path, "store")
         self.e_m_fields_folder_path = os.path.join(self.results_folder_path, "fields")
         self.e_m_circuit_folder_path = os.path.join(self.results_folder_path, "circuit")
         self.e_m_strands_coefficients_folder_path = os.path.join(self.electro_magnetic_folder_path, "Strands_Coefficients")
@@ -210,12 +260,60 @@ class MagneticComponent:
         self.hybrid_color_mesh_file = os.path.join(self.mesh_folder_path, "hybrid_color.msh")
         self.hybrid_color_visualize_file = os.path.join(self.mesh_folder_path, "hybrid_color.png")
         self.thermal_mesh_file = os.path.join(self.mesh_folder_path, "thermal.msh")
+        self.mesh_cache_folder_path = os.path.join(self.working_directory, "mesh_cache")
 
         # Create necessary folders
         self.create_folders([self.femmt_folder_path, self.mesh_folder_path, self.electro_magnetic_folder_path, 
             self.results_folder_path, self.e_m_values_folder_path, self.e_m_fields_folder_path, 
             self.e_m_circuit_folder_path, self.e_m_strands_coefficients_folder_path])
 
+        # Copy the solver templates into the private workspace of this component
+        self.setup_solver_workspace()
+
+        # The .dat files written by GetDP are imported into the result store after every solve.
+        # All solves of one simulation (e.g. one excitation sweep) belong to the same run.
+        self.result_store = ResultStore(self.e_m_result_store_folder_path, max_runs=self.max_stored_runs)
+        self.run_id = None
+
+        # Meshes of already simulated geometries are reused (see Mesh.generate_hybrid_mesh())
+        self.mesh_cache = MeshCache(self.mesh_cache_folder_path)
+
+    def setup_solver_workspace(self):
+        """
+        Copies the GetDP solver templates (.pro and .geo files) from the package into the working directory of this
+        component. All files which are written during a simulation (e.g. Parameter.pro) are written into this
+        workspace, so any number of components with different working directories can be simulated in parallel.
+
+        Templates in the workspace which differ from the package templates (e.g. of an older femmt version) are
+        replaced.
+
+        :return: -
+        """
+        workspaces = [
+            (self.electro_magnetic_template_folder_path, self.electro_magnetic_folder_path),
+            (os.path.join(self.electro_magnetic_template_folder_path, "Strands_Coefficients"),
+             self.e_m_strands_coefficients_folder_path),
+            (self.thermal_template_folder_path, self.thermal_solver_folder_path)
+        ]
+
+        for template_folder, workspace_folder in workspaces:
+            if os.path.abspath(template_folder) == os.path.abspath(workspace_folder):
+                # The package folder itself is used as working directory
+                continue
+
+            os.makedirs(workspace_folder, exist_ok=True)
+            for file_name in os.listdir(template_folder):
+                if os.path.splitext(file_name)[1] not in [".pro", ".geo"]:
+                    continue
+                if file_name in ["Parameter.pro", "postquantities.pro", "PreParameter.pro", "Parameters.pro",
+                                 "Function.pro", "Group.pro", "Constraint.pro", "material_data.pro"]:
+                    # Generated files belong to the template folder's own simulations
+                    continue
+                template_file = os.path.join(template_folder, file_name)
+                workspace_file = os.path.join(workspace_folder, file_name)
+                if not os.path.exists(workspace_file) or not filecmp.cmp(template_file, workspace_file, shallow=False):
+                    shutil.copy(template_file, workspace_file)
+
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -   -  -  -  -  -  -  -  -  -  -  -
     # Thermal simulation
     def calculate_core_volume(self) -> float:
@@ -255,28 +353,34 @@ class MagneticComponent:
     def get_wire_distances(self):
         wire_distance = []
         for winding in self.two_d_axi.p_conductor:
-            # 5 points are for 1 wire
-            num_points = len(winding)
-            num_windings = num_points//5
-            winding_list = []
-            for i in range(num_windings):
-                winding_list.append(winding[i*5][0])
-            wire_distance.append(winding_list)
+            # 5 points are for 1 wire, the first one is the center
+            wire_distance.append(np.asarray(winding).reshape(-1, 4)[0::5, 0].tolist())
 
         return wire_distance
 
     # Start thermal simulation
-    def thermal_simulation(self, thermal_conductivity, boundary_temperatures, boundary_flags, case_gap_top, case_gap_right, case_gap_bot, show_results=True) -> None:
+    @timed_stage(category="thermal")
+    def thermal_simulation(self, thermal_conductivity, boundary_temperatures, boundary_flags, case_gap_top, case_gap_right, case_gap_bot, show_results=True,
+                           reuse_mesh: bool = False) -> None:
         """
         
         Starts the thermal simulation using thermal.py
 
+        :param reuse_mesh: the thermal mesh of the previous thermal simulation of the same geometry is used
+        :type reuse_mesh: bool
         :return: -
         """
         # Create necessary folders
         self.create_folders([self.thermal_results_folder_path])
 
-        self.mesh.generate_thermal_mesh(case_gap_top, case_gap_right, case_gap_bot)
+        if not (reuse_mesh and os.path.isfile(self.thermal_mesh_file)):
+            if self.mesh.half_model:
+                # The thermal simulation needs the full cross-section of the component: the isolations (air in the
+                # electro magnetic half model) conduct heat, the case gaps and the boundary temperatures of the top and
+                # bottom side may differ, so the temperature field is in general not mirror symmetric.
+                self.mesh.generate_hybrid_mesh(save_png=False, allow_half_model=False)
+
+            self.mesh.generate_thermal_mesh(case_gap_top, case_gap_right, case_gap_bot)
 
         if not os.path.exists(self.e_m_results_log_path):
             # Simulation results file not created
@@ -300,6 +404,7 @@ class MagneticComponent:
 
         thermal_parameters = {
             "onelab_folder_path": self.onelab_folder_path,
+            "solver_folder_path": self.thermal_solver_folder_path,
             "model_mesh_file_path": self.thermal_mesh_file,
             "results_log_file_path": self.e_m_results_log_path,
             "results_folder_path": self.thermal_results_folder_path,
@@ -324,30 +429,156 @@ class MagneticComponent:
 
         run_thermal(**thermal_parameters)
 
+    def electro_thermal_simulation(self, freq: float, current: List[float], phi_deg: List[float],
+                                   thermal_conductivity: Dict, boundary_temperatures: Dict, boundary_flags: Dict,
+                                   case_gap_top: float, case_gap_right: float, case_gap_bot: float,
+                                   max_iterations: int = 10, tolerance: float = 0.5, anderson_depth: int = 3,
+                                   show_results: bool = False) -> Dict:
+        """
+        Coupled electro-thermal simulation: electromagnetic and thermal simulation are solved alternately, until the
+        temperatures of the core and of all turns are converged.
+
+        After every thermal simulation, the conductivity of every turn is updated from its mean temperature (linear
+        temperature coefficient of the wire material) and the temperatures of the core regions (center leg, outer leg,
+        yokes and stray path, see femmt_electro_thermal.core_regions) are set to their mean temperatures, which are
+        used for the permeability from the material database (permeability_type "from_data").
+        The fixed point iteration of the temperatures is accelerated with Anderson acceleration.
+
+        The meshes of the first iteration are reused in all further iterations. If no hybrid mesh has been generated
+        before (create_model()), it is generated in the first iteration.
+
+        :param freq: frequency to simulate
+        :type freq: float
+        :param current: current amplitudes of the windings
+        :type current: List[float]
+        :param phi_deg: phase angles in degree
+        :type phi_deg: List[float]
+        :param thermal_conductivity: thermal conductivities, see thermal_simulation()
+        :type thermal_conductivity: Dict
+        :param boundary_temperatures: boundary temperatures, see thermal_simulation()
+        :type boundary_temperatures: Dict
+        :param boundary_flags: boundary flags, see thermal_simulation()
+        :type boundary_flags: Dict
+        :param case_gap_top: case gap, see thermal_simulation()
+        :param case_gap_right: case gap, see thermal_simulation()
+        :param case_gap_bot: case gap, see thermal_simulation()
+        :param max_iterations: maximum number of electromagnetic and thermal simulation pairs
+        :type max_iterations: int
+        :param tolerance: the iteration stops, if no temperature changes more than tolerance (in K)
+        :type tolerance: float
+        :param anderson_depth: number of previous iterations used by the Anderson acceleration (0: fixed point iteration)
+        :type anderson_depth: int
+        :param show_results: the thermal results of the last iteration are shown in gmsh
+        :type show_results: bool
+        :return: converged, number of iterations, mean core temperature, temperatures of the core regions and turn
+            temperatures of every winding in °C
+        :rtype: Dict
+        """
+        if max_iterations < 1:
+            raise ValueError(f"max_iterations must be at least 1, not {max_iterations}.")
+
+        n_turns = [sum(self.windings[num].turns) for num in range(0, self.n_windings)]
+        turn_offsets = np.cumsum([len(core_regions)] + n_turns)
+
+        # Temperatures: core regions, turns of winding 1, turns of winding 2, ...
+        start_temperature = float(np.mean([value for key, value in boundary_temperatures.items()
+                                           if key.startswith("value")]))
+        temperatures = np.full(turn_offsets[-1], start_temperature)
+        anderson = AndersonAcceleration(depth=anderson_depth)
+        converged = False
+
+        for iteration in range(0, max_iterations):
+            # Material parameters at the current temperatures
+            self.core.region_temperatures = temperatures[:len(core_regions)].tolist()
+            for num in range(0, self.n_windings):
+                self.windings[num].turn_sigma = conductivity_at_temperature(
+                    self.windings[num].cond_sigma, temperatures[turn_offsets[num]:turn_offsets[num + 1]],
+                    self.windings[num].temperature_coefficient or default_temperature_coefficient)
+
+            # Electromagnetic simulation, the mesh is only generated in the first iteration
+            if iteration == 0:
+                if not self.mesh.hybrid_mesh_exists():
+                    self.high_level_geo_gen(frequency=freq)
+                    if not self.valid:
+                        raise Exception("The model is not valid. The simulation won't start.")
+                    self.mesh.generate_hybrid_mesh()
+                self.mesh.generate_electro_magnetic_mesh()
+            self.start_result_run()
+            self.excitation(frequency=freq, amplitude_list=current, phase_deg_list=phi_deg)
+            self.file_communication()
+            self.pre_simulate()
+            self.simulate()
+            self.write_log()
+
+            self.thermal_simulation(thermal_conductivity, boundary_temperatures, boundary_flags, case_gap_top,
+                                    case_gap_right, case_gap_bot, show_results=False, reuse_mesh=iteration > 0)
+
+            # Mean temperatures of the core regions and of every turn
+            thermal_fields = FieldResults(self.thermal_mesh_file, self.thermal_results_folder_path, use_cache=False)
+            core_temperature = thermal_fields.mean("thermal", self.mesh.ps_core)
+            new_temperatures = list(core_region_means(thermal_fields, "thermal", self.core.core_w,
+                                                      self.core.window_w, self.core.window_h))
+            for num in range(0, self.n_windings):
+                new_temperatures += [thermal_fields.mean("thermal", tag) for tag in self.mesh.ps_cond[num]]
+            new_temperatures = np.array(new_temperatures)
+            if len(new_temperatures) != len(temperatures) or np.any(np.isnan(new_temperatures)):
+                raise Exception("Electro-thermal simulation: the thermal results do not contain the core and all turns.")
+
+            change = float(np.max(np.abs(new_temperatures - temperatures)))
+            print(f"Electro-thermal iteration {iteration + 1}: core {core_temperature:.2f} °C (hottest region "
+                  f"{np.max(new_temperatures[:len(core_regions)]):.2f} °C), hottest turn "
+                  f"{np.max(new_temperatures[len(core_regions):]):.2f} °C, largest temperature change {change:.3f} K")
+
+            if change < tolerance:
+                temperatures = new_temperatures
+                self.core.region_temperatures = temperatures[:len(core_regions)].tolist()
+                converged = True
+                break
+            temperatures = anderson.update(temperatures, new_temperatures)
+
+        if not converged:
+            print(f"Electro-thermal simulation not converged after {max_iterations} iterations "
+                  f"(largest temperature change {change:.3f} K)")
+
+        if show_results:
+            gmsh.open(os.path.join(self.thermal_results_folder_path, "thermal.pos"))
+            gmsh.fltk.run()
+
+        return {"converged": converged,
+                "iterations": iteration + 1,
+                "core_temperature": core_temperature,
+                "core_region_temperatures": dict(zip(core_regions, temperatures[:len(core_regions)].tolist())),
+                "turn_temperatures": [temperatures[turn_offsets[num]:turn_offsets[num + 1]].tolist()
+                                      for num in range(0, self.n_windings)]}
+
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -   -  -  -  -  -  -  -  -  -  -  -
     # Setup
     def onelab_setup(self) -> None:
         """
 
         Either reads ONELAB parent folder path from config.json or asks the user to provide the ONELAB path it.
-        Creates a config.json inside the site-packages folder at first run.
+        The config.json of the working directory is used first, then the one of the femmt folder.
+        Creates a config.json inside the site-packages folder at first run (inside the working directory, if one is
+        given).
 
         :return: -
         """
         # find out path of femmt (installed module or directly opened in git)?
-        config_file_path = os.path.join(self.working_directory, 'config.json')
+        config_file_path = self.config_path if self.default_working_directory else \
+            os.path.join(self.working_directory, 'config.json')
 
         # check if config.json is available and not empty
-        if os.path.isfile(config_file_path) and os.stat(config_file_path).st_size != 0:
-            onelab_path = ""
-            with open(config_file_path, "r") as fd:
-                loaded_dict = json.loads(fd.read())
-                onelab_path = loaded_dict['onelab']
-
-            if os.path.exists(onelab_path) and os.path.isfile(os.path.join(onelab_path, "onelab.py")):
-                # Path found
-                self.onelab_folder_path = onelab_path
-                return
+        for candidate_path in [os.path.join(self.working_directory, 'config.json'), self.config_path]:
+            if os.path.isfile(candidate_path) and os.stat(candidate_path).st_size != 0:
+                onelab_path = ""
+                with open(candidate_path, "r") as fd:
+                    loaded_dict = json.loads(fd.read())
+                    onelab_path = loaded_dict['onelab']
+
+                if os.path.exists(onelab_path) and os.path.isfile(os.path.join(onelab_path, "onelab.py")):
+                    # Path found
+                    self.onelab_folder_path = onelab_path
+                    return
 
         # Let the user enter the onelab_path:
         # Find out the onelab_path of installed module, or in case of running directly from git, find the onelab_path of git repository
@@ -379,6 +610,7 @@ class MagneticComponent:
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -   -  -  -  -  -  -  -  -  -  -  -
     # Geometry Parts
+    @timed_stage(category="geometry")
     def high_level_geo_gen(self, dimensionality="2D", frequency=None, skin_mesh_factor=None, isolation_deltas = None):
         """
         - high level geometry generation
@@ -452,6 +684,8 @@ class MagneticComponent:
 
         def __init__(self):
             self.cond_sigma = None
+            self.temperature_coefficient = None  # Temperature coefficient of the resistivity in 1/K
+            self.turn_sigma = None  # Conductivity of every turn (e.g. at its temperature), cond_sigma for all if None
             self.turns = None
             self.conductor_type = None  # List of possible conductor types
             self.ff = None
@@ -477,7 +711,10 @@ class MagneticComponent:
             self.component = component  # Convention: parent
 
             # Standard material data
-            self.material = None  # "95_100" := TDK-N95 | Currently only works with Numbers corresponding to BH.pro
+            self.material = None  # Name of a material (permeability from data) or B-H curve (nonlinear) of the material database
+            self.temperature = default_temperature  # Core temperature in °C for the permeability from the material database
+            # Temperatures in °C of the core regions (femmt_electro_thermal.core_regions), used instead of temperature if given
+            self.region_temperatures = None
 
             # Permeability
             # TDK N95 as standard material:
@@ -529,7 +766,8 @@ class MagneticComponent:
             :type sigma: float
             :param non_linear: True/False
             :type non_linear: bool
-            :param material: specified in BH.pro. Currently available: '95_100' #ToDo: Add Values!
+            :param material: name of a material of the material database (permeability from data, e.g. "N95") or, for
+                non_linear cores, of a B-H curve of the material database (e.g. 95100 for TDK N95 at 100 °C)
             :type material: str
             :param type: There is actually only one type: "EI"
             :type type: str
@@ -956,8 +1194,11 @@ class MagneticComponent:
             dict_material_database = wire_material_database()
             if conductivity_sigma[i] in list(dict_material_database.keys()):
                 self.windings[i].cond_sigma = dict_material_database[conductivity_sigma[i]]["sigma"]
+                self.windings[i].temperature_coefficient = \
+                    dict_material_database[conductivity_sigma[i]]["temperature_coefficient"]
             else:
                 self.windings[i].cond_sigma = conductivity_sigma[i]
+                self.windings[i].temperature_coefficient = default_temperature_coefficient
 
     def update_litz_configuration(self, num=0, litz_parametrization_type='implicit_ff', strand_radius=None, ff=None,
                                   conductor_radius=None, n_strands=None):
@@ -987,9 +1228,9 @@ class MagneticComponent:
         """
         # Choose one of three different parametrization types
         if litz_parametrization_type == 'implicit_ff':
-            ff_exact = n_strands * strand_radius ** 2 / conductor_radius ** 2
-            print(f"Exact fill factor: {ff_exact}")
-            ff = np.around(ff_exact, decimals=2)  # TODO: Interpolation instead of rounding
+            # The litz coefficients are interpolated between the fill factors of the coefficient library
+            ff = n_strands * strand_radius ** 2 / conductor_radius ** 2
+            print(f"Exact fill factor: {ff}")
 
         if litz_parametrization_type == 'implicit_litz_radius':
             conductor_radius = np.sqrt(n_strands * strand_radius ** 2 / ff)
@@ -1316,6 +1557,17 @@ class MagneticComponent:
 
         def draw_conductors(self):
             # Conductors
+            # The conductor centers of every winding scheme are computed as arrays (see femmt_winding_placement), the
+            # gmsh points (5 per round conductor, 4 per rectangular conductor) are derived from the centers.
+            windings = self.component.windings
+            mesh = self.component.mesh
+            cond_cond = self.component.isolation.cond_cond
+
+            def add_round_conductors(num, centers):
+                self.p_conductor[num].append(round_conductor_points(centers, windings[num].conductor_radius,
+                                                                    mesh.c_center_conductor[num],
+                                                                    mesh.c_conductor[num]))
+
             for n_win in range(0, len(self.component.virtual_winding_windows)):
                 """
                 - Work through the virtual winding windows
@@ -1344,55 +1596,10 @@ class MagneticComponent:
                         - Excess windings are placed below the bifilar ones
         
                         """
-                        if self.component.windings[0].conductor_radius != self.component.windings[1].conductor_radius:
-                            print("For bifilar winding scheme both conductors must be of the same radius!")
-                        else:
-                            print("Bifilar winding scheme is applied")
-                            # n1 = self.n_turns[0]/self.n_turns[1]
-                            # n2 = self.n_stray_turns[0]/self.n_stray_turns[1]
-
-                            # for
-                            #     if self.component.virtual_winding_windows[num].scheme == "hexa":
-                            #         y = bot_bound + self.component.windings[num].conductor_radius
-                            #         x = left_bound + self.component.windings[num].conductor_radius
-                            #         i = 0
-                            #         base_line = True
-                            #         # Case n_conductors higher that "allowed" is missing
-                            #         while x < right_bound - self.component.windings[num].conductor_radius and
-                            #         i < self.component.windings[num].turns:
-                            #             while y < top_bound - self.component.windings[num].conductor_radius and
-                            #             i < self.component.windings[num].turns:
-                            #                 self.p_conductor[num].append([x, y, 0,
-                            #                                           self.component.mesh.c_center_conductor[num]])
-                            #                 self.p_conductor[num].append(
-                            #                     [x - self.component.windings[num].conductor_radius, y, 0,
-                            #                 self.component.mesh.c_conductor[num]])
-                            #                 self.p_conductor[num].append(
-                            #                     [x, y + self.component.windings[num].conductor_radius, 0,
-                            #                 self.component.mesh.c_conductor[num]])
-                            #                 self.p_conductor[num].append(
-                            #                     [x + self.component.windings[num].conductor_radius, y, 0,
-                            #                 self.component.mesh.c_conductor[num]])
-                            #                 self.p_conductor[num].append(
-                            #                     [x, y - self.component.windings[num].conductor_radius, 0,
-                            #                 self.component.mesh.c_conductor[num]])
-                            #                 i += 1
-                            #                 y += self.component.windings[num].conductor_radius * 2 + \
-                            #                      self.component.isolation.cond_cond[num]
-                            #                 # from bottom to top
-                            #             x += 2 * np.cos(np.pi / 6) * (self.component.windings[num].conductor_radius +
-                            #             self.component.isolation.cond_cond[
-                            #                 num] / 2)  # * np.sqrt(2 / 3 * np.pi / np.sqrt(3))  # one step from
-                            #     # left to
-                            #                 # right
-                            #             # depending on what line, hexa scheme starts shifted
-                            #             # reset y to "new" bottom
-                            #             base_line = (not base_line)
-                            #             if base_line:
-                            #                 y = bot_bound + self.component.windings[num].conductor_radius
-                            #             else:
-                            #                 y = bot_bound + 2 * self.component.windings[num].conductor_radius +
-                            #                 self.component.isolation.cond_cond[num] / 2
+                        # Not implemented yet (neither the placement nor the isolations): no conductors are placed,
+                        # so the design is invalid
+                        print("Bifilar winding scheme is not implemented yet!")
+                        self.component.valid = False
 
                     if self.component.virtual_winding_windows[n_win].scheme == "vertical":
                         """
@@ -1402,6 +1609,10 @@ class MagneticComponent:
                         - If the turns ratio is != 1, the scheme always begins with the "higher-turns-number's" 
                            conductor
                         """
+                        # Not implemented yet (neither the placement nor the isolations): no conductors are placed,
+                        # so the design is invalid
+                        print("Vertical winding scheme is not implemented yet!")
+                        self.component.valid = False
 
                     if self.component.virtual_winding_windows[n_win].scheme == "horizontal":
                         """
@@ -1414,167 +1625,21 @@ class MagneticComponent:
                         """
 
                         # assume 2 winding transformer and dedicated stray path:
-                        if self.component.component_type == "integrated_transformer" or self.component.n_windings == 2:
-
-                            # top window
+                        if (self.component.component_type == "integrated_transformer" or self.component.n_windings == 2) \
+                                and n_win in [0, 1]:
+                            # Columns from left to right, the top window is filled from top to bottom, the bottom
+                            # window from bottom to top
+                            line_bounds = (top_bound, bot_bound) if n_win == 0 else (bot_bound, top_bound)
+                            centers, col_cond_start, iso_counter = interleaved_layer_centers(
+                                [windings[0].turns[n_win], windings[1].turns[n_win]],
+                                [windings[0].conductor_radius, windings[1].conductor_radius],
+                                cond_cond, (left_bound, right_bound), line_bounds)
                             if n_win == 0:
-                                # Initialize the list, that counts the already placed conductors
-                                N_completed = [0, 0]
-
-                                # Initialize the starting conductor
-                                if self.component.windings[0].turns[n_win] >= self.component.windings[1].turns[n_win]:
-                                    # Primary starts first
-                                    self.col_cond_start = 0
-                                else:
-                                    # Secondary starts fist
-                                    self.col_cond_start = 1
-
-                                col_cond = self.col_cond_start
-
-                                # Initialize the x and y coordinate
-                                x = left_bound + self.component.windings[col_cond].conductor_radius
-                                y = top_bound - self.component.windings[col_cond].conductor_radius
-                                self.top_window_iso_counter = 0
-                                # Continue placing as long as not all conductors have been placed
-                                while (self.component.windings[0].turns[n_win] - N_completed[0] != 0) or \
-                                        (self.component.windings[1].turns[n_win] - N_completed[1] != 0):
-                                    if self.component.windings[col_cond].turns[n_win] - N_completed[col_cond] != 0:
-                                        # is this winding not already finished?
-                                        if x < right_bound - self.component.windings[col_cond].conductor_radius:
-                                            while y > bot_bound + self.component.windings[col_cond].conductor_radius and \
-                                                    N_completed[col_cond] < self.component.windings[col_cond].turns[n_win]:
-                                                self.p_conductor[col_cond].append([x, y, 0, self.component.mesh.c_center_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append(
-                                                    [x - self.component.windings[col_cond].conductor_radius,
-                                                     y,
-                                                     0,
-                                                     self.component.mesh.c_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append([x,
-                                                                                   y + self.component.windings[col_cond].conductor_radius,
-                                                                                   0,
-                                                                                   self.component.mesh.c_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append(
-                                                    [x + self.component.windings[col_cond].conductor_radius,
-                                                     y,
-                                                     0,
-                                                     self.component.mesh.c_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append([x,
-                                                                                   y - self.component.windings[col_cond].conductor_radius,
-                                                                                   0,
-                                                                                   self.component.mesh.c_conductor[col_cond]])
-
-                                                N_completed[col_cond] += 1
-
-                                                y -= self.component.windings[col_cond].conductor_radius * 2 + self.component.isolation.cond_cond[col_cond]  # one from bot to top
-
-                                            x += self.component.windings[col_cond].conductor_radius + \
-                                                 self.component.windings[(col_cond + 1) % 2].conductor_radius + \
-                                                 self.component.isolation.cond_cond[2]  # from left to right
-
-                                            # Reset y
-                                            col_cond = (col_cond + 1) % 2
-                                            y = top_bound - self.component.windings[col_cond].conductor_radius
-                                            self.top_window_iso_counter += 1
-                                        else:
-                                            break
-
-                                    else:
-                                        # is this winding already finished? - continue with the other one
-                                        col_cond = (col_cond + 1) % 2
-
-                                        # Correct the reset of y and correct x displacement
-                                        x += self.component.windings[col_cond].conductor_radius - \
-                                             self.component.windings[(col_cond + 1) % 2].conductor_radius \
-                                             - self.component.isolation.cond_cond[2] + self.component.isolation.cond_cond[
-                                                 col_cond]
-
-                                        y = top_bound - self.component.windings[col_cond].conductor_radius
-                                        self.top_window_iso_counter -= 1
-                            #  bottom window
-                            if n_win == 1:
-                                # Initialize the list, that counts the already placed conductors
-                                N_completed = [0, 0]
-
-                                # Initialize the starting conductor
-                                if self.component.windings[0].turns[n_win] >= self.component.windings[1].turns[n_win]:
-                                    col_cond = 0
-                                else:
-                                    col_cond = 1
-
-                                # Initialize the x and y coordinate
-                                x = left_bound + self.component.windings[col_cond].conductor_radius
-                                y = bot_bound + self.component.windings[col_cond].conductor_radius
-
-                                # Continue placing as long as not all conductors have been placed
-                                while (self.component.windings[0].turns[n_win] - N_completed[0] != 0) or \
-                                        (self.component.windings[1].turns[n_win] - N_completed[1] != 0):
-                                    if self.component.windings[col_cond].turns[n_win] - N_completed[col_cond] != 0:
-                                        # is this winding not already finished?
-                                        if x < right_bound - self.component.windings[col_cond].conductor_radius:
-                                            while y < top_bound - self.component.windings[col_cond].conductor_radius and \
-                                                    N_completed[col_cond] < self.component.windings[col_cond].turns[
-                                                n_win]:
-                                                self.p_conductor[col_cond].append(
-                                                    [x, y, 0, self.component.mesh.c_center_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append(
-                                                    [x - self.component.windings[col_cond].conductor_radius,
-                                                     y,
-                                                     0,
-                                                     self.component.mesh.c_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append([x,
-                                                                                   y + self.component.windings[
-                                                                                       col_cond].conductor_radius,
-                                                                                   0,
-                                                                                   self.component.mesh.c_conductor[
-                                                                                       col_cond]])
-
-                                                self.p_conductor[col_cond].append(
-                                                    [x + self.component.windings[col_cond].conductor_radius,
-                                                     y,
-                                                     0,
-                                                     self.component.mesh.c_conductor[col_cond]])
-
-                                                self.p_conductor[col_cond].append([x,
-                                                                                   y - self.component.windings[
-                                                                                       col_cond].conductor_radius,
-                                                                                   0,
-                                                                                   self.component.mesh.c_conductor[
-                                                                                       col_cond]])
-
-                                                N_completed[col_cond] += 1
-
-                                                y += self.component.windings[col_cond].conductor_radius * 2 + \
-                                                     self.component.isolation.cond_cond[col_cond]  # one from bot to top
-
-                                            x += self.component.windings[col_cond].conductor_radius + \
-                                                 self.component.windings[(col_cond + 1) % 2].conductor_radius + \
-                                                 self.component.isolation.cond_cond[2]  # from left to right
-
-                                            # Reset y
-                                            col_cond = (col_cond + 1) % 2
-                                            y = bot_bound + self.component.windings[col_cond].conductor_radius
-
-                                        else:
-                                            break
-
-                                    else:
-                                        # is this winding already finished? - continue with the other one
-                                        col_cond = (col_cond + 1) % 2
-
-                                        # Correct the reset of y and correct x displacement
-                                        x += self.component.windings[col_cond].conductor_radius - \
-                                             self.component.windings[(col_cond + 1) % 2].conductor_radius \
-                                             - self.component.isolation.cond_cond[2] + \
-                                             self.component.isolation.cond_cond[
-                                                 col_cond]
-
-                                        y = bot_bound + self.component.windings[col_cond].conductor_radius
+                                # Needed for the isolations between the columns
+                                self.col_cond_start = col_cond_start
+                                self.top_window_iso_counter = iso_counter
+                            for num in range(0, 2):
+                                add_round_conductors(num, centers[num])
 
                     """Blockwise concentrated"""
                     if isinstance(self.component.virtual_winding_windows[n_win].scheme, list):
@@ -1601,193 +1666,18 @@ class MagneticComponent:
                             raise Warning
 
                         for num in range(0, len(self.component.virtual_winding_windows[n_win].scheme)):
-
-                            y = None
-
-                            # Cases
-                            if num == 0:
-                                y = bot_bound + self.component.windings[num].conductor_radius
-                            if num == 1:
-                                y = top_bound - self.component.windings[num].conductor_radius
-
-                            # Initialization
-                            x = left_bound + self.component.windings[num].conductor_radius
-                            i = 0
-
+                            # Primary winding from bottom to top, secondary winding from top to bottom
                             if self.component.virtual_winding_windows[n_win].scheme[num] == "square":
-
-                                # Primary winding from bottom to top
-                                if num == 0:
-                                    while y < top_bound - self.component.windings[num].conductor_radius and \
-                                            i < self.component.windings[num].turns[n_win]:
-                                        while x < right_bound - self.component.windings[num].conductor_radius and \
-                                                i < self.component.windings[num].turns[n_win]:
-                                            self.p_conductor[num].append(
-                                                [x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x - self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y + self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x + self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y - self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            i += 1
-                                            x += self.component.windings[num].conductor_radius * 2 + \
-                                                 self.component.isolation.cond_cond[
-                                                     num]  # from left to right
-                                        y += self.component.windings[num].conductor_radius * 2 + \
-                                             self.component.isolation.cond_cond[
-                                                 num]  # one step from bot to top
-                                        x = left_bound + self.component.windings[
-                                            num].conductor_radius  # always the same
-
-                                # Secondary winding from top to bottom
-                                if num == 1:
-                                    while y > bot_bound + self.component.windings[num].conductor_radius and i < \
-                                            self.component.windings[num].turns[n_win]:
-                                        while x < right_bound - self.component.windings[num].conductor_radius and i < \
-                                                self.component.windings[num].turns[n_win]:
-                                            self.p_conductor[num].append(
-                                                [x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x - self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y + self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x + self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y - self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            i += 1
-
-                                            x += self.component.windings[num].conductor_radius * 2 + \
-                                                 self.component.isolation.cond_cond[
-                                                     num]  # from left to right
-                                        y += -(self.component.windings[num].conductor_radius * 2) - \
-                                             self.component.isolation.cond_cond[
-                                                 num]  # one step from bot to top
-                                        x = left_bound + self.component.windings[
-                                            num].conductor_radius  # always the same
+                                add_round_conductors(num, square_centers(left_bound, right_bound, bot_bound, top_bound,
+                                                                         windings[num].conductor_radius,
+                                                                         cond_cond[num], windings[num].turns[n_win],
+                                                                         column_wise=False, from_top=num == 1))
 
                             if self.component.virtual_winding_windows[n_win].scheme[num] == "hexa":
-
-                                # Primary winding from bottom to top
-                                if num == 0:
-
-                                    base_line = True
-
-                                    while y < top_bound - self.component.windings[num].conductor_radius and \
-                                            i < self.component.windings[num].turns[n_win]:
-                                        while x < right_bound - self.component.windings[num].conductor_radius and \
-                                                i < self.component.windings[num].turns[n_win]:
-
-                                            self.p_conductor[num].append(
-                                                [x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x - self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y + self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x + self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y - self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            i += 1
-
-                                            x += 2 * np.cos(np.pi / 6) * (
-                                                    self.component.windings[num].conductor_radius +
-                                                    self.component.isolation.cond_cond[num] / 2)
-
-                                            # depending on what line, hexa scheme starts shifted
-                                            # reset y to "new" bottom
-                                            base_line = (not base_line)
-                                            if base_line:
-                                                y -= (self.component.windings[num].conductor_radius +
-                                                      self.component.isolation.cond_cond[num])
-                                            else:
-                                                y += (self.component.windings[num].conductor_radius +
-                                                      self.component.isolation.cond_cond[num])
-
-                                        # Undo last base_line reset
-                                        if base_line:
-                                            y += (self.component.windings[num].conductor_radius +
-                                                  self.component.isolation.cond_cond[num])
-                                        else:
-                                            y -= (self.component.windings[num].conductor_radius +
-                                                  self.component.isolation.cond_cond[num])
-
-                                        base_line = True
-                                        x = left_bound + self.component.windings[num].conductor_radius
-                                        y += self.component.windings[num].conductor_radius + \
-                                             self.component.isolation.cond_cond[num]
-
-                                # Secondary winding from top to bottom
-                                if num == 1:
-
-                                    base_line = True
-
-                                    while y > bot_bound + self.component.windings[num].conductor_radius and \
-                                            i < self.component.windings[num].turns[n_win]:
-                                        while x < right_bound - self.component.windings[num].conductor_radius and \
-                                                i < self.component.windings[num].turns[n_win]:
-                                            print(f"i: {i} "
-                                                  f"x: {x} "
-                                                  f"y: {y} ")
-
-                                            self.p_conductor[num].append(
-                                                [x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x - self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y + self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x + self.component.windings[num].conductor_radius, y, 0,
-                                                 self.component.mesh.c_conductor[num]])
-                                            self.p_conductor[num].append(
-                                                [x, y - self.component.windings[num].conductor_radius, 0,
-                                                 self.component.mesh.c_conductor[num]])
-
-                                            i += 1
-                                            x += 2 * np.cos(np.pi / 6) * (
-                                                    self.component.windings[num].conductor_radius +
-                                                    self.component.isolation.cond_cond[num] / 2)
-
-                                            # depending on what line, hexa scheme starts shifted
-                                            # reset y to "new" bottom
-                                            base_line = (not base_line)
-                                            if base_line:
-                                                y += (self.component.windings[num].conductor_radius +
-                                                      self.component.isolation.cond_cond[num])
-                                            else:
-                                                y -= (self.component.windings[num].conductor_radius +
-                                                      self.component.isolation.cond_cond[num])
-
-                                        # Undo last base_line reset
-                                        if base_line:
-                                            y -= (self.component.windings[num].conductor_radius +
-                                                  self.component.isolation.cond_cond[num])
-                                        else:
-                                            y += (self.component.windings[num].conductor_radius +
-                                                  self.component.isolation.cond_cond[num])
-
-                                        base_line = True
-                                        x = left_bound + self.component.windings[num].conductor_radius
-                                        # from top to bottom
-                                        y -= (self.component.windings[num].conductor_radius +
-                                              self.component.isolation.cond_cond[num])
+                                add_round_conductors(num, hexa_row_centers(left_bound, right_bound, bot_bound,
+                                                                           top_bound, windings[num].conductor_radius,
+                                                                           cond_cond[num], windings[num].turns[n_win],
+                                                                           from_top=num == 1))
 
                 else:
                     # other case is non-interleaved
@@ -1796,190 +1686,70 @@ class MagneticComponent:
                     if self.component.virtual_winding_windows[n_win].winding == "secondary":
                         num = 1
 
-                    if self.component.windings[num].conductor_type == "full":
-                        if sum(self.component.windings[num].turns) != 1:
+                    if windings[num].conductor_type == "full":
+                        if sum(windings[num].turns) != 1:
                             print(f"For a \"full\" conductor you must choose 1 turn for each conductor!")
                         # full window conductor
-                        self.p_conductor[num].append([left_bound, bot_bound, 0, self.component.mesh.c_conductor[num]])
-                        self.p_conductor[num].append([right_bound, bot_bound, 0, self.component.mesh.c_conductor[num]])
-                        self.p_conductor[num].append([left_bound, top_bound, 0, self.component.mesh.c_conductor[num]])
-                        self.p_conductor[num].append([right_bound, top_bound, 0, self.component.mesh.c_conductor[num]])
+                        self.p_conductor[num].append(rectangular_conductor_points(left_bound, right_bound, bot_bound,
+                                                                                  top_bound, mesh.c_conductor[num]))
 
-                    if self.component.windings[num].conductor_type == "stacked":
+                    if windings[num].conductor_type == "stacked":
                         # Stack defined number of turns and chosen thickness
-                        for i in range(0, self.component.windings[num].turns[n_win]):
-                            # CHECK if top bound is reached
-                            if (bot_bound + (i + 1) * self.component.windings[num].thickness +
-                                i * self.component.isolation.cond_cond[num]) <= top_bound:
-                                # stacking from the ground
-                                self.p_conductor[num].append(
-                                    [left_bound, bot_bound + i * self.component.windings[num].thickness + i *
-                                     self.component.isolation.cond_cond[num], 0, self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append([right_bound,
-                                                              bot_bound + i * self.component.windings[
-                                                                  num].thickness + i *
-                                                              self.component.isolation.cond_cond[num], 0,
-                                                              self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append([left_bound,
-                                                              bot_bound + (i + 1) * self.component.windings[
-                                                                  num].thickness + i *
-                                                              self.component.isolation.cond_cond[num], 0,
-                                                              self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append([right_bound,
-                                                              bot_bound + (i + 1) * self.component.windings[
-                                                                  num].thickness + i *
-                                                              self.component.isolation.cond_cond[num], 0,
-                                                              self.component.mesh.c_conductor[num]])
-
-                    if self.component.windings[num].conductor_type == "foil":
-                        print(f"at foil: {self.component.windings[num].wrap_para}")
+                        i = np.arange(windings[num].turns[n_win])
+                        y_min = bot_bound + i * windings[num].thickness + i * cond_cond[num]
+                        y_max = y_min + windings[num].thickness
+                        # CHECK if top bound is reached, stacking from the ground
+                        fits = y_max <= top_bound
+                        self.p_conductor[num].append(rectangular_conductor_points(left_bound, right_bound, y_min[fits],
+                                                                                  y_max[fits], mesh.c_conductor[num]))
+
+                    if windings[num].conductor_type == "foil":
+                        print(f"at foil: {windings[num].wrap_para}")
                         # Wrap defined number of turns and chosen thickness
-                        if self.component.windings[num].wrap_para == "fixed_thickness":
-                            for i in range(0, self.component.windings[num].turns[n_win]):
-                                # CHECK if right bound is reached
-                                if (left_bound + (i + 1) * self.component.windings[num].thickness +
-                                    i * self.component.isolation.cond_cond[num]) <= right_bound:
-                                    # Foils
-                                    self.p_conductor[num].append(
-                                        [left_bound + i * self.component.windings[num].thickness + i *
-                                         self.component.isolation.cond_cond[num],
-                                         bot_bound, 0, self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [left_bound + (i + 1) * self.component.windings[num].thickness + i *
-                                         self.component.isolation.cond_cond[num], bot_bound, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [left_bound + i * self.component.windings[num].thickness + i *
-                                         self.component.isolation.cond_cond[num],
-                                         top_bound, 0, self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [left_bound + (i + 1) * self.component.windings[num].thickness + i *
-                                         self.component.isolation.cond_cond[num], top_bound, 0,
-                                         self.component.mesh.c_conductor[num]])
+                        if windings[num].wrap_para == "fixed_thickness":
+                            i = np.arange(windings[num].turns[n_win])
+                            x_min = left_bound + i * windings[num].thickness + i * cond_cond[num]
+                            x_max = x_min + windings[num].thickness
+                            # CHECK if right bound is reached
+                            fits = x_max <= right_bound
+                            self.p_conductor[num].append(rectangular_conductor_points(x_min[fits], x_max[fits],
+                                                                                      bot_bound, top_bound,
+                                                                                      mesh.c_conductor[num]))
 
                         # Fill the allowed space in the Winding Window with a chosen number of turns
-                        if self.component.windings[num].wrap_para == "interpolate":
-                            x_interpol = np.linspace(left_bound, right_bound + self.component.isolation.cond_cond[num],
-                                                     self.component.windings[num].turns + 1)
-                            for i in range(0, self.component.windings[num].turns):
-                                # Foils
-                                self.p_conductor[num].append(
-                                    [x_interpol[i], bot_bound, 0, self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append(
-                                    [x_interpol[i + 1] - self.component.isolation.cond_cond[num], bot_bound, 0,
-                                     self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append(
-                                    [x_interpol[i], top_bound, 0, self.component.mesh.c_conductor[num]])
-                                self.p_conductor[num].append(
-                                    [x_interpol[i + 1] - self.component.isolation.cond_cond[num], top_bound, 0,
-                                     self.component.mesh.c_conductor[num]])
+                        if windings[num].wrap_para == "interpolate":
+                            x_interpol = np.linspace(left_bound, right_bound + cond_cond[num],
+                                                     windings[num].turns[n_win] + 1)
+                            self.p_conductor[num].append(rectangular_conductor_points(x_interpol[:-1],
+                                                                                      x_interpol[1:] - cond_cond[num],
+                                                                                      bot_bound, top_bound,
+                                                                                      mesh.c_conductor[num]))
 
                     # Round Conductors:
-                    if self.component.windings[num].conductor_type == "litz" or \
-                            self.component.windings[num].conductor_type == "solid":
+                    if windings[num].conductor_type == "litz" or \
+                            windings[num].conductor_type == "solid":
 
                         if self.component.virtual_winding_windows[num].scheme == "square":
-                            y = bot_bound + self.component.windings[num].conductor_radius
-                            x = left_bound + self.component.windings[num].conductor_radius
-                            i = 0
-                            # Case n_conductors higher that "allowed" is missing
-                            while x < right_bound - self.component.windings[num].conductor_radius and i < self.component.windings[num].turns[n_win]:
-                                while y < top_bound - self.component.windings[num].conductor_radius and i < self.component.windings[num].turns[n_win]:
-                                    self.p_conductor[num].append([x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x - self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y + self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x + self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y - self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    i += 1
-                                    y += self.component.windings[num].conductor_radius * 2 + self.component.isolation.cond_cond[num]  # one step from left to right
-                                x += self.component.windings[num].conductor_radius * 2 + self.component.isolation.cond_cond[num]  # from left to top
-                                y = bot_bound + self.component.windings[num].conductor_radius
+                            add_round_conductors(num, square_centers(left_bound, right_bound, bot_bound, top_bound,
+                                                                     windings[num].conductor_radius, cond_cond[num],
+                                                                     windings[num].turns[n_win]))
 
                         if self.component.virtual_winding_windows[num].scheme == "square_full_width":
-                            y = bot_bound + self.component.windings[num].conductor_radius
-                            x = left_bound + self.component.windings[num].conductor_radius
-                            i = 0
-                            # Case n_conductors higher that "allowed" is missing
-                            while y < top_bound - self.component.windings[num].conductor_radius \
-                                    and i < self.component.windings[num].turns[n_win]:
-                                while x < right_bound - self.component.windings[num].conductor_radius \
-                                        and i < self.component.windings[num].turns[n_win]:
-                                    self.p_conductor[num].append([x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x - self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y + self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x + self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y - self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    i += 1
-                                    x += self.component.windings[num].conductor_radius * 2 + \
-                                         self.component.isolation.cond_cond[
-                                             num]  # from left to top
-                                y += self.component.windings[num].conductor_radius * 2 + \
-                                     self.component.isolation.cond_cond[
-                                         num]  # one step from left to right
-                                x = left_bound + self.component.windings[num].conductor_radius  # always the same
+                            add_round_conductors(num, square_centers(left_bound, right_bound, bot_bound, top_bound,
+                                                                     windings[num].conductor_radius, cond_cond[num],
+                                                                     windings[num].turns[n_win], column_wise=False))
 
                         if self.component.virtual_winding_windows[num].scheme == "hexa":
-                            y = bot_bound + self.component.windings[num].conductor_radius
-                            x = left_bound + self.component.windings[num].conductor_radius
-                            i = 0
-                            base_line = True
-                            # Case n_conductors higher that "allowed" is missing
-                            while x < right_bound - self.component.windings[num].conductor_radius \
-                                    and i < self.component.windings[num].turns[n_win]:
-                                while y < top_bound - self.component.windings[num].conductor_radius and \
-                                        i < self.component.windings[num].turns[n_win]:
-                                    self.p_conductor[num].append([x, y, 0, self.component.mesh.c_center_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x - self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y + self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x + self.component.windings[num].conductor_radius, y, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    self.p_conductor[num].append(
-                                        [x, y - self.component.windings[num].conductor_radius, 0,
-                                         self.component.mesh.c_conductor[num]])
-                                    i += 1
-                                    y += self.component.windings[num].conductor_radius * 2 + \
-                                         self.component.isolation.cond_cond[
-                                             num]  # from bottom to top
-                                x += 2 * np.cos(np.pi / 6) * (
-                                        self.component.windings[num].conductor_radius +
-                                        self.component.isolation.cond_cond[num] / 2)
-                                # * np.sqrt(2 / 3 * np.pi / np.sqrt(3))  # one step from left to right
-                                # depending on what line, hexa scheme starts shifted
-                                # reset y to "new" bottom
-                                base_line = (not base_line)
-                                if base_line:
-                                    y = bot_bound + self.component.windings[num].conductor_radius
-                                else:
-                                    y = bot_bound + 2 * self.component.windings[num].conductor_radius + \
-                                        self.component.isolation.cond_cond[
-                                            num] / 2
+                            add_round_conductors(num, hexa_centers(left_bound, right_bound, bot_bound, top_bound,
+                                                                   windings[num].conductor_radius, cond_cond[num],
+                                                                   windings[num].turns[n_win]))
 
             # Checking the Conductors
             for num in range(0, self.component.n_windings):
                 # Convert to numpy
                 # Check if all Conductors could be resolved
-                self.p_conductor[num] = np.asarray(self.p_conductor[num])
+                self.p_conductor[num] = np.concatenate(self.p_conductor[num]) if len(self.p_conductor[num]) > 0 \
+                    else np.zeros((0, 4))
 
                 # TODO:CHECKS for rect. conductors
                 """ CHECK: rectangle conductors with 4 points
@@ -2262,6 +2032,7 @@ class MagneticComponent:
                 else:
                     warnings.warn(f"Isolations are not implemented for components with type {self.component.vw_type}")
 
+        @timed_stage(category="geometry")
         def update(self, isolation_deltas = None):
 
             # Preallocate the arrays, in which the geometries' point coordinates will be stored
@@ -2631,10 +2402,11 @@ class MagneticComponent:
 
                 plt.show()
 
-        def phi_fundamental(self):
+        def currents_fundamental(self):
             """
+            Time functions of the fundamental currents of the nominal operating point.
 
-            :return:
+            :return: time, I1, I2
             """
             # time
             t = np.linspace(min(self.nom_current[0][0]), max(self.nom_current[0][0]), 500) / self.f_1st / 2 / np.pi
@@ -2653,23 +2425,18 @@ class MagneticComponent:
             # I2 = Imax_out * np.cos(t * f + phase_pairs_nom[0][1]+np.pi)
             I2 = self.nom_current_1st[1] * np.cos(t * self.f_1st * 2 * np.pi + self.nom_phase_1st[1] + np.pi)
 
-            # Calc fluxes
-            Phi_top = []
-            Phi_bot = []
-            Phi_stray = []
+            return t, I1, I2
 
-            for i in range(0, len(I1)):
-                CurrentVector = [I1[i], I2[i]]
+        def phi_fundamental(self):
+            """
 
-                #     [Phi_top, Phi_bot] = np.matmul(np.matmul(np.linalg.inv(R), N), self.current)
-                [Phi_top_s, Phi_bot_s] = np.matmul(np.matmul(np.linalg.inv(np.transpose(self.N)), self.L_goal),
-                                                   np.transpose(CurrentVector))
-                Phi_stray_s = Phi_bot_s - Phi_top_s
+            :return:
+            """
+            t, I1, I2 = self.currents_fundamental()
 
-                # Append to lists (for all time-steps)
-                Phi_top.append(Phi_top_s)
-                Phi_bot.append(Phi_bot_s)
-                Phi_stray.append(Phi_stray_s)
+            # Calc fluxes of all time steps with one matrix solve: N^T * [Phi_top, Phi_bot] = L * I
+            Phi_top, Phi_bot = np.linalg.solve(np.transpose(self.N), np.matmul(self.L_goal, np.array([I1, I2])))
+            Phi_stray = Phi_bot - Phi_top
 
             if self.visualize_nom:
                 self.visualize_current_and_flux(t, Phi_top, Phi_bot, Phi_stray, I1, I2)
@@ -2679,36 +2446,59 @@ class MagneticComponent:
         def hysteresis_loss(self, Phi_top, Phi_bot, Phi_stray):
             """
             Returns the hysteresis losses. Assumptions: homogeneous flux, sinusoidal excitation
+            (see hysteresis_losses_integrated_transformer_batched())
             :return:
             """
-            length_corner = self.A_core / self.component.core.core_w / np.pi
-            ri = self.component.core.core_w / 2
-            ro = ri + self.component.core.window_w
-
-            # Top Part
-            b_top = Phi_top / self.A_core
-            Vol_top = self.A_core * (100 - self.component.stray_path.midpoint) / 100 * self.component.core.window_h + \
-                      self.A_core * ((100 - self.component.stray_path.midpoint) / 100 * self.component.core.window_h - \
-                                     self.air_gap_lengths["R_top"])
-
-            p_top = 0.5 * self.component.mu0 * f_N95_mu_imag(self.f_1st, b_top) * Vol_top * 2 * np.pi * self.f_1st * \
-                    (b_top / self.component.core.mu_rel / self.component.mu0) ** 2 + \
-                    self.p_loss_cyl(Phi_top, length_corner, ri, ro)[0]
-
-            # Bot Part
-            b_bot = Phi_bot / self.A_core
-            Vol_bot = self.A_core * self.component.stray_path.midpoint / 100 * self.component.core.window_h + \
-                      self.A_core * (self.component.stray_path.midpoint / 100 * self.component.core.window_h + \
-                                     self.air_gap_lengths["R_bot"])
-            p_bot = 0.5 * self.component.mu0 * f_N95_mu_imag(self.f_1st, b_bot) * Vol_bot * 2 * np.pi * self.f_1st * \
-                    (b_bot / self.component.core.mu_rel / self.component.mu0) ** 2 + \
-                    self.p_loss_cyl(Phi_bot, length_corner, ri, ro)[0]
-
-            # Stray Path
-            p_stray = self.p_loss_cyl(Phi_stray, self.component.stray_path.width, ri,
-                                      ro - self.air_gap_lengths["R_stray"])[0]
-
-            return p_top, p_bot, p_stray
+            p_top, p_bot, p_stray = hysteresis_losses_integrated_transformer_batched(
+                Phi_top, Phi_bot, Phi_stray, self.f_1st, core_w=self.component.core.core_w,
+                window_w=self.component.core.window_w, window_h=self.component.core.window_h,
+                midpoint=self.component.stray_path.midpoint, stray_path_width=self.component.stray_path.width,
+                R_top=self.air_gap_lengths["R_top"], R_bot=self.air_gap_lengths["R_bot"],
+                R_stray=self.air_gap_lengths["R_stray"], mu_rel=self.component.core.mu_rel, mu_imag=f_N95_mu_imag,
+                flux_density_breakpoints=material_database()["N95_measurement"].flux_densities)
+
+            return float(p_top), float(p_bot), float(p_stray)
+
+        def get_core_losses_batched(self, N, core_w, window_w, window_h, midpoint, stray_path_width, R_top, R_bot,
+                                    R_stray, mu_rel):
+            """
+            Vectorized version of get_core_loss(): analytical hysteresis losses of many designs at once. The fluxes of
+            the fundamental and of the nominal time domain currents are calculated with batched matrix solves, the
+            losses of both operating points and all legs with one Gauss-Legendre quadrature.
+
+            :param N: winding matrices, shape (n_designs, 2, 2)
+            :param core_w: core widths (scalar or array of length n_designs, also for the following parameters)
+            :param window_w: window widths
+            :param window_h: window heights
+            :param midpoint: stray path midpoints in percent of the window height
+            :param stray_path_width: stray path widths
+            :param R_top: air gap lengths of the top leg
+            :param R_bot: air gap lengths of the bottom leg
+            :param R_stray: air gap lengths of the stray path
+            :param mu_rel: relative permeabilities
+            :return: p_hyst_nom_1st, p_hyst_nom (arrays of length n_designs)
+            """
+            _, I1_1st, I2_1st = self.currents_fundamental()
+            # Negative sign of the output current as in phi_from_time_currents()
+            operating_points = [np.array([I1_1st, I2_1st], dtype=float),
+                                np.array([self.nom_current[0][1], -np.asarray(self.nom_current[1][1])], dtype=float)]
+
+            # Peak fluxes, shape (operating point, leg, design)
+            Phi_peaks = []
+            for currents in operating_points:
+                Phi = fluxes_from_currents_batched(N, self.L_goal, currents)
+                Phi_peaks.append([np.max(np.abs(Phi[:, 0]), axis=-1), np.max(np.abs(Phi[:, 1]), axis=-1),
+                                  np.max(np.abs(Phi[:, 1] - Phi[:, 0]), axis=-1)])
+            Phi_peaks = np.array(Phi_peaks)
+
+            p_top, p_bot, p_stray = hysteresis_losses_integrated_transformer_batched(
+                Phi_peaks[:, 0], Phi_peaks[:, 1], Phi_peaks[:, 2], self.f_1st, core_w=core_w, window_w=window_w,
+                window_h=window_h, midpoint=midpoint, stray_path_width=stray_path_width, R_top=R_top, R_bot=R_bot,
+                R_stray=R_stray, mu_rel=mu_rel, mu_imag=f_N95_mu_imag,
+                flux_density_breakpoints=material_database()["N95_measurement"].flux_densities)
+            p_hyst = p_top + p_bot + p_stray
+
+            return p_hyst[0], p_hyst[1]
 
         def p_loss_cyl(self, Phi, w, ri, ro):
             """
@@ -2785,23 +2575,11 @@ class MagneticComponent:
             else:
                 warnings.warn("Time values do not match equally for both currents!")
 
-            Phi_top = []
-            Phi_bot = []
-            Phi_stray = []
-
-            for i in range(0, len(I1)):
-                # Negative sign is placed here
-                CurrentVector = [I1[i], -I2[i]]
-
-                #     [Phi_top, Phi_bot] = np.matmul(np.matmul(np.linalg.inv(R), N), self.max_current)
-                [Phi_top_s, Phi_bot_s] = np.matmul(np.matmul(np.linalg.inv(np.transpose(self.N)), self.L_goal),
-                                                   np.transpose(CurrentVector))
-                Phi_stray_s = Phi_bot_s - Phi_top_s
-
-                # Append to lists (for all time-steps)
-                Phi_top.append(Phi_top_s)
-                Phi_bot.append(Phi_bot_s)
-                Phi_stray.append(Phi_stray_s)
+            # Fluxes of all time steps with one matrix solve: N^T * [Phi_top, Phi_bot] = L * I
+            # Negative sign is placed here
+            currents = np.array([I1, -np.asarray(I2)], dtype=float)
+            Phi_top, Phi_bot = np.linalg.solve(np.transpose(self.N), np.matmul(self.L_goal, currents))
+            Phi_stray = Phi_bot - Phi_top
 
             # Visualize
             if visualize:
@@ -2970,11 +2748,36 @@ class MagneticComponent:
                 # print(f"{results=}")
                 return results
 
+        @staticmethod
+        def parameter_grid_to_arrays(parameters_init: Union[List[Dict], Dict]):
+            """
+            Converts a parameter grid into arrays, which can be handled by the vectorized air gap design.
+
+            :param parameters_init: list of parameter dictionaries (e.g. {"window_w": 0.011, "N": [[20, 5], [3, 4]]})
+                or one dictionary of parameter arrays of equal length (e.g. {"window_w": [...], "N": [...]})
+            :type parameters_init: List[Dict] or Dict
+            :return: list of parameter dictionaries (one per parameter set), dictionary of parameter arrays
+            """
+            if isinstance(parameters_init, dict):
+                parameter_arrays = {key: np.asarray(value) for key, value in parameters_init.items()}
+                n_parameters = len(parameter_arrays["N"])
+                parameter_list = [{key: value[index] for key, value in parameter_arrays.items()}
+                                  for index in range(0, n_parameters)]
+            else:
+                parameter_list = list(parameters_init)
+                keys = parameter_list[0].keys() if parameter_list else []
+                parameter_arrays = {key: np.asarray([parameters[key] for parameters in parameter_list])
+                                    for key in keys}
+            return parameter_list, parameter_arrays
+
         def air_gap_design(self, L_goal, parameters_init, stray_path_parametrization=None, f_1st=None,
                            max_current=None, nom_current=None, b_max=None, b_stray=None, material=None,
                            visualize_waveforms=False, nom_current_1st=None, nom_phase_1st=None):
             """
             Performs calculation of air gap lengths according to given data.
+            The reluctance equations of all parameter sets are solved at once (see
+            air_gap_lengths_integrated_transformer_batched()), the analytical hysteresis losses are calculated for
+            the valid parameter sets only.
 
             :param f_1st:
             :param nom_phase_1st:
@@ -2986,7 +2789,8 @@ class MagneticComponent:
             :param stray_path_parametrization: the width of the stray path may be parametrized by "max_flux" or
                 "mean_flux" of the other two legs (top and bot) or by a "given_flux" which can be defined with param:b_stray
             :param b_max:
-            :param parameters_init:
+            :param parameters_init: list of parameter dictionaries or one dictionary of parameter arrays, see
+                parameter_grid_to_arrays()
             :param b_stray:
             :param L_goal: list of inductance goals [inductor: single value L;
                                                      transformer: Inductance Matrix [[L_11, M], [M, L_22]]
@@ -3021,32 +2825,67 @@ class MagneticComponent:
                 self.visualize_max = True
                 self.visualize_nom = True
 
-            if not os.path.exists(self.reluctance_model_folder):
-                os.mkdir(self.reluctance_model_folder)
-
-            # Save initial parameter set
-            # parameters_init = np.asarray(parameters_init)
-            # np.save('Reluctance_Model/parameters_init.npy', parameters_init)
+            self.component.create_folders([self.component.reluctance_model_folder_path])
 
             # Save goal inductance values
             self.L_goal = np.asarray(L_goal)
-            np.save(self.component.path + '/Reluctance_Model/goals.npy', self.L_goal)
+            np.save(os.path.join(self.component.reluctance_model_folder_path, 'goals.npy'), self.L_goal)
 
-            # Initialize result list
-            parameter_results = []
+            if self.component.component_type != "integrated_transformer":
+                raise Exception("The air gap design is only implemented for the integrated_transformer.")
+
+            # The whole parameter grid is handled as arrays
+            parameter_list, parameter_arrays = self.parameter_grid_to_arrays(parameters_init)
 
             # Put to Terminal
             print(f"\n"
                   f"--- ---\n"
                   f"Perform reluctance calculations\n\n"
                   # f"Goal inductance values                   : {L_goal}\n\n"
-                  f"Number of initial reluctance parameters  : {len(parameters_init)}\n")
+                  f"Number of initial reluctance parameters  : {len(parameter_list)}\n")
+
+            # Solve the fringing corrected reluctance equations of all parameter sets at once
+            def parameter(key, default):
+                return parameter_arrays[key] if key in parameter_arrays else default
+
+            air_gap_results = air_gap_lengths_integrated_transformer_batched(
+                N=parameter_arrays["N"], L_goal=self.L_goal, max_current=self.max_current,
+                window_w=parameter("window_w", self.component.core.window_w),
+                window_h=parameter("window_h", self.component.core.window_h),
+                core_w=parameter("core_w", self.component.core.core_w),
+                midpoint=parameter("midpoint", self.component.stray_path.midpoint),
+                b_max=self.b_max, b_stray=self.b_stray,
+                b_stray_rel_overshoot=parameter("b_stray_rel_overshoot", self.b_stray_rel_overshoot),
+                real_core_width=parameter("real_core_width", self.real_core_width),
+                stray_path_parametrization=self.stray_path_parametrization)
+            self.n_singularities += int(np.sum(air_gap_results["singular"]))
 
-            # Update the core to use its internal core parameter calculation functionality
-            # Set attributes of core with given keywords
-            for index, parameters in enumerate(parameters_init):
+            # Initialize result list
+            parameter_results = [None] * len(parameter_list)
+
+            # The analytical hysteresis losses are only calculated for the valid parameter sets, all at once
+            valid = np.flatnonzero(air_gap_results["valid"])
+
+            def valid_values(values):
+                return np.broadcast_to(np.asarray(values, dtype=float), (len(parameter_list),))[valid]
+
+            p_hyst_nom_1st, p_hyst_nom = self.get_core_losses_batched(
+                N=np.asarray(parameter_arrays["N"], dtype=float)[valid],
+                core_w=valid_values(parameter("core_w", self.component.core.core_w)),
+                window_w=valid_values(parameter("window_w", self.component.core.window_w)),
+                window_h=valid_values(parameter("window_h", self.component.core.window_h)),
+                midpoint=valid_values(parameter("midpoint", self.component.stray_path.midpoint)),
+                stray_path_width=air_gap_results["stray_path_width"][valid],
+                R_top=air_gap_results["R_top"][valid], R_bot=air_gap_results["R_bot"][valid],
+                R_stray=air_gap_results["R_stray"][valid],
+                mu_rel=valid_values(parameter("mu_rel", self.component.core.mu_rel)))
+
+            for i_valid, index in enumerate(valid):
+                parameters = parameter_list[index]
+
+                # Update the core to use its internal core parameter calculation functionality
+                # Set attributes of core with given keywords
                 for key, value in parameters.items():
-                    # print(key, value)
                     if hasattr(self, key):
                         setattr(self, key, value)
 
@@ -3059,40 +2898,46 @@ class MagneticComponent:
                     if key == "N":
                         self.N = value
 
-                self.singularity = False
-                air_gap_results = self.get_air_gaps_from_winding_matrix()
-
-                # Check if the result is valid
-                if air_gap_results is None:
-                    all_parameters = None
-                else:
-                    # Add frequency to results
-                    wp_frequency = {"frequency": self.f_1st}
-                    model_results = dict(air_gap_results, **wp_frequency)
-
-                    # Calculate analytical Hysteresis Loss
+                self.component.stray_path.width = float(air_gap_results["stray_path_width"][index])
+                self.A_core = (self.component.core.core_w / 2) ** 2 * np.pi
+                self.A_stray = self.component.stray_path.width * self.component.core.core_w * np.pi
+                self.air_gap_lengths = {key: float(air_gap_results[key][index])
+                                        for key in ["R_top", "R_bot", "R_stray", "R_stray_real"]}
+                self.b_peaks = {key: float(air_gap_results[key][index])
+                                for key in ["R_top_b_peak", "R_bot_b_peak", "R_stray_b_peak"]}
+
+                # Width of the stray path is added to the result data
+                stray_path_width = {"stray_path_width": self.component.stray_path.width}
+                lengths_and_peaks = dict(self.b_peaks, **self.air_gap_lengths)
+                model_results = dict(stray_path_width, **lengths_and_peaks)
+
+                # Add frequency to results
+                wp_frequency = {"frequency": self.f_1st}
+                model_results = dict(model_results, **wp_frequency)
+
+                # Analytical Hysteresis Loss
+                if self.visualize_nom:
                     self.get_core_loss()
-                    losses = {"p_hyst_nom_1st": self.p_hyst_nom_1st, "p_hyst_nom": self.p_hyst_nom}
-
-                    model_results = dict(model_results, **losses)
+                self.p_hyst_nom_1st, self.p_hyst_nom = float(p_hyst_nom_1st[i_valid]), float(p_hyst_nom[i_valid])
+                losses = {"p_hyst_nom_1st": self.p_hyst_nom_1st, "p_hyst_nom": self.p_hyst_nom}
 
-                    all_parameters = dict(parameters, **model_results)
+                model_results = dict(model_results, **losses)
 
-                parameter_results.append(all_parameters)
+                parameter_results[index] = dict(parameters, **model_results)
 
             print(f"Number of singularities: {self.n_singularities}\n")
 
             # Save Results including invalid parameters
-            # print(f"{parameter_results=}")
-
-            np.save(self.component.path + '/Reluctance_Model/parameter_results.npy', parameter_results)
+            np.save(os.path.join(self.component.reluctance_model_folder_path, 'parameter_results.npy'),
+                    parameter_results)
 
             # Filter all entries, that are None
             # Elements of list reluctance_parameters are either a dictionary or None
             valid_parameter_results = [x for x in parameter_results if x is not None]
 
             # Save resulting valid parameters
-            np.save(self.component.path + '/Reluctance_Model/valid_parameter_results.npy', valid_parameter_results)
+            np.save(os.path.join(self.component.reluctance_model_folder_path, 'valid_parameter_results.npy'),
+                    valid_parameter_results)
 
             print(f"Number of valid parameters: {len(valid_parameter_results)}\n\n"
                   f"Ready with reluctance calculations\n"
@@ -3107,12 +2952,36 @@ class MagneticComponent:
 
         """
 
+        # gmsh entity tags of the hybrid geometry, which are needed to define the physical groups. They are stored
+        # together with the cached meshes.
+        geometry_tag_attributes = ["p_core", "p_island", "p_cond", "p_region", "p_iso_core", "p_iso_pri_sec",
+                                   "l_bound_core", "l_bound_air", "l_core_air", "l_cond", "l_region",
+                                   "l_air_gaps_air", "l_iso_core", "l_iso_pri_sec", "l_bound_tmp", "l_symmetry",
+                                   "curve_loop_cond", "curve_loop_island", "curve_loop_air", "curve_loop_air_gaps",
+                                   "curve_loop_iso_core", "curve_loop_iso_pri_sec", "plane_surface_core",
+                                   "plane_surface_cond", "plane_surface_air", "plane_surface_outer_air",
+                                   "plane_surface_air_gaps", "plane_surface_iso_core", "plane_surface_iso_pri_sec"]
+
         def __init__(self, component):
             self.component = component
 
+            # Reuse meshes of identical geometries and mesh settings from the mesh cache
+            self.use_cache = True
+            self.cache_key = None
+
+            # Components, which are mirror symmetric to the horizontal midplane of the window, are meshed as half
+            # model (see detect_mirror_symmetry()). The results are converted to the full component.
+            # Set use_symmetry to False to always mesh the full component.
+            self.use_symmetry = True
+            self.half_model = False
+            self.turn_maps = None  # turn maps of the hybrid mesh, None for a full model
+            self.e_m_turn_maps = None  # turn maps of the electro magnetic mesh, None for a full model
+
             # Initialize gmsh once
             if not gmsh.isInitialized():
                 gmsh.initialize()
+                if profiler.quiet:
+                    gmsh.option.setNumber("General.Terminal", 0)
 
             # Characteristic lengths [for mesh sizes]
             self.global_accuracy = 0.5  # Parameter for mesh-accuracy
@@ -3145,6 +3014,7 @@ class MagneticComponent:
             self.l_air_gaps_air = []
             self.l_iso_core = []
             self.l_iso_pri_sec = []
+            self.l_symmetry = []
             # Curve Loops
             self.curve_loop_cond = [[], []]
             self.curve_loop_island = []
@@ -3163,7 +3033,9 @@ class MagneticComponent:
             self.plane_surface_iso_core = []
             self.plane_surface_iso_pri_sec = []
 
-        def generate_hybrid_mesh(self, do_meshing=True, visualize_before=False, save_png=True, refine=0, alternative_error=0):
+        @timed_stage(category="mesh")
+        def generate_hybrid_mesh(self, do_meshing=True, visualize_before=False, save_png=True, refine=0, alternative_error=0,
+                                 allow_half_model=True):
             """
             - interaction with gmsh
             - mesh generation
@@ -3171,6 +3043,7 @@ class MagneticComponent:
                 - adaptive refinement [future TODO]
                     - with the help of mesh-size-fields/background meshes
                     - with an appropriate local error metric
+                - half model of mirror symmetric components, if use_symmetry is set and allow_half_model is True
 
             :return:
 
@@ -3178,6 +3051,17 @@ class MagneticComponent:
             # Initialization
             self.set_empty_lists()
 
+            self.turn_maps = self.detect_mirror_symmetry() if self.use_symmetry and allow_half_model else None
+            self.half_model = self.turn_maps is not None
+
+            # Look up the mesh of this geometry in the mesh cache
+            self.cache_key = None
+            if self.use_cache and do_meshing and not visualize_before:
+                self.cache_key = self.component.mesh_cache.key(self.geometry_description())
+                if self.load_hybrid_mesh_from_cache(save_png):
+                    print("Hybrid Mesh loaded from the mesh cache")
+                    return
+
             print("Hybrid Mesh Generation in Gmsh")
 
             """
@@ -3199,7 +3083,11 @@ class MagneticComponent:
             # ------------------------------------------ Geometry -------------------------------------------
             # Core generation
             # --------------------------------------- Points --------------------------------------------
-            if self.component.dimensionality == "2D":
+            if self.half_model:
+                print("Mirror symmetric geometry: only the upper half is meshed")
+                self.draw_half_model_geometry()
+
+            elif self.component.dimensionality == "2D":
 
                 # Find points of air gaps (used later)
                 if self.component.air_gaps.number > 0:
@@ -3695,8 +3583,214 @@ class MagneticComponent:
                 gmsh.model.mesh.generate(2)
                 random_value = str(np.random.rand())[-5]
                 gmsh.write(self.component.hybrid_mesh_file)
+                if profiler.enabled:
+                    profiler.annotate(**mesh_statistics(gmsh))
+
+                if self.cache_key is not None:
+                    self.store_hybrid_mesh_in_cache(save_png)
+
+        def geometry_description(self) -> Dict:
+            """
+            Returns all data, which the mesh depends on: the points of the geometry (including the characteristic
+            lengths), the conductor types and mesh settings. Meshes of equal descriptions are equal.
+
+            :return: geometry description
+            :rtype: Dict
+            """
+            two_d_axi = {name: value for name, value in vars(self.component.two_d_axi).items() if name != "component"}
+            return {"component_type": self.component.component_type,
+                    "dimensionality": self.component.dimensionality,
+                    "region": self.component.region,
+                    "two_d_axi": two_d_axi,
+                    "conductor_types": [winding.conductor_type for winding in self.component.windings],
+                    "turns": [winding.turns for winding in self.component.windings],
+                    "virtual_winding_windows": [vww.winding for vww in self.component.virtual_winding_windows],
+                    "air_gaps": self.component.air_gaps.number,
+                    "half_model": self.half_model,
+                    "global_accuracy": self.global_accuracy,
+                    "padding": self.padding,
+                    "skin_mesh_factor": self.skin_mesh_factor,
+                    "c_core": self.c_core,
+                    "c_window": self.c_window,
+                    "c_conductor": self.c_conductor,
+                    "c_center_conductor": self.c_center_conductor,
+                    "gmsh": getattr(gmsh, "__version__", None)}
+
+        def load_hybrid_mesh_from_cache(self, save_png: bool = False) -> bool:
+            """
+            Copies the cached hybrid mesh to the mesh folder and restores the gmsh entity tags of the geometry.
+
+            :param save_png: the cached png of the geometry is needed as well
+            :type save_png: bool
+            :return: True, if the mesh was found in the cache
+            :rtype: bool
+            """
+            cache = self.component.mesh_cache
+            meta = cache.load_meta(self.cache_key)
+            if meta is None or not cache.has_file(self.cache_key, "hybrid.msh"):
+                return False
+            if save_png and not cache.has_file(self.cache_key, "hybrid_color.png"):
+                return False
+
+            # The entry may be deleted by another process in the meantime
+            if not cache.load_file(self.cache_key, "hybrid.msh", self.component.hybrid_mesh_file):
+                return False
+            if save_png and not cache.load_file(self.cache_key, "hybrid_color.png",
+                                                self.component.hybrid_color_visualize_file):
+                return False
+            for name in self.geometry_tag_attributes:
+                setattr(self, name, meta["geometry_tags"][name])
+            return True
+
+        def store_hybrid_mesh_in_cache(self, save_png: bool = False):
+            """
+            Stores the hybrid mesh and the gmsh entity tags of the geometry in the mesh cache.
+
+            :param save_png: stores the png of the geometry as well
+            :type save_png: bool
+            """
+            cache = self.component.mesh_cache
+            cache.store_meta(self.cache_key, {"geometry_tags": {name: getattr(self, name, [])
+                                                                for name in self.geometry_tag_attributes}})
+            cache.store_file(self.cache_key, self.component.hybrid_mesh_file, "hybrid.msh")
+            if save_png and os.path.isfile(self.component.hybrid_color_visualize_file):
+                cache.store_file(self.cache_key, self.component.hybrid_color_visualize_file, "hybrid_color.png")
+
+        def detect_mirror_symmetry(self) -> Optional[List[np.ndarray]]:
+            """
+            Checks, if the component is mirror symmetric to the horizontal midplane of the window (y = 0):
+                - no outer region and no dedicated stray path
+                - no air gap or a single air gap in the center leg, which is centered on the midplane
+                - every conductor lies completely above or below the midplane and has a mirror image of the same winding
+
+            The isolations are not checked, since they are treated as air in the electro magnetic simulation.
+
+            :return: turn maps of all windings (see femmt_symmetry.half_model_turn_map()), None if the component is not
+                mirror symmetric
+            :rtype: List[np.ndarray]
+            """
+            if self.component.dimensionality != "2D" or self.component.region is not None or \
+                    self.component.component_type == "integrated_transformer":
+                return None
+
+            if self.component.air_gaps.number > 1:
+                return None
+            if self.component.air_gaps.number == 1:
+                position_tag, position, _, _ = self.component.air_gaps.midpoints[0]
+                if position_tag != 0 or abs(position) > symmetry_tolerance:
+                    return None
+
+            turn_maps = []
+            for num in range(0, self.component.n_windings):
+                turn_map = half_model_turn_map(self.component.two_d_axi.p_conductor[num],
+                                               self.component.windings[num].conductor_type)
+                if turn_map is None:
+                    return None
+                turn_maps.append(turn_map)
+            return turn_maps
+
+        def draw_half_model_geometry(self):
+            """
+            Creates the gmsh geometry of the upper half of a mirror symmetric component. The lines on the midplane are
+            collected in l_symmetry. They are not part of the boundary with the Dirichlet condition, so the flux
+            crosses the midplane perpendicularly (homogeneous Neumann condition).
+
+            Every modeled conductor is a complete turn, which represents itself and its mirror image. The isolations
+            are not drawn, since they are treated as air in the electro magnetic simulation.
+            """
+            two_d_axi = self.component.two_d_axi
+            x_center = two_d_axi.p_window[6][0]  # core_w / 2
+            x_window = two_d_axi.p_window[7][0]  # r_inner
+            y_window = two_d_axi.p_window[6][1]  # window_h / 2
+            x_outer, y_outer, _, c_outer = two_d_axi.p_outer[3]
+            has_air_gap = self.component.air_gaps.number > 0
+            y_air_gap = self.component.air_gaps.midpoints[0][2] / 2 if has_air_gap else 0
+
+            # Core: from the axis (at the top of the air gap or on the midplane) clockwise around the core
+            self.p_core = [gmsh.model.geo.addPoint(0, y_air_gap, 0, self.c_core),
+                           gmsh.model.geo.addPoint(0, y_outer, 0, c_outer),
+                           gmsh.model.geo.addPoint(x_outer, y_outer, 0, c_outer),
+                           gmsh.model.geo.addPoint(x_outer, 0, 0, c_outer),
+                           gmsh.model.geo.addPoint(x_window, 0, 0, self.c_window),
+                           gmsh.model.geo.addPoint(x_window, y_window, 0, two_d_axi.p_window[7][3]),
+                           gmsh.model.geo.addPoint(x_center, y_window, 0, two_d_axi.p_window[6][3]),
+                           gmsh.model.geo.addPoint(x_center, y_air_gap, 0, self.c_window)]
+            l_core = [gmsh.model.geo.addLine(self.p_core[i], self.p_core[(i + 1) % 8]) for i in range(0, 8)]
+
+            # Axis, top and right side of the core are part of the boundary, the bottom of the outer leg (and of the
+            # center leg without air gap) lies on the midplane
+            self.l_bound_core = l_core[0:3]
+            self.l_core_air = l_core[4:7] + ([l_core[7]] if has_air_gap else [])
+            self.l_symmetry = [l_core[3]] + ([] if has_air_gap else [l_core[7]])
+            curve_loop_core = gmsh.model.geo.addCurveLoop(l_core)
+            self.plane_surface_core.append(gmsh.model.geo.addPlaneSurface([-curve_loop_core]))
+
+            # Upper half of the air gap
+            if has_air_gap:
+                p_axis = gmsh.model.geo.addPoint(0, 0, 0, self.c_core)
+                p_center = gmsh.model.geo.addPoint(x_center, 0, 0, self.c_window)
+                self.l_bound_air.append(gmsh.model.geo.addLine(p_axis, self.p_core[0]))
+                self.l_symmetry.append(gmsh.model.geo.addLine(p_axis, p_center))
+                self.l_air_gaps_air.append(gmsh.model.geo.addLine(p_center, self.p_core[7]))
+                self.curve_loop_air_gaps.append(gmsh.model.geo.addCurveLoop([self.l_symmetry[-1], self.l_air_gaps_air[0],
+                                                                             l_core[7], -self.l_bound_air[0]]))
+                self.plane_surface_air_gaps.append(gmsh.model.geo.addPlaneSurface([self.curve_loop_air_gaps[0]]))
+            else:
+                p_center = self.p_core[7]
+
+            self.l_bound_tmp = self.l_bound_core + self.l_bound_air
+
+            # Conductors above the midplane
+            for num in range(0, self.component.n_windings):
+                conductor_type = self.component.windings[num].conductor_type
+                points = np.asarray(two_d_axi.p_conductor[num]).reshape(-1, 4)
+                if conductor_type == "litz" or conductor_type == "solid":
+                    conductors = points.reshape(-1, 5, 4)[upper_half_conductors(points, conductor_type)]
+                    for conductor in conductors:
+                        p_cond = [gmsh.model.geo.addPoint(x, y, 0, c) for x, y, _, c in conductor]
+                        self.p_cond[num] += p_cond
+                        # Arcs from the left to the top, right and bottom point around the center point
+                        self.l_cond[num] += [gmsh.model.geo.addCircleArc(p_cond[1 + i], p_cond[0], p_cond[1 + (i + 1) % 4])
+                                             for i in range(0, 4)]
+                        self.curve_loop_cond[num].append(gmsh.model.geo.addCurveLoop(self.l_cond[num][-4:]))
+                        self.plane_surface_cond[num].append(gmsh.model.geo.addPlaneSurface([self.curve_loop_cond[num][-1]]))
+                else:
+                    conductors = points.reshape(-1, 4, 4)[upper_half_conductors(points, conductor_type)]
+                    for conductor in conductors:
+                        # bottom left, bottom right, top left, top right
+                        p_cond = [gmsh.model.geo.addPoint(x, y, 0, c) for x, y, _, c in conductor]
+                        self.p_cond[num] += p_cond
+                        self.l_cond[num] += [gmsh.model.geo.addLine(p_cond[0], p_cond[2]),
+                                             gmsh.model.geo.addLine(p_cond[2], p_cond[3]),
+                                             gmsh.model.geo.addLine(p_cond[3], p_cond[1]),
+                                             gmsh.model.geo.addLine(p_cond[1], p_cond[0])]
+                        self.curve_loop_cond[num].append(gmsh.model.geo.addCurveLoop(self.l_cond[num][-4:]))
+                        self.plane_surface_cond[num].append(gmsh.model.geo.addPlaneSurface([self.curve_loop_cond[num][-1]]))
+
+            # Window air: the midplane of the window, the window sides and the side of the air gap, conductors are holes
+            self.l_symmetry.append(gmsh.model.geo.addLine(p_center, self.p_core[4]))
+            l_air = [self.l_symmetry[-1]] + l_core[4:7] + ([-self.l_air_gaps_air[0]] if has_air_gap else [])
+            self.curve_loop_air.append(gmsh.model.geo.addCurveLoop(l_air))
+            flatten_curve_loop_cond = [j for sub in self.curve_loop_cond for j in sub]
+            self.plane_surface_air.append(gmsh.model.geo.addPlaneSurface(self.curve_loop_air + flatten_curve_loop_cond))
+
+        def hybrid_mesh_exists(self) -> bool:
+            """
+            :return: True, if the hybrid mesh of the current geometry has been generated (or loaded from the mesh cache)
+            :rtype: bool
+            """
+            return len(getattr(self, "plane_surface_core", [])) > 0 and \
+                os.path.isfile(self.component.hybrid_mesh_file)
 
         def generate_electro_magnetic_mesh(self, refine = 0):
+            self.e_m_turn_maps = self.turn_maps
+
+            if self.cache_key is not None and \
+                    self.component.mesh_cache.load_file(self.cache_key, "electro_magnetic.msh",
+                                                        self.component.e_m_mesh_file):
+                print("Electro Magnetic Mesh loaded from the mesh cache")
+                return
+
             print("Electro Magnetic Mesh Generation in Gmsh (write physical entities)")
 
             gmsh.open(self.component.hybrid_mesh_file)
@@ -3711,16 +3805,19 @@ class MagneticComponent:
             # Conductors
             self.ps_cond = [[], []]
             for num in range(0, self.component.n_windings):
+                # Only the turns above the midplane are modeled in a half model
+                n_turns = number_of_model_turns(sum(self.component.windings[num].turns),
+                                                None if self.turn_maps is None else self.turn_maps[num])
 
                 if self.component.windings[num].conductor_type == "foil" or \
                         self.component.windings[num].conductor_type == "solid" or \
                         self.component.windings[num].conductor_type == "full" or \
                         self.component.windings[num].conductor_type == "stacked":
-                    for i in range(0, sum(self.component.windings[num].turns)):
+                    for i in range(0, n_turns):
                         self.ps_cond[num].append(
                             gmsh.model.geo.addPhysicalGroup(2, [self.plane_surface_cond[num][i]], tag=4000 + 1000 * num + i))
                 if self.component.windings[num].conductor_type == "litz":
-                    for i in range(0, sum(self.component.windings[num].turns)):
+                    for i in range(0, n_turns):
                         self.ps_cond[num].append(
                             gmsh.model.geo.addPhysicalGroup(2, [self.plane_surface_cond[num][i]], tag=6000 + 1000 * num + i))
 
@@ -3735,6 +3832,10 @@ class MagneticComponent:
             self.pc_bound = gmsh.model.geo.addPhysicalGroup(1, self.l_bound_tmp, tag=1111)
             # print(f"Physical Conductor Surfaces: {ps_cond}")
 
+            # Symmetry plane of a half model (natural boundary condition, see ind_axi_python_controlled.pro)
+            if self.l_symmetry:
+                self.pc_symmetry = gmsh.model.geo.addPhysicalGroup(1, self.l_symmetry, tag=1112)
+
             # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
             # Set names [optional]
             gmsh.model.setPhysicalName(2, self.ps_core, "CORE")
@@ -3743,6 +3844,8 @@ class MagneticComponent:
                     gmsh.model.setPhysicalName(2, self.ps_cond[num][i], f"COND{num + 1}")
             gmsh.model.setPhysicalName(2, self.ps_air, "AIR")
             gmsh.model.setPhysicalName(1, self.pc_bound, "BOUND")
+            if self.l_symmetry:
+                gmsh.model.setPhysicalName(1, self.pc_symmetry, "SYMMETRY")
 
 
 
@@ -3790,6 +3893,11 @@ class MagneticComponent:
                 os.mkdir(self.component.mesh_folder_path)
 
             gmsh.write(self.component.e_m_mesh_file)
+            if profiler.enabled:
+                profiler.annotate(**mesh_statistics(gmsh))
+
+            if self.cache_key is not None:
+                self.component.mesh_cache.store_file(self.cache_key, self.component.e_m_mesh_file, "electro_magnetic.msh")
             # - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - - -
             # Open gmsh GUI for visualization
             # gmsh.fltk.run()
@@ -4057,6 +4165,9 @@ class MagneticComponent:
                                                           self.component.two_d_axi.p_conductor[num][5 * j * i + 5 * j][1]))
                                 for x in x_inter:
                                     for y in y_inter:
+                                        if self.half_model and y < symmetry_tolerance:
+                                            # Not part of the half model
+                                            continue
                                         p_inter.append(gmsh.model.geo.addPoint(x,
                                                                                y,
                                                                                0,
@@ -4154,10 +4265,14 @@ class MagneticComponent:
                     self.delta = 1e20  # random huge value
                     self.red_freq[num] = 0
 
-    def file_communication(self):
+    @timed_stage(category="io")
+    def file_communication(self, sweep_steps: List[Dict] = None):
         """
         Interaction between python and Prolog files.
 
+        :param sweep_steps: excitation of every sweep step, if a frequency sweep is solved within one GetDP run,
+            see write_electro_magnetic_parameter_pro()
+        :type sweep_steps: List[Dict]
         :return:
 
         """
@@ -4167,17 +4282,23 @@ class MagneticComponent:
               f"File Communication\n")
 
         # Write initialization parameters for simulation in .pro file
-        self.write_electro_magnetic_parameter_pro()
+        self.write_electro_magnetic_parameter_pro(sweep_steps)
 
         # Write postprocessing parameters in .pro file
         self.write_electro_magnetic_post_pro()
 
-    def write_electro_magnetic_parameter_pro(self):
+    def write_electro_magnetic_parameter_pro(self, sweep_steps: List[Dict] = None):
         """
         Write materials and other parameters to the "Parameter.pro" file.
         This file is generated by python and is read by gmsh to hand over some parameters.
 
         Source for the parameters is the MagneticComponent object.
+
+        :param sweep_steps: Excitation of every step of a frequency sweep, which is solved within one GetDP run
+            (see excitation_sweep() with multi_frequency=True). Every step is a dictionary with the keys
+            "frequency", "current", "phase_tmp" and "red_freq". The scalar parameters are written for the current
+            excitation of the component (the last sweep step).
+        :type sweep_steps: List[Dict]
         :return: None
         :rtype: None
         """
@@ -4195,6 +4316,14 @@ class MagneticComponent:
         text_file.write("Freq = %s;\n" % self.frequency)
         text_file.write(f"delta = {self.delta};\n")
 
+        # Frequency sweep within one GetDP run
+        if sweep_steps is None:
+            text_file.write(f"Flag_Sweep = 0;\n")
+        else:
+            text_file.write(f"Flag_Sweep = 1;\n")
+            text_file.write(f"NbrSweepSteps = {len(sweep_steps)};\n")
+            text_file.write(f"Freq_List() = {{{', '.join([str(step['frequency']) for step in sweep_steps])}}};\n")
+
         # Core Loss
         text_file.write(f"Flag_Steinmetz_loss = {self.core.steinmetz_loss};\n")
         text_file.write(f"Flag_Generalized_Steinmetz_loss = {self.core.generalized_steinmetz_loss};\n")
@@ -4232,8 +4361,9 @@ class MagneticComponent:
             text_file.write("Flag_imposedRr = %s;\n" % self.flag_imposed_reduced_frequency)
 
             # -- Geometry --
-            # Number of conductors
-            text_file.write(f"NbrCond{num + 1} = {sum(self.windings[num].turns)};\n")
+            # Number of conductors (only the turns above the midplane are modeled in a half model)
+            turn_map = None if self.mesh.e_m_turn_maps is None else self.mesh.e_m_turn_maps[num]
+            text_file.write(f"NbrCond{num + 1} = {number_of_model_turns(sum(self.windings[num].turns), turn_map)};\n")
 
             # For stranded Conductors:
             # text_file.write(f"NbrstrandedCond = {self.turns};\n")  # redundant
@@ -4251,7 +4381,13 @@ class MagneticComponent:
             # -- Excitation --
             # Imposed current, current density or voltage
             if self.flag_excitation_type == 'current':
-                text_file.write(f"Val_EE_{num + 1} = {self.current[num]};\n")
+                if sweep_steps is None:
+                    text_file.write(f"Val_EE_{num + 1} = {self.current[num]};\n")
+                else:
+                    # The value is only used to decide if the winding is excited at all (If(Val_EE_n!=0) in the
+                    # .pro files), the amplitudes of the single steps are given by the lists below
+                    text_file.write(f"Val_EE_{num + 1} = {max([abs(step['current'][num]) for step in sweep_steps])};\n")
+                    self.write_electro_magnetic_sweep_lists(text_file, num, sweep_steps)
                 text_file.write(f"Phase_{num + 1} = Pi*{self.phase_tmp[num]};\n")
                 text_file.write(f"Parallel_{num + 1} = {self.windings[num].parallel};\n")
 
@@ -4275,7 +4411,20 @@ class MagneticComponent:
 
             # Material Properties
             # Conductor Material
-            text_file.write(f"sigma_winding_{num + 1} = {self.windings[num].cond_sigma};\n")
+            turn_sigma = self.windings[num].turn_sigma
+            if turn_sigma is None:
+                text_file.write(f"sigma_winding_{num + 1} = {self.windings[num].cond_sigma};\n")
+                text_file.write(f"Flag_turn_sigma_{num + 1} = 0;\n")
+            else:
+                # Conductivity of every modeled turn (a turn of a half model represents itself and its mirror image),
+                # the homogenized litz model only supports one conductivity per winding
+                text_file.write(f"sigma_winding_{num + 1} = {float(np.mean(turn_sigma))};\n")
+                if self.windings[num].conductor_type == "litz":
+                    text_file.write(f"Flag_turn_sigma_{num + 1} = 0;\n")
+                else:
+                    model_sigma = model_turn_values(turn_sigma, turn_map)
+                    text_file.write(f"Flag_turn_sigma_{num + 1} = 1;\n")
+                    text_file.write(f"sigma_turn_{num + 1} = {{{', '.join(repr(float(sigma)) for sigma in model_sigma)}}};\n")
 
         # -- Materials --
 
@@ -4290,7 +4439,15 @@ class MagneticComponent:
         # if self.frequency == 0:
         if self.core.non_linear:
             text_file.write(f"Flag_NL = 1;\n")
-            text_file.write(f"Core_Material = {self.core.material};\n")  # relative permeability is defined at simulation runtime            text_file.write(f"Flag_NL = 0;\n")
+            text_file.write(f"Nb_max_iter = {self.nl_max_iterations};\n")
+            text_file.write(f"stop_criterion = {self.nl_stop_criterion};\n")
+            if self.nl_relaxation == "adaptive":
+                text_file.write(f"Flag_adaptive_relaxation = 1;\n")
+                text_file.write(f"relaxation_factor = 1;\n")
+            else:
+                text_file.write(f"Flag_adaptive_relaxation = 0;\n")
+                text_file.write(f"relaxation_factor = {self.nl_relaxation};\n")
+            text_file.write(f"Flag_warm_start = {int(self.nl_warm_start)};\n")
         else:
             text_file.write(f"Flag_NL = 0;\n")
             text_file.write(f"mur = {self.core.mu_rel};\n")  # mur is predefined to a fixed value
@@ -4312,6 +4469,62 @@ class MagneticComponent:
 
         text_file.close()
 
+        self.write_material_data_pro()
+
+    def write_material_data_pro(self):
+        """
+        Exports the permeability of the core material from the material database to "material_data.pro". The file
+        defines the functions f_mu_data_real[b, f] and f_mu_data_imag[b, f] at the core temperature (at the
+        temperature of every core region, if core.region_temperatures is given), for nonlinear cores the functions of
+        the B-H curve (nu_bh_data[b], h_bh_data[b], ...). If the permeability is not taken from data, the Function
+        block is empty.
+
+        Materials which are not part of the database use the TDK N95 datasheet data.
+        """
+        with open(os.path.join(self.electro_magnetic_folder_path, "material_data.pro"), "w") as text_file:
+            if self.core.non_linear:
+                text_file.write(material_database().bh_curve(self.core.material).getdp_functions())
+                return
+            if self.core.permeability_type != "from_data":
+                text_file.write("Function{\n}\n")
+                return
+            database = material_database()
+            if self.core.material in database:
+                material = database[self.core.material]
+            else:
+                print(f"Material {self.core.material} is not in the material database, the N95 datasheet data is used.")
+                material = database["N95"]
+            if self.core.region_temperatures is not None:
+                text_file.write(material.getdp_region_functions(
+                    self.core.region_temperatures,
+                    core_region_getdp_conditions(self.core.core_w, self.core.window_w, self.core.window_h)))
+            else:
+                text_file.write(material.getdp_functions(self.core.temperature))
+
+    @staticmethod
+    def write_electro_magnetic_sweep_lists(text_file, num: int, sweep_steps: List[Dict]):
+        """
+        Writes the excitation lists of one winding for a frequency sweep, which is solved within one GetDP run.
+        Inductance factors are set to zero for steps, where the winding is not excited.
+
+        :param text_file: opened "Parameter.pro" file
+        :param num: number of the winding
+        :type num: int
+        :param sweep_steps: excitation of every sweep step, see write_electro_magnetic_parameter_pro()
+        :type sweep_steps: List[Dict]
+        """
+        amplitudes = [step["current"][num] for step in sweep_steps]
+        phases = [np.pi * step["phase_tmp"][num] for step in sweep_steps]
+        reduced_frequencies = [step["red_freq"][num] for step in sweep_steps]
+        signs = [-1 if step["phase_tmp"][num] == 1 else 1 for step in sweep_steps]
+        l_factors = [sign / amplitude if amplitude != 0 else 0 for sign, amplitude in zip(signs, amplitudes)]
+        e_factors = [1 / amplitude ** 2 if amplitude != 0 else 0 for amplitude in amplitudes]
+
+        for name, values in [(f"Val_EE_{num + 1}_List", amplitudes), (f"Phase_{num + 1}_List", phases),
+                             (f"Rr{num + 1}_List", reduced_frequencies), (f"L_Factor_{num + 1}_List", l_factors),
+                             (f"E_Factor_{num + 1}_List", e_factors)]:
+            text_file.write(f"{name}() = {{{', '.join([str(value) for value in values])}}};\n")
+
     def write_electro_magnetic_post_pro(self):
         """
 
@@ -4336,8 +4549,15 @@ class MagneticComponent:
         else:
             text_file.write(f"Flag_show_standard_fields = 0;\n")
 
+        # Field maps
+        field_outputs = self.get_field_outputs()
+        text_file.write(f"Flag_write_fields = {int(self.write_fields and len(field_outputs) > 0)};\n")
+        for name in self.field_outputs:
+            text_file.write(f"Flag_field_{name} = {int(name in field_outputs)};\n")
+
         text_file.close()
 
+    @timed_stage(category="solver")
     def simulate(self):
         """
         Initializes a onelab client. Provides the GetDP based solver with the created mesh file.
@@ -4362,12 +4582,30 @@ class MagneticComponent:
 
         # Run simulations as sub clients (non blocking??)
         mygetdp = os.path.join(self.onelab_folder_path, "getdp")
-        self.onelab_client.runSubClient("myGetDP", mygetdp + " " + solver + " -msh " + self.e_m_mesh_file + " -solve Analysis -v2")
+        run_sub_client(self.onelab_client, "myGetDP", [mygetdp, solver, "-msh", self.e_m_mesh_file, "-solve",
+                                                       "Analysis", "-v2"] + self.solver_output_options())
+
+        # Move the results of this solve from the .dat files into the result store
+        if self.run_id is None:
+            self.start_result_run()
+        self.result_store.import_values(self.run_id, self.e_m_values_folder_path,
+                                        half_model_turns=self.mesh.e_m_turn_maps)
+
+    def start_result_run(self):
+        """
+        Starts a new run in the result store. The results of all following solves are stored under the new run id
+        until the next run is started. Left over .dat files (e.g. of an aborted simulation) are deleted, so they
+        can not be mixed up with the results of the new run.
+        """
+        for file_path, _ in value_files(self.e_m_values_folder_path):
+            os.remove(file_path)
+        self.run_id = self.result_store.new_run()
 
+    @timed_stage(category="io")
     def write_log(self, sweep_number: int = 1, currents: List = None, frequencies: List = None):
         """
-        Method reads back the results from the .dat result files created by the ONELAB simulation client and stores
-        them in a dictionary. From this data type a JSON log file is created.
+        Method reads back the results of the current run from the result store (imported from the .dat result files
+        created by the ONELAB simulation client) and stores them in a dictionary. From this data type a JSON log file is created.
         :param sweep_number: Number of sweep iterations that were done before. For a single simulation sweep_number = 1
         :param currents: Current values of the sweep iterations. Not needed for single simulation
         :return:
@@ -4382,6 +4620,9 @@ class MagneticComponent:
         #               - fundamental frequency is smallest frequency != 0
         log_dict = {"single_sweeps": [], "total_losses": {}}
 
+        # The results of the current run are read from the result store
+        values = self.result_store.load_run(self.run_id, last_n=sweep_number)
+
         for sweep_run in range(0, sweep_number):
             # create dictionary sweep_dict with 'Winding' as a list of m=n_windings winding_dicts.
             # Single values, recieved during one of the n=sweep_number simulations, are added as 'core_eddy_losses' etc.
@@ -4396,9 +4637,6 @@ class MagneticComponent:
                 # single_simulation -> get frequency from instance variable
                 sweep_dict["f"] = self.frequency
 
-            # Winding names are needed to find the logging path
-            winding_name = ["Primary", "Secondary", "Tertiary"]
-
             for winding in range(0, self.n_windings):
 
                 # Create empty winding dictionary
@@ -4424,31 +4662,31 @@ class MagneticComponent:
 
                 # Case litz: Load homogenized results
                 if self.windings[winding].conductor_type == "litz":
-                    winding_dict["winding_losses"] = self.load_result(res_name=f"j2H_{winding + 1}", last_n=sweep_number)[sweep_run]
+                    winding_dict["winding_losses"] = values.get("j2H", winding + 1)[sweep_run]
                     for turn in range(0, self.windings[winding].turns[0]):
-                        winding_dict["turn_losses"].append(self.load_result(res_name=winding_name[winding] + f"/Losses_turn_{turn + 1}", last_n=sweep_number)[sweep_run])
+                        winding_dict["turn_losses"].append(values.get("Losses_turn", winding + 1, turn + 1)[sweep_run])
 
                 # Case litz: Load homogenized results
                 else:
-                    winding_dict["winding_losses"] = self.load_result(res_name=f"j2F_{winding + 1}", last_n=sweep_number)[sweep_run]
+                    winding_dict["winding_losses"] = values.get("j2F", winding + 1)[sweep_run]
                     for turn in range(0, self.windings[winding].turns[0]):
-                        winding_dict["turn_losses"].append(self.load_result(res_name=winding_name[winding] + f"/Losses_turn_{turn + 1}", last_n=sweep_number)[sweep_run])
+                        winding_dict["turn_losses"].append(values.get("Losses_turn", winding + 1, turn + 1)[sweep_run])
 
                 # Flux
-                winding_dict["flux"].append(self.load_result(res_name=f"Flux_Linkage_{winding + 1}", last_n=sweep_number)[sweep_run])
-                winding_dict["flux"].append(self.load_result(res_name=f"Flux_Linkage_{winding + 1}", part="imaginary", last_n=sweep_number)[sweep_run])
+                winding_dict["flux"].append(values.get("Flux_Linkage", winding + 1)[sweep_run])
+                winding_dict["flux"].append(values.get("Flux_Linkage", winding + 1, part="imaginary")[sweep_run])
 
                 # Inductance
-                winding_dict["self_inductivity"].append(self.load_result(res_name=f"L_{winding + 1}{winding + 1}", part="real", last_n=sweep_number)[sweep_run])
-                winding_dict["self_inductivity"].append(self.load_result(res_name=f"L_{winding + 1}{winding + 1}", part="imaginary", last_n=sweep_number)[sweep_run])
+                winding_dict["self_inductivity"].append(values.get("L", winding + 1, part="real")[sweep_run])
+                winding_dict["self_inductivity"].append(values.get("L", winding + 1, part="imaginary")[sweep_run])
 
                 # Magnetic Field Energy
-                winding_dict["mag_field_energy"].append(self.load_result(res_name=f"ME", last_n=sweep_number)[sweep_run])
-                winding_dict["mag_field_energy"].append(self.load_result(res_name=f"ME", part="imaginary", last_n=sweep_number)[sweep_run])
+                winding_dict["mag_field_energy"].append(values.get("ME")[sweep_run])
+                winding_dict["mag_field_energy"].append(values.get("ME", part="imaginary")[sweep_run])
 
                 # Voltage
-                winding_dict["V"].append(self.load_result(res_name=f"Voltage_{winding + 1}", part="real", last_n=sweep_number)[sweep_run])
-                winding_dict["V"].append(self.load_result(res_name=f"Voltage_{winding + 1}", part="imaginary", last_n=sweep_number)[sweep_run])
+                winding_dict["V"].append(values.get("Voltage", winding + 1, part="real")[sweep_run])
+                winding_dict["V"].append(values.get("Voltage", winding + 1, part="imaginary")[sweep_run])
 
                 # Power
                 # using 'winding_dict["V"][0]' to get first element (real part) of V. Use winding_dict["I"][0] to avoid typeerror
@@ -4460,8 +4698,8 @@ class MagneticComponent:
 
 
             # Core losses TODO: Choose between Steinmetz or complex core losses
-            sweep_dict["core_eddy_losses"] = self.load_result(res_name="CoreEddyCurrentLosses", last_n=sweep_number)[sweep_run]
-            sweep_dict["core_hyst_losses"] = self.load_result(res_name="p_hyst", last_n=sweep_number)[sweep_run]
+            sweep_dict["core_eddy_losses"] = values.get("CoreEddyCurrentLosses")[sweep_run]
+            sweep_dict["core_hyst_losses"] = values.get("p_hyst")[sweep_run]
 
             # Sum losses of all windings of one single run
             sweep_dict["all_winding_losses"] = sum(sweep_dict[f"winding{d+1}"]["winding_losses"] for d in range(0, self.n_windings))
@@ -4508,6 +4746,24 @@ class MagneticComponent:
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
     # Post-Processing
+    def field_results(self, step: int = None, use_cache: bool = True) -> FieldResults:
+        """
+        Headless access to the field maps of the last simulation as NumPy arrays (see femmt_fields.FieldResults),
+        e.g. for the peak flux density in the core or the losses per turn of many designs.
+
+        :param step: index of the sweep step, if the field maps of selected sweep steps are written (see
+            set_outputs()), None for the field maps in results/fields
+        :type step: int
+        :param use_cache: cache the arrays as memory-mapped .npy files in the fields folder
+        :type use_cache: bool
+        :return: field results
+        :rtype: FieldResults
+        """
+        fields_folder_path = self.e_m_fields_folder_path if step is None else \
+            os.path.join(self.e_m_fields_folder_path, f"step_{step}")
+        return FieldResults(self.e_m_mesh_file, fields_folder_path, use_cache=use_cache,
+                            turn_maps=self.mesh.e_m_turn_maps)
+
     def visualize(self):
         """
         - a post simulation viewer
@@ -4541,7 +4797,8 @@ class MagneticComponent:
         gmsh.option.setNumber("Mesh.SurfaceEdges", 0)
         view = 0
 
-        if any(self.windings[i].conductor_type != 'litz' for i in range(0, self.n_windings)):
+        if any(self.windings[i].conductor_type != 'litz' for i in range(0, self.n_windings)) and \
+                os.path.isfile(os.path.join(self.e_m_fields_folder_path, "j2F.pos")):
             # Ohmic losses (weighted effective value of current density)
             gmsh.open(os.path.join(self.e_m_fields_folder_path, "j2F.pos"))
             gmsh.option.setNumber(f"View[{view}].ScaleType", 2)
@@ -4555,7 +4812,8 @@ class MagneticComponent:
             print(gmsh.option.getNumber(f"View[{view}].Max"))
             view += 1
 
-        if any(self.windings[i].conductor_type == 'litz' for i in range(0, self.n_windings)):
+        if any(self.windings[i].conductor_type == 'litz' for i in range(0, self.n_windings)) and \
+                os.path.isfile(os.path.join(self.e_m_fields_folder_path, "jH.pos")):
             # Ohmic losses (weighted effective value of current density)
             gmsh.open(os.path.join(self.e_m_fields_folder_path, "jH.pos"))
             gmsh.option.setNumber(f"View[{view}].ScaleType", 2)
@@ -4569,15 +4827,19 @@ class MagneticComponent:
             view += 1
 
         # Magnetic flux density
-        gmsh.open(os.path.join(self.e_m_fields_folder_path, "Magb.pos"))
-        gmsh.option.setNumber(f"View[{view}].ScaleType", 1)
-        gmsh.option.setNumber(f"View[{view}].RangeType", 1)
-        gmsh.option.setNumber(f"View[{view}].CustomMin", gmsh.option.getNumber(f"View[{view}].Min") + epsilon)
-        gmsh.option.setNumber(f"View[{view}].CustomMax", gmsh.option.getNumber(f"View[{view}].Max"))
-        gmsh.option.setNumber(f"View[{view}].ColormapNumber", 1)
-        gmsh.option.setNumber(f"View[{view}].IntervalsType", 2)
-        gmsh.option.setNumber(f"View[{view}].NbIso", 40)
-        view += 1
+        if os.path.isfile(os.path.join(self.e_m_fields_folder_path, "Magb.pos")):
+            gmsh.open(os.path.join(self.e_m_fields_folder_path, "Magb.pos"))
+            gmsh.option.setNumber(f"View[{view}].ScaleType", 1)
+            gmsh.option.setNumber(f"View[{view}].RangeType", 1)
+            gmsh.option.setNumber(f"View[{view}].CustomMin", gmsh.option.getNumber(f"View[{view}].Min") + epsilon)
+            gmsh.option.setNumber(f"View[{view}].CustomMax", gmsh.option.getNumber(f"View[{view}].Max"))
+            gmsh.option.setNumber(f"View[{view}].ColormapNumber", 1)
+            gmsh.option.setNumber(f"View[{view}].IntervalsType", 2)
+            gmsh.option.setNumber(f"View[{view}].NbIso", 40)
+            view += 1
+
+        if view == 0:
+            print(f"No field maps in {self.e_m_fields_folder_path} (see set_outputs()).")
 
         """
         # Vector Potential
@@ -4597,39 +4859,37 @@ class MagneticComponent:
 
     def get_loss_data(self, last_n_values, loss_type='litz_loss'):
         """
-        Returns the last n values from the chosen loss type logged in the result folder.
+        Returns the last n values from the chosen loss type of the current (or latest stored) run.
 
-        :param last_n_values:
-        :param loss_type:
+        :param last_n_values: number of values (sweep steps)
+        :param loss_type: 'litz_loss' (j2H) or 'solid_loss' (j2F)
 
-        :return:
+        :return: list of the losses
 
         """
-        loss_file = None
-        # Loss file location
-        if loss_type == 'litz_loss':
-            loss_file = 'j2H.dat'
-        if loss_type == 'solid_loss':
-            loss_file = 'j2F.dat'
-        # Read the logged losses corresponding to the frequencies
-        with open(os.path.join(self.e_m_values_folder_path, loss_file), newline='') as fd:
-            reader = csv.reader(fd)
-            data = list(reader)
-        return data[-last_n_values:-1] + [data[-1]]
-
-    def load_result(self, res_name, res_type="value", last_n: int = 1, part="real", position: int = 0):
+        loss_names = {'litz_loss': 'j2H', 'solid_loss': 'j2F'}
+        if loss_type not in loss_names:
+            raise ValueError(f"loss_type must be 'litz_loss' or 'solid_loss', not '{loss_type}'.")
+        return self.load_result(loss_names[loss_type], last_n=last_n_values)
+
+    def load_result(self, res_name, res_type="value", last_n: int = 1, part="real", position: int = 0,
+                    run_id: str = None):
         """
         Loads the "last_n" parameters from a result file of the scalar quantity "res_name".
         Either the real or imaginary part can be chosen.
         :param part: "real" or "imaginary" part can be chosen
-        :param res_name: name of the quantity
-        :param res_type: type of the quantity: "value" or "circuit"
+        :param res_name: name of the quantity, e.g. "L_11" or "Primary/Losses_turn_1"
+        :param res_type: type of the quantity: "value" (read from the result store) or "circuit"
         :param last_n: Number of parameters to be loaded
+        :param run_id: run of the result store, defaults to the current (or latest stored) run. Only for "value".
         :return: last_n entries of the chosen result file
         :rtype: list
         """
-        if res_type=="value":
-            res_path=self.e_m_values_folder_path
+        if res_type == "value":
+            quantity, winding, turn = ResultValues.parse_result_name(res_name)
+            values = self.result_store.load_run(run_id or self.run_id, last_n=last_n)
+            return list(values.get(quantity, winding, turn, part=part))
+
         if res_type=="circuit":
             res_path=self.e_m_circuit_folder_path
 
@@ -5217,110 +5477,33 @@ class MagneticComponent:
 
     #  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -  -
     # Litz Approximation [internal methods]
+    @timed_stage(category="litz")
     def pre_simulate(self):
         """
-        Used to determine the litz-approximation coefficients.
+        Writes the litz-approximation coefficients of all litz windings into the workspace of this component.
 
-        :return:
+        The coefficients are interpolated from the litz coefficient library (see femmt_litz_coefficients.py). If there
+        is no library yet, it is generated once in bulk.
 
-        """
-        for num in range(0, self.n_windings):
-            if self.windings[num].conductor_type == 'litz':
-                # ---
-                # Litz Approximation Coefficients were created with 4 layers
-                # That's why here a hard-coded 4 is implemented
-                # if os.path.isfile(self.path +
-                # f"/Strands_Coefficients/coeff/pB_RS_la{self.windings[num].ff}_{self.n_layers[num]}layer.dat"):
-                if os.path.exists(os.path.join(self.e_m_strands_coefficients_folder_path, "coeff", f"pB_RS_la{self.windings[num].ff}_4layer.dat")):
-                    print("Coefficients for stands approximation are found.")
-
-                else:
-                    # Rounding X to fit it with corresponding parameters from the database
-                    X = self.red_freq[num]
-                    X = np.around(X, decimals=3)
-                    print(f"Rounded Reduced frequency X = {X}")
-                    self.create_strand_coeff(num)
+        :return:
 
-    def create_strand_coeff(self, num):
         """
+        litz_windings = [num for num in range(0, self.n_windings) if self.windings[num].conductor_type == 'litz']
+        if not litz_windings:
+            return
 
-        :return:
+        if LitzCoefficientLibrary.exists():
+            library = LitzCoefficientLibrary.load()
+        else:
+            library = generate_litz_coefficient_library(self.onelab_client, self.onelab_folder_path,
+                                                        self.e_m_strands_coefficients_folder_path)
 
-        """
-        print(f"\n"
-              f"Pre-Simulation\n"
-              f"-----------------------------------------\n"
-              f"Create coefficients for strands approximation\n")
-        # Create a new onelab client
-        # -- Pre-Simulation Settings --
-        text_file = open(os.path.join(self.e_m_strands_coefficients_folder_path, "PreParameter.pro"), "w")
-        # ---
-        # Litz Approximation Coefficients are created with 4 layers
-        # That's why here a hard-coded 4 is implemented
-        # text_file.write(f"NbrLayers = {self.n_layers[num]};\n")
-        text_file.write(f"NbrLayers = 4;\n")
-        text_file.write(f"Fill = {self.windings[num].ff};\n")
-        print("Here")
-        text_file.write(f"Rc = {self.windings[num].strand_radius};\n")  # double named!!! must be changed
-        text_file.close()
-        cell_geo = os.path.join(self.e_m_strands_coefficients_folder_path, "cell.geo")
-
-        # Run gmsh as a sub client
-        mygmsh = os.path.join(self.onelab_folder_path, "gmsh")
-        self.onelab_client.runSubClient("myGmsh", mygmsh + " " + cell_geo + " -2 -v 2")
-
-        modes = [1, 2]  # 1 = "skin", 2 = "proximity"
-        reduced_frequencies = np.linspace(0, 1.25, 6)  # must be even
-        for mode in modes:
-            for rf in reduced_frequencies:
-                # -- Pre-Simulation Settings --
-                text_file = open(os.path.join(self.e_m_strands_coefficients_folder_path, "PreParameter.pro"), "w")
-                text_file.write(f"Rr_cell = {rf};\n")
-                text_file.write(f"Mode = {mode};\n")
-                # Litz Approximation Coefficients are created with 4 layers
-                # That's why here a hard-coded 4 is implemented
-                # text_file.write(f"NbrLayers = {self.n_layers[num]};\n")
-                text_file.write(f"NbrLayers = 4;\n")
-
-                text_file.write(f"Fill = {self.windings[num].ff};\n")
-                text_file.write(f"Rc = {self.windings[num].strand_radius};\n")  # double named!!! must be changed
-                text_file.close()
-
-                # get model file names with correct path
-                input_file = os.path.join(self.e_m_strands_coefficients_folder_path, "cell_dat.pro")
-                cell = os.path.join(self.e_m_strands_coefficients_folder_path, "cell.pro")
-
-                # Run simulations as sub clients
-                mygetdp = os.path.join(self.onelab_folder_path, "getdp")
-                self.onelab_client.runSubClient("myGetDP", mygetdp + " " + cell + " -input " + input_file + " -solve MagDyn_a -v2")
-
-        # Formatting stuff
-        # Litz Approximation Coefficients are created with 4 layers
-        # That's why here a hard-coded 4 is implemented
-        # files = [self.path + f"/Strands_Coefficients/coeff/pB_RS_la{self.windings[num].ff}_{self.n_layers[num]}layer.dat",
-        #         self.path + f"/Strands_Coefficients/coeff/pI_RS_la{self.windings[num].ff}_{self.n_layers[num]}layer.dat",
-        #         self.path + f"/Strands_Coefficients/coeff/qB_RS_la{self.windings[num].ff}_{self.n_layers[num]}layer.dat",
-        #         self.path + f"/Strands_Coefficients/coeff/qI_RS_la{self.windings[num].ff}_{self.n_layers[num]}layer.dat"]
-        
-        coeff_folder = os.path.join(self.e_m_strands_coefficients_folder_path, "coeff") 
-        if not os.path.isdir(coeff_folder):
-            os.mkdir(coeff_folder)
-
-        files = [os.path.join(coeff_folder, f"pB_RS_la{self.windings[num].ff}_4layer.dat"),
-                 os.path.join(coeff_folder, f"pI_RS_la{self.windings[num].ff}_4layer.dat"),
-                 os.path.join(coeff_folder, f"qB_RS_la{self.windings[num].ff}_4layer.dat"),
-                 os.path.join(coeff_folder, f"qI_RS_la{self.windings[num].ff}_4layer.dat")]
-        for i in range(0, 4):
-            with fileinput.FileInput(files[i], inplace=True) as file:
-                for line in file:
-                    print(line.replace(' 0\n', '\n'), end='')
-
-        # Corrects pB coefficient error at 0Hz
-        # Must be changed in future in cell.pro
-        for i in range(0, 4):
-            with fileinput.FileInput(files[i], inplace=True) as file:
-                for line in file:
-                    print(line.replace(' 0\n', ' 1\n'), end='')
+        for num in litz_windings:
+            # ---
+            # Litz Approximation Coefficients were created with 4 layers
+            # That's why here a hard-coded 4 is implemented
+            library.write_coefficient_files(os.path.join(self.e_m_strands_coefficients_folder_path, "coeff"),
+                                            winding_number=num + 1, ff=self.windings[num].ff, n_layers=4)
 
     def pre_simulation(self):
         """
@@ -5362,6 +5545,7 @@ class MagneticComponent:
         phi_deg = phi_deg or []
 
         self.mesh.generate_electro_magnetic_mesh()
+        self.start_result_run()
         self.excitation(frequency=freq, amplitude_list=current, phase_deg_list=phi_deg)  # frequency and current
         self.file_communication()
         self.pre_simulate()
@@ -5384,14 +5568,6 @@ class MagneticComponent:
 
         """
 
-        # Remove "old" Inductance Logs
-        try:
-            os.remove(os.path.join(self.e_m_values_folder_path, "L_11.dat"))
-            os.remove(os.path.join(self.e_m_values_folder_path, "L_22.dat"))
-        except:
-            # TODO: Find better way for exception
-            pass
-
         # -- Inductance Estimation --
         self.mesh.mesh(frequency=op_frequency, skin_mesh_factor=skin_mesh_factor)
         # self.high_level_geo_gen(frequency=op_frequency, skin_mesh_factor=skin_mesh_factor)
@@ -5408,18 +5584,14 @@ class MagneticComponent:
             print(f"\n"
                   f"                             == Inductances ==                             \n")
 
+            # The two sweep steps of this run are stored in the result store
+            values = self.result_store.load_run(self.run_id)
+
             # Read the logged Flux_Linkages
-            with open(os.path.join(self.e_m_values_folder_path, "Flux_Linkage_1.dat")) as fd:
-                line = fd.readlines()[-2:]
-                # Fluxes induced in Winding 1
-                Phi_11 = float(line[0].split(sep=' ')[2])
-                Phi_12 = float(line[1].split(sep=' ')[2])
-
-            with open(os.path.join(self.e_m_values_folder_path, "Flux_Linkage_2.dat")) as fd:
-                line = fd.readlines()[-2:]
-                # Fluxes induced in Winding 2
-                Phi_21 = float(line[0].split(sep=' ')[2])
-                Phi_22 = float(line[1].split(sep=' ')[2])
+            # Fluxes induced in Winding 1
+            Phi_11, Phi_12 = values.get("Flux_Linkage", 1)
+            # Fluxes induced in Winding 2
+            Phi_21, Phi_22 = values.get("Flux_Linkage", 2)
 
             print(f"\n"
                   f"Fluxes: \n"
@@ -5460,14 +5632,8 @@ class MagneticComponent:
                   )
 
             # Read the logged inductance values
-            with open(os.path.join(self.e_m_values_folder_path, "L_11.dat")) as fd:
-                line = fd.readlines()[-1]
-                words = line.split(sep=' ')
-                self.L_11 = float(words[2])
-            with open(os.path.join(self.e_m_values_folder_path, "L_22.dat")) as fd:
-                line = fd.readlines()[-1]
-                words = line.split(sep=' ')
-                self.L_22 = float(words[2])
+            self.L_11 = float(values.get("L", 1)[-1])
+            self.L_22 = float(values.get("L", 2)[-1])
             print(f"\n"
                   f"Self Inductances:\n"
                   f"L_11 = {self.L_11}\n"
@@ -5546,6 +5712,7 @@ class MagneticComponent:
         # currents = currents or []
         # phi = phi or []
         print(frequencies, currents, phi)
+        self.start_result_run()
         for i in range(0, len(frequencies)):
             self.excitation(frequency=frequencies[i], amplitude_list=currents[i], phase_deg_list=phi[i])  # frequency and current
             self.file_communication()
@@ -5555,7 +5722,8 @@ class MagneticComponent:
             self.visualize()
 
     def excitation_sweep(self, frequency_list: List, current_list_list: List, phi_deg_list_list: List,
-                         show_last: bool = False, return_results: bool = False, meshing: bool = True) -> Dict:
+                         show_last: bool = False, return_results: bool = False, meshing: bool = True,
+                         multi_frequency: bool = False, continuation: bool = False) -> Dict:
         """
         Performs a sweep simulation for frequency-current pairs. Both values can
         be passed in lists of the same length. The mesh is only created ones (fast sweep)!
@@ -5574,12 +5742,22 @@ class MagneticComponent:
         :type current_list_list: List
         :param phi_deg_list_list: phase in degree, must be a list in a list, see example!
         :type phi_deg_list_list: List
-        :param show_last: shows last simulation in gmsh if set to True
+        :param show_last: shows last simulation in gmsh if set to True. The field maps, which are written, and the
+            sweep steps with field maps are given by the output profile (see set_outputs()).
         :type show_last: bool
         :param return_results: returns results in a dictionary
         :type return_results: bool
         :param meshing:
         :type meshing: bool
+        :param multi_frequency: solve all (non-zero) frequencies within one GetDP run instead of starting GetDP
+            for every frequency. The model is parsed and the mesh is read only once.
+        :type multi_frequency: bool
+        :param continuation: for nonlinear cores: the steps are ordered by similarity (see get_continuation_order())
+            and solved within one GetDP run, every nonlinear solve starts from the solution of the previous step.
+            The results are stored in the order of frequency_list. The warm start only works within one GetDP run:
+            the sweep is split into several runs at DC steps and after every step with field maps (see set_outputs()),
+            the first step of every run starts from zero. Limit the field map steps to keep the continuation intact.
+        :type continuation: bool
 
         :return: Results in a dictionary
         :rtype: Dict
@@ -5600,14 +5778,51 @@ class MagneticComponent:
                 self.mesh.generate_electro_magnetic_mesh()
 
         if self.valid:
-
-            for i in range(0, len(frequency_list)):
-                self.excitation(frequency=frequency_list[i], amplitude_list=current_list_list[i],
-                                phase_deg_list=phi_deg_list_list[i])  # frequency and current
-                self.file_communication()
-                self.pre_simulate()
-                self.simulate()
-                # self.visualize()
+            self.start_result_run()
+
+            # Order in which the steps are solved
+            order = list(range(0, len(frequency_list)))
+            if continuation and self.core.non_linear:
+                order = self.get_continuation_order(frequency_list, current_list_list)
+                multi_frequency = True
+
+            field_steps = self.get_field_output_steps(len(frequency_list))
+            nl_warm_start = self.nl_warm_start
+            try:
+                if multi_frequency:
+                    self.nl_warm_start = self.nl_warm_start or continuation
+                    # Field maps are written for the last step of a GetDP run only
+                    segments = self.split_sweep_segments(
+                        self.get_multi_frequency_segments([frequency_list[i] for i in order]),
+                        [k for k, i in enumerate(order) if i in field_steps])
+                    for segment in segments:
+                        sweep_indices = [order[k] for k in segment]
+                        with profiler.stage("sweep_segment", "step", steps=sweep_indices,
+                                            frequencies=[frequency_list[i] for i in sweep_indices]):
+                            self.write_fields = sweep_indices[-1] in field_steps
+                            self.multi_frequency_simulation([frequency_list[i] for i in sweep_indices],
+                                                            [current_list_list[i] for i in sweep_indices],
+                                                            [phi_deg_list_list[i] for i in sweep_indices])
+                            self.store_step_fields(sweep_indices[-1])
+                else:
+                    for i in range(0, len(frequency_list)):
+                        with profiler.stage("sweep_step", "step", step=i, frequency=frequency_list[i]):
+                            self.write_fields = i in field_steps
+                            self.excitation(frequency=frequency_list[i], amplitude_list=current_list_list[i],
+                                            phase_deg_list=phi_deg_list_list[i])  # frequency and current
+                            self.file_communication()
+                            self.pre_simulate()
+                            self.simulate()
+                            self.store_step_fields(i)
+                            # self.visualize()
+            finally:
+                self.write_fields = True
+                self.nl_warm_start = nl_warm_start
+
+            if order != sorted(order):
+                self.result_store.reorder_steps(self.run_id, order)
+            if self.core.non_linear:
+                self.print_nonlinear_iterations(frequency_list)
 
             self.write_log(sweep_number=len(frequency_list), currents=current_list_list, frequencies=frequency_list)
 
@@ -5625,6 +5840,485 @@ class MagneticComponent:
             if return_results:
                 return {"FEM_results": "invalid"}
 
+    @staticmethod
+    def get_multi_frequency_segments(frequency_list: List) -> List[List[int]]:
+        """
+        Splits the indices of a frequency sweep into segments, which can be solved within one GetDP run.
+        Zero frequency (DC) steps use different post-processing formulas and are simulated on their own.
+        The order of the sweep steps is kept, so the result files are written in the order of frequency_list.
+
+        :param frequency_list: frequencies of the sweep
+        :type frequency_list: List
+        :return: list of segments, every segment is a list of indices of frequency_list
+        :rtype: List[List[int]]
+        """
+        segments = []
+        for i, frequency in enumerate(frequency_list):
+            if frequency == 0 or len(segments) == 0 or frequency_list[segments[-1][-1]] == 0:
+                segments.append([i])
+            else:
+                segments[-1].append(i)
+        return segments
+
+    @staticmethod
+    def get_continuation_order(frequency_list: List, current_list_list: List) -> List[int]:
+        """
+        Orders the steps of a sweep for a continuation of nonlinear solves: starting with the step with the smallest
+        currents (least saturation), the next step is always the most similar remaining step (nearest neighbor of
+        the logarithmic frequency and the current amplitudes, each normalized to its range).
+
+        :param frequency_list: frequencies of the sweep
+        :type frequency_list: List
+        :param current_list_list: current amplitudes of the sweep steps
+        :type current_list_list: List
+        :return: indices of the steps in the order in which they are solved
+        :rtype: List[int]
+        """
+        features = np.column_stack([np.log10(1 + np.abs(np.asarray(frequency_list, dtype=float))),
+                                    np.abs(np.asarray(current_list_list, dtype=float)).reshape(len(frequency_list),
+                                                                                               -1)])
+        ranges = np.ptp(features, axis=0)
+        features = (features - features.min(axis=0)) / np.where(ranges > 0, ranges, 1)
+        distances = np.linalg.norm(features[:, np.newaxis, :] - features[np.newaxis, :, :], axis=2)
+
+        order = [int(np.argmin(features[:, 1:].sum(axis=1)))]
+        remaining = np.ones(len(frequency_list), dtype=bool)
+        remaining[order[0]] = False
+        while remaining.any():
+            next_step = int(np.argmin(np.where(remaining, distances[order[-1]], np.inf)))
+            order.append(next_step)
+            remaining[next_step] = False
+        return order
+
+    def get_nonlinear_iterations(self) -> np.ndarray:
+        """
+        :return: number of nonlinear iterations of every step of the current run
+        :rtype: np.ndarray
+        """
+        return self.result_store.load_run(self.run_id).get("NL_Iterations").astype(int)
+
+    def print_nonlinear_iterations(self, frequency_list: List):
+        """
+        Prints the number of nonlinear iterations of every step of the current run.
+
+        :param frequency_list: frequencies of the steps
+        :type frequency_list: List
+        """
+        try:
+            iterations = self.get_nonlinear_iterations()
+        except Exception:
+            # No iteration counts written (e.g. templates of an older version in the solver workspace)
+            return
+        print(f"\n---\n"
+              f"Nonlinear iterations per step (total {int(iterations.sum())}):")
+        for step, (frequency, n_iterations) in enumerate(zip(frequency_list, iterations)):
+            limit = "  (maximum number of iterations)" if n_iterations >= self.nl_max_iterations else ""
+            print(f"  step {step}: {frequency} Hz, {n_iterations} iterations{limit}")
+
+    @staticmethod
+    def split_sweep_segments(segments: List[List[int]], steps: List[int]) -> List[List[int]]:
+        """
+        Splits the segments of a sweep (see get_multi_frequency_segments()) after the given steps. GetDP writes the
+        field maps for the last step of a run only, so every step with field maps must end a segment.
+
+        :param segments: list of segments, every segment is a list of step indices
+        :type segments: List[List[int]]
+        :param steps: indices of the steps, which must end a segment
+        :type steps: List[int]
+        :return: list of segments
+        :rtype: List[List[int]]
+        """
+        split_segments = []
+        for segment in segments:
+            start = 0
+            for k, index in enumerate(segment[:-1]):
+                if index in steps:
+                    split_segments.append(segment[start:k + 1])
+                    start = k + 1
+            split_segments.append(segment[start:])
+        return split_segments
+
+    def set_outputs(self, values_only: bool = False, fields: Union[List[str], str] = None,
+                    steps: Union[List[int], str] = "last", binary: bool = False):
+        """
+        Sets the output profile of the electro magnetic simulation. The integrated values (losses, flux linkages,
+        voltages, ...) are always written. Field maps (.pos files) are expensive for fine meshes and long sweeps and
+        are only written as far as they are needed.
+
+        :Example Code:
+
+        >>> geo.set_outputs(values_only=True)  # e.g. for optimizations
+        >>> geo.set_outputs(fields=["Magb", "p_hyst"], steps=[0, 5], binary=True)
+
+        :param values_only: no field maps at all
+        :type values_only: bool
+        :param fields: names of the field maps (see MagneticComponent.field_outputs), "standard" for Magb, j2F and
+            jH, None for all field maps
+        :type fields: Union[List[str], str]
+        :param steps: sweep steps with field maps: "last", "all" or a list of step indices. The field maps of the
+            last step are written into results/fields, the ones of selected steps ("all" or a list) into
+            results/fields/step_<index>.
+        :type steps: Union[List[int], str]
+        :param binary: write the field maps in the binary gmsh format (smaller and faster to write and to load)
+        :type binary: bool
+        """
+        if values_only:
+            fields = []
+        elif fields is None:
+            fields = list(self.field_outputs)
+        elif fields == "standard":
+            fields = list(self.standard_field_outputs)
+
+        unknown_fields = [name for name in fields if name not in self.field_outputs]
+        if unknown_fields:
+            raise Exception(f"Unknown field maps {unknown_fields}. Available field maps: {self.field_outputs}")
+        if isinstance(steps, str) and steps not in ["last", "all"]:
+            raise Exception(f"steps must be 'last', 'all' or a list of step indices, not '{steps}'.")
+
+        self.outputs = {"fields": list(fields), "steps": steps if isinstance(steps, str) else list(steps),
+                        "binary": binary}
+
+    def get_field_outputs(self) -> List[str]:
+        """
+        :return: names of the field maps, which are written (see set_outputs()). Without output profile, the
+            standard field maps are written if plot_fields is "standard", all others always.
+        :rtype: List[str]
+        """
+        if self.outputs is not None:
+            return self.outputs["fields"]
+        if self.plot_fields == "standard":
+            return list(self.field_outputs)
+        return [name for name in self.field_outputs if name not in self.standard_field_outputs]
+
+    def get_field_output_steps(self, n_steps: int) -> List[int]:
+        """
+        :param n_steps: number of sweep steps
+        :type n_steps: int
+        :return: indices of the sweep steps with field maps (see set_outputs())
+        :rtype: List[int]
+        """
+        steps = "last" if self.outputs is None else self.outputs["steps"]
+        if n_steps == 0 or not self.get_field_outputs():
+            return []
+        if steps == "last":
+            return [n_steps - 1]
+        if steps == "all":
+            return list(range(0, n_steps))
+        return sorted(set(step % n_steps for step in steps if -n_steps <= step < n_steps))
+
+    def store_step_fields(self, step: int):
+        """
+        Moves the field maps of a sweep step into results/fields/step_<step>, if selected sweep steps are written
+        (see set_outputs()). Otherwise, the field maps stay in results/fields.
+
+        :param step: index of the sweep step
+        :type step: int
+        """
+        if not self.write_fields or self.outputs is None or self.outputs["steps"] == "last":
+            return
+        step_folder_path = os.path.join(self.e_m_fields_folder_path, f"step_{step}")
+        os.makedirs(step_folder_path, exist_ok=True)
+        for name in self.get_field_outputs():
+            file_path = os.path.join(self.e_m_fields_folder_path, f"{name}.pos")
+            if os.path.isfile(file_path):
+                os.replace(file_path, os.path.join(step_folder_path, f"{name}.pos"))
+
+    def solver_output_options(self) -> List[str]:
+        """
+        :return: command line options of GetDP for the output profile (see set_outputs())
+        :rtype: List[str]
+        """
+        if self.outputs is not None and self.outputs["binary"]:
+            return ["-bin"]
+        return []
+
+    def multi_frequency_simulation(self, frequency_list: List, current_list_list: List, phi_deg_list_list: List):
+        """
+        Simulates several frequencies within one GetDP run. The mesh must already exist.
+        The results are appended to the result files in the order of frequency_list, like for single simulations.
+
+        :param frequency_list: Frequency in a list
+        :type frequency_list: List
+        :param current_list_list: current amplitude, must be a list in a list
+        :type current_list_list: List
+        :param phi_deg_list_list: phase in degree, must be a list in a list
+        :type phi_deg_list_list: List
+        """
+        self.write_multi_frequency_files(frequency_list, current_list_list, phi_deg_list_list)
+        self.simulate()
+
+    def write_multi_frequency_files(self, frequency_list: List, current_list_list: List, phi_deg_list_list: List):
+        """
+        Writes the solver input files (Parameter.pro, postquantities.pro, litz coefficients) to simulate several
+        frequencies within one GetDP run, see multi_frequency_simulation().
+
+        :param frequency_list: Frequency in a list
+        :type frequency_list: List
+        :param current_list_list: current amplitude, must be a list in a list
+        :type current_list_list: List
+        :param phi_deg_list_list: phase in degree, must be a list in a list
+        :type phi_deg_list_list: List
+        """
+        sweep_steps = []
+        for i in range(0, len(frequency_list)):
+            self.excitation(frequency=frequency_list[i], amplitude_list=current_list_list[i],
+                            phase_deg_list=phi_deg_list_list[i])
+            for num in range(0, self.n_windings):
+                if self.red_freq[num] > 1.25 and self.windings[num].conductor_type == "litz":
+                    raise ValueError(f"Winding {num + 1}: reduced frequency {self.red_freq[num]} at "
+                                     f"{frequency_list[i]} Hz is above 1.25, the maximum of the litz coefficients.")
+            sweep_steps.append({"frequency": self.frequency,
+                                "current": list(self.current),
+                                "phase_tmp": np.array(self.phase_tmp, dtype=float).copy(),
+                                "red_freq": self.red_freq.copy()})
+
+        if len(sweep_steps) == 1:
+            # Nothing to gain, use the standard parameter file
+            self.file_communication()
+        else:
+            self.file_communication(sweep_steps)
+        self.pre_simulate()
+
+    @contextlib.contextmanager
+    def solver_workspace(self, workspace_directory: str):
+        """
+        Temporarily redirects the solver input files and the result files of the electro magnetic simulation into
+        another directory, so that several GetDP runs on the same mesh can be prepared and executed at the same time.
+
+        :param workspace_directory: directory of the additional solver workspace
+        :type workspace_directory: str
+        """
+        path_names = ["electro_magnetic_folder_path", "e_m_strands_coefficients_folder_path", "results_folder_path",
+                      "e_m_values_folder_path", "e_m_fields_folder_path", "e_m_circuit_folder_path"]
+        original_paths = {name: getattr(self, name) for name in path_names}
+
+        self.electro_magnetic_folder_path = os.path.join(workspace_directory, "electro_magnetic")
+        self.e_m_strands_coefficients_folder_path = os.path.join(self.electro_magnetic_folder_path,
+                                                                 "Strands_Coefficients")
+        self.results_folder_path = os.path.join(workspace_directory, "results")
+        self.e_m_values_folder_path = os.path.join(self.results_folder_path, "values")
+        self.e_m_fields_folder_path = os.path.join(self.results_folder_path, "fields")
+        self.e_m_circuit_folder_path = os.path.join(self.results_folder_path, "circuit")
+        try:
+            for name in path_names:
+                os.makedirs(getattr(self, name), exist_ok=True)
+            self.setup_solver_workspace()
+            yield
+        finally:
+            for name, path in original_paths.items():
+                setattr(self, name, path)
+
+    def solve_excitation_steps(self, frequency_list: List, current_list_list: List, phi_deg_list_list: List,
+                               workers: int = 1):
+        """
+        Simulates a list of excitation steps on the existing mesh and imports the results into the current run of
+        the result store (in the order of the steps).
+
+        With workers > 1, the steps are split into groups, which are solved by parallel GetDP processes in separate
+        solver workspaces (see solver_workspace()).
+
+        :param frequency_list: Frequency in a list
+        :type frequency_list: List
+        :param current_list_list: current amplitude, must be a list in a list
+        :type current_list_list: List
+        :param phi_deg_list_list: phase in degree, must be a list in a list
+        :type phi_deg_list_list: List
+        :param workers: number of parallel GetDP processes
+        :type workers: int
+        """
+        # The excitation steps are basis excitations of a model, their field maps are not needed
+        write_fields, self.write_fields = self.write_fields, False
+        try:
+            self.solve_excitation_step_segments(frequency_list, current_list_list, phi_deg_list_list, workers)
+        finally:
+            self.write_fields = write_fields
+
+    def solve_excitation_step_segments(self, frequency_list: List, current_list_list: List,
+                                       phi_deg_list_list: List, workers: int = 1):
+        """
+        See solve_excitation_steps().
+        """
+        if workers <= 1:
+            for sweep_indices in self.get_multi_frequency_segments(frequency_list):
+                self.multi_frequency_simulation([frequency_list[i] for i in sweep_indices],
+                                                [current_list_list[i] for i in sweep_indices],
+                                                [phi_deg_list_list[i] for i in sweep_indices])
+            return
+
+        segments = []
+        for group in np.array_split(np.arange(len(frequency_list)), min(workers, len(frequency_list))):
+            for sweep_indices in self.get_multi_frequency_segments([frequency_list[i] for i in group]):
+                segments.append([int(group[i]) for i in sweep_indices])
+
+        # The input files are written one after another, only the solvers run in parallel
+        commands, values_folders = [], []
+        mygetdp = os.path.join(self.onelab_folder_path, "getdp")
+        for n_segment, sweep_indices in enumerate(segments):
+            with self.solver_workspace(os.path.join(self.working_directory, "solver_workspaces",
+                                                    f"segment_{n_segment}")):
+                for file_path, _ in value_files(self.e_m_values_folder_path):
+                    os.remove(file_path)
+                self.write_multi_frequency_files([frequency_list[i] for i in sweep_indices],
+                                                 [current_list_list[i] for i in sweep_indices],
+                                                 [phi_deg_list_list[i] for i in sweep_indices])
+                solver = os.path.join(self.electro_magnetic_folder_path, "ind_axi_python_controlled.pro")
+                commands.append([mygetdp, solver, "-msh", self.e_m_mesh_file, "-solve", "Analysis", "-v2"] +
+                                self.solver_output_options())
+                values_folders.append(self.e_m_values_folder_path)
+
+        print(f"\n---\n"
+              f"Run {len(commands)} GetDP processes with {workers} workers\n")
+
+        def run_solver(command):
+            return subprocess.run(command, cwd=self.working_directory, capture_output=True, text=True)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            completed_processes = list(executor.map(run_solver, commands))
+
+        for n_segment, completed_process in enumerate(completed_processes):
+            if completed_process.returncode != 0:
+                raise Exception(f"GetDP failed for the excitation steps {segments[n_segment]}:\n"
+                                f"{completed_process.stdout[-2000:]}{completed_process.stderr[-2000:]}")
+
+        if self.run_id is None:
+            self.start_result_run()
+        for values_folder in values_folders:
+            self.result_store.import_values(self.run_id, values_folder, half_model_turns=self.mesh.e_m_turn_maps)
+
+    def superposition_model(self, frequency_list: List, meshing: bool = True, workers: int = 1) -> SuperpositionModel:
+        """
+        Creates a model of the linear component, which evaluates the results (losses, flux linkages, voltages, ...)
+        for any combination of current amplitudes and phases without further FEM simulations.
+
+        Per frequency, n_windings ** 2 basis excitations are simulated (see superposition_basis()): one with unit
+        current per winding and two per pair of windings for the coupling terms. All non-zero frequencies are
+        solved within one GetDP run.
+
+        Only possible for linear core materials (non_linear=False and no B-dependent permeability data).
+
+        :Example Code for a Transformer:
+
+        >>> model = geo.superposition_model(frequency_list=[200000])
+        >>> losses = model.losses(200000, amplitudes=[[4, 14.5], [3, 11.2]], phases_deg=[[0, 176], [0, 172]])
+
+        :param frequency_list: frequencies of the model
+        :type frequency_list: List
+        :param meshing: create the mesh before the simulation
+        :type meshing: bool
+        :param workers: number of parallel GetDP processes, see solve_excitation_steps()
+        :type workers: int
+        :return: superposition model
+        :rtype: SuperpositionModel
+        """
+        if self.core.non_linear or self.core.permeability_type == "from_data":
+            raise Exception("The superposition of results is only possible for linear core materials "
+                            "(non_linear=False and a constant permeability).")
+
+        if meshing:
+            self.high_level_geo_gen(frequency=frequency_list[0])
+            if not self.valid:
+                raise Exception("The model is not valid. The simulation won't start.")
+            self.mesh.generate_hybrid_mesh()
+            self.mesh.generate_electro_magnetic_mesh()
+
+        basis = superposition_basis(self.n_windings)
+        step_frequencies, step_amplitudes, step_phases = [], [], []
+        for frequency in frequency_list:
+            for currents in basis:
+                step_frequencies.append(frequency)
+                step_amplitudes.append(list(np.abs(currents)))
+                step_phases.append(list(np.rad2deg(np.angle(currents))))
+
+        self.start_result_run()
+        self.solve_excitation_steps(step_frequencies, step_amplitudes, step_phases, workers=workers)
+
+        values = self.result_store.load_run(self.run_id)
+        shape = (len(frequency_list), len(basis))
+        quadratic_samples, linear_samples = {}, {}
+        for quantity, winding, turn in values.quantities():
+            real = values.get(quantity, winding, turn)
+            if len(real) != len(step_frequencies):
+                # e.g. inductances, which are only written for excited windings
+                continue
+            if quantity in quadratic_quantities:
+                quadratic_samples[(quantity, winding, turn)] = real.reshape(shape)
+            elif quantity in linear_quantities:
+                imaginary = values.get(quantity, winding, turn, part="imaginary")
+                linear_samples[(quantity, winding, turn)] = (real + 1j * imaginary).reshape(shape)
+
+        return SuperpositionModel.from_samples(frequency_list, basis, quadratic_samples, linear_samples)
+
+    def impedance_matrix(self, frequency_list: List, workers: Optional[int] = None,
+                         meshing: bool = True) -> np.ndarray:
+        """
+        Returns the complex impedance matrix Z = R + jωL of all windings for every frequency.
+
+        The matrices are identified from unit current excitations (see superposition_model()), the solves of
+        different frequencies run in parallel GetDP processes. The results are read from the result store of the
+        run, no result files are parsed.
+
+        :Example Code for a Transformer:
+
+        >>> Z = geo.impedance_matrix(frequency_list=[50000, 100000, 200000], workers=3)
+        >>> R_12, L_12 = Z[:, 0, 1].real, Z[:, 0, 1].imag / (2 * np.pi * 200000)
+
+        :param frequency_list: frequencies in Hz
+        :type frequency_list: List
+        :param workers: number of parallel GetDP processes, defaults to the number of frequencies (limited by the
+            number of CPUs)
+        :type workers: int
+        :param meshing: create the mesh before the simulation
+        :type meshing: bool
+        :return: impedance matrices with the shape (len(frequency_list), n_windings, n_windings)
+        :rtype: np.ndarray
+        """
+        if workers is None:
+            workers = min(len(frequency_list), os.cpu_count() or 1)
+        model = self.superposition_model(frequency_list, meshing=meshing, workers=workers)
+        return model.impedance_matrix()
+
+    def frequency_response(self, f_min: float, f_max: float, tolerance: float = 1e-2, n_initial: int = 5,
+                           max_samples: int = 30, workers: Optional[int] = None) -> FrequencyResponseModel:
+        """
+        Creates a passive rational model (vector fitting) of the impedance matrix over a broad frequency band, which
+        evaluates R(f) and L(f) at any frequency without further FEM simulations. The FEM frequencies are chosen
+        adaptively: new frequencies are only simulated where the estimated error exceeds the tolerance.
+
+        The mesh is created once for the highest frequency (smallest skin depth).
+
+        :Example Code for a Transformer:
+
+        >>> model = geo.frequency_response(f_min=1e3, f_max=1e6, tolerance=1e-3)
+        >>> R = model.resistance([50e3, 150e3, 250e3])
+        >>> L = model.inductance([50e3, 150e3, 250e3])
+
+        :param f_min: lowest frequency in Hz (> 0)
+        :type f_min: float
+        :param f_max: highest frequency in Hz
+        :type f_max: float
+        :param tolerance: accepted relative error of resistances and reactances
+        :type tolerance: float
+        :param n_initial: number of initial FEM frequencies
+        :type n_initial: int
+        :param max_samples: maximum number of FEM frequencies
+        :type max_samples: int
+        :param workers: number of parallel GetDP processes, see impedance_matrix()
+        :type workers: int
+        :return: frequency response model
+        :rtype: FrequencyResponseModel
+        """
+        self.high_level_geo_gen(frequency=f_max)
+        if not self.valid:
+            raise Exception("The model is not valid. The simulation won't start.")
+        self.mesh.generate_hybrid_mesh()
+        self.mesh.generate_electro_magnetic_mesh()
+
+        builder = FrequencyResponseBuilder(lambda frequencies: self.impedance_matrix(frequencies, workers=workers,
+                                                                                     meshing=False),
+                                           f_min, f_max, tolerance=tolerance, n_initial=n_initial,
+                                           max_samples=max_samples)
+        return builder.build()
+
     def get_steinmetz_loss(self, Ipeak=None, ki=1, alpha=1.2, beta=2.2, t_rise=3e-6, t_fall=3e-6, f_switch=100000,
                            skin_mesh_factor=0.5):
         """
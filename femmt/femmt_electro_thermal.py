@@ -0,0 +1,159 @@
+import numpy as np
+from typing import List, Optional, Union
+
+# Temperature in °C at which the conductivities of the wire material database are given
+conductivity_reference_temperature = 20
+
+# Temperature coefficient of the resistivity (1/K), used for conductor materials without database entry (copper)
+default_temperature_coefficient = 3.93e-3
+
+# Regions of the core with their own temperature in the coupled electro-thermal simulation. The window region is the
+# stray path of integrated transformers.
+core_regions = ["center_leg", "outer_leg", "top_yoke", "bottom_yoke", "window"]
+
+
+def conductivity_at_temperature(sigma: float, temperature: Union[float, np.ndarray],
+                                temperature_coefficient: float = default_temperature_coefficient) -> np.ndarray:
+    """
+    Electrical conductivity of a conductor with a linear temperature dependence of the resistivity:
+    rho(T) = rho_20 * (1 + alpha * (T - 20 °C)).
+
+    :param sigma: conductivity at the reference temperature in S/m
+    :type sigma: float
+    :param temperature: conductor temperature(s) in °C
+    :param temperature_coefficient: temperature coefficient alpha of the resistivity in 1/K
+    :type temperature_coefficient: float
+    :return: conductivity in S/m
+    :rtype: np.ndarray
+    """
+    return sigma / (1 + temperature_coefficient * (np.asarray(temperature, dtype=float) -
+                                                   conductivity_reference_temperature))
+
+
+def model_turn_values(values: np.ndarray, turn_map: Optional[np.ndarray]) -> np.ndarray:
+    """
+    :param values: value of every turn of the full component
+    :type values: np.ndarray
+    :param turn_map: turn map of a half model (see femmt_symmetry.half_model_turn_map()), None for the full model
+    :type turn_map: np.ndarray
+    :return: value of every modeled turn, the mean of the turns it represents in a half model
+    :rtype: np.ndarray
+    """
+    values = np.asarray(values, dtype=float)
+    if turn_map is None:
+        return values
+    return np.bincount(turn_map, weights=values) / np.bincount(turn_map)
+
+
+def core_region_indices(r, z, core_w: float, window_w: float, window_h: float) -> np.ndarray:
+    """
+    Core region (index in core_regions) of points of the axisymmetric core. The legs are separated from the yokes by
+    the radial extension of the window, the window is centered at z = 0.
+
+    :param r: radial coordinates
+    :param z: axial coordinates
+    :param core_w: core width (diameter of the center leg)
+    :type core_w: float
+    :param window_w: window width
+    :type window_w: float
+    :param window_h: window height
+    :type window_h: float
+    :return: region index of every point
+    :rtype: np.ndarray
+    """
+    r, z = np.broadcast_arrays(np.abs(np.asarray(r, dtype=float)), np.asarray(z, dtype=float))
+    return np.select([r <= core_w / 2, r >= core_w / 2 + window_w, z >= window_h / 2, z <= -window_h / 2],
+                     [0, 1, 2, 3], default=4)
+
+
+def core_region_getdp_conditions(core_w: float, window_w: float, window_h: float) -> List[str]:
+    """
+    :return: GetDP conditions of the first len(core_regions) - 1 regions in the order of core_region_indices() (the
+        last region is the remaining one)
+    :rtype: List[str]
+    """
+    return [f"Fabs[X[]] <= {core_w / 2!r}", f"Fabs[X[]] >= {core_w / 2 + window_w!r}", f"Y[] >= {window_h / 2!r}",
+            f"Y[] <= {-window_h / 2!r}"]
+
+
+def core_region_means(fields, name: str, core_w: float, window_w: float, window_h: float) -> np.ndarray:
+    """
+    Volume weighted means of a real valued field in the core regions, e.g. the core temperatures. Regions without
+    elements (e.g. the window region without stray path) get the mean of the whole core.
+
+    :param fields: field results of the simulation (femmt_fields.FieldResults)
+    :param name: name of the field map, e.g. "thermal"
+    :type name: str
+    :param core_w: core width
+    :type core_w: float
+    :param window_w: window width
+    :type window_w: float
+    :param window_h: window height
+    :type window_h: float
+    :return: mean of every region in core_regions
+    :rtype: np.ndarray
+    """
+    mask = fields.region_mask(name, "core")
+    rows = fields.element_rows(name)[mask]
+    volumes = fields.volumes(name)[mask]
+    values = np.real(fields.field(name).element_means()[mask, 0])
+    regions = core_region_indices(fields.elements["x"][rows], fields.elements["y"][rows], core_w, window_w, window_h)
+
+    region_volumes = np.bincount(regions, weights=volumes, minlength=len(core_regions))
+    region_integrals = np.bincount(regions, weights=values * volumes, minlength=len(core_regions))
+    core_mean = np.sum(region_integrals) / np.sum(region_volumes) if np.sum(region_volumes) > 0 else np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(region_volumes > 0, region_integrals / region_volumes, core_mean)
+
+
+class AndersonAcceleration:
+    """
+    Anderson acceleration of the fixed point iteration x = g(x). The next iterate is the combination of the last
+    depth + 1 evaluations of g, which minimizes the linearized residual g(x) - x.
+
+    :Example Code:
+
+    >>> anderson = AndersonAcceleration(depth=3)
+    >>> x = x_0
+    >>> for _ in range(max_iterations):
+    >>>     g = fixed_point_function(x)
+    >>>     x = anderson.update(x, g)
+    """
+
+    def __init__(self, depth: int = 3, damping: float = 1.0):
+        """
+        :param depth: number of previous iterates which are used, 0 results in the (damped) plain fixed point iteration
+        :type depth: int
+        :param damping: damping factor beta of the update (1: no damping)
+        :type damping: float
+        """
+        self.depth = depth
+        self.damping = damping
+        self.x_history = []
+        self.residual_history = []
+
+    def update(self, x: np.ndarray, g: np.ndarray) -> np.ndarray:
+        """
+        :param x: current iterate
+        :type x: np.ndarray
+        :param g: fixed point function evaluated at x
+        :type g: np.ndarray
+        :return: next iterate
+        :rtype: np.ndarray
+        """
+        x = np.asarray(x, dtype=float)
+        residual = np.asarray(g, dtype=float) - x
+        self.x_history = (self.x_history + [x])[-(self.depth + 1):]
+        self.residual_history = (self.residual_history + [residual])[-(self.depth + 1):]
+
+        x_next = x + self.damping * residual
+        if len(self.x_history) > 1:
+            delta_x = np.diff(np.array(self.x_history), axis=0).T
+            delta_residual = np.diff(np.array(self.residual_history), axis=0).T
+            gamma = np.linalg.lstsq(delta_residual, residual, rcond=None)[0]
+            x_next -= (delta_x + self.damping * delta_residual) @ gamma
+        return x_next
+
+    def reset(self):
+        self.x_history = []
+        self.residual_history = []
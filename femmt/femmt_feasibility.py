@@ -0,0 +1,435 @@
+import numpy as np
+from typing import List, Dict, Tuple, Union
+
+# All functions with array arguments broadcast their arguments, so a whole parameter grid is checked at once, e.g.
+# square_capacity(window_w[:, None], window_h[None, :], radius, cond_cond) for all combinations of window_w and window_h.
+ArrayLike = Union[float, np.ndarray]
+
+
+def _count(start: ArrayLike, stop: ArrayLike, step: ArrayLike) -> np.ndarray:
+    """
+    Number of positions start + k * step (k = 0, 1, ...) which lie strictly before stop, like
+    femmt_winding_placement.line_positions().
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.maximum(np.ceil((np.asarray(stop, dtype=float) - start) / step), 0)
+
+
+def _needed(n_turns: ArrayLike, per_layer: ArrayLike) -> np.ndarray:
+    """
+    Number of layers (rows or columns) for n_turns with per_layer turns each, inf if no turn fits in a layer.
+    """
+    n_turns = np.asarray(n_turns, dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(n_turns > 0, np.where(per_layer > 0, np.ceil(n_turns / per_layer), np.inf), 0)
+
+
+def square_capacity(width: ArrayLike, height: ArrayLike, radius: ArrayLike, cond_cond: ArrayLike) -> np.ndarray:
+    """
+    Maximum number of turns of the "square" and "square_full_width" schemes in a virtual winding window.
+
+    :param width: width of the virtual winding window
+    :param height: height of the virtual winding window
+    :param radius: conductor radius
+    :param cond_cond: isolation between two turns
+    :return: number of turns
+    :rtype: np.ndarray
+    """
+    step = 2 * np.asarray(radius, dtype=float) + cond_cond
+    return _count(radius, width - radius, step) * _count(radius, height - radius, step)
+
+
+def hexa_capacity(width: ArrayLike, height: ArrayLike, radius: ArrayLike, cond_cond: ArrayLike) -> np.ndarray:
+    """
+    Maximum number of turns of the "hexa" scheme (columns, every second one shifted upwards) in a virtual winding
+    window.
+
+    :return: number of turns
+    :rtype: np.ndarray
+    """
+    radius = np.asarray(radius, dtype=float)
+    step = 2 * radius + cond_cond
+    n_columns = _count(radius, width - radius, 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2))
+    rows_base = _count(radius, height - radius, step)
+    rows_shifted = _count(2 * radius + cond_cond / 2, height - radius, step)
+    return np.ceil(n_columns / 2) * rows_base + np.floor(n_columns / 2) * rows_shifted
+
+
+def turns_fit(scheme: str, width: ArrayLike, height: ArrayLike, n_turns: ArrayLike, radius: ArrayLike,
+              cond_cond: ArrayLike) -> np.ndarray:
+    """
+    Checks whether all turns of a single winding fit into a virtual winding window.
+
+    :param scheme: "square", "square_full_width" or "hexa"
+    :type scheme: str
+    :param width: width of the virtual winding window
+    :param height: height of the virtual winding window
+    :param n_turns: number of turns
+    :param radius: conductor radius
+    :param cond_cond: isolation between two turns
+    :return: True where all turns fit
+    :rtype: np.ndarray
+    """
+    if scheme in ["square", "square_full_width"]:
+        capacity = square_capacity(width, height, radius, cond_cond)
+    elif scheme == "hexa":
+        capacity = hexa_capacity(width, height, radius, cond_cond)
+    else:
+        raise Exception(f"The winding scheme {scheme} is unknown.")
+    return capacity >= n_turns
+
+
+def block_height(scheme: str, width: ArrayLike, n_turns: ArrayLike, radius: ArrayLike,
+                 cond_cond: ArrayLike) -> np.ndarray:
+    """
+    Height, which a blockwise concentrated winding (rows of the "square" or "hexa" scheme) occupies in a virtual
+    winding window of the given width.
+
+    :param scheme: "square" or "hexa"
+    :type scheme: str
+    :return: height from the bottom of the lowest to the top of the highest turn, inf if no turn fits in a row
+    :rtype: np.ndarray
+    """
+    radius = np.asarray(radius, dtype=float)
+    if scheme == "square":
+        per_row = _count(radius, width - radius, 2 * radius + cond_cond)
+        row_step = 2 * radius + cond_cond
+        shift = 0
+    elif scheme == "hexa":
+        per_row = _count(radius, width - radius, 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2))
+        # Rows of an even number of conductors end on the base line, rows of an odd number on the shifted line
+        row_step = (radius + cond_cond) * np.where(per_row % 2 == 0, 2, 1)
+    else:
+        raise Exception(f"The winding scheme {scheme} is unknown.")
+
+    n_rows = _needed(n_turns, per_row)
+    with np.errstate(invalid="ignore"):
+        if scheme == "hexa":
+            # The shifted conductors of the last row determine the height, if there are any
+            shift = np.where(n_turns - (n_rows - 1) * per_row >= 2, radius + cond_cond, 0)
+        return np.where(n_rows > 0, (n_rows - 1) * row_step + 2 * radius + shift, 0)
+
+
+def interleaved_turns_fit(scheme: Union[str, List[str]], width: ArrayLike, height: ArrayLike,
+                          turns: Tuple[ArrayLike, ArrayLike], radii: Tuple[ArrayLike, ArrayLike],
+                          cond_cond: Tuple[ArrayLike, ArrayLike, ArrayLike]) -> np.ndarray:
+    """
+    Checks whether all turns of two interleaved windings fit into a virtual winding window.
+
+    :param scheme: "horizontal" (alternating columns) or a list of two blockwise schemes, e.g. ["square", "hexa"]
+        (primary from the bottom, secondary from the top). The "vertical" and "bifilar" schemes are not implemented
+        in draw_conductors(), so they never fit.
+    :type scheme: str or List[str]
+    :param width: width of the virtual winding window
+    :param height: height of the virtual winding window
+    :param turns: number of turns of both windings
+    :param radii: conductor radii of both windings
+    :param cond_cond: isolations [primary-primary, secondary-secondary, primary-secondary]
+    :return: True where all turns fit
+    :rtype: np.ndarray
+    """
+    turns = [np.asarray(n, dtype=float) for n in turns]
+    radii = [np.asarray(r, dtype=float) for r in radii]
+
+    if isinstance(scheme, list):
+        heights = [block_height(scheme[num], width, turns[num], radii[num], cond_cond[num]) for num in range(0, 2)]
+        both = (turns[0] > 0) & (turns[1] > 0)
+        return heights[0] + heights[1] + np.where(both, cond_cond[2], 0) <= height
+
+    if scheme in ["vertical", "bifilar"]:
+        return np.zeros(np.broadcast(width, height, *turns, *radii).shape, dtype=bool)
+    if scheme != "horizontal":
+        raise Exception(f"The winding scheme {scheme} is unknown.")
+
+    # Turns per column and number of columns of both windings
+    per_layer = [_count(radii[c], height - radii[c], 2 * radii[c] + cond_cond[c]) for c in range(0, 2)]
+    layers = [_needed(turns[c], per_layer[c]) for c in range(0, 2)]
+
+    # The winding with more turns (a) starts, the layers alternate until one winding is completed, the remaining
+    # layers (tail) belong to the other winding
+    a_starts = turns[0] >= turns[1]
+    layers_a = np.where(a_starts, layers[0], layers[1])
+    layers_b = np.where(a_starts, layers[1], layers[0])
+    radius_a = np.where(a_starts, radii[0], radii[1])
+    tail_is_a = layers_a > layers_b
+
+    pitch = radii[0] + radii[1] + cond_cond[2]
+    with np.errstate(invalid="ignore"):
+        alternating = 2 * np.minimum(layers_a, layers_b) + tail_is_a
+        tail = np.abs(layers_a - layers_b) - tail_is_a
+        position_alternating = radius_a + (alternating - 1) * pitch
+        last_is_a = alternating % 2 == 1
+
+        fits = np.isfinite(layers_a) & np.isfinite(layers_b)
+        for c in range(0, 2):
+            is_a = np.where(a_starts, c == 0, c == 1)
+            # Last layer of winding c in the alternating part
+            index = np.where(last_is_a == is_a, alternating - 1, alternating - 2)
+            position = radius_a + index * pitch
+            # Winding c owns the tail
+            owns_tail = (tail > 0) & (tail_is_a == is_a)
+            position = np.where(owns_tail, position_alternating + tail * (2 * radii[c] + cond_cond[c]), position)
+            fits = fits & ((layers[c] == 0) | (position < width - radii[c]))
+    return fits
+
+
+def air_gap_positions(method: str, window_h: ArrayLike, air_gap_position: ArrayLike = None) -> np.ndarray:
+    """
+    Center coordinates of the air gaps as calculated by AirGaps.update().
+
+    :param method: "center", "percent" or "manually"
+    :type method: str
+    :param window_h: height of the winding window
+    :param air_gap_position: positions with the shape (..., n_air_gaps) in percent of the window height
+        ("percent") or in m ("manually")
+    :return: center coordinates of the air gaps
+    :rtype: np.ndarray
+    """
+    if method == "center":
+        return np.zeros(np.shape(window_h) + (1,))
+    if method == "percent":
+        return np.asarray(air_gap_position, dtype=float) / 100 * np.asarray(window_h)[..., np.newaxis] - \
+            np.asarray(window_h)[..., np.newaxis] / 2
+    if method == "manually":
+        return np.asarray(air_gap_position, dtype=float)
+    raise Exception(f"The air gap method {method} is unknown.")
+
+
+def air_gaps_overlap(positions: np.ndarray, heights: np.ndarray, position_tags: np.ndarray = None) -> np.ndarray:
+    """
+    Checks whether air gaps on the same leg overlap or touch each other.
+
+    :param positions: center coordinates with the shape (..., n_air_gaps)
+    :param heights: air gap heights with the same shape
+    :param position_tags: legs of the air gaps (-1, 0, 1), defaults to the center leg for all air gaps
+    :return: True where two air gaps overlap
+    :rtype: np.ndarray
+    """
+    positions, heights = np.broadcast_arrays(np.asarray(positions, dtype=float), np.asarray(heights, dtype=float))
+    if position_tags is None:
+        position_tags = np.zeros(positions.shape[-1])
+    distance = np.abs(positions[..., :, np.newaxis] - positions[..., np.newaxis, :])
+    minimum_distance = (heights[..., :, np.newaxis] + heights[..., np.newaxis, :]) / 2
+    same_leg = np.asarray(position_tags)[:, np.newaxis] == np.asarray(position_tags)[np.newaxis, :]
+    pairs = np.triu(np.ones((positions.shape[-1],) * 2, dtype=bool), k=1) & same_leg
+    return np.any((distance <= minimum_distance) & pairs, axis=(-2, -1))
+
+
+def air_gaps_inside(positions: np.ndarray, heights: np.ndarray, window_h: ArrayLike) -> np.ndarray:
+    """
+    Checks whether all air gaps lie within the height of the winding window.
+
+    :param positions: center coordinates with the shape (..., n_air_gaps)
+    :param heights: air gap heights with the same shape
+    :param window_h: height of the winding window
+    :return: True where all air gaps lie inside
+    :rtype: np.ndarray
+    """
+    half = np.asarray(window_h, dtype=float)[..., np.newaxis] / 2
+    positions = np.asarray(positions, dtype=float)
+    heights = np.asarray(heights, dtype=float)
+    return np.all((heights > 0) & (positions - heights / 2 >= -half) & (positions + heights / 2 <= half), axis=-1)
+
+
+def inductor_feasibility(core_w: ArrayLike, window_w: ArrayLike, window_h: ArrayLike, n_turns: ArrayLike,
+                         conductor_radius: ArrayLike, core_cond_isolation: List[ArrayLike],
+                         cond_cond_isolation: ArrayLike, scheme: str = "square", air_gap_h: ArrayLike = None,
+                         air_gap_method: str = "center", air_gap_position: ArrayLike = None) -> np.ndarray:
+    """
+    Feasibility of a whole parameter grid of inductors (one virtual winding window with round conductors).
+
+    :Example Code:
+
+    >>> import numpy as np
+    >>> import femmt as fmt
+    >>> window_w, n_turns, radius = np.meshgrid(np.linspace(0.005, 0.02, 50), np.arange(1, 60),
+    >>>                                         np.linspace(0.0005, 0.002, 20), indexing="ij")
+    >>> feasible = fmt.inductor_feasibility(0.02, window_w, 0.03, n_turns, radius, [0.001, 0.001, 0.002, 0.001],
+    >>>                                     0.0001, air_gap_h=[0.0005])
+
+    :param core_w: core width
+    :param window_w: width of the winding window
+    :param window_h: height of the winding window
+    :param n_turns: number of turns
+    :param conductor_radius: conductor radius
+    :param core_cond_isolation: isolations [top, bot, left, right] between winding and core
+    :param cond_cond_isolation: isolation between two turns
+    :param scheme: "square", "square_full_width" or "hexa"
+    :param air_gap_h: air gap heights with the shape (..., n_air_gaps)
+    :param air_gap_method: "center", "percent" or "manually"
+    :param air_gap_position: air gap positions (see air_gap_positions())
+    :return: True where the design is feasible
+    :rtype: np.ndarray
+    """
+    top, bot, left, right = core_cond_isolation
+    # Bounds of the virtual winding window as in draw_virtual_winding_windows() ("full_window")
+    width = np.asarray(window_w, dtype=float) - left - right
+    height = np.asarray(window_h, dtype=float) - top - bot
+
+    feasible = (width > 0) & (height > 0) & (np.asarray(core_w) > 0)
+    feasible = feasible & turns_fit(scheme, width, height, n_turns, conductor_radius, cond_cond_isolation)
+
+    if air_gap_h is not None:
+        air_gap_h = np.asarray(air_gap_h, dtype=float)
+        positions = air_gap_positions(air_gap_method, window_h, air_gap_position)
+        feasible = feasible & air_gaps_inside(positions, air_gap_h, window_h) & \
+            ~air_gaps_overlap(positions, air_gap_h)
+    return feasible
+
+
+def conductor_radii(conductors: Dict) -> List[float]:
+    """
+    Conductor radii of all windings of a design, litz radii are calculated from the litz parameters as in
+    update_litz_configuration().
+
+    :param conductors: keyword arguments of update_conductors()
+    :type conductors: Dict
+    :return: conductor radii (None for rectangular conductors)
+    :rtype: List[float]
+    """
+    n_windings = len(conductors["n_turns"])
+    radii = []
+    for num in range(0, n_windings):
+        conductor_type = conductors["conductor_type"][num]
+        given_radius = (conductors.get("conductor_radii") or [None] * n_windings)[num]
+        if conductor_type == "litz" and \
+                (conductors.get("litz_para_type") or [None] * n_windings)[num] == "implicit_litz_radius":
+            radii.append(np.sqrt(conductors["strands_numbers"][num] * conductors["strand_radii"][num] ** 2 /
+                                 conductors["ff"][num]))
+        elif conductor_type in ["litz", "solid"]:
+            radii.append(given_radius)
+        else:
+            radii.append(None)
+    return radii
+
+
+def virtual_winding_window_bounds(design: Dict) -> List[Tuple[float, float, float, float]]:
+    """
+    Bounds of the virtual winding windows of a design as calculated by draw_virtual_winding_windows().
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :return: (bot_bound, top_bound, left_bound, right_bound) of every virtual winding window
+    :rtype: List[Tuple[float, float, float, float]]
+    """
+    core = design["core"]
+    conductors = design["conductors"]
+    core_cond = conductors["core_cond_isolation"]
+    cond_cond = conductors["cond_cond_isolation"]
+    window_h = core["window_h"]
+    left = core["core_w"] / 2 + core_cond[2]
+    right = core["core_w"] / 2 + core["window_w"] - core_cond[3]
+    winding = conductors["winding"]
+
+    if design.get("component_type", "inductor") == "integrated_transformer":
+        stray_path = design.get("stray_path", {})
+        air_gaps = design["air_gaps"]
+        positions = air_gap_positions(air_gaps["method"], window_h, air_gaps.get("air_gap_position"))
+        order = np.argsort(positions)
+        positions, heights = positions[order], np.asarray(air_gaps["air_gap_h"], dtype=float)[order]
+        # The stray path lies between two neighbouring air gaps, see draw_virtual_winding_windows()
+        island = (stray_path.get("start_index", 0) - 1) % max(len(positions) - 1, 1)
+        return [(positions[island + 1] - heights[island + 1] / 2 + core_cond[1], window_h / 2 - core_cond[0], left,
+                 right),
+                (-window_h / 2 + core_cond[1], positions[island] + heights[island] / 2 - core_cond[0], left, right)]
+
+    if len(winding) == 2:
+        # "center": the first window is the bottom one
+        return [(-window_h / 2 + core_cond[1], -cond_cond[-1] / 2, left, right),
+                (cond_cond[-1] / 2, window_h / 2 - core_cond[0], left, right)]
+
+    return [(-window_h / 2 + core_cond[0], window_h / 2 - core_cond[1], left, right)]
+
+
+def check_design(design: Dict) -> List[str]:
+    """
+    Checks a design for geometric feasibility without gmsh: dimensions and isolations, air gaps (inside the window,
+    no overlap), stray path and the fit of all turns into the virtual winding windows (round conductors).
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :return: descriptions of all violations, empty if the design is feasible
+    :rtype: List[str]
+    """
+    violations = []
+    core = design["core"]
+    conductors = design["conductors"]
+    air_gaps = design.get("air_gaps", {})
+    component_type = design.get("component_type", "inductor")
+
+    for key in ["core_w", "window_w", "window_h"]:
+        if core.get(key) is None or core[key] <= 0:
+            violations.append(f"Core dimension {key} must be positive.")
+    isolations = list(conductors.get("core_cond_isolation", [])) + list(conductors.get("cond_cond_isolation", []))
+    if len(conductors.get("core_cond_isolation", [])) != 4:
+        violations.append("core_cond_isolation needs four values [top, bot, left, right].")
+    if any(isolation is None or isolation < 0 for isolation in isolations):
+        violations.append("Isolations must not be negative.")
+    if violations:
+        return violations
+
+    # Air gaps
+    n_air_gaps = air_gaps.get("n_air_gaps", 0) or 0
+    if n_air_gaps > 0:
+        positions = air_gap_positions(air_gaps["method"], core["window_h"], air_gaps.get("air_gap_position"))
+        heights = np.asarray(air_gaps["air_gap_h"], dtype=float)
+        if len(heights) != n_air_gaps or positions.shape[-1] != n_air_gaps:
+            violations.append(f"{n_air_gaps} air gaps are defined, but {len(heights)} heights and "
+                              f"{positions.shape[-1]} positions are given.")
+            return violations
+        if not air_gaps_inside(positions, heights, core["window_h"]):
+            violations.append("An air gap lies outside of the window height.")
+        if air_gaps_overlap(positions, heights, air_gaps.get("position_tag")):
+            violations.append("Overlapping air gaps.")
+
+    # Stray path
+    if component_type == "integrated_transformer":
+        stray_path = design.get("stray_path", {})
+        if n_air_gaps < 2:
+            violations.append("The stray path needs at least two air gaps.")
+        elif stray_path.get("radius") is None or \
+                not core["core_w"] / 2 < stray_path["radius"] < core["core_w"] / 2 + core["window_w"]:
+            violations.append("The stray path radius must lie within the winding window.")
+    if violations:
+        return violations
+
+    # Turns in the virtual winding windows
+    radii = conductor_radii(conductors)
+    cond_cond = conductors["cond_cond_isolation"]
+    n_turns = conductors["n_turns"]
+    for n_win, (bot, top, left, right) in enumerate(virtual_winding_window_bounds(design)):
+        width, height = right - left, top - bot
+        if width <= 0 or height <= 0:
+            violations.append(f"The virtual winding window {n_win} has no space left after the isolations.")
+            continue
+        if n_win >= len(conductors["winding"]):
+            continue
+        winding = conductors["winding"][n_win]
+        scheme = conductors["scheme"][n_win]
+
+        if winding == "interleaved":
+            if None in radii[0:2]:
+                continue
+            turns = [n_turns[0][n_win], n_turns[1][n_win]]
+            if not interleaved_turns_fit(scheme, width, height, turns, radii[0:2], cond_cond[0:3]):
+                violations.append(f"The turns {turns} do not fit into the virtual winding window {n_win} "
+                                  f"(scheme {scheme}).")
+        else:
+            num = 0 if winding == "primary" else 1
+            if radii[num] is None or scheme not in ["square", "square_full_width", "hexa"]:
+                continue
+            if not turns_fit(scheme, width, height, n_turns[num][n_win], radii[num], cond_cond[num]):
+                violations.append(f"The {n_turns[num][n_win]} turns of winding {num} do not fit into the virtual "
+                                  f"winding window {n_win} (scheme {scheme}).")
+
+    return violations
+
+
+def feasible_designs(designs: List[Dict]) -> np.ndarray:
+    """
+    :param designs: list of design dictionaries, see run_batch()
+    :type designs: List[Dict]
+    :return: True for every feasible design
+    :rtype: np.ndarray
+    """
+    return np.array([len(check_design(design)) == 0 for design in designs], dtype=bool)
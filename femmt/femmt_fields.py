@@ -0,0 +1,498 @@
+import os
+import numpy as np
+import gmsh
+from typing import List, Optional, Tuple, Union
+
+
+# Data type of the element table of a mesh: one row per 2D element
+mesh_element_dtype = [("tag", "i8"), ("region", "i4"), ("x", "f8"), ("y", "f8"), ("area", "f8")]
+
+# Number of components of the list based view data types (first letter: scalar, vector, tensor) and number of nodes
+# of the 2D element types (second letter: triangle, quadrangle)
+list_data_components = {"S": 1, "V": 3, "T": 9}
+list_data_nodes = {"T": 3, "Q": 4}
+
+# Physical groups of the electro magnetic mesh (see Mesh.generate_electro_magnetic_mesh())
+region_air = [1000, 1001]
+region_core = [2000]
+
+# Name of the sub folder of a fields folder with the cached arrays
+field_data_folder_name = "field_data"
+
+
+def polygon_areas(coordinates: np.ndarray) -> np.ndarray:
+    """
+    :param coordinates: node coordinates of the elements with the shape (n_elements, n_nodes, 2 or 3), the nodes
+        of every element are ordered along its circumference. Missing nodes (NaN) are ignored.
+    :type coordinates: np.ndarray
+    :return: areas of the elements in the x-y plane
+    :rtype: np.ndarray
+    """
+    x, y = coordinates[:, :, 0], coordinates[:, :, 1]
+    valid = ~np.isnan(x)
+    n_nodes = valid.sum(axis=1)
+    # The successor of the last valid node is the first node
+    successor = (np.arange(x.shape[1])[np.newaxis, :] + 1) % n_nodes[:, np.newaxis]
+    x_next = np.take_along_axis(x, successor, axis=1)
+    y_next = np.take_along_axis(y, successor, axis=1)
+    return 0.5 * np.abs(np.nansum(np.where(valid, x * y_next - x_next * y, 0), axis=1))
+
+
+def match_elements(reference_centroids: np.ndarray, reference_tags: np.ndarray, centroids: np.ndarray,
+                   tolerance: float = 1e-9) -> np.ndarray:
+    """
+    Finds the element tags of elements, which are only given by their coordinates (list based field data), by the
+    centroids of the mesh elements.
+
+    :param reference_centroids: centroids of the mesh elements with the shape (n, 2)
+    :type reference_centroids: np.ndarray
+    :param reference_tags: tags of the mesh elements
+    :type reference_tags: np.ndarray
+    :param centroids: centroids of the elements to be found with the shape (m, 2)
+    :type centroids: np.ndarray
+    :param tolerance: resolution of the coordinates in m
+    :type tolerance: float
+    :return: element tags, -1 for elements which are not part of the mesh
+    :rtype: np.ndarray
+    """
+    keys = np.round(np.concatenate([reference_centroids, centroids]) / tolerance).astype(np.int64)
+    _, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+    lookup = np.full(inverse.max() + 1 if len(inverse) else 0, -1, dtype=np.int64)
+    lookup[inverse[:len(reference_tags)]] = reference_tags
+    return lookup[inverse[len(reference_tags):]]
+
+
+def read_mesh_elements(mesh_file_path: str) -> np.ndarray:
+    """
+    Reads the 2D elements of all physical surfaces of a mesh with gmsh (without GUI).
+
+    :param mesh_file_path: path of the .msh file
+    :type mesh_file_path: str
+    :return: element table (see mesh_element_dtype), sorted by the element tag
+    :rtype: np.ndarray
+    """
+    with GmshSession() as session:
+        session.merge(mesh_file_path)
+        node_tags, node_coordinates, _ = gmsh.model.mesh.getNodes()
+        node_index = np.zeros(int(np.max(node_tags)) + 1 if len(node_tags) else 0, dtype=np.int64)
+        node_index[np.asarray(node_tags, dtype=np.int64)] = np.arange(len(node_tags))
+        node_coordinates = np.asarray(node_coordinates).reshape(-1, 3)
+
+        tables = []
+        for dim, physical_tag in gmsh.model.getPhysicalGroups(2):
+            for entity in gmsh.model.getEntitiesForPhysicalGroup(dim, physical_tag):
+                element_types, element_tags, element_node_tags = gmsh.model.mesh.getElements(dim, entity)
+                for element_type, tags, nodes in zip(element_types, element_tags, element_node_tags):
+                    properties = gmsh.model.mesh.getElementProperties(element_type)
+                    n_nodes, n_primary_nodes = properties[3], properties[5]
+                    nodes = np.asarray(nodes, dtype=np.int64).reshape(-1, n_nodes)[:, :n_primary_nodes]
+                    coordinates = node_coordinates[node_index[nodes]]
+
+                    table = np.zeros(len(tags), dtype=mesh_element_dtype)
+                    table["tag"] = tags
+                    table["region"] = physical_tag
+                    table["x"] = coordinates[:, :, 0].mean(axis=1)
+                    table["y"] = coordinates[:, :, 1].mean(axis=1)
+                    table["area"] = polygon_areas(coordinates)
+                    tables.append(table)
+
+    elements = np.concatenate(tables) if tables else np.zeros(0, dtype=mesh_element_dtype)
+    return elements[np.argsort(elements["tag"], kind="stable")]
+
+
+def read_field_file(field_file_path: str, mesh_file_path: str,
+                    mesh_elements: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads a field map (.pos file written by GetDP, ASCII or binary, list or mesh based) with gmsh (without GUI).
+
+    :param field_file_path: path of the .pos file
+    :type field_file_path: str
+    :param mesh_file_path: path of the mesh, which is needed for mesh based field data
+    :type mesh_file_path: str
+    :param mesh_elements: element table of the mesh (see read_mesh_elements()), used to find the elements of list
+        based field data
+    :type mesh_elements: np.ndarray
+    :return: element tags (n_elements) and values with the shape (n_elements, n_nodes, n_components, n_steps).
+        Elements with less nodes are padded with NaN.
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    blocks = []
+    with GmshSession() as session:
+        session.merge(mesh_file_path)
+        for view in session.merge(field_file_path):
+            data_types, numbers_of_elements, list_data = gmsh.view.getListData(view)
+            if sum(numbers_of_elements) > 0:
+                blocks += list_data_blocks(data_types, numbers_of_elements, list_data, mesh_elements)
+            else:
+                blocks.append(model_data_block(view))
+
+    if not blocks:
+        raise Exception(f"{field_file_path} contains no field data.")
+    n_nodes = max(values.shape[1] for _, values in blocks)
+    n_components = max(values.shape[2] for _, values in blocks)
+    n_steps = blocks[0][1].shape[3]
+    if any(values.shape[3] != n_steps for _, values in blocks):
+        raise Exception(f"The views of {field_file_path} have different numbers of steps.")
+
+    tags = np.concatenate([tags for tags, _ in blocks])
+    values = np.full((len(tags), n_nodes, n_components, n_steps), np.nan)
+    start = 0
+    for _, block_values in blocks:
+        values[start:start + len(block_values), :block_values.shape[1], :block_values.shape[2]] = block_values
+        start += len(block_values)
+    return tags, values
+
+
+def list_data_blocks(data_types: List[str], numbers_of_elements: List[int], list_data: List,
+                     mesh_elements: np.ndarray) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Converts list based view data (every element with its node coordinates and values) into element tags and values.
+
+    :return: list of (element tags, values with the shape (n_elements, n_nodes, n_components, n_steps))
+    :rtype: List[Tuple[np.ndarray, np.ndarray]]
+    """
+    blocks = []
+    for data_type, n_elements, data in zip(data_types, numbers_of_elements, list_data):
+        if n_elements == 0:
+            continue
+        if data_type[0] not in list_data_components or data_type[1:] not in list_data_nodes:
+            raise Exception(f"Field data of the type {data_type} is not supported (only 2D elements).")
+        n_components, n_nodes = list_data_components[data_type[0]], list_data_nodes[data_type[1:]]
+
+        records = np.asarray(data, dtype=float).reshape(n_elements, -1)
+        n_steps = (records.shape[1] - 3 * n_nodes) // (n_nodes * n_components)
+        # Record of one element: x of all nodes, y of all nodes, z of all nodes, values of all nodes per step
+        coordinates = records[:, :3 * n_nodes].reshape(n_elements, 3, n_nodes).transpose(0, 2, 1)
+        values = records[:, 3 * n_nodes:].reshape(n_elements, n_steps, n_nodes, n_components).transpose(0, 2, 3, 1)
+
+        centroids = coordinates[:, :, 0:2].mean(axis=1)
+        tags = match_elements(np.column_stack([mesh_elements["x"], mesh_elements["y"]]), mesh_elements["tag"],
+                              centroids)
+        blocks.append((tags, values))
+    return blocks
+
+
+def model_data_block(view: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads mesh based view data (values given per element tag) of all steps of a view.
+
+    :return: element tags and values with the shape (n_elements, n_nodes, n_components, n_steps)
+    :rtype: Tuple[np.ndarray, np.ndarray]
+    """
+    n_steps = int(gmsh.option.getNumber(f"View[{gmsh.view.getIndex(view)}].NbTimeStep"))
+    steps = []
+    tags = None
+    for step in range(0, n_steps):
+        data_type, tags, data, _, n_components = gmsh.view.getModelData(view, step)
+        if data_type not in ["ElementNodeData", "ElementData"]:
+            raise Exception(f"Field data of the type {data_type} is not supported.")
+        data = np.asarray(data, dtype=float)
+        steps.append(data.reshape(len(tags), -1, n_components))
+    return np.asarray(tags, dtype=np.int64), np.stack(steps, axis=3)
+
+
+class GmshSession:
+    """
+    Context manager for reading files with gmsh without GUI. The files are merged into a temporary model, all
+    views and the model are removed again on exit. gmsh is only initialized (and finalized) if necessary.
+    """
+
+    def __init__(self):
+        self.initialized = False
+        self.views = []
+
+    def __enter__(self):
+        self.initialized = not gmsh.isInitialized()
+        if self.initialized:
+            gmsh.initialize()
+            gmsh.option.setNumber("General.Terminal", 0)
+        self.previous_model = gmsh.model.getCurrent() if gmsh.model.list() else None
+        gmsh.model.add("femmt_field_data")
+        return self
+
+    def merge(self, file_path: str) -> List[int]:
+        """
+        :return: tags of the new views
+        :rtype: List[int]
+        """
+        if not os.path.isfile(file_path):
+            raise Exception(f"{file_path} does not exist.")
+        existing_views = set(gmsh.view.getTags())
+        gmsh.merge(file_path)
+        new_views = [view for view in gmsh.view.getTags() if view not in existing_views]
+        self.views += new_views
+        return new_views
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for view in self.views:
+            gmsh.view.remove(view)
+        gmsh.model.remove()
+        if self.previous_model is not None:
+            gmsh.model.setCurrent(self.previous_model)
+        if self.initialized:
+            gmsh.finalize()
+
+
+class FieldData:
+    """
+    Values of one field map. The electro magnetic system is complex valued: GetDP writes the real and the imaginary
+    part of every value as two steps.
+    """
+
+    def __init__(self, name: str, element_tags: np.ndarray, values: np.ndarray):
+        """
+        :param name: name of the field map
+        :type name: str
+        :param element_tags: element tags of the mesh
+        :type element_tags: np.ndarray
+        :param values: values with the shape (n_elements, n_nodes, n_components, n_steps)
+        :type values: np.ndarray
+        """
+        self.name = name
+        self.element_tags = element_tags
+        self.values = values
+
+    def phasors(self) -> np.ndarray:
+        """
+        :return: complex values of the last step with the shape (n_elements, n_nodes, n_components)
+        :rtype: np.ndarray
+        """
+        if self.values.shape[3] >= 2:
+            return self.values[:, :, :, -2] + 1j * self.values[:, :, :, -1]
+        return self.values[:, :, :, -1].astype(complex)
+
+    def norms(self) -> np.ndarray:
+        """
+        :return: amplitude of the value at every node (euclidean norm of the complex components), shape
+            (n_elements, n_nodes), NaN for missing nodes
+        :rtype: np.ndarray
+        """
+        return np.sqrt(np.sum(np.abs(self.phasors()) ** 2, axis=2))
+
+    def element_means(self) -> np.ndarray:
+        """
+        :return: complex mean value of every element with the shape (n_elements, n_components)
+        :rtype: np.ndarray
+        """
+        return np.nanmean(self.phasors(), axis=1)
+
+
+class FieldResults:
+    """
+    Headless access to the field maps of a simulation as NumPy arrays, e.g. to evaluate peak flux densities and loss
+    hot spots of many designs without gmsh GUI.
+
+    The mesh and the field maps are read with gmsh once, the arrays are cached as .npy files in
+    <fields folder>/field_data and memory-mapped on later accesses.
+
+    :Example Code:
+
+    >>> fields = geo.field_results()
+    >>> b_max = fields.max_norm("Magb", "core")
+    >>> loss_per_turn = fields.per_turn("j2F", winding=1, reduce="integral")
+
+    Regions are given as physical group tags, lists of tags or names: "core", "air", "windings" or "winding<n>".
+    """
+
+    def __init__(self, mesh_file_path: str, fields_folder_path: str, use_cache: bool = True,
+                 turn_maps: Optional[List[np.ndarray]] = None):
+        """
+        :param mesh_file_path: path of the electro magnetic mesh (electro_magnetic.msh)
+        :type mesh_file_path: str
+        :param fields_folder_path: folder with the .pos files
+        :type fields_folder_path: str
+        :param use_cache: store the arrays as .npy files and memory-map them
+        :type use_cache: bool
+        :param turn_maps: turn maps of a half model (see femmt_symmetry.half_model_turn_map()), integrals are
+            doubled and per turn results are given for all turns of the full component
+        :type turn_maps: List[np.ndarray]
+        """
+        self.mesh_file_path = mesh_file_path
+        self.fields_folder_path = fields_folder_path
+        self.use_cache = use_cache
+        self.turn_maps = turn_maps
+        self.cache_folder_path = os.path.join(fields_folder_path, field_data_folder_name)
+        self._elements = None
+        self._fields = {}
+
+    def cached(self, source_path: str, name: str) -> Optional[np.ndarray]:
+        """
+        :return: memory-mapped cache of an array, None if there is no cache or it is older than the source file
+        :rtype: np.ndarray
+        """
+        cache_path = os.path.join(self.cache_folder_path, f"{name}.npy")
+        if self.use_cache and os.path.isfile(cache_path) and \
+                os.path.getmtime(cache_path) >= os.path.getmtime(source_path):
+            return np.load(cache_path, mmap_mode="r")
+        return None
+
+    def store(self, name: str, array: np.ndarray):
+        if self.use_cache:
+            os.makedirs(self.cache_folder_path, exist_ok=True)
+            np.save(os.path.join(self.cache_folder_path, f"{name}.npy"), array)
+
+    @property
+    def elements(self) -> np.ndarray:
+        """
+        :return: element table of the mesh (see mesh_element_dtype)
+        :rtype: np.ndarray
+        """
+        if self._elements is None:
+            self._elements = self.cached(self.mesh_file_path, "mesh_elements")
+            if self._elements is None:
+                self._elements = read_mesh_elements(self.mesh_file_path)
+                self.store("mesh_elements", self._elements)
+        return self._elements
+
+    def field_names(self) -> List[str]:
+        """
+        :return: names of all field maps in the fields folder
+        :rtype: List[str]
+        """
+        return sorted(os.path.splitext(file_name)[0] for file_name in os.listdir(self.fields_folder_path)
+                      if file_name.endswith(".pos"))
+
+    def field(self, name: str) -> FieldData:
+        """
+        :param name: name of the field map, e.g. "Magb" for Magb.pos
+        :type name: str
+        :return: field data
+        :rtype: FieldData
+        """
+        if name not in self._fields:
+            field_file_path = os.path.join(self.fields_folder_path, f"{name}.pos")
+            tags = self.cached(field_file_path, f"{name}_tags")
+            values = self.cached(field_file_path, f"{name}_values")
+            if tags is None or values is None:
+                tags, values = read_field_file(field_file_path, self.mesh_file_path, self.elements)
+                self.store(f"{name}_tags", tags)
+                self.store(f"{name}_values", values)
+            self._fields[name] = FieldData(name, tags, values)
+        return self._fields[name]
+
+    def element_rows(self, name: str) -> np.ndarray:
+        """
+        :return: row of every element of a field map in the element table, -1 for unknown elements
+        :rtype: np.ndarray
+        """
+        tags = self.field(name).element_tags
+        rows = np.searchsorted(self.elements["tag"], tags)
+        rows = np.minimum(rows, len(self.elements) - 1)
+        return np.where(self.elements["tag"][rows] == tags, rows, -1)
+
+    def region_mask(self, name: str, region: Union[str, int, List[int], None]) -> np.ndarray:
+        """
+        :param name: name of the field map
+        :type name: str
+        :param region: physical group tag(s) or name of the region, None for all elements
+        :return: mask of the elements of the field map which belong to the region
+        :rtype: np.ndarray
+        """
+        rows = self.element_rows(name)
+        regions = np.where(rows >= 0, self.elements["region"][rows], -1)
+        if region is None:
+            return rows >= 0
+        if isinstance(region, str):
+            if region == "core":
+                return np.isin(regions, region_core)
+            if region == "air":
+                return np.isin(regions, region_air)
+            if region == "windings":
+                return (regions >= 4000) & (regions < 8000)
+            if region.startswith("winding") and region[7:].isdigit():
+                return np.isin(regions // 1000, [3 + int(region[7:]), 5 + int(region[7:])])
+            raise Exception(f"Unknown region '{region}'.")
+        return np.isin(regions, np.atleast_1d(region))
+
+    def volumes(self, name: str) -> np.ndarray:
+        """
+        :return: volume of the axisymmetric ring of every element of a field map (2 pi r A)
+        :rtype: np.ndarray
+        """
+        rows = self.element_rows(name)
+        return np.where(rows >= 0, 2 * np.pi * self.elements["x"][rows] * self.elements["area"][rows], 0)
+
+    def max_norm(self, name: str, region: Union[str, int, List[int], None] = None) -> float:
+        """
+        :return: maximum amplitude of a field in a region, e.g. the peak flux density max_norm("Magb", "core")
+        :rtype: float
+        """
+        norms = self.field(name).norms()[self.region_mask(name, region)]
+        return float(np.nanmax(norms)) if norms.size else np.nan
+
+    def hot_spot(self, name: str, region: Union[str, int, List[int], None] = None) -> Tuple[float, float, float]:
+        """
+        :return: r and z coordinate of the element centroid with the highest amplitude in a region and the amplitude
+        :rtype: Tuple[float, float, float]
+        """
+        mask = self.region_mask(name, region)
+        norms = np.nanmax(self.field(name).norms(), axis=1)
+        norms = np.where(mask, norms, -np.inf)
+        row = self.element_rows(name)[int(np.argmax(norms))]
+        return float(self.elements["x"][row]), float(self.elements["y"][row]), float(np.max(norms))
+
+    def integrate(self, name: str, region: Union[str, int, List[int], None] = None) -> float:
+        """
+        Volume integral of a real valued density (e.g. a loss density) over a region.
+
+        :return: integral, for a half model the integral of the full component
+        :rtype: float
+        """
+        mask = self.region_mask(name, region)
+        densities = np.real(self.field(name).element_means()[:, 0])
+        integral = float(np.sum(densities[mask] * self.volumes(name)[mask]))
+        return 2 * integral if self.turn_maps is not None else integral
+
+    def mean(self, name: str, region: Union[str, int, List[int], None] = None) -> float:
+        """
+        :return: volume weighted mean of a real valued field over a region, e.g. the mean temperature
+            mean("thermal", "core")
+        :rtype: float
+        """
+        mask = self.region_mask(name, region)
+        volumes = self.volumes(name)[mask]
+        if not np.any(volumes > 0):
+            return np.nan
+        return float(np.sum(np.real(self.field(name).element_means()[mask, 0]) * volumes) / np.sum(volumes))
+
+    def per_turn(self, name: str, winding: int = 1, reduce: str = "mean") -> np.ndarray:
+        """
+        Evaluates a field for every turn of a winding.
+
+        :param name: name of the field map, e.g. "j2F" or "jH" for the ohmic loss density
+        :type name: str
+        :param winding: number of the winding (starting with 1)
+        :type winding: int
+        :param reduce: "mean" (volume weighted mean), "max" (maximum amplitude) or "integral" (volume integral of a
+            real valued density)
+        :type reduce: str
+        :return: value per turn (in the order of the turns), NaN for turns without field data
+        :rtype: np.ndarray
+        """
+        rows = self.element_rows(name)
+        regions = np.where(rows >= 0, self.elements["region"][rows], -1)
+        in_winding = np.isin(regions // 1000, [3 + winding, 5 + winding])
+        turns = regions[in_winding] % 1000
+        n_turns = int(turns.max()) + 1 if turns.size else 0
+        volumes = self.volumes(name)[in_winding]
+
+        if reduce == "max":
+            values = np.full(n_turns, -np.inf)
+            np.maximum.at(values, turns, np.nanmax(self.field(name).norms()[in_winding], axis=1))
+            values[np.isinf(values)] = np.nan
+        elif reduce in ["mean", "integral"]:
+            densities = np.real(self.field(name).element_means()[in_winding, 0])
+            integrals = np.bincount(turns, weights=densities * volumes, minlength=n_turns)
+            if reduce == "integral":
+                values = integrals
+            else:
+                with np.errstate(invalid="ignore", divide="ignore"):
+                    values = integrals / np.bincount(turns, weights=volumes, minlength=n_turns)
+        else:
+            raise Exception(f"reduce must be 'mean', 'max' or 'integral', not '{reduce}'.")
+
+        if self.turn_maps is not None and winding - 1 < len(self.turn_maps):
+            # Values of the modeled (upper) turns for all turns of the full component
+            values = np.append(values, np.nan)[np.minimum(self.turn_maps[winding - 1], len(values))]
+        return values
@@ -0,0 +1,416 @@
+import numpy as np
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+def _starting_poles(omega_min: float, omega_max: float, n_poles: int) -> np.ndarray:
+    """
+    Weakly damped complex conjugate starting poles, distributed logarithmically over the frequency band (and one real
+    pole for an odd number of poles). Only the poles with a non-negative imaginary part are returned.
+    """
+    poles = []
+    for beta in np.geomspace(omega_min, omega_max, n_poles // 2):
+        poles.append(-beta / 100 + 1j * beta)
+    if n_poles % 2:
+        poles.append(-np.sqrt(omega_min * omega_max) + 0j)
+    return np.array(poles)
+
+
+def _basis_functions(s: np.ndarray, poles: np.ndarray) -> np.ndarray:
+    """
+    Real valued partial fraction basis: 1/(s-a) for real poles and 1/(s-a) + 1/(s-a*), j/(s-a) - j/(s-a*) for every
+    complex conjugate pair (given by the pole a with positive imaginary part).
+
+    :return: basis functions with the shape (len(s), n_poles)
+    """
+    columns = []
+    for pole in poles:
+        if pole.imag == 0:
+            columns.append(1 / (s - pole.real))
+        else:
+            columns.append(1 / (s - pole) + 1 / (s - np.conj(pole)))
+            columns.append(1j / (s - pole) - 1j / (s - np.conj(pole)))
+    return np.stack(columns, axis=1)
+
+
+def _relocate_poles(poles: np.ndarray, sigma_coefficients: np.ndarray) -> np.ndarray:
+    """
+    Returns the zeros of the weighting function sigma(s) = 1 + sum(c * basis), which are the new poles of the vector
+    fitting iteration. Unstable poles are flipped into the left half plane.
+    """
+    n = len(sigma_coefficients)
+    state_matrix = np.zeros((n, n))
+    input_vector = np.zeros(n)
+    i = 0
+    for pole in poles:
+        if pole.imag == 0:
+            state_matrix[i, i] = pole.real
+            input_vector[i] = 1
+            i += 1
+        else:
+            state_matrix[i:i + 2, i:i + 2] = [[pole.real, pole.imag], [-pole.imag, pole.real]]
+            input_vector[i] = 2
+            i += 2
+
+    zeros = np.linalg.eigvals(state_matrix - np.outer(input_vector, sigma_coefficients))
+    zeros = np.where(zeros.real > 0, -np.conj(zeros), zeros)
+
+    new_poles = [zero for zero in zeros if zero.imag > 0]
+    new_poles += [complex(zero.real, 0) for zero in zeros if zero.imag == 0]
+    return np.array(sorted(new_poles, key=lambda pole: abs(pole)))
+
+
+def _stacked_real(matrix: np.ndarray, weights: np.ndarray) -> np.ndarray:
+    """
+    Real valued least squares rows of a complex matrix, the real and imaginary parts are weighted separately.
+    """
+    return np.concatenate([weights.real * matrix.real, weights.imag * matrix.imag], axis=0)
+
+
+def vector_fit(frequencies: np.ndarray, responses: np.ndarray, n_poles: int, n_iterations: int = 10,
+               weights: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vector fitting (B. Gustavsen, A. Semlyen) of several frequency responses with common poles:
+
+        H(s) = sum_k r_k / (s - a_k) + d + s * e
+
+    The complex frequency is normalized to the highest sample frequency internally.
+
+    :param frequencies: sample frequencies in Hz (> 0)
+    :type frequencies: np.ndarray
+    :param responses: complex responses with the shape (len(frequencies), n_responses)
+    :type responses: np.ndarray
+    :param n_poles: number of poles
+    :type n_poles: int
+    :param n_iterations: number of pole relocation iterations
+    :type n_iterations: int
+    :param weights: weights of the samples with the same shape as responses, defaults to 1 / |H| (relative error).
+        The real part weights the real part of the error, the imaginary part weights the imaginary part of the error.
+    :type weights: np.ndarray
+    :return: poles (with positive imaginary part for pairs, in rad/s), residues (n_pole_entries, n_responses), d, e
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    """
+    frequencies = np.asarray(frequencies, dtype=float)
+    responses = np.asarray(responses, dtype=complex)
+    n_samples, n_responses = responses.shape
+    if weights is None:
+        weights = 1 / np.maximum(np.abs(responses), 1e-12 * np.max(np.abs(responses)) + 1e-300)
+        weights = weights * (1 + 1j)
+
+    omega_scale = 2 * np.pi * np.max(frequencies)
+    s = 1j * 2 * np.pi * frequencies / omega_scale
+    poles = _starting_poles(np.min(frequencies) / np.max(frequencies), 1, n_poles)
+
+    for _ in range(0, n_iterations):
+        basis = _basis_functions(s, poles)
+        n_basis = basis.shape[1]
+        fixed_part = np.concatenate([basis, np.ones((n_samples, 1)), s[:, np.newaxis]], axis=1)
+        n_fixed = fixed_part.shape[1]
+
+        # One least squares problem for the residues of all responses and the common sigma coefficients
+        system = np.zeros((2 * n_samples * n_responses, n_fixed * n_responses + n_basis))
+        right_hand_side = np.zeros(2 * n_samples * n_responses)
+        for m in range(0, n_responses):
+            w = weights[:, m:m + 1]
+            rows = slice(2 * n_samples * m, 2 * n_samples * (m + 1))
+            system[rows, n_fixed * m:n_fixed * (m + 1)] = _stacked_real(fixed_part, w)
+            system[rows, n_fixed * n_responses:] = _stacked_real(-responses[:, m:m + 1] * basis, w)
+            right_hand_side[rows] = _stacked_real(responses[:, m], w[:, 0])
+
+        column_norms = np.linalg.norm(system, axis=0)
+        column_norms[column_norms == 0] = 1
+        solution = np.linalg.lstsq(system / column_norms, right_hand_side, rcond=None)[0] / column_norms
+        poles = _relocate_poles(poles, solution[n_fixed * n_responses:])
+
+    # Residues, d and e for the final poles
+    basis = _basis_functions(s, poles)
+    fixed_part = np.concatenate([basis, np.ones((n_samples, 1)), s[:, np.newaxis]], axis=1)
+    coefficients = np.zeros((fixed_part.shape[1], n_responses))
+    for m in range(0, n_responses):
+        w = weights[:, m:m + 1]
+        system = _stacked_real(fixed_part, w)
+        column_norms = np.linalg.norm(system, axis=0)
+        column_norms[column_norms == 0] = 1
+        coefficients[:, m] = np.linalg.lstsq(system / column_norms, _stacked_real(responses[:, m], w[:, 0]),
+                                             rcond=None)[0] / column_norms
+
+    residues = []
+    i = 0
+    for pole in poles:
+        if pole.imag == 0:
+            residues.append(coefficients[i].astype(complex))
+            i += 1
+        else:
+            residues.append(coefficients[i] + 1j * coefficients[i + 1])
+            i += 2
+    residues = np.array(residues) * omega_scale
+    d = coefficients[-2]
+    e = coefficients[-1] / omega_scale
+
+    return poles * omega_scale, residues, d, e
+
+
+def evaluate_rational(frequencies, poles: np.ndarray, residues: np.ndarray, d: np.ndarray,
+                      e: np.ndarray) -> np.ndarray:
+    """
+    Evaluates a rational model of vector_fit() at arbitrary frequencies.
+
+    :return: responses with the shape (len(frequencies), n_responses)
+    :rtype: np.ndarray
+    """
+    s = 1j * 2 * np.pi * np.atleast_1d(np.asarray(frequencies, dtype=float))[:, np.newaxis]
+    responses = d[np.newaxis] + s * e[np.newaxis]
+    for pole, residue in zip(poles, residues):
+        if pole.imag == 0:
+            responses = responses + residue.real / (s - pole.real)
+        else:
+            responses = responses + residue / (s - pole) + np.conj(residue) / (s - np.conj(pole))
+    return responses
+
+
+def entry_scales(matrices: np.ndarray) -> np.ndarray:
+    """
+    Scale of every matrix entry given by the geometric mean of the corresponding diagonal entries.
+
+    :param matrices: real matrices with the shape (n, n_windings, n_windings)
+    :return: scales with the same shape
+    """
+    diagonal = np.abs(matrices[:, np.arange(matrices.shape[-1]), np.arange(matrices.shape[-1])])
+    diagonal = np.maximum(diagonal, 1e-12 * np.max(diagonal) + 1e-300)
+    return np.sqrt(diagonal[:, :, np.newaxis] * diagonal[:, np.newaxis, :])
+
+
+class FrequencyResponseModel:
+    """
+    Passive rational model of the impedance matrix Z(f) = R(f) + jωL(f) of a magnetic component.
+
+    All entries of the matrix share the same stable poles. The model is reciprocal (symmetric) and its resistance
+    matrix Re(Z) is positive semi-definite over the fitted frequency band, so it can be used in circuit simulations.
+    """
+
+    def __init__(self, poles: np.ndarray, residues: np.ndarray, d: np.ndarray, e: np.ndarray, n_windings: int,
+                 f_min: float, f_max: float):
+        """
+        :param poles: poles in rad/s (one per complex conjugate pair)
+        :type poles: np.ndarray
+        :param residues: residues with the shape (n_poles, n_windings ** 2)
+        :type residues: np.ndarray
+        :param d: constant term with the shape (n_windings ** 2,)
+        :type d: np.ndarray
+        :param e: proportional term (inductance at high frequencies) with the shape (n_windings ** 2,)
+        :type e: np.ndarray
+        :param n_windings: number of windings
+        :type n_windings: int
+        :param f_min: lowest frequency of the fit
+        :type f_min: float
+        :param f_max: highest frequency of the fit
+        :type f_max: float
+        """
+        self.poles = poles
+        self.residues = residues
+        self.d = d
+        self.e = e
+        self.n_windings = n_windings
+        self.f_min = f_min
+        self.f_max = f_max
+
+    @classmethod
+    def fit(cls, frequencies: np.ndarray, impedance_matrices: np.ndarray, n_poles: int,
+            n_iterations: int = 10) -> "FrequencyResponseModel":
+        """
+        Fits the model to sampled impedance matrices.
+
+        :param frequencies: sample frequencies in Hz
+        :type frequencies: np.ndarray
+        :param impedance_matrices: impedance matrices with the shape (len(frequencies), n_windings, n_windings)
+        :type impedance_matrices: np.ndarray
+        :param n_poles: number of poles
+        :type n_poles: int
+        :param n_iterations: number of pole relocation iterations
+        :type n_iterations: int
+        :return: model
+        :rtype: FrequencyResponseModel
+        """
+        impedance_matrices = np.asarray(impedance_matrices, dtype=complex)
+        n_windings = impedance_matrices.shape[-1]
+        # Reciprocity
+        impedance_matrices = (impedance_matrices + np.swapaxes(impedance_matrices, 1, 2)) / 2
+        responses = impedance_matrices.reshape(len(frequencies), n_windings ** 2)
+
+        # The resistances are much smaller than the reactances, so the real and imaginary parts are weighted
+        # separately. All entries are weighted relative to the diagonal entries.
+        weights = 1 / entry_scales(impedance_matrices.real) + 1j / entry_scales(impedance_matrices.imag)
+        weights = weights.reshape(len(frequencies), -1)
+
+        poles, residues, d, e = vector_fit(frequencies, responses, n_poles, n_iterations, weights)
+        model = cls(poles, residues, d, e, n_windings, float(np.min(frequencies)), float(np.max(frequencies)))
+        model.enforce_passivity()
+        return model
+
+    def enforce_passivity(self, n_check_frequencies: int = 200):
+        """
+        Makes the high frequency inductance matrix positive semi-definite and shifts the constant resistance, so
+        that the smallest eigenvalue of Re(Z) is not negative on a dense frequency grid of the fitted band.
+
+        :param n_check_frequencies: number of frequencies of the check grid
+        :type n_check_frequencies: int
+        """
+        n = self.n_windings
+        eigenvalues, eigenvectors = np.linalg.eigh(self.e.reshape(n, n))
+        self.e = (eigenvectors @ np.diag(np.maximum(eigenvalues, 0)) @ eigenvectors.T).reshape(-1)
+
+        check_frequencies = np.geomspace(self.f_min, self.f_max, n_check_frequencies)
+        smallest_eigenvalue = np.min(np.linalg.eigvalsh(self(check_frequencies).real))
+        if smallest_eigenvalue < 0:
+            self.d = self.d - smallest_eigenvalue * np.eye(n).reshape(-1)
+
+    def __call__(self, frequencies) -> np.ndarray:
+        """
+        :param frequencies: frequencies in Hz
+        :return: impedance matrices with the shape (len(frequencies), n_windings, n_windings)
+        :rtype: np.ndarray
+        """
+        responses = evaluate_rational(frequencies, self.poles, self.residues, self.d, self.e)
+        return responses.reshape(-1, self.n_windings, self.n_windings)
+
+    def resistance(self, frequencies) -> np.ndarray:
+        """
+        :return: resistance matrices R(f) in Ohm
+        :rtype: np.ndarray
+        """
+        return self(frequencies).real
+
+    def inductance(self, frequencies) -> np.ndarray:
+        """
+        :return: inductance matrices L(f) in H
+        :rtype: np.ndarray
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype=float))
+        return self(frequencies).imag / (2 * np.pi * frequencies[:, np.newaxis, np.newaxis])
+
+    def losses(self, frequencies, currents) -> np.ndarray:
+        """
+        Losses for current phasors (peak values) at the given frequencies, e.g. the harmonics of a converter current.
+
+        :param frequencies: frequencies in Hz
+        :param currents: complex current phasors with the shape (len(frequencies), n_windings)
+        :return: losses per frequency in W
+        :rtype: np.ndarray
+        """
+        currents = np.asarray(currents, dtype=complex)
+        return 0.5 * np.einsum("fa,fab,fb->f", np.conj(currents), self(frequencies), currents).real
+
+
+class FrequencyResponseBuilder:
+    """
+    Builds a FrequencyResponseModel from as few FEM simulations as possible.
+
+    Starting with a few logarithmically spaced frequencies, rational models of two different orders are fitted. At the
+    geometric midpoints between the sampled frequencies, their relative deviation is used as error estimate. New FEM
+    frequencies are only added at midpoints, where the estimate exceeds the tolerance.
+
+    :Example Code:
+
+    >>> builder = FrequencyResponseBuilder(lambda fs: geo.impedance_matrix(fs, meshing=False), 1e3, 1e6)
+    >>> model = builder.build()
+    >>> L = model.inductance([123e3])
+    """
+
+    def __init__(self, evaluate: Callable[[List[float]], np.ndarray], f_min: float, f_max: float,
+                 tolerance: float = 1e-2, n_initial: int = 5, max_samples: int = 30,
+                 max_new_samples_per_iteration: int = 4):
+        """
+        :param evaluate: function, which returns the impedance matrices (n_frequencies, n_windings, n_windings) for a
+            list of frequencies (e.g. MagneticComponent.impedance_matrix)
+        :type evaluate: Callable
+        :param f_min: lowest frequency in Hz (> 0)
+        :type f_min: float
+        :param f_max: highest frequency in Hz
+        :type f_max: float
+        :param tolerance: relative error, which is accepted
+        :type tolerance: float
+        :param n_initial: number of initial FEM frequencies
+        :type n_initial: int
+        :param max_samples: maximum number of FEM frequencies
+        :type max_samples: int
+        :param max_new_samples_per_iteration: maximum number of FEM frequencies, which are added at once (they can be
+            simulated in parallel)
+        :type max_new_samples_per_iteration: int
+        """
+        if f_min <= 0 or f_max <= f_min:
+            raise Exception(f"A frequency band 0 < f_min < f_max is needed (f_min={f_min}, f_max={f_max}).")
+        self.evaluate = evaluate
+        self.f_min = f_min
+        self.f_max = f_max
+        self.tolerance = tolerance
+        self.n_initial = n_initial
+        self.max_samples = max_samples
+        self.max_new_samples_per_iteration = max_new_samples_per_iteration
+        self.samples: Dict[float, np.ndarray] = {}
+
+    def add_samples(self, frequencies: List[float]):
+        frequencies = [float(frequency) for frequency in frequencies if float(frequency) not in self.samples]
+        if not frequencies:
+            return
+        impedance_matrices = self.evaluate(frequencies)
+        for frequency, impedance_matrix in zip(frequencies, impedance_matrices):
+            self.samples[frequency] = np.asarray(impedance_matrix, dtype=complex)
+
+    def sampled(self) -> Tuple[np.ndarray, np.ndarray]:
+        frequencies = np.array(sorted(self.samples))
+        return frequencies, np.array([self.samples[frequency] for frequency in frequencies])
+
+    @staticmethod
+    def relative_deviation(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        """
+        Largest deviation of two impedance matrices per frequency. The deviations of the resistances and reactances
+        are relative to the diagonal resistances and reactances.
+        """
+        resistance_deviation = np.abs(a.real - b.real) / entry_scales(b.real)
+        reactance_deviation = np.abs(a.imag - b.imag) / entry_scales(b.imag)
+        return np.maximum(np.max(resistance_deviation, axis=(1, 2)), np.max(reactance_deviation, axis=(1, 2)))
+
+    def fit(self) -> Tuple[FrequencyResponseModel, np.ndarray, np.ndarray]:
+        """
+        Fits the model to the current samples and estimates the error.
+
+        :return: model, midpoint frequencies, error estimate at the midpoints
+        """
+        frequencies, impedance_matrices = self.sampled()
+        # At most one pole per two samples (the model has n_poles + 2 coefficients per entry)
+        n_poles = max(1, min(len(frequencies) - 3, 2 * (len(frequencies) // 3)))
+        model = FrequencyResponseModel.fit(frequencies, impedance_matrices, n_poles)
+        reference = FrequencyResponseModel.fit(frequencies, impedance_matrices, max(1, n_poles - 2))
+
+        midpoints = np.sqrt(frequencies[1:] * frequencies[:-1])
+        errors = np.maximum(self.relative_deviation(model(midpoints), reference(midpoints)),
+                            np.max(self.relative_deviation(model(frequencies), impedance_matrices)))
+        return model, midpoints, errors
+
+    def build(self) -> FrequencyResponseModel:
+        """
+        Samples the impedance matrix adaptively and returns the fitted model.
+
+        :return: model
+        :rtype: FrequencyResponseModel
+        """
+        self.add_samples(np.geomspace(self.f_min, self.f_max, self.n_initial))
+
+        while True:
+            model, midpoints, errors = self.fit()
+            self.estimated_error = float(np.max(errors))
+            print(f"Frequency response: {len(self.samples)} FEM frequencies, estimated error {self.estimated_error:.2e}")
+
+            remaining_samples = self.max_samples - len(self.samples)
+            if self.estimated_error <= self.tolerance or remaining_samples <= 0:
+                if self.estimated_error > self.tolerance:
+                    print(f"Frequency response: the tolerance {self.tolerance} was not reached with "
+                          f"{self.max_samples} FEM frequencies.")
+                return model
+
+            worst = np.argsort(errors)[::-1]
+            worst = worst[errors[worst] > self.tolerance]
+            if len(worst) == 0:
+                # The residual error of the fit itself is too large: refine everywhere
+                worst = np.argsort(errors)[::-1]
+            n_new = min(len(worst), self.max_new_samples_per_iteration, remaining_samples)
+            self.add_samples(midpoints[worst[:n_new]])
@@ -13,7 +13,8 @@ import pandas as pd
 import time
 import gmsh
 import warnings
-from typing import Union, List, Tuple, Dict
+from typing import Union, List, Tuple, Dict, Optional
+from .femmt_materials import material_database
 
 
 def core_database() -> Dict:
@@ -184,18 +185,21 @@ def wire_material_database() -> Dict:
     """
     Returns wire materials e.g. copper, aluminium in a dictionary
 
-    :return: Dict with materials and conductivity
+    :return: Dict with materials, conductivity and temperature coefficient
     :rtype: Dict
     """
 
     wire_material = {}
 
+    # sigma at 20 °C, temperature_coefficient of the resistivity in 1/K
     wire_material["copper"] = {
         "sigma": 5.8e7,
+        "temperature_coefficient": 3.93e-3,
     }
 
     wire_material["aluminium"] = {
         "sigma": 3.7e7,
+        "temperature_coefficient": 4.03e-3,
     }
 
     return wire_material
@@ -795,8 +799,8 @@ def r_basis(basis_air_gap_length: float, basis_air_gap_width: float, basis_air_g
     :rtype: float
 
     """
-    if basis_air_gap_length <= 0:
-        basis_air_gap_length = 0.0000001
+    # Works for scalars and numpy arrays
+    basis_air_gap_length = np.maximum(basis_air_gap_length, 0.0000001)
     return 1 / (mu0 * (basis_air_gap_width / 2 / basis_air_gap_length + 2 / np.pi * (1 + np.log(np.pi * basis_air_gap_height_core_material / 4 / basis_air_gap_length))))
 
 
@@ -933,6 +937,378 @@ def calculate_reluctances(N, L):
 
     return np.matmul(np.matmul(N, L_invert), np.transpose(N))
 
+
+def calculate_reluctances_batched(N: np.ndarray, L: np.ndarray) -> np.ndarray:
+    """
+    Calculates the reluctance matrices of many winding matrices at once.
+
+    :param N: winding matrices, shape (n_designs, 2, 2)
+    :type N: np.ndarray
+    :param L: inductance matrix, shape (2, 2) or (n_designs, 2, 2)
+    :type L: np.ndarray
+    :return: reluctance matrices, shape (n_designs, 2, 2)
+    :rtype: np.ndarray
+    """
+    return np.matmul(np.matmul(N, np.linalg.inv(L)), np.swapaxes(N, -1, -2))
+
+
+def fluxes_from_currents_batched(N: np.ndarray, L: np.ndarray, currents: np.ndarray) -> np.ndarray:
+    """
+    Calculates the fluxes [Phi_top, Phi_bot] of the integrated transformer for all time steps and all winding
+    matrices with one batched matrix solve: N^T * Phi = L * I
+
+    Singular winding matrices result in NaN fluxes.
+
+    :param N: winding matrices, shape (n_designs, 2, 2)
+    :type N: np.ndarray
+    :param L: inductance matrix, shape (2, 2) or (n_designs, 2, 2)
+    :type L: np.ndarray
+    :param currents: currents [I_1, I_2] of all time steps, shape (2, n_time_steps)
+    :type currents: np.ndarray
+    :return: fluxes, shape (n_designs, 2, n_time_steps)
+    :rtype: np.ndarray
+    """
+    N_transposed = np.swapaxes(np.asarray(N, dtype=float), -1, -2)
+    singular = np.linalg.cond(N_transposed) >= 1 / sys.float_info.epsilon
+
+    # Singular matrices are replaced by the identity to keep the batched solve running
+    N_transposed = np.where(singular[:, None, None], np.eye(2), N_transposed)
+    Phi = np.linalg.solve(N_transposed, np.matmul(L, currents) * np.ones((len(N_transposed), 1, 1)))
+    Phi[singular] = np.nan
+
+    return Phi
+
+
+def solve_increasing_function_batched(function, goal: np.ndarray, lower: Union[float, np.ndarray],
+                                      upper: Union[float, np.ndarray], xtol: float = 2e-12,
+                                      max_iterations: int = 200) -> np.ndarray:
+    """
+    Solves function(x) = goal for many problems at once with a bisection. The function must be vectorized and
+    increasing within [lower, upper] (as the air gap reluctance over the air gap length).
+
+    :param function: vectorized function f(x), x has the shape of goal
+    :param goal: goal values
+    :type goal: np.ndarray
+    :param lower: lower bound(s) of the solution
+    :type lower: float or np.ndarray
+    :param upper: upper bound(s) of the solution
+    :type upper: float or np.ndarray
+    :param xtol: absolute tolerance of the solution
+    :type xtol: float
+    :param max_iterations: maximum number of bisection steps
+    :type max_iterations: int
+    :return: solutions, NaN where there is no solution within the bounds
+    :rtype: np.ndarray
+    """
+    goal = np.asarray(goal, dtype=float)
+    a = np.broadcast_to(np.asarray(lower, dtype=float), goal.shape).copy()
+    b = np.broadcast_to(np.asarray(upper, dtype=float), goal.shape).copy()
+
+    with np.errstate(all="ignore"):
+        f_a = function(a) - goal
+        f_b = function(b) - goal
+        # Same sign on both bounds: no zero crossing
+        solvable = f_a * f_b <= 0
+
+        for _ in range(0, max_iterations):
+            # NaN bounds (invalid problems) do not prevent the termination
+            if not np.any(b - a > xtol):
+                break
+            x = (a + b) / 2
+            f_x = function(x) - goal
+            lower_half = f_a * f_x <= 0
+            b = np.where(lower_half, x, b)
+            a = np.where(lower_half, a, x)
+            f_a = np.where(lower_half, f_a, f_x)
+
+    return np.where(solvable, (a + b) / 2, np.nan)
+
+
+def air_gap_lengths_integrated_transformer_batched(N: np.ndarray, L_goal: np.ndarray, max_current: List,
+                                                   window_w: np.ndarray, window_h: np.ndarray, core_w: np.ndarray,
+                                                   midpoint: np.ndarray, b_max: float, b_stray: float = None,
+                                                   b_stray_rel_overshoot: np.ndarray = 1,
+                                                   real_core_width: np.ndarray = None,
+                                                   stray_path_parametrization: str = "max_flux") -> Dict:
+    """
+    Vectorized air gap design of the integrated transformer (top, bottom and stray path air gap) for whole
+    parameter grids. All geometric parameters may be scalars or arrays of length n_designs.
+    Uses the same fringing corrected reluctance equations as ReluctanceModel.calculate_air_gap_lengths_with_sct().
+
+    :param N: winding matrices, shape (n_designs, 2, 2)
+    :type N: np.ndarray
+    :param L_goal: goal inductance matrix [[L_11, M], [M, L_22]]
+    :type L_goal: np.ndarray
+    :param max_current: time domain currents [[time, I_1], [time, I_2]] of the maximum operating point
+    :type max_current: List
+    :param window_w: window width
+    :param window_h: window height
+    :param core_w: core width
+    :param midpoint: stray path midpoint in percent of the window height
+    :param b_max: maximum flux density in the core (saturation)
+    :type b_max: float
+    :param b_stray: flux density in the stray path for stray_path_parametrization = "given_flux"
+    :type b_stray: float
+    :param b_stray_rel_overshoot: overshoot of the stray path flux density for "max_flux"
+    :param real_core_width: real core width (for the stray path air gap of the real core "R_stray_real")
+    :param stray_path_parametrization: "max_flux", "mean" or "given_flux"
+    :type stray_path_parametrization: str
+    :return: dictionary of arrays (length n_designs) with the keys "valid", "singular", "stray_path_width",
+        "R_top_b_peak", "R_bot_b_peak", "R_stray_b_peak", "R_top", "R_bot", "R_stray" and "R_stray_real"
+    :rtype: Dict
+    """
+    N = np.asarray(N, dtype=float)
+    n_designs = len(N)
+    L_goal = np.asarray(L_goal, dtype=float)
+
+    def as_array(value):
+        return np.broadcast_to(np.asarray(value, dtype=float), (n_designs,))
+
+    window_w, window_h, core_w, midpoint = as_array(window_w), as_array(window_h), as_array(core_w), as_array(midpoint)
+    b_stray_rel_overshoot = as_array(b_stray_rel_overshoot)
+    real_core_width = as_array(np.nan if real_core_width is None else real_core_width)
+
+    with np.errstate(all="ignore"):
+        # Goal reluctances [R_top, R_bot, R_stray]
+        R_matrix = calculate_reluctances_batched(N, L_goal)
+        R_goal = np.stack([R_matrix[:, 0, 0] + R_matrix[:, 0, 1],
+                           R_matrix[:, 1, 1] + R_matrix[:, 0, 1],
+                           -R_matrix[:, 0, 1]], axis=1)
+
+        # Fluxes of the maximum current (negative sign of the secondary current)
+        currents = np.array([max_current[0][1], -np.asarray(max_current[1][1])], dtype=float)
+        Phi = fluxes_from_currents_batched(N, L_goal, currents)
+        Phi_top_peak = np.max(np.abs(Phi[:, 0, :]), axis=1)
+        Phi_bot_peak = np.max(np.abs(Phi[:, 1, :]), axis=1)
+        Phi_stray_peak = np.max(np.abs(Phi[:, 1, :] - Phi[:, 0, :]), axis=1)
+
+        # Stray path width
+        if stray_path_parametrization == "given_flux":
+            stray_path_width = Phi_stray_peak / b_stray / (np.pi * core_w)
+        elif stray_path_parametrization == "mean":
+            b_stray_mean = (Phi_top_peak + Phi_bot_peak) / 2 / np.pi / (core_w / 2) ** 2
+            stray_path_width = Phi_stray_peak / b_stray_mean / (np.pi * core_w)
+        elif stray_path_parametrization == "max_flux":
+            b_stray_max = np.maximum(Phi_top_peak, Phi_bot_peak) / np.pi / (core_w / 2) ** 2
+            stray_path_width = Phi_stray_peak / b_stray_max / b_stray_rel_overshoot / (np.pi * core_w)
+        else:
+            raise Exception(f"Unknown stray path parametrization: {stray_path_parametrization}")
+
+        # Max allowed lengths in each leg
+        max_length = [window_h * (100 - midpoint) / 100, window_h * midpoint / 100, window_w / 2]
+
+        # Saturation check
+        A_core = (core_w / 2) ** 2 * np.pi
+        A_stray = stray_path_width * core_w * np.pi
+        b_peaks = [Phi_top_peak / A_core, Phi_bot_peak / A_core, Phi_stray_peak / A_stray]
+
+        # Fringing corrected reluctances as functions of the air gap length
+        def r_round_inf_sct(length, n_reluctance):
+            h_basis = max_length[n_reluctance] - stray_path_width / 2
+            return r_round_inf(air_gap_length=length,
+                               sigma=sigma(length, core_w / 2, r_basis(length, core_w, h_basis)),
+                               air_gap_radius=core_w / 2)
+
+        radius_outer = window_w + core_w / 2
+
+        def r_stray_sct(length):
+            return r_cyl_cyl(air_gap_length=length,
+                             sigma=sigma(length, stray_path_width,
+                                         r_basis(length, stray_path_width, window_w - length) / 2),
+                             air_gap_width=stray_path_width, radius_outer=radius_outer)
+
+        def r_stray_real_sct(length):
+            return r_cyl_cyl_real(air_gap_length=length,
+                                  sigma=sigma(length, stray_path_width,
+                                              r_basis(length, stray_path_width, window_w - length) / 2),
+                                  air_gap_width=stray_path_width, radius_outer=radius_outer,
+                                  real_core_heigth=real_core_width)
+
+        R_top = solve_increasing_function_batched(lambda length: r_round_inf_sct(length, 0), R_goal[:, 0],
+                                                  1e-6, max_length[0])
+        R_bot = solve_increasing_function_batched(lambda length: r_round_inf_sct(length, 1), R_goal[:, 1],
+                                                  1e-6, max_length[1])
+        R_stray = solve_increasing_function_batched(r_stray_sct, R_goal[:, 2], 1e-6, max_length[2])
+        R_stray_real = solve_increasing_function_batched(r_stray_real_sct, R_goal[:, 2], 1e-9, max_length[2])
+
+    singular = ~np.all(np.isfinite(Phi), axis=(1, 2))
+    valid = ~singular & np.all(R_goal >= 0, axis=1) & \
+        (b_peaks[0] <= b_max) & (b_peaks[1] <= b_max) & (b_peaks[2] <= b_max) & \
+        np.isfinite(R_top) & np.isfinite(R_bot) & np.isfinite(R_stray)
+
+    return {"valid": valid, "singular": singular, "stray_path_width": stray_path_width,
+            "R_top_b_peak": b_peaks[0], "R_bot_b_peak": b_peaks[1], "R_stray_b_peak": b_peaks[2],
+            "R_top": R_top, "R_bot": R_bot, "R_stray": R_stray, "R_stray_real": R_stray_real}
+
+
+def gauss_legendre_integral(integrand, lower: np.ndarray, upper: np.ndarray, order: int = 16,
+                            breakpoints: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Fixed order Gauss-Legendre quadrature of many integrals at once.
+
+    Gauss-Legendre quadrature is only accurate for smooth integrands. Integrands with kinks (e.g. linearly interpolated
+    material data) are split at the kinks (breakpoints), every sub interval is integrated with order nodes. Only the
+    breakpoints inside of the integration intervals are used, the number of sub intervals is the largest number of
+    breakpoints inside of one integral plus one.
+
+    :param integrand: vectorized function of the integration variable, which is called once with the nodes of all
+        integrals (shape (..., n_nodes))
+    :param lower: lower bounds of the integrals
+    :param upper: upper bounds of the integrals (upper >= lower)
+    :param order: number of quadrature nodes per integral resp. per sub interval
+    :type order: int
+    :param breakpoints: points, at which the integrals are split, shape (..., n_breakpoints), the leading dimensions
+        broadcast with the bounds
+    :type breakpoints: np.ndarray
+    :return: integrals, shape of the broadcast bounds
+    :rtype: np.ndarray
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(order)
+    lower = np.asarray(lower, dtype=float)[..., np.newaxis]
+    upper = np.asarray(upper, dtype=float)[..., np.newaxis]
+    if breakpoints is None:
+        inner = np.zeros(lower.shape[:-1] + (0,))
+    else:
+        # Breakpoints outside of an interval are moved to its bounds, the inner breakpoints of every integral are
+        # gathered at the start of the sorted list, so the sub intervals after them have zero length
+        points = np.sort(np.clip(np.asarray(breakpoints, dtype=float), lower, upper), axis=-1)
+        n_lower = np.sum(points <= lower, axis=-1, keepdims=True)
+        n_inner = np.sum((points > lower) & (points < upper), axis=-1)
+        indices = np.minimum(n_lower + np.arange(np.max(n_inner, initial=0)), points.shape[-1] - 1)
+        inner = np.where(np.arange(indices.shape[-1]) < n_inner[..., np.newaxis],
+                         np.take_along_axis(points, indices, axis=-1), upper)
+
+    shape = np.broadcast_shapes(lower.shape[:-1], upper.shape[:-1], inner.shape[:-1])
+    bounds = np.concatenate([np.broadcast_to(value, shape + value.shape[-1:]) for value in [lower, inner, upper]],
+                            axis=-1)
+    half_lengths = (bounds[..., 1:, np.newaxis] - bounds[..., :-1, np.newaxis]) / 2
+    x = bounds[..., :-1, np.newaxis] + half_lengths * (nodes + 1)
+    values = integrand(x.reshape(*x.shape[:-2], -1)).reshape(x.shape)
+    return np.sum(values * weights * half_lengths, axis=(-2, -1))
+
+
+def hysteresis_loss_cylinder_batched(Phi: np.ndarray, width: np.ndarray, r_inner: np.ndarray, r_outer: np.ndarray,
+                                     frequency: float, mu_rel: np.ndarray, mu_imag, order: int = 4,
+                                     flux_density_breakpoints: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Hysteresis losses of cylindrical core sections (flux in radial direction, b = Phi / (2 pi r w)), integrated over
+    the radius with Gauss-Legendre quadrature. All arguments except mu_imag, order and flux_density_breakpoints may be
+    arrays which broadcast.
+
+    mu_imag of tabulated material data has kinks at the flux densities of the table, so the radius is split at the
+    radii of these flux densities. Between them, the integrand is smooth and 4 nodes are exact to about 1e-10. Without
+    breakpoints, 16 nodes deviate up to a few 1e-3 from an adaptive quadrature.
+
+    :param Phi: peak fluxes
+    :param width: widths of the cylinders
+    :param r_inner: inner radii
+    :param r_outer: outer radii
+    :param frequency: frequency in Hz
+    :type frequency: float
+    :param mu_rel: relative permeability
+    :param mu_imag: vectorized function mu_imag(f, b) of the imaginary part of the relative permeability
+    :param order: number of quadrature nodes per sub interval
+    :type order: int
+    :param flux_density_breakpoints: flux densities, at which mu_imag has kinks (e.g. the flux densities of the
+        material table), the integrals are not split if None
+    :type flux_density_breakpoints: np.ndarray
+    :return: losses in W
+    :rtype: np.ndarray
+    """
+    Phi, width, mu_rel = [np.asarray(value, dtype=float)[..., np.newaxis] for value in [Phi, width, mu_rel]]
+
+    def loss_density(r):
+        b = Phi / (2 * np.pi * r * width)
+        return 2 * np.pi * r * width * np.pi * frequency * mu0 * mu_imag(frequency, b) * (b / mu_rel / mu0) ** 2
+
+    radius_breakpoints = None
+    if flux_density_breakpoints is not None:
+        flux_density_breakpoints = np.asarray(flux_density_breakpoints, dtype=float)
+        radius_breakpoints = Phi / (2 * np.pi * width * flux_density_breakpoints[flux_density_breakpoints > 0])
+
+    return gauss_legendre_integral(loss_density, r_inner, r_outer, order, breakpoints=radius_breakpoints)
+
+
+def hysteresis_losses_integrated_transformer_batched(Phi_top: np.ndarray, Phi_bot: np.ndarray, Phi_stray: np.ndarray,
+                                                     frequency: float, core_w: np.ndarray, window_w: np.ndarray,
+                                                     window_h: np.ndarray, midpoint: np.ndarray,
+                                                     stray_path_width: np.ndarray, R_top: np.ndarray,
+                                                     R_bot: np.ndarray, R_stray: np.ndarray, mu_rel: np.ndarray,
+                                                     mu_imag=None, order: int = 4,
+                                                     flux_density_breakpoints: Optional[np.ndarray] = None) -> \
+        Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized version of ReluctanceModel.hysteresis_loss(): analytical hysteresis losses of the top leg, bottom leg
+    and stray path of the integrated transformer for many designs (and operating points) at once. Assumptions:
+    homogeneous flux in the legs, sinusoidal excitation. All arguments except frequency, mu_imag and order may be
+    arrays which broadcast.
+
+    :param Phi_top: peak flux of the top leg
+    :param Phi_bot: peak flux of the bottom leg
+    :param Phi_stray: peak flux of the stray path
+    :param frequency: frequency in Hz
+    :type frequency: float
+    :param core_w: core width
+    :param window_w: window width
+    :param window_h: window height
+    :param midpoint: stray path midpoint in percent of the window height
+    :param stray_path_width: width of the stray path
+    :param R_top: air gap length of the top leg
+    :param R_bot: air gap length of the bottom leg
+    :param R_stray: air gap length of the stray path
+    :param mu_rel: relative permeability
+    :param mu_imag: vectorized function mu_imag(f, b) of the imaginary part of the relative permeability, the N95
+        measurement of the material database if None
+    :param order: number of quadrature nodes per sub interval of the radial integrals
+    :type order: int
+    :param flux_density_breakpoints: flux densities, at which mu_imag has kinks, see hysteresis_loss_cylinder_batched().
+        The flux densities of the N95 measurement are used if mu_imag is None.
+    :type flux_density_breakpoints: np.ndarray
+    :return: losses of top leg, bottom leg and stray path in W
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    if mu_imag is None:
+        mu_imag = mu_imag_function(material_database()["N95_measurement"])
+        flux_density_breakpoints = material_database()["N95_measurement"].flux_densities
+    Phi_top, Phi_bot, Phi_stray, core_w, window_w, window_h, midpoint, stray_path_width, R_top, R_bot, R_stray, \
+        mu_rel = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in [
+            Phi_top, Phi_bot, Phi_stray, core_w, window_w, window_h, midpoint, stray_path_width, R_top, R_bot, R_stray,
+            mu_rel]])
+
+    A_core = (core_w / 2) ** 2 * np.pi
+    length_corner = A_core / core_w / np.pi
+    ri = core_w / 2
+    ro = ri + window_w
+
+    def leg_loss(Phi, height):
+        b = Phi / A_core
+        return 0.5 * mu0 * mu_imag(frequency, b) * A_core * height * 2 * np.pi * frequency * (b / mu_rel / mu0) ** 2
+
+    # The cylindrical corners of both legs and the stray path are integrated in one call
+    corner_and_stray = hysteresis_loss_cylinder_batched(
+        Phi=np.stack([Phi_top, Phi_bot, Phi_stray]), width=np.stack([length_corner, length_corner, stray_path_width]),
+        r_inner=ri, r_outer=np.stack([ro, ro, ro - R_stray]),
+        frequency=frequency, mu_rel=mu_rel, mu_imag=mu_imag, order=order,
+        flux_density_breakpoints=flux_density_breakpoints)
+
+    top_height = (100 - midpoint) / 100 * window_h
+    bot_height = midpoint / 100 * window_h
+    p_top = leg_loss(Phi_top, top_height + top_height - R_top) + corner_and_stray[0]
+    p_bot = leg_loss(Phi_bot, bot_height + bot_height + R_bot) + corner_and_stray[1]
+    p_stray = corner_and_stray[2]
+
+    return p_top, p_bot, p_stray
+
+
+def mu_imag_function(material):
+    """
+    :param material: material of the material database (femmt_materials.MaterialData)
+    :return: vectorized function mu_imag(f, b) of the material, linearly extrapolated in frequency
+    """
+    def mu_imag(frequency, flux_density):
+        return material.get_mu_imag(flux_density, frequency, extrapolate=True)
+    return mu_imag
+
 def create_physical_group(dim, entities, name):
     tag = gmsh.model.addPhysicalGroup(dim, entities)
     gmsh.model.setPhysicalName(dim, tag, name)
@@ -0,0 +1,356 @@
+import os
+import time
+import threading
+import numpy as np
+from typing import Dict, Optional
+from .femmt_paths import user_cache_directory
+from .femmt_profiling import run_sub_client
+
+# The version of the library file. It must be increased whenever the cell model (cell.pro, cell.geo) or the default
+# grid of the library is changed, so outdated libraries are not used any longer.
+litz_coefficient_library_version = 1
+
+# Names of the homogenization coefficients, as they are written by cell.pro
+litz_coefficient_names = ["pI", "qI", "qB", "pB"]
+
+default_fill_factors = np.round(np.arange(0.30, 0.91, 0.05), 2)
+default_n_layers = np.array([4])
+default_reduced_frequencies = np.linspace(0, 1.25, 6)
+
+
+def default_litz_coefficient_library_path() -> str:
+    """
+    :return: path of the library, which is shared by all components: a library shipped with the package, if there is
+        one, otherwise the library in the user cache folder (see user_cache_directory())
+    :rtype: str
+    """
+    file_name = f"litz_coefficients_v{litz_coefficient_library_version}.npz"
+    package_path = os.path.join(os.path.dirname(__file__), "electro_magnetic", "Strands_Coefficients", file_name)
+    if os.path.isfile(package_path):
+        return package_path
+    return os.path.join(user_cache_directory(), file_name)
+
+
+class FileLock:
+    """
+    Simple inter process lock based on the exclusive creation of a lock file.
+
+    Locks which are older than stale_time are regarded as left over from a crashed process and are removed.
+    """
+
+    def __init__(self, lock_file_path: str, timeout: float = 3600, stale_time: float = 3600):
+        self.lock_file_path = lock_file_path
+        self.timeout = timeout
+        self.stale_time = stale_time
+
+    def acquire(self):
+        start_time = time.time()
+        while True:
+            try:
+                fd = os.open(self.lock_file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                os.write(fd, str(os.getpid()).encode())
+                os.close(fd)
+                return
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.lock_file_path) > self.stale_time:
+                        os.remove(self.lock_file_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.time() - start_time > self.timeout:
+                    raise Exception(f"Could not acquire the lock {self.lock_file_path} within {self.timeout} s.")
+                time.sleep(0.5)
+
+    def release(self):
+        if os.path.exists(self.lock_file_path):
+            os.remove(self.lock_file_path)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class LitzCoefficientLibrary:
+    """
+    Pre-computed litz homogenization coefficients.
+
+    The coefficients pI, qI (skin effect) and qB, pB (proximity effect) of the hexagonal strand cell only depend on
+    the fill factor, the number of strand layers of the cell and the reduced frequency. They are calculated once for
+    a grid of these parameters (see generate_litz_coefficient_library()) and stored in one compact, versioned binary
+    table (numpy .npz file) with the shape (coefficient, layers, fill factor, reduced frequency).
+
+    Coefficients for fill factors between the grid points are interpolated linearly, so no additional cell
+    simulations are necessary for arbitrary litz wires. The library file is only read after it is completely written,
+    hence it can be used by any number of threads and processes at the same time.
+
+    :Example Code:
+
+    >>> library = LitzCoefficientLibrary.load()
+    >>> library.write_coefficient_files(coeff_folder_path, winding_number=1, ff=0.613)
+    """
+
+    _loaded_libraries = {}
+    _loaded_libraries_lock = threading.Lock()
+
+    def __init__(self, fill_factors: np.ndarray, n_layers: np.ndarray, reduced_frequencies: np.ndarray,
+                 coefficients: np.ndarray, version: int = litz_coefficient_library_version):
+        """
+        :param fill_factors: fill factor grid (ascending)
+        :type fill_factors: np.ndarray
+        :param n_layers: numbers of strand layers of the cell
+        :type n_layers: np.ndarray
+        :param reduced_frequencies: reduced frequency grid (ascending)
+        :type reduced_frequencies: np.ndarray
+        :param coefficients: coefficients with the shape (4, len(n_layers), len(fill_factors), len(reduced_frequencies))
+        :type coefficients: np.ndarray
+        :param version: version of the library
+        :type version: int
+        """
+        self.fill_factors = np.asarray(fill_factors, dtype=float)
+        self.n_layers = np.asarray(n_layers, dtype=int)
+        self.reduced_frequencies = np.asarray(reduced_frequencies, dtype=float)
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.version = int(version)
+
+        expected_shape = (len(litz_coefficient_names), len(self.n_layers), len(self.fill_factors),
+                          len(self.reduced_frequencies))
+        if self.coefficients.shape != expected_shape:
+            raise Exception(f"The coefficient table has the shape {self.coefficients.shape}, "
+                            f"but {expected_shape} is expected.")
+
+    @classmethod
+    def load(cls, library_path: Optional[str] = None) -> "LitzCoefficientLibrary":
+        """
+        Loads a library file. Libraries are loaded once per process.
+
+        :param library_path: path of the library file, defaults to default_litz_coefficient_library_path()
+        :type library_path: str
+        :return: library
+        :rtype: LitzCoefficientLibrary
+        """
+        library_path = os.path.abspath(library_path or default_litz_coefficient_library_path())
+        with cls._loaded_libraries_lock:
+            # Libraries, which could not be saved, are only kept in memory
+            if library_path not in cls._loaded_libraries:
+                with np.load(library_path) as data:
+                    version = int(data["version"])
+                    if version != litz_coefficient_library_version:
+                        raise Exception(f"The litz coefficient library {library_path} has the version {version}, "
+                                        f"but version {litz_coefficient_library_version} is needed.")
+                    cls._loaded_libraries[library_path] = cls(data["fill_factors"], data["n_layers"],
+                                                              data["reduced_frequencies"], data["coefficients"],
+                                                              version)
+            return cls._loaded_libraries[library_path]
+
+    @classmethod
+    def exists(cls, library_path: Optional[str] = None) -> bool:
+        library_path = os.path.abspath(library_path or default_litz_coefficient_library_path())
+        return library_path in cls._loaded_libraries or os.path.isfile(library_path)
+
+    def save(self, library_path: Optional[str] = None) -> bool:
+        """
+        Saves the library. The file is written to a temporary name first and renamed afterwards. If the file can not
+        be written, the library is kept in memory for this process.
+
+        :param library_path: path of the library file, defaults to default_litz_coefficient_library_path()
+        :type library_path: str
+        :return: True, if the file was written
+        :rtype: bool
+        """
+        library_path = os.path.abspath(library_path or default_litz_coefficient_library_path())
+        with self._loaded_libraries_lock:
+            self._loaded_libraries[library_path] = self
+        temporary_path = f"{library_path}.{os.getpid()}.tmp.npz"
+        try:
+            np.savez(temporary_path, version=self.version, names=np.array(litz_coefficient_names),
+                     fill_factors=self.fill_factors, n_layers=self.n_layers,
+                     reduced_frequencies=self.reduced_frequencies, coefficients=self.coefficients)
+            os.replace(temporary_path, library_path)
+        except OSError as e:
+            print(f"The litz coefficient library can not be saved to {library_path} ({e}), "
+                  f"it is only kept in memory.")
+            if os.path.isfile(temporary_path):
+                os.remove(temporary_path)
+            return False
+        return True
+
+    def coefficients_for(self, ff: float, n_layers: int = 4) -> Dict[str, np.ndarray]:
+        """
+        Returns the coefficients over the reduced frequency grid for one fill factor. Between the fill factors of the
+        library, the coefficients are interpolated linearly.
+
+        :param ff: fill factor of the litz wire
+        :type ff: float
+        :param n_layers: number of strand layers of the cell
+        :type n_layers: int
+        :return: coefficient name -> coefficients at self.reduced_frequencies
+        :rtype: Dict[str, np.ndarray]
+        """
+        layer_index = np.flatnonzero(self.n_layers == n_layers)
+        if len(layer_index) == 0:
+            raise Exception(f"The litz coefficient library contains no coefficients for {n_layers} layers "
+                            f"(available: {self.n_layers.tolist()}).")
+        if not self.fill_factors[0] <= ff <= self.fill_factors[-1]:
+            raise Exception(f"The fill factor {ff} is outside of the litz coefficient library "
+                            f"({self.fill_factors[0]} ... {self.fill_factors[-1]}).")
+
+        table = self.coefficients[:, layer_index[0]]
+        upper = int(np.clip(np.searchsorted(self.fill_factors, ff), 1, len(self.fill_factors) - 1))
+        weight = (ff - self.fill_factors[upper - 1]) / (self.fill_factors[upper] - self.fill_factors[upper - 1])
+        interpolated = (1 - weight) * table[:, upper - 1] + weight * table[:, upper]
+
+        return {name: interpolated[i] for i, name in enumerate(litz_coefficient_names)}
+
+    @staticmethod
+    def coefficient_file_name(name: str, winding_number: int) -> str:
+        """
+        Name of the coefficient file, which is read by ind_axi_python_controlled.pro.
+        """
+        return f"{name}_RS_winding{winding_number}.dat"
+
+    def write_coefficient_files(self, coeff_folder_path: str, winding_number: int, ff: float, n_layers: int = 4):
+        """
+        Writes the coefficient files of one winding in the format of GetDP's ListFromFile (pairs of reduced frequency
+        and coefficient).
+
+        :param coeff_folder_path: coeff folder of the workspace of the component
+        :type coeff_folder_path: str
+        :param winding_number: number of the winding, starting with 1
+        :type winding_number: int
+        :param ff: fill factor of the litz wire
+        :type ff: float
+        :param n_layers: number of strand layers of the cell
+        :type n_layers: int
+        """
+        os.makedirs(coeff_folder_path, exist_ok=True)
+        for name, values in self.coefficients_for(ff, n_layers).items():
+            file_path = os.path.join(coeff_folder_path, self.coefficient_file_name(name, winding_number))
+            temporary_path = f"{file_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary_path, "w") as fd:
+                for reduced_frequency, value in zip(self.reduced_frequencies, values):
+                    fd.write(f"{reduced_frequency:.12g} {value:.12g}\n")
+            os.replace(temporary_path, file_path)
+
+
+def read_cell_coefficient_file(file_path: str) -> np.ndarray:
+    """
+    Reads a coefficient file as it is written by cell.pro (columns: reduced frequency, real part, imaginary part).
+
+    :param file_path: path of the file
+    :type file_path: str
+    :return: coefficients sorted by the reduced frequency
+    :rtype: np.ndarray
+    """
+    data = np.atleast_2d(np.loadtxt(file_path))
+    data = data[np.argsort(data[:, 0])]
+    values = data[:, 1].copy()
+    # Corrects the coefficient error at 0 Hz (formerly done by rewriting the files)
+    values[values == 0] = 1
+    return values
+
+
+def generate_litz_coefficient_library(onelab_client, onelab_folder_path: str, strands_coefficients_folder_path: str,
+                                      library_path: Optional[str] = None,
+                                      fill_factors: np.ndarray = default_fill_factors,
+                                      n_layers: np.ndarray = default_n_layers,
+                                      reduced_frequencies: np.ndarray = default_reduced_frequencies,
+                                      strand_radius: float = 35e-6) -> LitzCoefficientLibrary:
+    """
+    Calculates the litz coefficient library in bulk with the cell model (cell.geo, cell.pro).
+
+    For every combination of fill factor and number of layers, the cell is meshed once and solved for all reduced
+    frequencies in skin and proximity mode. The coefficients are dimensionless, so the strand radius of the cell is
+    arbitrary.
+
+    The generation is protected by a lock file, so if several processes need the library at the same time, it is
+    only generated once.
+
+    :param onelab_client: onelab client to run gmsh and GetDP
+    :param onelab_folder_path: folder of the onelab binaries
+    :type onelab_folder_path: str
+    :param strands_coefficients_folder_path: folder containing cell.geo and cell.pro
+    :type strands_coefficients_folder_path: str
+    :param library_path: path of the library file, defaults to default_litz_coefficient_library_path()
+    :type library_path: str
+    :param fill_factors: fill factor grid
+    :type fill_factors: np.ndarray
+    :param n_layers: numbers of strand layers
+    :type n_layers: np.ndarray
+    :param reduced_frequencies: reduced frequency grid
+    :type reduced_frequencies: np.ndarray
+    :param strand_radius: strand radius of the cell in m
+    :type strand_radius: float
+    :return: library
+    :rtype: LitzCoefficientLibrary
+    """
+    library_path = os.path.abspath(library_path or default_litz_coefficient_library_path())
+    lock_path = f"{library_path}.lock"
+    if not os.access(os.path.dirname(library_path), os.W_OK):
+        # Read only folder: the library is only kept in memory (see LitzCoefficientLibrary.save())
+        lock_path = os.path.join(user_cache_directory(), f"{os.path.basename(library_path)}.lock")
+
+    with FileLock(lock_path):
+        if LitzCoefficientLibrary.exists(library_path):
+            # Generated by another process in the meantime
+            return LitzCoefficientLibrary.load(library_path)
+
+        print(f"\n"
+              f"Pre-Simulation\n"
+              f"-----------------------------------------\n"
+              f"Create litz coefficient library ({len(n_layers)} layer counts x {len(fill_factors)} fill factors x "
+              f"{len(reduced_frequencies)} reduced frequencies)\n")
+
+        coeff_folder_path = os.path.join(strands_coefficients_folder_path, "coeff")
+        os.makedirs(coeff_folder_path, exist_ok=True)
+        pre_parameter_path = os.path.join(strands_coefficients_folder_path, "PreParameter.pro")
+        cell_geo = os.path.join(strands_coefficients_folder_path, "cell.geo")
+        cell = os.path.join(strands_coefficients_folder_path, "cell.pro")
+        input_file = os.path.join(strands_coefficients_folder_path, "cell_dat.pro")
+        mygmsh = os.path.join(onelab_folder_path, "gmsh")
+        mygetdp = os.path.join(onelab_folder_path, "getdp")
+
+        def write_pre_parameters(layers: int, ff: float, reduced_frequency: float = None, mode: int = None):
+            with open(pre_parameter_path, "w") as text_file:
+                if reduced_frequency is not None:
+                    text_file.write(f"Rr_cell = {reduced_frequency};\n")
+                    text_file.write(f"Mode = {mode};\n")
+                text_file.write(f"NbrLayers = {layers};\n")
+                text_file.write(f"Fill = {ff};\n")
+                text_file.write(f"Rc = {strand_radius};\n")
+
+        coefficients = np.empty((len(litz_coefficient_names), len(n_layers), len(fill_factors),
+                                 len(reduced_frequencies)))
+        for i_layers, layers in enumerate(n_layers):
+            for i_ff, ff in enumerate(fill_factors):
+                # cell.pro names its output files by the fill factor and number of layers (with two digits)
+                files = {name: os.path.join(coeff_folder_path, f"{name}_RS_la{ff:.2g}_{layers:.2g}layer.dat")
+                         for name in litz_coefficient_names}
+                for file_path in files.values():
+                    if os.path.isfile(file_path):
+                        os.remove(file_path)
+
+                write_pre_parameters(layers, ff)
+                run_sub_client(onelab_client, "myGmsh", [mygmsh, cell_geo, "-2", "-v", "2"])
+
+                modes = [1, 2]  # 1 = "skin", 2 = "proximity"
+                for mode in modes:
+                    for reduced_frequency in reduced_frequencies:
+                        write_pre_parameters(layers, ff, reduced_frequency, mode)
+                        run_sub_client(onelab_client, "myGetDP",
+                                       [mygetdp, cell, "-input", input_file, "-solve", "MagDyn_a", "-v2"])
+
+                for i_name, name in enumerate(litz_coefficient_names):
+                    values = read_cell_coefficient_file(files[name])
+                    if len(values) != len(reduced_frequencies):
+                        raise Exception(f"{files[name]} contains {len(values)} instead of {len(reduced_frequencies)} "
+                                        f"coefficients.")
+                    coefficients[i_name, i_layers, i_ff] = values
+                    os.remove(files[name])
+
+        library = LitzCoefficientLibrary(fill_factors, n_layers, reduced_frequencies, coefficients)
+        library.save(library_path)
+        return library
@@ -0,0 +1,209 @@
+import os
+import re
+import numpy as np
+from typing import List, Optional, Tuple, Union
+from .femmt_materials import MaterialData, MaterialDatabase, save_user_materials, user_material_database_path
+
+# Measurement files: <parameter>_<frequency>kHz_<material>_<temperature>C.txt with two whitespace separated columns
+# (peak flux density in T, value). mu_r is the amplitude permeability, mu_phi the permeability loss angle in degree.
+measurement_file_pattern = re.compile(r"^(?P<parameter>mu_r|mu_phi)_(?P<frequency>\d+(?:\.\d+)?)kHz_(?P<material>.+)_"
+                                      r"(?P<temperature>-?\d+(?:\.\d+)?)C\.(?:txt|csv)$")
+
+measurement_parameters = ["mu_r", "mu_phi"]
+
+measurement_dtype = np.dtype([("parameter", np.int8), ("temperature", np.float64), ("frequency", np.float64),
+                              ("flux_density", np.float64), ("value", np.float64)])
+
+
+def read_measurement_directory(directory: Union[str, List[str]], material: Optional[str] = None) -> np.ndarray:
+    """
+    Reads all measurement files of a directory into one table. The operating point (parameter, frequency, material,
+    temperature) is taken from the file name, see measurement_file_pattern.
+
+    :param directory: directory with the measurement files or list of directories
+    :type directory: Union[str, List[str]]
+    :param material: only files of this material are read, all materials if None
+    :type material: str
+    :return: table with the dtype measurement_dtype, the parameter is the index in measurement_parameters
+    :rtype: np.ndarray
+    """
+    directories = [directory] if isinstance(directory, str) else directory
+    file_paths = [os.path.join(folder, file_name) for folder in directories for file_name in sorted(os.listdir(folder))]
+
+    blocks = []
+    for file_path in file_paths:
+        file_name = os.path.basename(file_path)
+        match = measurement_file_pattern.match(file_name)
+        if match is None or (material is not None and match["material"] != material):
+            continue
+        try:
+            values = np.loadtxt(file_path, ndmin=2)
+        except ValueError as e:
+            raise Exception(f"Measurement file {file_name} can not be read: {e}")
+        if values.shape[1] < 2:
+            raise Exception(f"Measurement file {file_name} must have two columns (flux density, value).")
+
+        block = np.empty(values.shape[0], dtype=measurement_dtype)
+        block["parameter"] = measurement_parameters.index(match["parameter"])
+        block["temperature"] = float(match["temperature"])
+        block["frequency"] = float(match["frequency"]) * 1000
+        block["flux_density"] = values[:, 0]
+        block["value"] = values[:, 1]
+        blocks.append(block)
+
+    if not blocks:
+        raise Exception(f"No measurement files{'' if material is None else f' of material {material}'} in {directory}.")
+    return np.concatenate(blocks)
+
+
+def fit_grouped_polynomials(group: np.ndarray, x: np.ndarray, y: np.ndarray, n_groups: int, degree: int) -> np.ndarray:
+    """
+    Least squares polynomial fits of all groups at once (batched normal equations).
+
+    :param group: group index of every point
+    :type group: np.ndarray
+    :param x: x values
+    :type x: np.ndarray
+    :param y: y values
+    :type y: np.ndarray
+    :param n_groups: number of groups
+    :type n_groups: int
+    :param degree: polynomial degree
+    :type degree: int
+    :return: coefficients in ascending order (x**0 to x**degree) with the shape (n_groups, degree + 1)
+    :rtype: np.ndarray
+    """
+    vandermonde = x[:, np.newaxis] ** np.arange(degree + 1)
+    normal_matrices = np.zeros((n_groups, degree + 1, degree + 1))
+    right_hand_sides = np.zeros((n_groups, degree + 1))
+    np.add.at(normal_matrices, group, vandermonde[:, :, np.newaxis] * vandermonde[:, np.newaxis, :])
+    np.add.at(right_hand_sides, group, vandermonde * y[:, np.newaxis])
+    return np.linalg.solve(normal_matrices, right_hand_sides[:, :, np.newaxis])[:, :, 0]
+
+
+def fit_measurements(table: np.ndarray, name: str, flux_density_bounds: Tuple[float, float] = (0.03, 0.25),
+                     mu_r_frequency: Optional[float] = None, mu_r_degree: int = 2, mu_phi_degree: int = 1,
+                     n_flux_densities: int = 50, extrapolation_factor: float = 2, source: str = "") -> MaterialData:
+    """
+    Fits the amplitude permeability and the loss angle of every operating point with polynomials in the flux density
+    and converts them to the complex permeability mu_real = mu_r * cos(phi), mu_imag = mu_r * sin(phi).
+
+    The fits are evaluated on a common flux density grid from 0 to extrapolation_factor times the largest measured
+    flux density, so the material can be used above the measured range.
+
+    :param table: measurements, see read_measurement_directory()
+    :type table: np.ndarray
+    :param name: name of the material
+    :type name: str
+    :param flux_density_bounds: measurement points outside of these bounds (in T) are ignored
+    :type flux_density_bounds: Tuple[float, float]
+    :param mu_r_frequency: frequency in Hz of the mu_r measurement, which is used for all frequencies. If None, a mu_r
+        measurement is needed for every operating point.
+    :type mu_r_frequency: float
+    :param mu_r_degree: polynomial degree of the amplitude permeability fit
+    :type mu_r_degree: int
+    :param mu_phi_degree: polynomial degree of the loss angle fit
+    :type mu_phi_degree: int
+    :param n_flux_densities: number of points of the flux density grid
+    :type n_flux_densities: int
+    :param extrapolation_factor: the grid ends at this factor times the largest measured flux density
+    :type extrapolation_factor: float
+    :param source: description of the data source
+    :type source: str
+    :rtype: MaterialData
+    """
+    mu_r_index, mu_phi_index = measurement_parameters.index("mu_r"), measurement_parameters.index("mu_phi")
+    table = table[(table["flux_density"] > flux_density_bounds[0]) & (table["flux_density"] < flux_density_bounds[1])
+                  & np.isfinite(table["value"])]
+    # Amplitude permeabilities of zero are invalid measurement points (typically at b = 0)
+    table = table[(table["parameter"] != mu_r_index) | (table["value"] > 0)]
+
+    phi_table = table[table["parameter"] == mu_phi_index]
+    temperatures = np.unique(phi_table["temperature"])
+    frequencies = np.unique(phi_table["frequency"])
+    if len(temperatures) == 0:
+        raise Exception(f"Material {name}: no loss angle (mu_phi) measurements within {flux_density_bounds} T.")
+
+    # Operating point index (temperature, frequency) of every loss angle measurement point
+    n_t, n_f = len(temperatures), len(frequencies)
+    phi_group = np.searchsorted(temperatures, phi_table["temperature"]) * n_f + \
+        np.searchsorted(frequencies, phi_table["frequency"])
+    phi_points = np.bincount(phi_group, minlength=n_t * n_f)
+
+    # Amplitude permeability fits, either per operating point or per temperature at mu_r_frequency
+    mu_r_table = table[table["parameter"] == mu_r_index]
+    if mu_r_frequency is None:
+        mu_r_mask = np.isin(mu_r_table["temperature"], temperatures) & np.isin(mu_r_table["frequency"], frequencies)
+        mu_r_table = mu_r_table[mu_r_mask]
+        mu_r_group = np.searchsorted(temperatures, mu_r_table["temperature"]) * n_f + \
+            np.searchsorted(frequencies, mu_r_table["frequency"])
+        n_mu_r_groups = n_t * n_f
+    else:
+        mu_r_table = mu_r_table[(mu_r_table["frequency"] == mu_r_frequency) &
+                                np.isin(mu_r_table["temperature"], temperatures)]
+        mu_r_group = np.searchsorted(temperatures, mu_r_table["temperature"])
+        n_mu_r_groups = n_t
+    mu_r_points = np.bincount(mu_r_group, minlength=n_mu_r_groups)
+
+    problems = []
+    for i in np.flatnonzero(phi_points <= mu_phi_degree):
+        problems.append(f"mu_phi at {temperatures[i // n_f]} °C, {frequencies[i % n_f]} Hz: {phi_points[i]} points")
+    for i in np.flatnonzero(mu_r_points <= mu_r_degree):
+        operating_point = f"{temperatures[i]} °C, {mu_r_frequency} Hz" if mu_r_frequency is not None else \
+            f"{temperatures[i // n_f]} °C, {frequencies[i % n_f]} Hz"
+        problems.append(f"mu_r at {operating_point}: {mu_r_points[i]} points")
+    if problems:
+        raise Exception(f"Material {name}: not enough measurement points within {flux_density_bounds} T for the "
+                        f"fits:\n" + "\n".join(problems))
+
+    phi_coefficients = fit_grouped_polynomials(phi_group, phi_table["flux_density"],
+                                               phi_table["value"], n_t * n_f, mu_phi_degree)
+    mu_r_coefficients = fit_grouped_polynomials(mu_r_group, mu_r_table["flux_density"], mu_r_table["value"],
+                                                n_mu_r_groups, mu_r_degree)
+    if mu_r_frequency is not None:
+        mu_r_coefficients = np.repeat(mu_r_coefficients, n_f, axis=0)
+
+    flux_densities = np.linspace(0, extrapolation_factor * table["flux_density"].max(), n_flux_densities)
+    phi = np.polynomial.polynomial.polyval(flux_densities, phi_coefficients.T)
+    mu_r = np.polynomial.polynomial.polyval(flux_densities, mu_r_coefficients.T)
+    phi = np.deg2rad(np.clip(phi, 0, 90)).reshape(n_t, n_f, -1)
+    mu_r = np.maximum(mu_r, 1).reshape(n_t, n_f, -1)
+
+    return MaterialData(name, temperatures, frequencies, flux_densities, mu_r * np.cos(phi), mu_r * np.sin(phi),
+                        source=source)
+
+
+def import_measurements(directory: Union[str, List[str]], material: str, name: Optional[str] = None,
+                        database_path: Optional[str] = None, **fit_parameters) -> MaterialData:
+    """
+    Imports a directory of permeability measurements into the material database: all files are read into one table,
+    validated and fitted (see fit_measurements()), the material is added to the user database, which is saved. The
+    user database is kept in the femmt cache folder (see user_material_database_path()), the materials are available
+    in material_database() next to the default materials.
+
+    Example (files mu_r_300kHz_N95_30C.txt, mu_phi_100kHz_N95_30C.txt, ...):
+
+        fmt.import_measurements("measurements/N95", material="N95", name="N95_measured", mu_r_frequency=300000)
+
+    :param directory: directory with the measurement files or list of directories
+    :type directory: Union[str, List[str]]
+    :param material: material name in the file names
+    :type material: str
+    :param name: name of the material in the database, the material name of the files is used if None. An existing
+        material of the same name is replaced.
+    :type name: str
+    :param database_path: path of the user database, user_material_database_path() if None
+    :type database_path: str
+    :param fit_parameters: keyword arguments of fit_measurements()
+    :return: imported material
+    :rtype: MaterialData
+    """
+    table = read_measurement_directory(directory, material)
+    material_data = fit_measurements(table, name or material, source=f"measurements in {directory}",
+                                     **fit_parameters)
+
+    save_user_materials(MaterialDatabase([material_data]), database_path)
+    print(f"Material {material_data.name} imported: {len(material_data.temperatures)} temperatures, "
+          f"{len(material_data.frequencies)} frequencies, {len(table)} measurement points, stored in "
+          f"{database_path or user_material_database_path()}.")
+    return material_data
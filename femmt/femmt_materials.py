@@ -0,0 +1,600 @@
+import os
+import json
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from .femmt_paths import user_cache_directory
+
+# The version of the database format. It must be increased whenever the layout of the data file or the default
+# materials are changed, so outdated default databases are rebuilt. Imported materials are stored in the user database
+# (user_material_database_path()), which is never rebuilt. Version 1 has no B-H curves.
+material_database_version = 2
+
+# Quantities, which are stored for every material on the (temperature, frequency, flux density) grid
+material_quantities = ["mu_real", "mu_imag"]
+
+# Temperature in °C, which is used if no core temperature is given
+default_temperature = 25
+
+
+def default_material_database_path() -> str:
+    """
+    :return: path of the data file of the database, which is shared by the reluctance model and the GetDP simulations.
+        It is built from the default materials in the femmt cache folder (see user_cache_directory()). The index is
+        stored next to it with the extension .json.
+    :rtype: str
+    """
+    return os.path.join(user_cache_directory(), f"material_database_v{material_database_version}.npy")
+
+
+def user_material_database_path() -> str:
+    """
+    :return: path of the data file of the user database, which holds the imported materials (see
+        import_measurements()). Its materials and B-H curves are added to the default database and replace default
+        entries of the same name.
+    :rtype: str
+    """
+    return os.path.join(user_cache_directory(), "user_materials.npy")
+
+
+def material_key(name) -> str:
+    """
+    Name of a material or B-H curve in the database. Numeric names, e.g. core.material = 95 or 95.0, are converted to
+    the integer string "95" the database is keyed with.
+
+    :param name: name of the material
+    :type name: str, int or float
+    :return: name in the material database
+    :rtype: str
+    """
+    if isinstance(name, (int, float, np.integer, np.floating)) and not isinstance(name, bool) and \
+            float(name).is_integer():
+        return str(int(name))
+    return str(name)
+
+
+def axis_weights(axis: np.ndarray, x, extrapolate: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Indices and weights of the linear interpolation on one axis of the grid.
+
+    :param axis: ascending grid values
+    :type axis: np.ndarray
+    :param x: values, at which is interpolated
+    :param extrapolate: extrapolate linearly with the outermost intervals, otherwise the values are clamped to the axis
+    :type extrapolate: bool
+    :return: lower indices, upper indices and weights of the upper indices
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    """
+    x = np.asarray(x, dtype=float)
+    if len(axis) == 1:
+        index = np.zeros(x.shape, dtype=int)
+        return index, index, np.zeros(x.shape)
+
+    lower = np.clip(np.searchsorted(axis, x, side="right") - 1, 0, len(axis) - 2)
+    weight = (x - axis[lower]) / (axis[lower + 1] - axis[lower])
+    if not extrapolate:
+        weight = np.clip(weight, 0, 1)
+    return lower, lower + 1, weight
+
+
+class MaterialData:
+    """
+    Complex permeability of one core material, tabulated on a grid of temperatures (°C), frequencies (Hz) and peak
+    flux densities (T). The quantities have the shape (n_temperatures, n_frequencies, n_flux_densities).
+    """
+
+    def __init__(self, name: str, temperatures, frequencies, flux_densities, mu_real, mu_imag, source: str = ""):
+        self.name = name
+        self.source = source
+        self.temperatures = np.asarray(temperatures, dtype=float)
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.flux_densities = np.asarray(flux_densities, dtype=float)
+        self.mu_real = np.asarray(mu_real, dtype=float)
+        self.mu_imag = np.asarray(mu_imag, dtype=float)
+
+        shape = (len(self.temperatures), len(self.frequencies), len(self.flux_densities))
+        for quantity in material_quantities:
+            if getattr(self, quantity).shape != shape:
+                raise Exception(f"The {quantity} data of material {name} must have the shape {shape}.")
+        for axis in [self.temperatures, self.frequencies, self.flux_densities]:
+            if np.any(np.diff(axis) <= 0):
+                raise Exception(f"The grid of material {name} must be strictly ascending.")
+
+    @classmethod
+    def from_curves(cls, name: str, curves: List[Dict], source: str = ""):
+        """
+        Creates the material from measured or datasheet curves mu(B) at single operating points. The curves are
+        resampled on the union of all flux densities within the range, which all curves cover (no data is invented by
+        extrapolation). Every combination of temperature and frequency must be given.
+
+        :param name: name of the material
+        :type name: str
+        :param curves: dicts with the keys "temperature", "frequency", "flux_density", "mu_real" and "mu_imag"
+        :type curves: List[Dict]
+        :param source: description of the data source
+        :type source: str
+        """
+        temperatures = np.unique([curve["temperature"] for curve in curves])
+        frequencies = np.unique([curve["frequency"] for curve in curves])
+        flux_densities = np.unique(np.concatenate([np.asarray(curve["flux_density"], dtype=float) for curve in curves]))
+        b_min = max(np.min(curve["flux_density"]) for curve in curves)
+        b_max = min(np.max(curve["flux_density"]) for curve in curves)
+        flux_densities = flux_densities[(flux_densities >= b_min) & (flux_densities <= b_max)]
+
+        data = {quantity: np.full((len(temperatures), len(frequencies), len(flux_densities)), np.nan)
+                for quantity in material_quantities}
+        for curve in curves:
+            i_temperature = np.searchsorted(temperatures, curve["temperature"])
+            i_frequency = np.searchsorted(frequencies, curve["frequency"])
+            b = np.asarray(curve["flux_density"], dtype=float)
+            order = np.argsort(b, kind="stable")
+            for quantity in material_quantities:
+                data[quantity][i_temperature, i_frequency] = np.interp(flux_densities, b[order],
+                                                                       np.asarray(curve[quantity], dtype=float)[order])
+
+        if np.any(np.isnan(data["mu_real"])):
+            raise Exception(f"Material {name}: a curve is needed for every combination of the temperatures "
+                            f"{list(temperatures)} and frequencies {list(frequencies)}.")
+        return cls(name, temperatures, frequencies, flux_densities, data["mu_real"], data["mu_imag"], source)
+
+    def interpolate(self, quantity: str, flux_density, frequency, temperature=default_temperature,
+                    extrapolate: bool = False, bounds_error: bool = False) -> np.ndarray:
+        """
+        Trilinear interpolation of a quantity. The arguments are broadcast against each other.
+
+        :param quantity: "mu_real" or "mu_imag"
+        :type quantity: str
+        :param flux_density: peak flux density in T, clamped to the grid
+        :param frequency: frequency in Hz
+        :param temperature: temperature in °C
+        :param extrapolate: extrapolate linearly in frequency and temperature, otherwise the values are clamped
+        :type extrapolate: bool
+        :param bounds_error: raise a ValueError for flux densities outside of the grid instead of clamping them
+        :type bounds_error: bool
+        :return: interpolated values
+        :rtype: np.ndarray
+        """
+        if quantity not in material_quantities:
+            raise Exception(f"Unknown material quantity {quantity}, possible quantities: {material_quantities}")
+        values = getattr(self, quantity)
+
+        if bounds_error:
+            b = np.abs(np.asarray(flux_density, dtype=float))
+            if np.any(b < self.flux_densities[0]) or np.any(b > self.flux_densities[-1]):
+                raise ValueError(f"Material {self.name}: a flux density lies outside of the data range "
+                                 f"{self.flux_densities[0]} T ... {self.flux_densities[-1]} T.")
+
+        # The weights are calculated for the arguments as given (often scalar frequency and temperature), the
+        # indexing broadcasts them
+        t0, t1, wt = axis_weights(self.temperatures, temperature, extrapolate)
+        f0, f1, wf = axis_weights(self.frequencies, frequency, extrapolate)
+        b0, b1, wb = axis_weights(self.flux_densities, np.abs(np.asarray(flux_density, dtype=float)))
+
+        def linear_in_b(t, f):
+            return (1 - wb) * values[t, f, b0] + wb * values[t, f, b1]
+
+        # Interpolation steps with vanishing weights (e.g. materials with one temperature) are skipped
+        def bilinear(t):
+            if not np.any(wf):
+                return linear_in_b(t, f0)
+            return (1 - wf) * linear_in_b(t, f0) + wf * linear_in_b(t, f1)
+
+        result = bilinear(t0)
+        if np.any(wt):
+            result = (1 - wt) * result + wt * bilinear(t1)
+
+        shape = np.broadcast_shapes(np.shape(flux_density), np.shape(frequency), np.shape(temperature))
+        return result if result.shape == shape else np.broadcast_to(result, shape).copy()
+
+    def get_mu_real(self, flux_density, frequency, temperature=default_temperature, extrapolate: bool = False,
+                    bounds_error: bool = False):
+        return self.interpolate("mu_real", flux_density, frequency, temperature, extrapolate, bounds_error)
+
+    def get_mu_imag(self, flux_density, frequency, temperature=default_temperature, extrapolate: bool = False,
+                    bounds_error: bool = False):
+        return self.interpolate("mu_imag", flux_density, frequency, temperature, extrapolate, bounds_error)
+
+    def getdp_functions(self, temperature: float = default_temperature, prefix: str = "mu_data") -> str:
+        """
+        GetDP functions f_<prefix>_real[b, f] and f_<prefix>_imag[b, f] of the material at the given temperature.
+        The curves of all grid frequencies are written as linear interpolation tables in the flux density, between
+        the frequencies is interpolated linearly (clamped at the outermost frequencies).
+
+        :param temperature: core temperature in °C
+        :type temperature: float
+        :param prefix: prefix of the function names
+        :type prefix: str
+        :return: Function block for a .pro file
+        :rtype: str
+        """
+        b = self.flux_densities
+        lines = [f"// Material {self.name} at {temperature} °C, generated from the femmt material database",
+                 "Function{", f"  {prefix}_b = {{{', '.join(repr(float(x)) for x in b)}}} ;"]
+        for part in ["real", "imag"]:
+            for k, frequency in enumerate(self.frequencies):
+                values = self.interpolate(f"mu_{part}", b, frequency, temperature)
+                lines += [f"  {prefix}_{part}_{k} = {{{', '.join(repr(float(x)) for x in values)}}} ;",
+                          f"  {prefix}_{part}_couples_{k} = ListAlt[{prefix}_b(), {prefix}_{part}_{k}()] ;",
+                          f"  f_{prefix}_{part}_{k}[] = InterpolationLinear[Norm[$1]]{{List[{prefix}_{part}_couples_{k}]}};"]
+
+            # Piecewise linear interpolation in the frequency $2, nested from the highest frequency downwards
+            n = len(self.frequencies)
+            expression = f"f_{prefix}_{part}_{n - 1}[$1]"
+            for k in range(n - 2, -1, -1):
+                f_low, f_high = float(self.frequencies[k]), float(self.frequencies[k + 1])
+                segment = f"f_{prefix}_{part}_{k}[$1] + (f_{prefix}_{part}_{k + 1}[$1] - f_{prefix}_{part}_{k}[$1]) " \
+                          f"* ($2 - {f_low!r}) / {f_high - f_low!r}"
+                expression = f"(($2 <= {f_high!r}) ? ({segment}) : ({expression}))"
+            if n > 1:
+                expression = f"(($2 <= {float(self.frequencies[0])!r}) ? f_{prefix}_{part}_0[$1] : {expression})"
+            lines.append(f"  f_{prefix}_{part}[] = {expression};")
+        lines.append("}")
+        return "\n".join(lines) + "\n"
+
+    def getdp_region_functions(self, temperatures: List[float], conditions: List[str], prefix: str = "mu_data") -> str:
+        """
+        GetDP functions f_<prefix>_real[b, f] and f_<prefix>_imag[b, f] with a temperature per core region: the
+        functions of every region (see getdp_functions()) are selected by the position of the evaluation point.
+
+        :param temperatures: temperature in °C of every region
+        :type temperatures: List[float]
+        :param conditions: GetDP conditions, which are true within the regions, for all regions but the last one
+            (e.g. "X[] <= 0.01"). The first region whose condition is true is used.
+        :type conditions: List[str]
+        :param prefix: prefix of the function names
+        :type prefix: str
+        :return: Function blocks for a .pro file
+        :rtype: str
+        """
+        if len(conditions) != len(temperatures) - 1:
+            raise Exception(f"{len(temperatures)} region temperatures need {len(temperatures) - 1} region conditions, "
+                            f"{len(conditions)} are given.")
+        blocks = [self.getdp_functions(temperature, prefix=f"{prefix}_region_{i}")
+                  for i, temperature in enumerate(temperatures)]
+        lines = ["Function{"]
+        for part in ["real", "imag"]:
+            expression = f"f_{prefix}_region_{len(temperatures) - 1}_{part}[$1, $2]"
+            for i in range(len(conditions) - 1, -1, -1):
+                expression = f"(({conditions[i]}) ? f_{prefix}_region_{i}_{part}[$1, $2] : {expression})"
+            lines.append(f"  f_{prefix}_{part}[] = {expression};")
+        lines.append("}")
+        return "".join(blocks) + "\n".join(lines) + "\n"
+
+
+class BHCurve:
+    """
+    Static B-H curve of a core material, which is used by the nonlinear simulation (core.non_linear = True). Between
+    the points, the reluctivity nu = h / b is interpolated linearly in b^2.
+    """
+
+    def __init__(self, name: str, flux_densities, field_strengths, source: str = ""):
+        self.name = name
+        self.source = source
+        self.flux_densities = np.asarray(flux_densities, dtype=float)
+        self.field_strengths = np.asarray(field_strengths, dtype=float)
+
+        if self.flux_densities.shape != self.field_strengths.shape or len(self.flux_densities) < 2:
+            raise Exception(f"The B-H curve {name} needs at least two points with flux density and field strength.")
+        if self.flux_densities[0] != 0 or np.any(np.diff(self.flux_densities) <= 0):
+            raise Exception(f"The flux densities of the B-H curve {name} must start at 0 and be strictly ascending.")
+
+    def reluctivity(self) -> np.ndarray:
+        """
+        :return: reluctivity h / b at the points of the curve, at b = 0 the value of the first point is used
+        :rtype: np.ndarray
+        """
+        nu = np.empty(len(self.flux_densities))
+        nu[1:] = self.field_strengths[1:] / self.flux_densities[1:]
+        nu[0] = nu[1]
+        return nu
+
+    def get_h(self, flux_density) -> np.ndarray:
+        """
+        :param flux_density: flux density in T
+        :return: field strength in A/m as evaluated by the GetDP functions (see getdp_functions())
+        :rtype: np.ndarray
+        """
+        b = np.asarray(flux_density, dtype=float)
+        return np.interp(b ** 2, self.flux_densities ** 2, self.reluctivity()) * b
+
+    def getdp_functions(self, prefix: str = "bh_data") -> str:
+        """
+        GetDP functions nu_<prefix>[b], dnudb2_<prefix>[b], h_<prefix>[b], dhdb_<prefix>[b] and dhdb_<prefix>_NL[b]
+        of the curve for the Newton-Raphson iteration.
+
+        :param prefix: prefix of the function names
+        :type prefix: str
+        :return: Function block for a .pro file
+        :rtype: str
+        """
+        return "\n".join([
+            f"// B-H curve {self.name}, generated from the femmt material database",
+            "Function{",
+            f"  {prefix}_b2 = {{{', '.join(repr(float(x)) for x in self.flux_densities ** 2)}}} ;",
+            f"  {prefix}_nu = {{{', '.join(repr(float(x)) for x in self.reluctivity())}}} ;",
+            f"  {prefix}_nu_b2 = ListAlt[{prefix}_b2(), {prefix}_nu()] ;",
+            f"  nu_{prefix}[] = InterpolationLinear[SquNorm[$1]]{{{prefix}_nu_b2()}} ;",
+            f"  dnudb2_{prefix}[] = dInterpolationLinear[SquNorm[$1]]{{{prefix}_nu_b2()}} ;",
+            f"  h_{prefix}[] = nu_{prefix}[$1] * $1 ;",
+            f"  dhdb_{prefix}[] = TensorDiag[1,1,1]*nu_{prefix}[$1#1] + 2*dnudb2_{prefix}[#1] * SquDyadicProduct[#1] ;",
+            f"  dhdb_{prefix}_NL[] = 2*dnudb2_{prefix}[$1] * SquDyadicProduct[$1] ;",
+            "}"]) + "\n"
+
+
+class MaterialDatabase:
+    """
+    Collection of core materials (complex permeability) and B-H curves. The database is stored as one flat float64
+    array (.npy), which is loaded memory mapped, and a .json index with the grid sizes and offsets of every entry.
+    """
+
+    def __init__(self, materials: Optional[List[MaterialData]] = None, bh_curves: Optional[List[BHCurve]] = None):
+        self.materials = {}
+        self.bh_curves = {}
+        for material in materials or []:
+            self.add(material)
+        for bh_curve in bh_curves or []:
+            self.add_bh_curve(bh_curve)
+
+    def add(self, material: MaterialData):
+        self.materials[material.name] = material
+
+    def add_bh_curve(self, bh_curve: BHCurve):
+        self.bh_curves[bh_curve.name] = bh_curve
+
+    def bh_curve(self, name: str) -> BHCurve:
+        name = material_key(name)
+        if name not in self.bh_curves:
+            raise Exception(f"B-H curve {name} is not in the material database. Available B-H curves: "
+                            f"{list(self.bh_curves)}")
+        return self.bh_curves[name]
+
+    def names(self) -> List[str]:
+        return list(self.materials)
+
+    def __contains__(self, name: str) -> bool:
+        return material_key(name) in self.materials
+
+    def __getitem__(self, name: str) -> MaterialData:
+        name = material_key(name)
+        if name not in self.materials:
+            raise Exception(f"Material {name} is not in the material database. Available materials: {self.names()}")
+        return self.materials[name]
+
+    @staticmethod
+    def index_path(database_path: str) -> str:
+        return f"{os.path.splitext(database_path)[0]}.json"
+
+    def save(self, database_path: str):
+        """
+        Writes the database. Data file and index are replaced atomically.
+
+        :param database_path: path of the data file (.npy)
+        :type database_path: str
+        """
+        blocks, index, offset = [], {}, 0
+        for name, material in self.materials.items():
+            block = np.concatenate([material.temperatures, material.frequencies, material.flux_densities] +
+                                   [getattr(material, quantity).ravel() for quantity in material_quantities])
+            index[name] = {"offset": offset, "shape": [len(material.temperatures), len(material.frequencies),
+                                                       len(material.flux_densities)], "source": material.source}
+            blocks.append(block)
+            offset += len(block)
+        bh_index = {}
+        for name, bh_curve in self.bh_curves.items():
+            bh_index[name] = {"offset": offset, "length": len(bh_curve.flux_densities), "source": bh_curve.source}
+            blocks.append(np.concatenate([bh_curve.flux_densities, bh_curve.field_strengths]))
+            offset += 2 * len(bh_curve.flux_densities)
+
+        temporary_path = f"{database_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "wb") as fd:
+            np.save(fd, np.concatenate(blocks) if blocks else np.zeros(0))
+        os.replace(temporary_path, database_path)
+        with open(f"{temporary_path}.json", "w") as fd:
+            json.dump({"version": material_database_version, "quantities": material_quantities, "materials": index,
+                       "bh_curves": bh_index}, fd, indent=1)
+        os.replace(f"{temporary_path}.json", self.index_path(database_path))
+
+    def update(self, database):
+        """
+        Adds all materials and B-H curves of another database, entries of the same name are replaced.
+
+        :param database: database with the new entries
+        :type database: MaterialDatabase
+        """
+        self.materials.update(database.materials)
+        self.bh_curves.update(database.bh_curves)
+
+    @classmethod
+    def load(cls, database_path: str, memory_map: bool = True):
+        """
+        Loads the database memory mapped. The grids and quantities of the materials are views of the data file.
+        Databases of older versions are read as well.
+
+        :param database_path: path of the data file (.npy)
+        :type database_path: str
+        :param memory_map: load the data file memory mapped, otherwise it is read into memory (the file can be replaced
+            while the database is in use)
+        :type memory_map: bool
+        """
+        with open(cls.index_path(database_path), "r") as fd:
+            index = json.load(fd)
+        if index["version"] > material_database_version:
+            raise Exception(f"The material database {database_path} has the version {index['version']}, this femmt "
+                            f"version reads databases up to version {material_database_version}.")
+        data = np.load(database_path, mmap_mode="r" if memory_map else None)
+
+        database = cls()
+        for name, entry in index["materials"].items():
+            n_t, n_f, n_b = entry["shape"]
+            offset = entry["offset"]
+            axes = []
+            for n in [n_t, n_f, n_b]:
+                axes.append(data[offset:offset + n])
+                offset += n
+            quantities = []
+            for _ in index["quantities"]:
+                quantities.append(data[offset:offset + n_t * n_f * n_b].reshape(n_t, n_f, n_b))
+                offset += n_t * n_f * n_b
+            database.add(MaterialData(name, *axes, *quantities, source=entry["source"]))
+        for name, entry in index.get("bh_curves", {}).items():
+            offset, n = entry["offset"], entry["length"]
+            database.add_bh_curve(BHCurve(name, data[offset:offset + n], data[offset + n:offset + 2 * n],
+                                          source=entry["source"]))
+        return database
+
+
+def default_materials() -> List[MaterialData]:
+    """
+    Materials of the default database: the TDK N95 datasheet curves (25 °C and 100 °C), the N95 measurements at
+    100 °C, which are used by the reluctance model, and an earlier N95 measurement at 100 kHz.
+
+    :rtype: List[MaterialData]
+    """
+    from .electro_magnetic import Analytical_Core_Data as data
+
+    datasheet_b = [0, 0.025, 0.05, 0.1, 0.2, 0.3, 0.4, 1]
+    datasheet = MaterialData.from_curves("N95", [
+        {"temperature": 25, "frequency": 100000, "flux_density": datasheet_b,
+         "mu_real": [3000, 2993, 2986, 2978, 2966, 2973, 1, 1], "mu_imag": [1, 202, 288, 360, 450, 520, 0, 0]},
+        {"temperature": 25, "frequency": 200000, "flux_density": datasheet_b,
+         "mu_real": [3000, 2989, 2978, 2969, 2951, 2939, 1, 1], "mu_imag": [1, 259, 360, 432, 540, 600, 0, 0]}],
+        source="TDK N95 datasheet, 25 °C")
+    datasheet_100 = MaterialData.from_curves("N95_datasheet_100C", [
+        {"temperature": 100, "frequency": 100000, "flux_density": datasheet_b,
+         "mu_real": [3000, 2998, 2997, 2995, 2978, 2973, 1, 1], "mu_imag": [1, 115, 130, 180, 360, 400, 0, 0]}],
+        source="TDK N95 datasheet, 100 °C")
+    measurement_lea = MaterialData.from_curves("N95_measurement_LEA", [
+        {"temperature": default_temperature, "frequency": 100000, "flux_density": [0, 0.03, 0.1, 0.2, 0.3, 0.4, 1],
+         "mu_real": [2790, 2797, 3368, 3329, 2891, 1, 1], "mu_imag": [1, 139, 462, 694, 800, 0, 0]}],
+        source="N95 measurement (LEA), 100 kHz, temperature not documented")
+
+    # Only the imaginary part is measured, the measurement is normalized on mur = 3000
+    measurement_curves = []
+    for frequency, b, mu_imag in [(200000, data.N95_b_200000, data.N95_mu_imag_200000),
+                                  (300000, data.N95_b_300000, data.N95_mu_imag_300000)]:
+        mu_imag = np.asarray(mu_imag, dtype=float)
+        measurement_curves.append({"temperature": 100, "frequency": frequency, "flux_density": b, "mu_imag": mu_imag,
+                                   "mu_real": np.sqrt(np.maximum(3000 ** 2 - mu_imag ** 2, 0))})
+    measurement = MaterialData.from_curves("N95_measurement", measurement_curves,
+                                           source="TDK N95 measurement, 100 °C, normalized on mur = 3000")
+    return [datasheet, datasheet_100, measurement, measurement_lea]
+
+
+def default_bh_curves() -> List[BHCurve]:
+    """
+    B-H curves of the default database. The names are the values of core.material for the nonlinear simulation:
+    1 and 3kW (example materials), N95 resp. 95 (TDK N95, 25 °C) and 95100 (TDK N95, 100 °C).
+
+    :rtype: List[BHCurve]
+    """
+    from .electro_magnetic import Analytical_Core_Data as data
+
+    return [BHCurve("1", data.BH_1_b, data.BH_1_h, source="Brauer law nu = 100 + 10 * exp(1.8 * b^2)"),
+            BHCurve("3kW", data.BH_3kW_b, data.BH_3kW_h, source="nu = 123 + 0.0596 * exp(3.504 * b^2), 3 kW machine"),
+            BHCurve("N95", data.BH_N95_b, data.BH_N95_h, source="TDK N95, 25 °C"),
+            BHCurve("95", data.BH_N95_b, data.BH_N95_h, source="TDK N95, 25 °C"),
+            BHCurve("95100", data.BH_N95_100_b, data.BH_N95_100_h, source="TDK N95, 100 °C")]
+
+
+_material_databases = {}
+
+
+def database_exists(database_path: str) -> bool:
+    return os.path.isfile(database_path) and os.path.isfile(MaterialDatabase.index_path(database_path))
+
+
+def outdated_database_paths() -> List[str]:
+    """
+    :return: default databases of older versions in the cache folder and in the package folder (location of version 1)
+    :rtype: List[str]
+    """
+    folders = [user_cache_directory(), os.path.join(os.path.dirname(__file__), "electro_magnetic")]
+    return [os.path.join(folder, f"material_database_v{version}.npy") for folder in folders
+            for version in range(1, material_database_version)
+            if database_exists(os.path.join(folder, f"material_database_v{version}.npy"))]
+
+
+def user_entries(database: MaterialDatabase, defaults: MaterialDatabase) -> MaterialDatabase:
+    """
+    Entries of a database, which are not default entries: other names or another source (e.g. an imported material,
+    which replaced a default material).
+
+    :param database: database, which may contain default and user entries
+    :type database: MaterialDatabase
+    :param defaults: database of the default entries
+    :type defaults: MaterialDatabase
+    :rtype: MaterialDatabase
+    """
+    entries = MaterialDatabase()
+    for name, material in database.materials.items():
+        if name not in defaults.materials or defaults.materials[name].source != material.source:
+            entries.add(material)
+    for name, bh_curve in database.bh_curves.items():
+        if name not in defaults.bh_curves or defaults.bh_curves[name].source != bh_curve.source:
+            entries.add_bh_curve(bh_curve)
+    return entries
+
+
+def save_user_materials(database: MaterialDatabase, database_path: Optional[str] = None):
+    """
+    Adds the materials and B-H curves of a database to the user database (existing entries of the same name are
+    replaced) and saves it. The shared database of material_database() is reloaded on the next access.
+
+    :param database: database with the new entries
+    :type database: MaterialDatabase
+    :param database_path: path of the user database, user_material_database_path() if None
+    :type database_path: str
+    """
+    database_path = database_path or user_material_database_path()
+    user_database = MaterialDatabase.load(database_path, memory_map=False) if database_exists(database_path) \
+        else MaterialDatabase()
+    user_database.update(database)
+    user_database.save(database_path)
+    _material_databases.pop(database_path, None)
+    _material_databases.pop(default_material_database_path(), None)
+
+
+def material_database(database_path: Optional[str] = None) -> MaterialDatabase:
+    """
+    The material database, which is shared by all components. It is loaded only once per process.
+
+    The default database is built from the default materials if it does not exist yet, the entries of the user
+    database (user_material_database_path()) are added. When the default database is rebuilt for a new version, the
+    user entries of the outdated default databases (imported into them by earlier femmt versions) are moved to the
+    user database before, so no user data is lost.
+
+    :param database_path: path of the data file, the default database with the user entries is used if None
+    :type database_path: str
+    :rtype: MaterialDatabase
+    """
+    if database_path is not None and database_path != default_material_database_path():
+        if database_path not in _material_databases:
+            if not database_exists(database_path):
+                raise Exception(f"The material database {database_path} does not exist.")
+            _material_databases[database_path] = MaterialDatabase.load(database_path)
+        return _material_databases[database_path]
+
+    database_path = default_material_database_path()
+    if database_path not in _material_databases:
+        if database_exists(database_path):
+            database = MaterialDatabase.load(database_path)
+        else:
+            database = MaterialDatabase(default_materials(), default_bh_curves())
+            for outdated_path in outdated_database_paths():
+                entries = user_entries(MaterialDatabase.load(outdated_path, memory_map=False), database)
+                if entries.materials or entries.bh_curves:
+                    print(f"The user materials {entries.names() + list(entries.bh_curves)} of the outdated material "
+                          f"database {outdated_path} are moved to the user database.")
+                    # Entries, which were imported later into the user database, are kept
+                    if database_exists(user_material_database_path()):
+                        entries.update(MaterialDatabase.load(user_material_database_path(), memory_map=False))
+                    save_user_materials(entries)
+            try:
+                database.save(database_path)
+            except OSError:
+                # The database is kept in memory, if the cache folder is not writable
+                pass
+        if database_exists(user_material_database_path()):
+            # Read into memory, so the user database can be replaced while the shared database is in use
+            database.update(MaterialDatabase.load(user_material_database_path(), memory_map=False))
+        _material_databases[database_path] = database
+    return _material_databases[database_path]
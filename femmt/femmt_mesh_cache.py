@@ -0,0 +1,189 @@
+import os
+import json
+import shutil
+import hashlib
+import numpy as np
+from typing import Dict, Optional
+
+
+def _json_default(value):
+    """
+    Makes numpy data types serializable for the geometry hashes (see MeshCache.key() and design_geometry_key()).
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return str(value)
+
+
+class MeshCache:
+    """
+    Content addressed cache for mesh files.
+
+    Every entry is a folder named by the hash of a geometry description (see MagneticComponent.Mesh.
+    geometry_description()), which contains the mesh files (e.g. hybrid.msh, electro_magnetic.msh) and a small
+    meta data file. If the total size of the cache exceeds max_size, the least recently used entries are deleted.
+
+    Files are written to a temporary name first and renamed afterwards, so several processes can share one cache
+    folder.
+
+    :Example Code:
+
+    >>> cache = MeshCache(os.path.join(geo.working_directory, "mesh_cache"), max_size=200e6)
+    >>> key = cache.key(geo.mesh.geometry_description())
+    >>> if not cache.load_file(key, "hybrid.msh", geo.hybrid_mesh_file):
+    >>>     geo.mesh.generate_hybrid_mesh()
+    """
+
+    meta_file_name = "meta.json"
+
+    def __init__(self, cache_folder_path: str, max_size: float = 500e6):
+        """
+        :param cache_folder_path: folder of the cache entries
+        :type cache_folder_path: str
+        :param max_size: maximum size of all cache entries in bytes
+        :type max_size: float
+        """
+        self.cache_folder_path = cache_folder_path
+        self.max_size = max_size
+        os.makedirs(self.cache_folder_path, exist_ok=True)
+
+    @staticmethod
+    def key(description: Dict) -> str:
+        """
+        Returns the hash of a geometry description.
+
+        :param description: json serializable description of geometry and mesh settings
+        :type description: Dict
+        :return: key of the cache entry
+        :rtype: str
+        """
+        text = json.dumps(description, sort_keys=True, default=_json_default)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_folder_path, key)
+
+    def has_file(self, key: str, file_name: str) -> bool:
+        return os.path.isfile(os.path.join(self.entry_path(key), file_name))
+
+    def touch(self, key: str):
+        """
+        Marks an entry as recently used.
+        """
+        try:
+            os.utime(self.entry_path(key))
+        except FileNotFoundError:
+            pass
+
+    def load_file(self, key: str, file_name: str, destination_path: str) -> bool:
+        """
+        Copies a file of a cache entry to destination_path. A missing file (e.g. the entry was just deleted by
+        another process sharing the cache) is a cache miss.
+
+        :param key: key of the cache entry
+        :type key: str
+        :param file_name: name of the file inside the cache entry
+        :type file_name: str
+        :param destination_path: path of the copy
+        :type destination_path: str
+        :return: True, if the file was copied
+        :rtype: bool
+        """
+        try:
+            shutil.copyfile(os.path.join(self.entry_path(key), file_name), destination_path)
+        except FileNotFoundError:
+            return False
+        self.touch(key)
+        return True
+
+    def store_file(self, key: str, file_path: str, file_name: Optional[str] = None):
+        """
+        Copies a file into a cache entry and deletes the least recently used entries, if the cache is too large.
+
+        :param key: key of the cache entry
+        :type key: str
+        :param file_path: path of the file to be stored
+        :type file_path: str
+        :param file_name: name of the file inside the cache entry, defaults to the name of the file
+        :type file_name: str
+        """
+        file_name = file_name or os.path.basename(file_path)
+        os.makedirs(self.entry_path(key), exist_ok=True)
+        destination_path = os.path.join(self.entry_path(key), file_name)
+        temporary_path = f"{destination_path}.{os.getpid()}.tmp"
+        shutil.copyfile(file_path, temporary_path)
+        os.replace(temporary_path, destination_path)
+        self.touch(key)
+        self.evict()
+
+    def load_meta(self, key: str) -> Optional[Dict]:
+        """
+        :param key: key of the cache entry
+        :type key: str
+        :return: meta data of the entry or None, if there is none
+        :rtype: Dict
+        """
+        meta_path = os.path.join(self.entry_path(key), self.meta_file_name)
+        try:
+            with open(meta_path, "r") as fd:
+                return json.load(fd)
+        except FileNotFoundError:
+            return None
+
+    def store_meta(self, key: str, meta: Dict):
+        """
+        Stores json serializable meta data (e.g. the gmsh entity tags of the geometry) in a cache entry.
+
+        :param key: key of the cache entry
+        :type key: str
+        :param meta: meta data
+        :type meta: Dict
+        """
+        os.makedirs(self.entry_path(key), exist_ok=True)
+        meta_path = os.path.join(self.entry_path(key), self.meta_file_name)
+        temporary_path = f"{meta_path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as fd:
+            json.dump(meta, fd, default=_json_default)
+        os.replace(temporary_path, meta_path)
+        self.touch(key)
+
+    def size(self) -> int:
+        """
+        :return: size of all cache entries in bytes
+        :rtype: int
+        """
+        return sum(self.entry_size(key) for key in os.listdir(self.cache_folder_path))
+
+    def entry_size(self, key: str) -> int:
+        entry_path = self.entry_path(key)
+        if not os.path.isdir(entry_path):
+            return 0
+        return sum(os.path.getsize(os.path.join(entry_path, file_name)) for file_name in os.listdir(entry_path)
+                   if os.path.isfile(os.path.join(entry_path, file_name)))
+
+    def evict(self):
+        """
+        Deletes the least recently used entries until the cache is smaller than max_size.
+        """
+        entries = []
+        for key in os.listdir(self.cache_folder_path):
+            if os.path.isdir(self.entry_path(key)):
+                entries.append((os.path.getmtime(self.entry_path(key)), key, self.entry_size(key)))
+        entries.sort()
+
+        total_size = sum(size for _, _, size in entries)
+        # The most recently used entry is always kept
+        for _, key, size in entries[:-1]:
+            if total_size <= self.max_size:
+                break
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
+            total_size -= size
+
+    def clear(self):
+        """
+        Deletes all cache entries.
+        """
+        for key in os.listdir(self.cache_folder_path):
+            shutil.rmtree(self.entry_path(key), ignore_errors=True)
@@ -0,0 +1,36 @@
+import os
+import sys
+import tempfile
+
+
+def user_cache_directory() -> str:
+    """
+    Folder for data, which femmt generates once and reuses afterwards (e.g. the litz coefficient library). The
+    package folder is not used, since it may be read only and is replaced by every installation.
+
+    The folder can be set by the environment variable FEMMT_CACHE_DIR, otherwise the cache folder of the platform is
+    used (%LOCALAPPDATA%\\femmt, ~/Library/Caches/femmt or $XDG_CACHE_HOME/femmt resp. ~/.cache/femmt). If this
+    folder can not be created, a folder in the temporary directory of the system is used.
+
+    :return: path of the folder, which exists
+    :rtype: str
+    """
+    if os.environ.get("FEMMT_CACHE_DIR"):
+        candidates = [os.environ["FEMMT_CACHE_DIR"]]
+    elif os.name == "nt":
+        candidates = [os.path.join(os.environ.get("LOCALAPPDATA", os.path.expanduser("~")), "femmt")]
+    elif sys.platform == "darwin":
+        candidates = [os.path.join(os.path.expanduser("~"), "Library", "Caches", "femmt")]
+    else:
+        candidates = [os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"),
+                                   "femmt")]
+    candidates.append(os.path.join(tempfile.gettempdir(), "femmt"))
+
+    for directory in candidates:
+        try:
+            os.makedirs(directory, exist_ok=True)
+        except OSError:
+            continue
+        if os.access(directory, os.W_OK):
+            return directory
+    raise Exception(f"None of the cache folders {candidates} is writable.")
@@ -0,0 +1,317 @@
+import os
+import sys
+import json
+import time
+import functools
+import threading
+import contextlib
+import subprocess
+from typing import Dict, List, Optional
+
+# Peak memory and the cpu time of solver sub processes are read with the resource module, which is not available on
+# Windows. There, these values are not recorded.
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+class _NullWriter:
+    """
+    Replacement of sys.stdout in quiet mode.
+    """
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _peak_rss() -> Optional[int]:
+    """
+    :return: peak resident set size of this process in bytes since its start (not resettable)
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _children_cpu_time() -> Optional[float]:
+    """
+    :return: cpu time of all terminated sub processes (e.g. GetDP) in seconds
+    """
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+class Profiler:
+    """
+    Records the wall time, cpu time, memory and the cpu time of solver sub processes of the stages of the
+    simulation pipeline (geometry, meshing, file communication, solving, logging, thermal simulation, ...).
+
+    The operating system only reports the peak memory of the whole process lifetime. Every record contains this
+    value at the end of the stage ("process_peak_rss") and its increase during the stage ("peak_rss_increase"), which
+    is the additional memory a stage needed above all previous stages.
+
+    The profiler is disabled by default, then every instrumented stage costs a single attribute lookup. The records
+    can be exported as JSON and in the Chrome trace format (open with chrome://tracing or https://ui.perfetto.dev).
+
+    In quiet mode, the console output of all instrumented stages (including the solver sub processes started by
+    run_sub_client()) is suppressed. sys.stdout is replaced once, while any stage of any thread is running. Quiet mode
+    can be used without recording.
+
+    :Example Code:
+
+    >>> import femmt as fmt
+    >>> fmt.profiler.enable(quiet=True)
+    >>> geo.excitation_sweep(frequency_list=fs, current_list_list=currents, phi_deg_list_list=phases)
+    >>> print(fmt.profiler.summary())
+    >>> fmt.profiler.save_chrome_trace("trace.json")
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.quiet = False
+        self.records: List[Dict] = []
+        self._records_lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+        self._quiet_lock = threading.Lock()
+        self._quiet_stages = 0
+        self._saved_stdout = None
+        self._saved_gmsh_terminal = None
+
+    def enable(self, quiet: bool = False):
+        """
+        Starts recording.
+
+        :param quiet: suppress the console output of the instrumented stages
+        :type quiet: bool
+        """
+        self.enabled = True
+        self.quiet = quiet
+
+    def disable(self):
+        self.enabled = False
+        self.quiet = False
+
+    def reset(self):
+        """
+        Deletes all records.
+        """
+        with self._records_lock:
+            self.records = []
+        self._origin = time.perf_counter()
+
+    def _stack(self) -> List[Dict]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def _enter_quiet(self):
+        """
+        sys.stdout is shared by all threads, so it is only replaced by the first running stage and restored by the
+        last one (of all threads).
+        """
+        with self._quiet_lock:
+            if self._quiet_stages == 0:
+                self._saved_stdout = sys.stdout
+                sys.stdout = _NullWriter()
+                # The gmsh API writes to the console of the process directly
+                gmsh_module = sys.modules.get("gmsh")
+                if gmsh_module is not None and gmsh_module.isInitialized():
+                    self._saved_gmsh_terminal = gmsh_module.option.getNumber("General.Terminal")
+                    gmsh_module.option.setNumber("General.Terminal", 0)
+            self._quiet_stages += 1
+
+    def _exit_quiet(self):
+        with self._quiet_lock:
+            self._quiet_stages -= 1
+            if self._quiet_stages == 0:
+                sys.stdout = self._saved_stdout
+                self._saved_stdout = None
+                gmsh_module = sys.modules.get("gmsh")
+                if self._saved_gmsh_terminal is not None and gmsh_module is not None and \
+                        gmsh_module.isInitialized():
+                    gmsh_module.option.setNumber("General.Terminal", self._saved_gmsh_terminal)
+                self._saved_gmsh_terminal = None
+
+    @contextlib.contextmanager
+    def stage(self, name: str, category: str = "femmt", **args):
+        """
+        Context manager, which records one stage. Stages can be nested.
+
+        :param name: name of the stage
+        :type name: str
+        :param category: category of the stage (e.g. "mesh", "solver", "step")
+        :type category: str
+        :param args: additional information (e.g. the frequency of a sweep step)
+        """
+        if not (self.enabled or self.quiet):
+            yield
+            return
+
+        stack = self._stack()
+        quiet = self.quiet
+        if quiet:
+            self._enter_quiet()
+
+        record = {"name": name, "category": category, "depth": len(stack), "args": dict(args),
+                  "pid": os.getpid(), "tid": threading.get_ident()}
+        stack.append(record)
+        peak_rss_start = _peak_rss()
+        children_cpu_start = _children_cpu_time()
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            wall_end = time.perf_counter()
+            cpu_end = time.process_time()
+            children_cpu_end = _children_cpu_time()
+            stack.pop()
+            if quiet:
+                self._exit_quiet()
+
+            if self.enabled:
+                record["start"] = wall_start - self._origin
+                record["wall_time"] = wall_end - wall_start
+                record["cpu_time"] = cpu_end - cpu_start
+                record["solver_time"] = None if children_cpu_start is None else children_cpu_end - children_cpu_start
+                peak_rss_end = _peak_rss()
+                record["process_peak_rss"] = peak_rss_end
+                record["peak_rss_increase"] = None if peak_rss_start is None else peak_rss_end - peak_rss_start
+                with self._records_lock:
+                    self.records.append(record)
+
+    def annotate(self, **args):
+        """
+        Adds information (e.g. the number of mesh elements) to the innermost running stage.
+        """
+        stack = self._stack() if self.enabled else None
+        if stack:
+            stack[-1]["args"].update(args)
+
+    def to_dict(self) -> Dict:
+        with self._records_lock:
+            records = sorted(self.records, key=lambda record: record["start"])
+        return {"stages": records}
+
+    def save_json(self, file_path: str):
+        """
+        Saves all records as JSON.
+
+        :param file_path: path of the JSON file
+        :type file_path: str
+        """
+        with open(file_path, "w") as fd:
+            json.dump(self.to_dict(), fd, indent=2, default=str)
+
+    def chrome_trace(self) -> Dict:
+        """
+        :return: records in the Chrome trace event format
+        :rtype: Dict
+        """
+        events = []
+        for record in self.to_dict()["stages"]:
+            args = dict(record["args"])
+            args.update({"cpu_time": record["cpu_time"], "solver_time": record["solver_time"],
+                         "process_peak_rss": record["process_peak_rss"],
+                         "peak_rss_increase": record["peak_rss_increase"]})
+            events.append({"name": record["name"], "cat": record["category"], "ph": "X",
+                           "ts": record["start"] * 1e6, "dur": record["wall_time"] * 1e6,
+                           "pid": record["pid"], "tid": record["tid"], "args": args})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_chrome_trace(self, file_path: str):
+        """
+        Saves all records in the Chrome trace event format.
+
+        :param file_path: path of the trace file
+        :type file_path: str
+        """
+        with open(file_path, "w") as fd:
+            json.dump(self.chrome_trace(), fd, default=str)
+
+    def summary(self) -> str:
+        """
+        :return: table of the total times per stage name
+        :rtype: str
+        """
+        totals = {}
+        for record in self.to_dict()["stages"]:
+            total = totals.setdefault(record["name"], {"calls": 0, "wall_time": 0, "cpu_time": 0, "solver_time": 0})
+            total["calls"] += 1
+            total["wall_time"] += record["wall_time"]
+            total["cpu_time"] += record["cpu_time"]
+            total["solver_time"] += record["solver_time"] or 0
+
+        lines = [f"{'stage':<50} {'calls':>6} {'wall [s]':>10} {'cpu [s]':>10} {'solver [s]':>10}"]
+        for name, total in sorted(totals.items(), key=lambda item: -item[1]["wall_time"]):
+            lines.append(f"{name:<50} {total['calls']:>6} {total['wall_time']:>10.3f} {total['cpu_time']:>10.3f} "
+                         f"{total['solver_time']:>10.3f}")
+        return "\n".join(lines)
+
+
+# The profiler of this process, which is used by all instrumented stages
+profiler = Profiler()
+
+
+def timed_stage(name: Optional[str] = None, category: str = "femmt"):
+    """
+    Decorator, which records every call of a function as a stage of the profiler.
+
+    :param name: name of the stage, defaults to the qualified name of the function
+    :type name: str
+    :param category: category of the stage
+    :type category: str
+    """
+    def decorator(function):
+        stage_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not (profiler.enabled or profiler.quiet):
+                return function(*args, **kwargs)
+            with profiler.stage(stage_name, category):
+                return function(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def run_sub_client(onelab_client, name: str, arguments: List[str]):
+    """
+    Runs a solver (gmsh, GetDP) as sub client of onelab. In quiet mode (see Profiler), the solver is started
+    directly with its console output discarded, a failed solver run raises an exception.
+
+    :param onelab_client: onelab client
+    :param name: name of the sub client, e.g. "myGetDP"
+    :type name: str
+    :param arguments: command line of the solver, e.g. [getdp, solver_file, "-solve", "Analysis"]
+    :type arguments: List[str]
+    """
+    if profiler.quiet:
+        completed_process = subprocess.run(arguments, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if completed_process.returncode != 0:
+            raise Exception(f"{name} failed (exit code {completed_process.returncode}):\n"
+                            f"{completed_process.stderr[-2000:]}")
+    else:
+        onelab_client.runSubClient(name, " ".join(arguments))
+
+
+def mesh_statistics(gmsh_module) -> Dict[str, int]:
+    """
+    :param gmsh_module: gmsh module with the current model
+    :return: number of nodes and elements of the current mesh
+    :rtype: Dict[str, int]
+    """
+    node_tags = gmsh_module.model.mesh.getNodes()[0]
+    element_tags = gmsh_module.model.mesh.getElements()[1]
+    return {"nodes": int(len(node_tags)), "elements": int(sum(len(tags) for tags in element_tags))}
@@ -0,0 +1,489 @@
+import os
+import re
+import numpy as np
+import json
+import time
+from typing import List, Tuple, Dict, Optional
+from .femmt_profiling import timed_stage
+
+
+# Names of the sub folders of the values folder, which contain the turn losses of the windings
+winding_folder_names = ["Primary", "Secondary", "Tertiary"]
+
+
+# Quantities, which are not integrated over the model (not scaled for half models)
+solver_quantities = ["NL_Iterations"]
+
+# Data type of the result tables: one row per quantity, winding, turn and sweep step
+result_dtype = [("quantity", "U64"), ("winding", "i4"), ("turn", "i4"), ("step", "i4"), ("real", "f8"),
+                ("imag", "f8")]
+
+
+def value_files(values_folder_path: str) -> List[Tuple[str, int]]:
+    """
+    Returns all .dat files of the values folder and of the winding sub folders.
+
+    :param values_folder_path: path to the values folder of the electro magnetic results
+    :type values_folder_path: str
+    :return: list of (file path, winding number given by the sub folder or 0)
+    :rtype: List[Tuple[str, int]]
+    """
+    files = []
+    for file_name in sorted(os.listdir(values_folder_path)):
+        file_path = os.path.join(values_folder_path, file_name)
+        if os.path.isfile(file_path) and file_name.endswith(".dat"):
+            files.append((file_path, 0))
+        elif os.path.isdir(file_path) and file_name in winding_folder_names:
+            winding = winding_folder_names.index(file_name) + 1
+            for sub_file_name in sorted(os.listdir(file_path)):
+                if sub_file_name.endswith(".dat"):
+                    files.append((os.path.join(file_path, sub_file_name), winding))
+    return files
+
+
+def read_values_folder(values_folder_path: str, last_n: Optional[int] = None, first_step: Dict = None) -> np.ndarray:
+    """
+    Reads all .dat files of the values folder into one structured array (see result_dtype), sorted by quantity,
+    winding, turn and step.
+
+    :param values_folder_path: path to the values folder of the electro magnetic results
+    :type values_folder_path: str
+    :param last_n: number of lines to be read from the end of every file, None reads all lines
+    :type last_n: int
+    :param first_step: step number of the first line of a file, given per (quantity, winding, turn), defaults to 0
+    :type first_step: Dict
+    :return: result table
+    :rtype: np.ndarray
+    """
+    first_step = first_step or {}
+    rows = []
+    for file_path, winding_from_folder in value_files(values_folder_path):
+        quantity, winding, turn = ResultValues.parse_file_name(os.path.basename(file_path))
+        if winding_from_folder != 0:
+            winding = winding_from_folder
+        offset = first_step.get((quantity, winding, turn), 0)
+        for step, (real, imag) in enumerate(ResultValues.read_last_lines(file_path, last_n)):
+            rows.append((quantity, winding, turn, offset + step, real, imag))
+
+    records = np.array(rows, dtype=result_dtype)
+    records.sort(order=["quantity", "winding", "turn", "step"])
+    return records
+
+
+def index_records(records: np.ndarray) -> Dict[Tuple[str, int, int], Tuple[int, int]]:
+    """
+    Returns the (start, stop) rows of every (quantity, winding, turn) combination of a sorted result table.
+
+    :param records: sorted result table
+    :type records: np.ndarray
+    :return: index
+    :rtype: Dict[Tuple[str, int, int], Tuple[int, int]]
+    """
+    index = {}
+    for row_number, (quantity, winding, turn) in enumerate(zip(records["quantity"], records["winding"],
+                                                               records["turn"])):
+        key = (str(quantity), int(winding), int(turn))
+        start, _ = index.get(key, (row_number, row_number))
+        index[key] = (start, row_number + 1)
+    return index
+
+
+def mirror_half_model_records(records: np.ndarray, turn_maps: List[np.ndarray], factor: float = 2) -> np.ndarray:
+    """
+    Converts the results of a half model (see MagneticComponent.Mesh.detect_mirror_symmetry()) into the results of the
+    full component. Quantities, which are integrated over the model (losses, energies, flux linkages, inductances,
+    voltages), are multiplied with the factor. Every modeled turn is a complete turn, which represents itself and its
+    mirror image, so the turn results are copied to the turn numbers of the full component.
+
+    :param records: sorted result table of the half model
+    :type records: np.ndarray
+    :param turn_maps: index of the modeled turn for every turn of the full component, per winding
+    :type turn_maps: List[np.ndarray]
+    :param factor: ratio of the full to the modeled domain
+    :type factor: float
+    :return: sorted result table of the full component
+    :rtype: np.ndarray
+    """
+    is_turn_result = np.char.endswith(records["quantity"].astype(str), "_turn")
+    is_solver_result = np.isin(records["quantity"].astype(str), solver_quantities)
+    integrated = records[~is_turn_result].copy()
+    integrated["real"] = np.where(is_solver_result[~is_turn_result], 1, factor) * integrated["real"]
+    integrated["imag"] = np.where(is_solver_result[~is_turn_result], 1, factor) * integrated["imag"]
+
+    turn_results = records[is_turn_result]
+    mirrored = [integrated]
+    for winding, turn_map in enumerate(turn_maps, start=1):
+        for turn, model_turn in enumerate(turn_map, start=1):
+            rows = turn_results[(turn_results["winding"] == winding) & (turn_results["turn"] == model_turn + 1)].copy()
+            rows["turn"] = turn
+            mirrored.append(rows)
+
+    records = np.concatenate(mirrored)
+    records.sort(order=["quantity", "winding", "turn", "step"])
+    return records
+
+
+class ResultValues:
+    """
+    Scalar results (e.g. losses, flux linkages, inductances) of one simulation run, stored in a structured NumPy
+    array, which is indexed by quantity, winding, turn and sweep step. The names of the result files are mapped as
+    follows:
+
+    - "j2F_1.dat" -> quantity "j2F", winding 1, turn 0
+    - "L_22.dat" -> quantity "L", winding 2, turn 0
+    - "Secondary/Losses_turn_3.dat" -> quantity "Losses_turn", winding 2, turn 3
+    - "ME.dat" -> quantity "ME", winding 0, turn 0
+
+    :Example Code:
+
+    >>> values = ResultValues.from_folder(geo.e_m_values_folder_path, last_n=2)
+    >>> values.get("Losses_turn", winding=1, turn=3)  # losses of the third primary turn for both sweep steps
+    """
+
+    def __init__(self, records: np.ndarray, index: Dict = None, last_n: Optional[int] = None):
+        """
+        :param records: sorted result table, see read_values_folder()
+        :type records: np.ndarray
+        :param index: (start, stop) rows per (quantity, winding, turn), calculated if not given
+        :type index: Dict
+        :param last_n: only the last_n sweep steps of every quantity are returned by get(), None returns all steps
+        :type last_n: int
+        """
+        self.records = records
+        self.index = index_records(records) if index is None else index
+        self.last_n = last_n
+
+    @classmethod
+    def from_folder(cls, values_folder_path: str, last_n: Optional[int] = None):
+        """
+        Reads every .dat file of the values folder exactly once.
+
+        :param values_folder_path: path to the values folder of the electro magnetic results
+        :type values_folder_path: str
+        :param last_n: number of sweep steps to be loaded (the last lines of every file), None loads all lines
+        :type last_n: int
+        :return: ResultValues
+        """
+        return cls(read_values_folder(values_folder_path, last_n))
+
+    @staticmethod
+    def parse_file_name(file_name: str) -> Tuple[str, int, int]:
+        """
+        Splits the name of a result file into quantity, winding and turn.
+
+        :param file_name: file name, e.g. "Flux_Linkage_1.dat"
+        :type file_name: str
+        :return: quantity, winding (0 if not winding related), turn (0 if not turn related)
+        :rtype: Tuple[str, int, int]
+        """
+        name = file_name[:-len(".dat")] if file_name.endswith(".dat") else file_name
+
+        turn_match = re.fullmatch(r"(.+_turn)_(\d+)", name)
+        if turn_match:
+            return turn_match.group(1), 0, int(turn_match.group(2))
+
+        inductance_match = re.fullmatch(r"L_(\d)\1", name)
+        if inductance_match:
+            return "L", int(inductance_match.group(1)), 0
+
+        winding_match = re.fullmatch(r"(.+)_(\d)", name)
+        if winding_match:
+            return winding_match.group(1), int(winding_match.group(2)), 0
+
+        return name, 0, 0
+
+    @staticmethod
+    def parse_result_name(res_name: str) -> Tuple[str, int, int]:
+        """
+        Splits a result name as used by MagneticComponent.load_result() into quantity, winding and turn.
+
+        :param res_name: result name, e.g. "L_11" or "Primary/Losses_turn_2"
+        :type res_name: str
+        :return: quantity, winding (0 if not winding related), turn (0 if not turn related)
+        :rtype: Tuple[str, int, int]
+        """
+        folder, _, name = res_name.rpartition("/")
+        quantity, winding, turn = ResultValues.parse_file_name(name)
+        if folder in winding_folder_names:
+            winding = winding_folder_names.index(folder) + 1
+        return quantity, winding, turn
+
+    @staticmethod
+    def read_last_lines(file_path: str, last_n: Optional[int]) -> List[Tuple[float, float]]:
+        """
+        Reads real and imaginary part of the last_n lines of a GetDP result file.
+        Lines of the "TimeTable" and "Table" formats start with two columns, followed by the real and imaginary
+        part of the value.
+
+        :param file_path: path to the .dat file
+        :type file_path: str
+        :param last_n: number of lines to be read (from the end of the file), None reads all lines
+        :type last_n: int
+        :return: list of (real, imaginary) tuples
+        :rtype: List[Tuple[float, float]]
+        """
+        with open(file_path) as fd:
+            lines = fd.readlines()
+        if last_n is not None:
+            lines = lines[-last_n:]
+
+        values = []
+        for line in lines:
+            columns = line.split(sep=' ')
+            try:
+                real = float(columns[2])
+            except (IndexError, ValueError):
+                real = np.nan
+            try:
+                imag = float(columns[3])
+            except (IndexError, ValueError):
+                imag = np.nan
+            values.append((real, imag))
+        return values
+
+    def get(self, quantity: str, winding: int = 0, turn: int = 0, part: str = "real") -> np.ndarray:
+        """
+        Returns the values of one quantity for all loaded sweep steps.
+
+        :param quantity: name of the quantity, e.g. "j2F", "Losses_turn", "L", "ME"
+        :type quantity: str
+        :param winding: winding number (starting with 1), 0 for quantities which are not related to a winding
+        :type winding: int
+        :param turn: turn number (starting with 1), 0 for quantities which are not related to a turn
+        :type turn: int
+        :param part: "real" or "imaginary"
+        :type part: str
+        :return: values of the sweep steps
+        :rtype: np.ndarray
+        """
+        key = (quantity, winding, turn)
+        if key not in self.index:
+            raise Exception(f"No result for quantity {quantity} (winding {winding}, turn {turn}) found")
+        start, stop = self.index[key]
+        if self.last_n is not None:
+            start = max(start, stop - self.last_n)
+        if part == "real":
+            return np.asarray(self.records["real"][start:stop])
+        if part == "imaginary":
+            return np.asarray(self.records["imag"][start:stop])
+        raise ValueError(f"part must be 'real' or 'imaginary', not {part}")
+
+    def quantities(self) -> List[Tuple[str, int, int]]:
+        """
+        :return: all loaded (quantity, winding, turn) combinations
+        :rtype: List[Tuple[str, int, int]]
+        """
+        return list(self.index.keys())
+
+
+class ResultStore:
+    """
+    Stores the scalar results of every simulation run in a binary result table (NumPy .npy file) together with a
+    small index file (.json), keyed by a run id. After every GetDP run, the .dat files written by GetDP are imported
+    into the table of the current run and deleted, so the results of different runs are never mixed and the values
+    folder does not grow during large sweeps or optimizations.
+
+    The results of every GetDP run are appended to the run as a separate block file, so the import time does not grow
+    with the length of a sweep. The blocks are merged into the result table once, when the run is loaded or the next
+    run is started. The result tables are opened memory mapped, so single quantities are read without loading the
+    whole run.
+
+    :Example Code:
+
+    >>> store = ResultStore(geo.e_m_result_store_folder_path)
+    >>> values = store.load_run()  # latest run
+    >>> values.get("L", winding=1)
+    """
+
+    def __init__(self, store_folder_path: str, max_runs: Optional[int] = None):
+        """
+        :param store_folder_path: folder of the result tables
+        :type store_folder_path: str
+        :param max_runs: maximum number of runs kept in the store, the oldest runs are deleted. None keeps all runs.
+        :type max_runs: int
+        """
+        self.store_folder_path = store_folder_path
+        self.max_runs = max_runs
+        self.step_counts = {}  # Number of imported steps per (quantity, winding, turn) of every run with blocks
+        os.makedirs(self.store_folder_path, exist_ok=True)
+
+    def table_path(self, run_id: str) -> str:
+        return os.path.join(self.store_folder_path, f"{run_id}.npy")
+
+    def block_paths(self, run_id: str) -> List[str]:
+        """
+        :return: paths of the not yet merged blocks of a run, in the order of their import
+        :rtype: List[str]
+        """
+        return [os.path.join(self.store_folder_path, file_name)
+                for file_name in sorted(os.listdir(self.store_folder_path))
+                if file_name.startswith(f"{run_id}_") and file_name.endswith(".block.npy")]
+
+    def index_path(self, run_id: str) -> str:
+        return os.path.join(self.store_folder_path, f"{run_id}.json")
+
+    def run_ids(self) -> List[str]:
+        """
+        :return: ids of all stored runs, the oldest run first
+        :rtype: List[str]
+        """
+        return sorted(file_name[:-len(".json")] for file_name in os.listdir(self.store_folder_path)
+                      if file_name.endswith(".json"))
+
+    def new_run(self) -> str:
+        """
+        Creates a new (empty) run. Runs are numbered consecutively.
+
+        :return: run id
+        :rtype: str
+        """
+        run_ids = self.run_ids()
+        if run_ids:
+            # The previous run is complete
+            self.consolidate(run_ids[-1])
+        run_number = int(run_ids[-1]) + 1 if run_ids else 1
+        run_id = f"{run_number:06d}"
+        self.write_run(run_id, np.array([], dtype=result_dtype))
+
+        if self.max_runs is not None:
+            for old_run_id in self.run_ids()[:-self.max_runs]:
+                self.delete_run(old_run_id)
+
+        return run_id
+
+    def write_run(self, run_id: str, records: np.ndarray):
+        """
+        Writes the result table and its index. The index is written last, so a run is only listed if its table is
+        complete.
+
+        :param run_id: run id
+        :type run_id: str
+        :param records: sorted result table
+        :type records: np.ndarray
+        """
+        np.save(self.table_path(run_id), records)
+        index = [[quantity, winding, turn, start, stop]
+                 for (quantity, winding, turn), (start, stop) in index_records(records).items()]
+        with open(self.index_path(run_id), "w") as fd:
+            json.dump({"run_id": run_id, "time": time.time(), "index": index}, fd)
+
+    @timed_stage(category="io")
+    def import_values(self, run_id: str, values_folder_path: str, delete_files: bool = True,
+                      half_model_turns: Optional[List[np.ndarray]] = None):
+        """
+        Appends the content of all .dat files of the values folder to the run as a new block. The lines of the files
+        are added as further sweep steps of the run.
+
+        :param run_id: run id
+        :type run_id: str
+        :param values_folder_path: path to the values folder of the electro magnetic results
+        :type values_folder_path: str
+        :param delete_files: deletes the imported .dat files
+        :type delete_files: bool
+        :param half_model_turns: turn maps of all windings, if the results belong to a half model. The results are
+            stored as results of the full component, see mirror_half_model_records().
+        :type half_model_turns: List[np.ndarray]
+        """
+        if run_id not in self.step_counts:
+            # Steps of the run, which were imported before (e.g. by another ResultStore instance)
+            stored = self.read_run(run_id)
+            self.step_counts[run_id] = {key: stop - start for key, (start, stop) in index_records(stored).items()}
+        step_counts = self.step_counts[run_id]
+
+        imported = read_values_folder(values_folder_path, first_step=step_counts)
+        if half_model_turns is not None:
+            imported = mirror_half_model_records(imported, half_model_turns)
+        for key, (start, stop) in index_records(imported).items():
+            step_counts[key] = step_counts.get(key, 0) + stop - start
+
+        block_paths = self.block_paths(run_id)
+        block_number = int(os.path.basename(block_paths[-1]).split("_")[-1].split(".")[0]) + 1 if block_paths else 0
+        np.save(os.path.join(self.store_folder_path, f"{run_id}_{block_number:06d}.block.npy"), imported)
+
+        if delete_files:
+            for file_path, _ in value_files(values_folder_path):
+                os.remove(file_path)
+
+    def reorder_steps(self, run_id: str, order: List[int], first_step: int = 0):
+        """
+        Renumbers the sweep steps of a run, which were solved in a different order than the sweep steps (e.g. for
+        a continuation of nonlinear solves).
+
+        :param run_id: run id
+        :type run_id: str
+        :param order: sweep step of every solved step: the k-th solved step is stored as step first_step + order[k]
+        :type order: List[int]
+        :param first_step: number of the first solved step in the run
+        :type first_step: int
+        """
+        self.consolidate(run_id)
+        records = np.load(self.table_path(run_id))
+        order = np.asarray(order, dtype=int)
+        solved = (records["step"] >= first_step) & (records["step"] < first_step + len(order))
+        records["step"][solved] = first_step + order[records["step"][solved] - first_step]
+        records.sort(order=["quantity", "winding", "turn", "step"])
+        self.write_run(run_id, records)
+
+    def read_run(self, run_id: str) -> np.ndarray:
+        """
+        :return: all records of a run (result table and not yet merged blocks), not sorted
+        :rtype: np.ndarray
+        """
+        tables = [np.load(path) for path in [self.table_path(run_id)] + self.block_paths(run_id)
+                  if os.path.isfile(path)]
+        return np.concatenate(tables) if tables else np.array([], dtype=result_dtype)
+
+    def consolidate(self, run_id: str):
+        """
+        Merges the blocks of a run into its result table.
+
+        :param run_id: run id
+        :type run_id: str
+        """
+        block_paths = self.block_paths(run_id)
+        if not block_paths:
+            return
+        records = self.read_run(run_id)
+        records.sort(order=["quantity", "winding", "turn", "step"])
+        self.write_run(run_id, records)
+        for path in block_paths:
+            os.remove(path)
+
+    def load_run(self, run_id: Optional[str] = None, last_n: Optional[int] = None) -> ResultValues:
+        """
+        Loads the results of a run. The result table is memory mapped.
+
+        :param run_id: run id, defaults to the latest run
+        :type run_id: str
+        :param last_n: only the last_n sweep steps of every quantity are returned, None returns all steps
+        :type last_n: int
+        :return: results of the run
+        :rtype: ResultValues
+        """
+        if run_id is None:
+            run_ids = self.run_ids()
+            if not run_ids:
+                raise Exception(f"No results stored in {self.store_folder_path}")
+            run_id = run_ids[-1]
+        if not os.path.isfile(self.index_path(run_id)):
+            raise Exception(f"Run {run_id} not found in {self.store_folder_path}")
+        self.consolidate(run_id)
+
+        with open(self.index_path(run_id)) as fd:
+            index = {(quantity, winding, turn): (start, stop)
+                     for quantity, winding, turn, start, stop in json.load(fd)["index"]}
+        records = np.load(self.table_path(run_id), mmap_mode="r") if index else np.array([], dtype=result_dtype)
+
+        return ResultValues(records, index=index, last_n=last_n)
+
+    def delete_run(self, run_id: str):
+        """
+        Deletes the result table of a run.
+
+        :param run_id: run id
+        :type run_id: str
+        """
+        for path in [self.index_path(run_id), self.table_path(run_id)] + self.block_paths(run_id):
+            if os.path.isfile(path):
+                os.remove(path)
+        self.step_counts.pop(run_id, None)
@@ -0,0 +1,391 @@
+import numpy as np
+from typing import List, Dict, Union, Tuple, Optional
+
+from .femmt_functions import mu0, r_basis, sigma, r_round_inf, wire_material_database
+from .femmt_batch import run_batch
+from .femmt_feasibility import check_design
+
+# Fraction of the designs, which are escalated to FEM, if no limit is given
+default_fem_fraction = 0.1
+
+
+def skin_depth(frequency: Union[float, np.ndarray], conductivity: float) -> Union[float, np.ndarray]:
+    """
+    :param frequency: frequency in Hz
+    :param conductivity: electrical conductivity in S/m
+    :type conductivity: float
+    :return: skin depth in m (inf for DC)
+    """
+    frequency = np.asarray(frequency, dtype=float)
+    with np.errstate(divide="ignore"):
+        return np.where(frequency > 0, np.sqrt(1 / (np.pi * frequency * mu0 * conductivity)), np.inf)
+
+
+def dowell_factor(frequency: Union[float, np.ndarray], conductor_height: float, conductivity: float,
+                  layers: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    AC resistance factor F_R = R_ac / R_dc of a winding with m layers according to Dowell.
+    Round conductors are described by the equivalent square conductor height h = sqrt(pi) / 2 * d.
+
+    :param frequency: frequency in Hz
+    :param conductor_height: (equivalent) conductor height in m
+    :type conductor_height: float
+    :param conductivity: electrical conductivity in S/m
+    :type conductivity: float
+    :param layers: number of layers m
+    :return: F_R
+    """
+    delta = conductor_height / skin_depth(frequency, conductivity)
+    layers = np.asarray(layers, dtype=float)
+
+    with np.errstate(all="ignore"):
+        skin = delta * (np.sinh(2 * delta) + np.sin(2 * delta)) / (np.cosh(2 * delta) - np.cos(2 * delta))
+        proximity = delta * 2 * (layers ** 2 - 1) / 3 * (np.sinh(delta) - np.sin(delta)) / \
+            (np.cosh(delta) + np.cos(delta))
+        factor = skin + proximity
+
+    # DC and numerically critical small delta: F_R = 1; large delta: asymptotic form
+    factor = np.where(delta < 1e-3, 1, factor)
+    factor = np.where(delta > 20, delta * (1 + 2 * (layers ** 2 - 1) / 3), factor)
+    return factor
+
+
+def core_dimensions(core: Dict) -> Dict:
+    """
+    Returns areas, magnetic path length and volumes of the axi-symmetric core, see TwoDaxiSymmetric.draw_outer().
+
+    :param core: core parameters as given to core.update() ("core_w", "window_w", "window_h", optional "core_h")
+    :type core: Dict
+    :return: dictionary with "A_core", "r_inner", "r_outer", "height", "l_core", "core_volume" and "volume"
+    :rtype: Dict
+    """
+    r_inner = core["core_w"] / 2
+    r_window = r_inner + core["window_w"]
+    # Outer leg has the same cross section as the inner leg
+    r_outer = np.sqrt(r_window ** 2 + r_inner ** 2)
+    height = core.get("core_h") or core["window_h"] + core["core_w"] / 2
+    A_core = np.pi * r_inner ** 2
+
+    volume = np.pi * r_outer ** 2 * height
+    core_volume = volume - np.pi * (r_window ** 2 - r_inner ** 2) * core["window_h"]
+    l_core = 2 * core["window_h"] + 2 * (core["window_w"] + core["core_w"] / 2)
+
+    return {"A_core": A_core, "r_inner": r_inner, "r_outer": r_outer, "height": height, "l_core": l_core,
+            "core_volume": core_volume, "volume": volume}
+
+
+def magnetic_reluctance(design: Dict) -> float:
+    """
+    Reluctance of the core including the fringing corrected air gap reluctances
+    (see ReluctanceModel.calculate_air_gap_lengths_with_sct()).
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :return: reluctance in 1/H
+    :rtype: float
+    """
+    core = design["core"]
+    dimensions = core_dimensions(core)
+    R_core = dimensions["l_core"] / (mu0 * core.get("mu_rel", 3000) * dimensions["A_core"])
+
+    R_air_gaps = 0
+    for air_gap_length in design["air_gaps"].get("air_gap_h", []):
+        R_air_gaps += r_round_inf(air_gap_length=air_gap_length,
+                                  sigma=sigma(air_gap_length, core["core_w"] / 2,
+                                              r_basis(air_gap_length, core["core_w"],
+                                                      (core["window_h"] - air_gap_length) / 2)),
+                                  air_gap_radius=core["core_w"] / 2)
+
+    return R_core + R_air_gaps
+
+
+def winding_resistances(design: Dict, frequencies: np.ndarray) -> np.ndarray:
+    """
+    AC resistances of all windings for the given frequencies. Solid conductors use Dowell's formula with the
+    number of turn layers, litz wires use Dowell's formula on strand level with the number of strand layers.
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :param frequencies: frequencies in Hz
+    :type frequencies: np.ndarray
+    :return: resistances in Ohm, shape (n_windings, n_frequencies)
+    :rtype: np.ndarray
+    """
+    core = design["core"]
+    conductors = design["conductors"]
+    materials = wire_material_database()
+
+    mean_turn_length = 2 * np.pi * (core["core_w"] / 2 + core["window_w"] / 2)
+    n_windings = len(conductors["n_turns"])
+    cond_cond_isolation = conductors.get("cond_cond_isolation", [0] * n_windings)
+
+    resistances = []
+    for num in range(0, n_windings):
+        n_turns = sum(conductors["n_turns"][num])
+        conductor_radius = conductors["conductor_radii"][num]
+        conductivity = conductors.get("conductivity_sigma", ["copper"] * n_windings)[num]
+        conductivity = materials[conductivity]["sigma"] if conductivity in materials else conductivity
+
+        # Turn layers, if the turns are wound in layers parallel to the window height
+        turns_per_layer = max(1, int(core["window_h"] / (2 * conductor_radius + cond_cond_isolation[num])))
+        turn_layers = np.ceil(n_turns / turns_per_layer)
+
+        if conductors["conductor_type"][num] == "litz":
+            n_strands = conductors["strands_numbers"][num]
+            strand_radius = conductors["strand_radii"][num]
+            conductor_area = n_strands * np.pi * strand_radius ** 2
+            height = np.sqrt(np.pi) * strand_radius
+            layers = turn_layers * np.sqrt(n_strands)
+        else:
+            conductor_area = np.pi * conductor_radius ** 2
+            height = np.sqrt(np.pi) * conductor_radius
+            layers = turn_layers
+
+        R_dc = n_turns * mean_turn_length / (conductivity * conductor_area)
+        resistances.append(R_dc * dowell_factor(frequencies, height, conductivity, layers))
+
+    return np.array(resistances)
+
+
+def analytical_estimate(design: Dict, steinmetz: Tuple[float, float, float] = (1, 1.2, 2.2)) -> Dict:
+    """
+    Fast analytical estimation of a design without FEM:
+
+    - inductance (seen from the first winding) of the reluctance model with fringing corrected air gaps
+    - winding losses with Dowell's formula (litz wires on strand level)
+    - core losses with the Steinmetz equation (sinusoidal flux of every sweep step)
+    - core volume and volume of the component
+
+    :param design: design dictionary, see run_batch()
+    :type design: Dict
+    :param steinmetz: Steinmetz parameters (k, alpha, beta) of p = k * f^alpha * B^beta in W/m^3
+        (defaults as in get_steinmetz_loss())
+    :type steinmetz: Tuple[float, float, float]
+    :return: dictionary with "inductance", "winding_losses", "core_losses", "total_losses", "core_volume" and
+        "volume"
+    :rtype: Dict
+    """
+    k, alpha, beta = steinmetz
+    dimensions = core_dimensions(design["core"])
+    reluctance = magnetic_reluctance(design)
+    n_turns = np.array([sum(turns) for turns in design["conductors"]["n_turns"]])
+
+    frequencies = np.asarray(design["frequency_list"], dtype=float)
+    currents = np.asarray(design["current_list_list"], dtype=float)
+    phases = design.get("phi_deg_list_list")
+    phases = np.zeros_like(currents) if phases is None else np.deg2rad(np.asarray(phases, dtype=float))
+
+    # Winding losses of all sweep steps (peak current amplitudes)
+    resistances = winding_resistances(design, frequencies)
+    winding_losses = np.sum(0.5 * currents ** 2 * resistances.T)
+
+    # Core losses with the flux of the magneto motive force of all windings
+    mmf = np.abs(np.sum(n_turns * currents * np.exp(1j * phases), axis=1))
+    b_peak = mmf / reluctance / dimensions["A_core"]
+    core_losses = np.sum(np.where(frequencies > 0, k * frequencies ** alpha * b_peak ** beta, 0)) * \
+        dimensions["core_volume"]
+
+    return {"inductance": float(n_turns[0] ** 2 / reluctance),
+            "winding_losses": float(winding_losses),
+            "core_losses": float(core_losses),
+            "total_losses": float(winding_losses + core_losses),
+            "core_volume": float(dimensions["core_volume"]),
+            "volume": float(dimensions["volume"])}
+
+
+def pareto_ranks(objectives: np.ndarray, max_rank: int = None, chunk_size: int = 256) -> np.ndarray:
+    """
+    Non-dominated sorting of candidates (all objectives are minimized). Rank 0 is the Pareto front, rank 1 the
+    front after removing rank 0, and so on.
+
+    :param objectives: objective values, shape (n_candidates, n_objectives)
+    :type objectives: np.ndarray
+    :param max_rank: stop sorting after this rank, all remaining candidates get the rank max_rank + 1
+    :type max_rank: int
+    :param chunk_size: number of candidates compared at once (limits the memory usage)
+    :type chunk_size: int
+    :return: rank of every candidate
+    :rtype: np.ndarray
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n_candidates = len(objectives)
+    ranks = np.full(n_candidates, -1)
+    remaining = np.arange(0, n_candidates)
+
+    rank = 0
+    while len(remaining) > 0 and (max_rank is None or rank <= max_rank):
+        remaining_objectives = objectives[remaining]
+        dominated = np.zeros(len(remaining), dtype=bool)
+        for start in range(0, len(remaining), chunk_size):
+            candidates = remaining_objectives[start:start + chunk_size, None, :]
+            others = remaining_objectives[None, :, :]
+            dominated[start:start + chunk_size] = np.any(np.all(others <= candidates, axis=2) &
+                                                         np.any(others < candidates, axis=2), axis=1)
+        ranks[remaining[~dominated]] = rank
+        remaining = remaining[dominated]
+        rank += 1
+
+    ranks[remaining] = rank
+    return ranks
+
+
+def fem_budget(n_candidates: int, max_designs: Optional[int] = None, fraction: Optional[float] = None) -> int:
+    """
+    Number of candidates, which are escalated to FEM. If both limits are given, the smaller one is used. If none is
+    given, default_fem_fraction of the candidates are escalated.
+
+    :param n_candidates: number of candidates
+    :type n_candidates: int
+    :param max_designs: maximum number of FEM simulations
+    :type max_designs: int
+    :param fraction: maximum fraction of the candidates in (0, 1]
+    :type fraction: float
+    :return: number of FEM simulations
+    :rtype: int
+    """
+    if max_designs is not None and (isinstance(max_designs, bool) or not isinstance(max_designs, (int, np.integer))
+                                    or max_designs < 0):
+        raise ValueError(f"max_designs must be a non-negative integer, not {max_designs!r}.")
+    if fraction is not None and (isinstance(fraction, bool) or not isinstance(fraction, (int, float, np.number))
+                                 or not 0 < fraction <= 1):
+        raise ValueError(f"fraction must be a number in (0, 1], not {fraction!r}.")
+    if max_designs is None and fraction is None:
+        fraction = default_fem_fraction
+
+    budget = n_candidates
+    if max_designs is not None:
+        budget = min(budget, int(max_designs))
+    if fraction is not None:
+        budget = min(budget, int(np.ceil(fraction * n_candidates)))
+    return budget
+
+
+def select_for_fem(objectives: np.ndarray, max_designs: Optional[int] = None,
+                   fraction: Optional[float] = None) -> np.ndarray:
+    """
+    Selects the candidates, which are escalated to FEM: whole Pareto fronts (by rank) until the budget is reached.
+    The last front is filled by the sum of the objectives normalized to their minimum.
+
+    :param objectives: objective values, shape (n_candidates, n_objectives)
+    :type objectives: np.ndarray
+    :param max_designs: maximum number of FEM simulations, see fem_budget()
+    :type max_designs: int
+    :param fraction: maximum fraction of the candidates in (0, 1], see fem_budget()
+    :type fraction: float
+    :return: indices of the selected candidates, best first
+    :rtype: np.ndarray
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    n_candidates = len(objectives)
+    budget = fem_budget(n_candidates, max_designs, fraction)
+    if budget <= 0:
+        return np.array([], dtype=int)
+
+    ranks = pareto_ranks(objectives, max_rank=budget)
+    minimum = np.min(np.abs(objectives), axis=0)
+    normalized_sum = np.sum(objectives / np.where(minimum > 0, minimum, 1), axis=1)
+
+    order = np.lexsort((normalized_sum, ranks))
+    return order[:budget]
+
+
+def screen_designs(designs: List[Dict], max_designs: Optional[int] = None, fraction: Optional[float] = None,
+                   objectives: Tuple[str, ...] = ("winding_losses", "core_losses", "volume"),
+                   steinmetz: Tuple[float, float, float] = (1, 1.2, 2.2),
+                   inductance_goal: float = None) -> Tuple[np.ndarray, List[Dict]]:
+    """
+    Estimates all designs analytically (see analytical_estimate()) and selects the Pareto relevant ones for FEM.
+
+    :param designs: list of design dictionaries, see run_batch()
+    :type designs: List[Dict]
+    :param max_designs: maximum number of FEM simulations, see fem_budget()
+    :type max_designs: int
+    :param fraction: maximum fraction of the designs in (0, 1], see fem_budget()
+    :type fraction: float
+    :param objectives: keys of the estimates, which are minimized
+    :type objectives: Tuple[str, ...]
+    :param steinmetz: Steinmetz parameters (k, alpha, beta)
+    :type steinmetz: Tuple[float, float, float]
+    :param inductance_goal: if given, the relative inductance deviation "inductance_error" is an additional
+        objective
+    :type inductance_goal: float
+    :return: indices of the selected designs (best first), estimates of all designs
+    :rtype: Tuple[np.ndarray, List[Dict]]
+    """
+    estimates = [analytical_estimate(design, steinmetz) for design in designs]
+    objectives = list(objectives)
+    if inductance_goal is not None:
+        for estimate in estimates:
+            estimate["inductance_error"] = abs(estimate["inductance"] - inductance_goal) / inductance_goal
+        objectives.append("inductance_error")
+
+    objective_values = np.array([[estimate[key] for key in objectives] for estimate in estimates])
+    return select_for_fem(objective_values, max_designs, fraction), estimates
+
+
+def run_screened_batch(designs: List[Dict], max_designs: Optional[int] = None, fraction: Optional[float] = None,
+                       objectives: Tuple[str, ...] = ("winding_losses", "core_losses", "volume"),
+                       steinmetz: Tuple[float, float, float] = (1, 1.2, 2.2), inductance_goal: float = None,
+                       **kwargs) -> List[Dict]:
+    """
+    Analytical pre-screening of all designs, only the Pareto relevant designs (limited by max_designs and fraction)
+    are simulated with FEM by run_batch().
+
+    :Example Code:
+
+    >>> import femmt as fmt
+    >>> results = fmt.run_screened_batch(designs, max_designs=20, inductance_goal=100e-6, workers=4)
+    >>> fem_results = [result for result in results if result["status"] == "success"]
+
+    :param designs: list of design dictionaries, see run_batch()
+    :type designs: List[Dict]
+    :param max_designs: maximum number of FEM simulations, see fem_budget()
+    :type max_designs: int
+    :param fraction: maximum fraction of the designs in (0, 1], see fem_budget()
+    :type fraction: float
+    :param objectives: keys of the analytical estimates, which are minimized
+    :type objectives: Tuple[str, ...]
+    :param steinmetz: Steinmetz parameters (k, alpha, beta)
+    :type steinmetz: Tuple[float, float, float]
+    :param inductance_goal: inductance goal in H, adds the inductance deviation as objective
+    :type inductance_goal: float
+    :param kwargs: keyword arguments of run_batch() (workers, working_directory, onelab_folder_path)
+    :return: one result dictionary per design (same order as designs). Designs, which were not escalated to FEM,
+        have the status "screened out", geometrically infeasible designs (see check_design()) the status
+        "infeasible". Every feasible result contains the analytical "estimate".
+    :rtype: List[Dict]
+    """
+    results = [{"name": design.get("name", f"job_{index}"), "status": "screened out", "error": None,
+                "traceback": None, "working_directory": None, "log": None}
+               for index, design in enumerate(designs)]
+
+    # Infeasible designs are neither estimated nor simulated
+    feasible_indices = []
+    for index, design in enumerate(designs):
+        violations = check_design(design)
+        if violations:
+            results[index].update({"status": "infeasible", "error": " ".join(violations)})
+        else:
+            feasible_indices.append(index)
+
+    selected, estimates = screen_designs([designs[index] for index in feasible_indices], max_designs, fraction,
+                                         objectives, steinmetz, inductance_goal)
+    selected = [feasible_indices[index] for index in selected]
+
+    print(f"\n"
+          f"--- ---\n"
+          f"Analytical pre-screening\n\n"
+          f"Number of designs          : {len(designs)}\n"
+          f"Infeasible designs         : {len(designs) - len(feasible_indices)}\n"
+          f"Escalated to FEM simulation: {len(selected)}\n")
+
+    if len(selected) > 0:
+        kwargs["check_feasibility"] = False
+        fem_results = run_batch([dict(designs[index], name=results[index]["name"]) for index in selected], **kwargs)
+        for index, fem_result in zip(selected, fem_results):
+            results[index] = fem_result
+
+    for index, estimate in zip(feasible_indices, estimates):
+        results[index]["estimate"] = estimate
+
+    return results
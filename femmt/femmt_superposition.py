@@ -0,0 +1,252 @@
+import numpy as np
+from typing import Dict, List, Tuple
+
+# Results of the electro magnetic simulation, which are quadratic in the winding currents (losses, energies) and which
+# are linear in the winding currents (complex phasors)
+quadratic_quantities = ["j2F", "j2H", "Losses_turn", "CoreEddyCurrentLosses", "p_hyst", "ME"]
+linear_quantities = ["Flux_Linkage", "Voltage"]
+
+
+def superposition_basis(n_windings: int) -> np.ndarray:
+    """
+    Returns the current phasors of the basis excitations, which are needed to identify all quadratic and linear results
+    of a linear problem: one excitation per winding with unit current and, for every pair of windings, the excitations
+    e_i + e_j and e_i + j*e_j, which determine the real and imaginary part of the coupling terms.
+
+    :param n_windings: number of windings
+    :type n_windings: int
+    :return: current phasors with the shape (n_windings ** 2, n_windings)
+    :rtype: np.ndarray
+    """
+    basis = [np.eye(n_windings, dtype=complex)]
+    for i in range(0, n_windings):
+        for j in range(i + 1, n_windings):
+            for coupling in [1, 1j]:
+                excitation = np.zeros(n_windings, dtype=complex)
+                excitation[i] = 1
+                excitation[j] = coupling
+                basis.append(excitation[np.newaxis])
+    return np.concatenate(basis)
+
+
+def currents_from_amplitudes(amplitudes, phases_deg=None) -> np.ndarray:
+    """
+    :param amplitudes: current amplitudes with the shape (..., n_windings)
+    :param phases_deg: phases in degree with the same shape, defaults to zero
+    :return: current phasors
+    :rtype: np.ndarray
+    """
+    amplitudes = np.asarray(amplitudes, dtype=float)
+    if phases_deg is None:
+        return amplitudes.astype(complex)
+    return amplitudes * np.exp(1j * np.deg2rad(np.asarray(phases_deg, dtype=float)))
+
+
+def quadratic_design_matrix(currents: np.ndarray) -> np.ndarray:
+    """
+    Design matrix of the real parameters of a hermitian matrix A, so that design_matrix @ parameters = I^H A I for
+    every current phasor vector I. The parameters are the diagonal of A, followed by the real parts and the imaginary
+    parts of the upper triangle of A.
+
+    :param currents: current phasors with the shape (n_excitations, n_windings)
+    :type currents: np.ndarray
+    :return: design matrix with the shape (n_excitations, n_windings ** 2)
+    :rtype: np.ndarray
+    """
+    n_windings = currents.shape[1]
+    upper_i, upper_j = np.triu_indices(n_windings, k=1)
+    products = np.conj(currents[:, upper_i]) * currents[:, upper_j]
+    return np.concatenate([np.abs(currents) ** 2, 2 * products.real, -2 * products.imag], axis=1)
+
+
+def hermitian_from_parameters(parameters: np.ndarray, n_windings: int) -> np.ndarray:
+    """
+    Inverse of the parametrization used by quadratic_design_matrix().
+
+    :param parameters: parameters with the shape (..., n_windings ** 2)
+    :type parameters: np.ndarray
+    :param n_windings: number of windings
+    :type n_windings: int
+    :return: hermitian matrices with the shape (..., n_windings, n_windings)
+    :rtype: np.ndarray
+    """
+    upper_i, upper_j = np.triu_indices(n_windings, k=1)
+    n_upper = len(upper_i)
+    matrix = np.zeros(parameters.shape[:-1] + (n_windings, n_windings), dtype=complex)
+    diagonal = np.arange(n_windings)
+    matrix[..., diagonal, diagonal] = parameters[..., :n_windings]
+    upper = parameters[..., n_windings:n_windings + n_upper] + 1j * parameters[..., n_windings + n_upper:]
+    matrix[..., upper_i, upper_j] = upper
+    matrix[..., upper_j, upper_i] = np.conj(upper)
+    return matrix
+
+
+class SuperpositionModel:
+    """
+    Results of a linear magnetic component (linear core material) for arbitrary winding currents.
+
+    As the field problem is linear in the winding currents, all losses and energies are hermitian quadratic forms
+    P = Re(I^H A I) of the current phasors I and all flux linkages and voltages are linear functions c^T I. The matrices
+    A and vectors c are identified per frequency from a few FEM solves (see MagneticComponent.superposition_model()),
+    afterwards any number of operating points can be evaluated with NumPy.
+
+    Results are identified by the same (quantity, winding, turn) keys as in the result store (see ResultValues).
+
+    :Example Code:
+
+    >>> model = geo.superposition_model(frequency_list=[200000])
+    >>> results = model.evaluate(200000, amplitudes=[[4, 14.5], [3, 11.2]], phases_deg=[[0, 176], [0, 172]])
+    >>> results[("j2F", 1, 0)]
+    """
+
+    def __init__(self, frequencies: List[float], quadratic: Dict[Tuple[str, int, int], np.ndarray],
+                 linear: Dict[Tuple[str, int, int], np.ndarray]):
+        """
+        :param frequencies: simulated frequencies
+        :type frequencies: List[float]
+        :param quadratic: hermitian matrices with the shape (n_frequencies, n_windings, n_windings) per result
+        :type quadratic: Dict[Tuple[str, int, int], np.ndarray]
+        :param linear: coefficient vectors with the shape (n_frequencies, n_windings) per result
+        :type linear: Dict[Tuple[str, int, int], np.ndarray]
+        """
+        self.frequencies = np.asarray(frequencies, dtype=float)
+        self.quadratic = quadratic
+        self.linear = linear
+
+    @classmethod
+    def from_samples(cls, frequencies: List[float], currents: np.ndarray,
+                     quadratic_samples: Dict[Tuple[str, int, int], np.ndarray],
+                     linear_samples: Dict[Tuple[str, int, int], np.ndarray]) -> "SuperpositionModel":
+        """
+        Identifies the model from simulated excitations by a least squares fit. With the excitations of
+        superposition_basis() the fit is exact.
+
+        :param frequencies: simulated frequencies
+        :type frequencies: List[float]
+        :param currents: current phasors of the simulated excitations with the shape (n_excitations, n_windings)
+        :type currents: np.ndarray
+        :param quadratic_samples: real results with the shape (n_frequencies, n_excitations)
+        :type quadratic_samples: Dict[Tuple[str, int, int], np.ndarray]
+        :param linear_samples: complex results with the shape (n_frequencies, n_excitations)
+        :type linear_samples: Dict[Tuple[str, int, int], np.ndarray]
+        :return: model
+        :rtype: SuperpositionModel
+        """
+        currents = np.asarray(currents, dtype=complex)
+        n_windings = currents.shape[1]
+        if currents.shape[0] < n_windings ** 2:
+            raise Exception(f"At least {n_windings ** 2} excitations are needed to identify the model of "
+                            f"{n_windings} windings, {currents.shape[0]} are given.")
+
+        quadratic_pinv = np.linalg.pinv(quadratic_design_matrix(currents))
+        linear_pinv = np.linalg.pinv(currents)
+
+        quadratic = {key: hermitian_from_parameters(np.asarray(samples, dtype=float) @ quadratic_pinv.T, n_windings)
+                     for key, samples in quadratic_samples.items()}
+        linear = {key: np.asarray(samples, dtype=complex) @ linear_pinv.T for key, samples in linear_samples.items()}
+        return cls(frequencies, quadratic, linear)
+
+    def frequency_index(self, frequency: float) -> int:
+        index = np.flatnonzero(np.isclose(self.frequencies, frequency))
+        if len(index) == 0:
+            raise Exception(f"The frequency {frequency} Hz is not part of the superposition model "
+                            f"({self.frequencies.tolist()}).")
+        return int(index[0])
+
+    def evaluate(self, frequency: float, amplitudes, phases_deg=None) -> Dict[Tuple[str, int, int], np.ndarray]:
+        """
+        Evaluates all results for many operating points at once.
+
+        :param frequency: frequency (must be part of the model)
+        :type frequency: float
+        :param amplitudes: current amplitudes with the shape (n_operating_points, n_windings)
+        :param phases_deg: current phases in degree with the same shape, defaults to zero
+        :return: real results (losses, energies) and complex results (flux linkages, voltages) with the shape
+            (n_operating_points,)
+        :rtype: Dict[Tuple[str, int, int], np.ndarray]
+        """
+        f = self.frequency_index(frequency)
+        currents = np.atleast_2d(currents_from_amplitudes(amplitudes, phases_deg))
+
+        results = {}
+        for key, matrix in self.quadratic.items():
+            results[key] = np.einsum("ma,ab,mb->m", np.conj(currents), matrix[f], currents).real
+        for key, coefficients in self.linear.items():
+            results[key] = currents @ coefficients[f]
+        return results
+
+    def losses(self, frequency: float, amplitudes, phases_deg=None) -> Dict[str, np.ndarray]:
+        """
+        Sums up the losses of many operating points at once.
+
+        :param frequency: frequency (must be part of the model)
+        :type frequency: float
+        :param amplitudes: current amplitudes with the shape (n_operating_points, n_windings)
+        :param phases_deg: current phases in degree with the same shape, defaults to zero
+        :return: "winding{n}" (losses of every winding), "all_windings", "eddy_core", "hyst_core", "core", "total"
+        :rtype: Dict[str, np.ndarray]
+        """
+        results = self.evaluate(frequency, amplitudes, phases_deg)
+        n_operating_points = np.atleast_2d(np.asarray(amplitudes)).shape[0]
+        zeros = np.zeros(n_operating_points)
+
+        losses = {}
+        windings = sorted({winding for quantity, winding, _ in results if quantity in ["j2F", "j2H"]})
+        for winding in windings:
+            losses[f"winding{winding}"] = results.get(("j2H", winding, 0), results.get(("j2F", winding, 0), zeros))
+        losses["all_windings"] = sum([losses[f"winding{winding}"] for winding in windings], zeros)
+        losses["eddy_core"] = results.get(("CoreEddyCurrentLosses", 0, 0), zeros)
+        losses["hyst_core"] = results.get(("p_hyst", 0, 0), zeros)
+        losses["core"] = losses["eddy_core"] + losses["hyst_core"]
+        losses["total"] = losses["all_windings"] + losses["core"]
+        return losses
+
+    def impedance_matrix(self) -> np.ndarray:
+        """
+        Returns the complex impedance matrices Z = R + jωL of all windings.
+
+        The resistances are taken from the power balance of all losses (windings and core), the inductances from the
+        flux linkages per unit current. For peak value phasors, the losses are P = 1/2 Re(I^H Z I).
+
+        :return: impedance matrices with the shape (n_frequencies, n_windings, n_windings)
+        :rtype: np.ndarray
+        """
+        loss_matrices = [matrix for (quantity, _, turn), matrix in self.quadratic.items()
+                         if quantity in ["j2F", "j2H", "CoreEddyCurrentLosses", "p_hyst"] and turn == 0]
+        if not loss_matrices:
+            raise Exception("The superposition model contains no losses.")
+        resistance = 2 * sum(loss_matrices).real
+
+        n_windings = resistance.shape[-1]
+        inductance = np.zeros(resistance.shape)
+        for winding in range(1, n_windings + 1):
+            if ("Flux_Linkage", winding, 0) not in self.linear:
+                raise Exception(f"The superposition model contains no flux linkage of winding {winding}.")
+            inductance[:, winding - 1, :] = self.linear[("Flux_Linkage", winding, 0)].real
+
+        return resistance + 1j * 2 * np.pi * self.frequencies[:, np.newaxis, np.newaxis] * inductance
+
+    def save(self, file_path: str):
+        """
+        Saves the model to a numpy .npz file.
+        """
+        arrays = {"frequencies": self.frequencies}
+        for kind, results in [("quadratic", self.quadratic), ("linear", self.linear)]:
+            for (quantity, winding, turn), values in results.items():
+                arrays[f"{kind}:{quantity}:{winding}:{turn}"] = values
+        np.savez(file_path, **arrays)
+
+    @classmethod
+    def load(cls, file_path: str) -> "SuperpositionModel":
+        """
+        Loads a model, which has been saved with save().
+        """
+        quadratic, linear = {}, {}
+        with np.load(file_path) as data:
+            frequencies = data["frequencies"]
+            for name in data.files:
+                if name == "frequencies":
+                    continue
+                kind, quantity, winding, turn = name.split(":")
+                {"quadratic": quadratic, "linear": linear}[kind][(quantity, int(winding), int(turn))] = data[name]
+        return cls(frequencies, quadratic, linear)
@@ -0,0 +1,97 @@
+import numpy as np
+from typing import Optional, Tuple
+
+# Absolute tolerance (in m) for the comparison of mirrored coordinates
+symmetry_tolerance = 1e-9
+
+
+def points_per_conductor(conductor_type: str) -> int:
+    """
+    :param conductor_type: conductor type of the winding
+    :type conductor_type: str
+    :return: number of gmsh points of one conductor: 5 for round conductors (center, left, top, right, bottom),
+        4 for rectangular conductors (bottom left, bottom right, top left, top right)
+    :rtype: int
+    """
+    return 5 if conductor_type in ["litz", "solid"] else 4
+
+
+def conductor_bounds(points: np.ndarray, conductor_type: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Bounding boxes of the conductors of one winding.
+
+    :param points: gmsh points of the winding (TwoDaxiSymmetric.p_conductor)
+    :type points: np.ndarray
+    :param conductor_type: conductor type of the winding
+    :type conductor_type: str
+    :return: x_min, x_max, y_min, y_max of every conductor
+    :rtype: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+    """
+    conductors = np.asarray(points, dtype=float).reshape(-1, points_per_conductor(conductor_type), 4)
+    return (conductors[:, :, 0].min(axis=1), conductors[:, :, 0].max(axis=1),
+            conductors[:, :, 1].min(axis=1), conductors[:, :, 1].max(axis=1))
+
+
+def upper_half_conductors(points: np.ndarray, conductor_type: str,
+                          tolerance: float = symmetry_tolerance) -> np.ndarray:
+    """
+    :return: indices of the conductors above the symmetry plane y = 0
+    :rtype: np.ndarray
+    """
+    _, _, y_min, _ = conductor_bounds(points, conductor_type)
+    return np.flatnonzero(y_min >= -tolerance)
+
+
+def half_model_turn_map(points: np.ndarray, conductor_type: str,
+                        tolerance: float = symmetry_tolerance) -> Optional[np.ndarray]:
+    """
+    Checks, if the conductors of one winding are mirror symmetric to the plane y = 0. Every conductor must lie
+    completely above or below the plane and must have a mirror image.
+
+    In the half model, only the conductors above the plane are modeled (in their original order). The turn map gives
+    the index of the modeled conductor for every conductor of the full model: a conductor above the plane is
+    represented by itself, a conductor below the plane by its mirror image.
+
+    :param points: gmsh points of the winding (TwoDaxiSymmetric.p_conductor)
+    :type points: np.ndarray
+    :param conductor_type: conductor type of the winding
+    :type conductor_type: str
+    :param tolerance: absolute tolerance of the coordinates in m
+    :type tolerance: float
+    :return: index of the modeled conductor for every conductor, None if the winding is not mirror symmetric
+    :rtype: np.ndarray
+    """
+    x_min, x_max, y_min, y_max = conductor_bounds(points, conductor_type)
+    upper = y_min >= -tolerance
+    lower = y_max <= tolerance
+    if not np.all(upper ^ lower):
+        # Conductors crossing the symmetry plane can not be split into two turns
+        return None
+    if len(upper) == 0:
+        return np.zeros(0, dtype=int)
+
+    # Deviation of conductor j from the mirror image of conductor i
+    deviation = np.maximum.reduce([np.abs(x_min[:, np.newaxis] - x_min[np.newaxis, :]),
+                                   np.abs(x_max[:, np.newaxis] - x_max[np.newaxis, :]),
+                                   np.abs(y_min[:, np.newaxis] + y_max[np.newaxis, :]),
+                                   np.abs(y_max[:, np.newaxis] + y_min[np.newaxis, :])])
+    partner = np.argmin(deviation, axis=1)
+    conductors = np.arange(len(partner))
+    if np.any(deviation[conductors, partner] > tolerance) or np.any(partner[partner] != conductors):
+        return None
+
+    model_index = np.full(len(upper), -1)
+    model_index[upper] = np.arange(np.count_nonzero(upper))
+    return np.where(upper, model_index, model_index[partner])
+
+
+def number_of_model_turns(n_turns: int, turn_map: Optional[np.ndarray]) -> int:
+    """
+    :param n_turns: number of turns of the winding
+    :type n_turns: int
+    :param turn_map: turn map of the half model (see half_model_turn_map()), None for the full model
+    :type turn_map: np.ndarray
+    :return: number of turns, which are modeled in the mesh
+    :rtype: int
+    """
+    return n_turns if turn_map is None else len(np.unique(turn_map))
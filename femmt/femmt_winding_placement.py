@@ -0,0 +1,208 @@
+import numpy as np
+from typing import List, Tuple
+
+
+def line_positions(start: float, stop: float, step: float) -> np.ndarray:
+    """
+    Positions start + k * step (k = 0, 1, ...) which lie strictly before stop. With a negative step the positions are
+    descending and lie strictly above stop.
+
+    :param start: first position
+    :type start: float
+    :param stop: exclusive bound
+    :type stop: float
+    :param step: distance of two positions
+    :type step: float
+    :return: positions
+    :rtype: np.ndarray
+    """
+    if step == 0:
+        raise Exception("The distance of two conductors must not be zero.")
+    n_max = max(int(np.ceil((stop - start) / step)) + 1, 0)
+    positions = start + np.arange(n_max) * step
+    return positions[positions < stop] if step > 0 else positions[positions > stop]
+
+
+def round_conductor_points(centers: np.ndarray, radius: float, c_center: float, c_conductor: float) -> np.ndarray:
+    """
+    Gmsh points of round conductors. Every conductor is described by five points: the center, the left, top, right and
+    bottom point of its circumference.
+
+    :param centers: conductor centers with the shape (n_conductors, 2)
+    :type centers: np.ndarray
+    :param radius: conductor radius
+    :type radius: float
+    :param c_center: mesh accuracy of the center point
+    :type c_center: float
+    :param c_conductor: mesh accuracy of the points on the circumference
+    :type c_conductor: float
+    :return: points [x, y, z, mesh_accuracy] with the shape (5 * n_conductors, 4)
+    :rtype: np.ndarray
+    """
+    centers = np.asarray(centers, dtype=float).reshape(-1, 2)
+    points = np.zeros((centers.shape[0], 5, 4))
+    points[:, :, 0] = centers[:, [0]] + radius * np.array([0, -1, 0, 1, 0])
+    points[:, :, 1] = centers[:, [1]] + radius * np.array([0, 0, 1, 0, -1])
+    points[:, :, 3] = c_conductor
+    points[:, 0, 3] = c_center
+    return points.reshape(-1, 4)
+
+
+def rectangular_conductor_points(x_min, x_max, y_min, y_max, c_conductor: float) -> np.ndarray:
+    """
+    Gmsh points of rectangular conductors (full, stacked and foil conductors). Every conductor is described by four
+    points: bottom left, bottom right, top left and top right.
+
+    :param x_min: left bounds of the conductors
+    :param x_max: right bounds of the conductors
+    :param y_min: bottom bounds of the conductors
+    :param y_max: top bounds of the conductors
+    :param c_conductor: mesh accuracy
+    :type c_conductor: float
+    :return: points [x, y, z, mesh_accuracy] with the shape (4 * n_conductors, 4)
+    :rtype: np.ndarray
+    """
+    x_min, x_max, y_min, y_max = np.broadcast_arrays(*[np.atleast_1d(np.asarray(bound, dtype=float))
+                                                      for bound in [x_min, x_max, y_min, y_max]])
+    points = np.zeros((x_min.shape[0], 4, 4))
+    points[:, :, 0] = np.stack([x_min, x_max, x_min, x_max], axis=1)
+    points[:, :, 1] = np.stack([y_min, y_min, y_max, y_max], axis=1)
+    points[:, :, 3] = c_conductor
+    return points.reshape(-1, 4)
+
+
+def square_centers(left_bound: float, right_bound: float, bot_bound: float, top_bound: float, radius: float,
+                   cond_cond: float, n_turns: int, column_wise: bool = True, from_top: bool = False) -> np.ndarray:
+    """
+    Conductor centers of the square winding scheme.
+
+    :param left_bound: left bound of the virtual winding window
+    :param right_bound: right bound of the virtual winding window
+    :param bot_bound: bottom bound of the virtual winding window
+    :param top_bound: top bound of the virtual winding window
+    :param radius: conductor radius
+    :param cond_cond: isolation between two conductors
+    :param n_turns: number of turns
+    :param column_wise: fill the window column by column (from left to right), otherwise row by row
+    :type column_wise: bool
+    :param from_top: start in the top row and fill the window downwards
+    :type from_top: bool
+    :return: centers with the shape (n_placed, 2), n_placed is smaller than n_turns if the window is too small
+    :rtype: np.ndarray
+    """
+    step = 2 * radius + cond_cond
+    xs = line_positions(left_bound + radius, right_bound - radius, step)
+    if from_top:
+        ys = line_positions(top_bound - radius, bot_bound + radius, -step)
+    else:
+        ys = line_positions(bot_bound + radius, top_bound - radius, step)
+
+    if column_wise:
+        x, y = np.meshgrid(xs, ys, indexing="ij")
+    else:
+        y, x = np.meshgrid(ys, xs, indexing="ij")
+    return np.column_stack([x.ravel(), y.ravel()])[:n_turns]
+
+
+def hexa_centers(left_bound: float, right_bound: float, bot_bound: float, top_bound: float, radius: float,
+                 cond_cond: float, n_turns: int) -> np.ndarray:
+    """
+    Conductor centers of the hexagonal winding scheme, filled column by column from left to right. Every second column
+    is shifted upwards by half a conductor distance.
+
+    :return: centers with the shape (n_placed, 2)
+    :rtype: np.ndarray
+    """
+    step = 2 * radius + cond_cond
+    xs = line_positions(left_bound + radius, right_bound - radius, 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2))
+    ys = line_positions(bot_bound + radius, top_bound - radius, step)
+
+    shift = (np.arange(len(xs)) % 2) * (radius + cond_cond / 2)
+    y = ys[np.newaxis, :] + shift[:, np.newaxis]
+    x = np.broadcast_to(xs[:, np.newaxis], y.shape)
+    inside = y < top_bound - radius
+    return np.column_stack([x[inside], y[inside]])[:n_turns]
+
+
+def hexa_row_centers(left_bound: float, right_bound: float, bot_bound: float, top_bound: float, radius: float,
+                     cond_cond: float, n_turns: int, from_top: bool = False) -> np.ndarray:
+    """
+    Conductor centers of the hexagonal winding scheme, filled row by row (used for blockwise concentrated windings).
+    Within a row, every second conductor is shifted by one conductor radius plus isolation away from the start row.
+
+    :param from_top: start in the top row and fill the window downwards
+    :type from_top: bool
+    :return: centers with the shape (n_placed, 2)
+    :rtype: np.ndarray
+    """
+    shift = radius + cond_cond
+    xs = line_positions(left_bound + radius, right_bound - radius, 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2))
+    # Rows of an even number of conductors end on the base line, rows of an odd number on the shifted line
+    row_step = shift * (2 if len(xs) % 2 == 0 else 1)
+    if from_top:
+        rows = line_positions(top_bound - radius, bot_bound + radius, -row_step)
+        shift = -shift
+    else:
+        rows = line_positions(bot_bound + radius, top_bound - radius, row_step)
+
+    y = rows[:, np.newaxis] + shift * (np.arange(len(xs)) % 2)[np.newaxis, :]
+    x = np.broadcast_to(xs[np.newaxis, :], y.shape)
+    return np.column_stack([x.ravel(), y.ravel()])[:n_turns]
+
+
+def interleaved_layer_centers(turns: List[int], radii: List[float], cond_cond: List[float],
+                              layer_bounds: Tuple[float, float], line_bounds: Tuple[float, float]) \
+        -> Tuple[List[np.ndarray], int, int]:
+    """
+    Conductor centers of two windings, which are placed in alternating columns (horizontal interleaving). The winding
+    with more turns starts. When one winding is completed, the remaining columns belong to the other one. Turns,
+    which do not fit into the window, are not placed.
+
+    :param turns: number of turns of both windings
+    :type turns: List[int]
+    :param radii: conductor radii of both windings
+    :type radii: List[float]
+    :param cond_cond: isolations [primary-primary, secondary-secondary, primary-secondary]
+    :type cond_cond: List[float]
+    :param layer_bounds: (start, end) of the columns, e.g. (left_bound, right_bound)
+    :type layer_bounds: Tuple[float, float]
+    :param line_bounds: (start, end) of the conductors within one column, e.g. (top_bound, bot_bound) to fill the
+        columns from top to bottom
+    :type line_bounds: Tuple[float, float]
+    :return: centers of both windings, index of the starting winding, number of primary-secondary column transitions
+        plus one (needed for the isolations between the columns)
+    :rtype: Tuple[List[np.ndarray], int, int]
+    """
+    layer_direction = np.sign(layer_bounds[1] - layer_bounds[0])
+    line_direction = np.sign(line_bounds[1] - line_bounds[0])
+
+    # The conductor positions within one layer are the same for every layer of a winding
+    lines = [line_positions(line_bounds[0] + line_direction * radii[c], line_bounds[1] - line_direction * radii[c],
+                            line_direction * (2 * radii[c] + cond_cond[c])) for c in range(0, 2)]
+
+    start = 0 if turns[0] >= turns[1] else 1
+    layers = [[], []]
+    completed = [0, 0]
+    iso_counter = 0
+
+    c = start
+    position = layer_bounds[0] + layer_direction * radii[c]
+    while completed[0] != turns[0] or completed[1] != turns[1]:
+        if completed[c] != turns[c]:
+            if not layer_direction * position < layer_direction * layer_bounds[1] - radii[c]:
+                break
+            n_placed = min(len(lines[c]), turns[c] - completed[c])
+            layers[c].append(np.column_stack([np.full(n_placed, position), lines[c][:n_placed]]))
+            completed[c] += n_placed
+            position += layer_direction * (radii[c] + radii[1 - c] + cond_cond[2])
+            c = 1 - c
+            iso_counter += 1
+        else:
+            # Winding c is completed, the next layer belongs to the same winding as the last one
+            c = 1 - c
+            position += layer_direction * (radii[c] - radii[1 - c] - cond_cond[2] + cond_cond[c])
+            iso_counter -= 1
+
+    centers = [np.concatenate(layers[c]) if layers[c] else np.zeros((0, 2)) for c in range(0, 2)]
+    return centers, start, iso_counter
+
@@ -3,6 +3,7 @@ from os import path
 from onelab import onelab
 from .thermal_functions import *
 from .thermal_classes import ConstraintPro, FunctionPro, GroupPro, ParametersPro
+from ..femmt_profiling import profiler, timed_stage, run_sub_client
 
 def create_case(boundary_regions, boundary_physical_groups, boundary_temperatures, boundary_flags, k_case, function_pro: FunctionPro, parameters_pro: ParametersPro, group_pro: GroupPro, constraint_pro: ConstraintPro):
     """
@@ -116,12 +117,13 @@ def simulate(onelab_folder_path, mesh_file, solver_file):
 
     # Run simulations as sub clients (non blocking??)
     mygetdp = path.join(onelab_folder_path, "getdp")
-    c.runSubClient("myGetDP", mygetdp + " " + solver_file + " -msh " + mesh_file + " -solve analysis -v2")
+    run_sub_client(c, "myGetDP", [mygetdp, solver_file, "-msh", mesh_file, "-solve", "analysis", "-v2"])
 
+@timed_stage(category="thermal")
 def run_thermal(onelab_folder_path, results_folder_path, model_mesh_file_path, results_log_file_path, 
     tags_dict, thermal_conductivity_dict, boundary_temperatures, 
     boundary_flags, boundary_physical_groups, core_area, conductor_radii, wire_distances,
-    show_results, pretty_colors = False, show_before_simulation = False):
+    show_results, pretty_colors = False, show_before_simulation = False, solver_folder_path = None):
     """
     Runs a thermal simulation.
     
@@ -137,6 +139,7 @@ def run_thermal(onelab_folder_path, results_folder_path, model_mesh_file_path, r
     :param show_results: Boolean - Set true when the results shall be shown in a gmsh window
     :param pretty_colors: Boolean - Set true if a specified colorization should be applied
     :param show_before_simulation: -  Set true if the mesh should be shown before running the thermal simulation (e.g. to see the colorization)
+    :param solver_folder_path: Folder containing the Thermal.pro and Solver.pro templates. The generated .pro files are written into this folder as well. Defaults to the solver folder of the package
 
     :param return: -
     """
@@ -150,7 +153,8 @@ def run_thermal(onelab_folder_path, results_folder_path, model_mesh_file_path, r
     map_pos_file = path.join(results_folder_path, "thermal.pos")
     influx_pos_file = path.join(results_folder_path, "thermal_influx.pos")
     material_pos_file = path.join(results_folder_path, "thermal_material.pos")
-    solver_folder_path = path.join(os.path.dirname(__file__), "solver")
+    if solver_folder_path is None:
+        solver_folder_path = path.join(os.path.dirname(__file__), "solver")
     thermal_template_file = path.join(solver_folder_path, "Thermal.pro")
     parameters_file = path.join(solver_folder_path, "Parameters.pro")
     function_file = path.join(solver_folder_path, "Function.pro")
@@ -159,6 +163,8 @@ def run_thermal(onelab_folder_path, results_folder_path, model_mesh_file_path, r
 
     if not gmsh.isInitialized():
         gmsh.initialize()
+        if profiler.quiet:
+            gmsh.option.setNumber("General.Terminal", 0)
     gmsh.open(model_mesh_file_path)
     
     # Create file wrappers
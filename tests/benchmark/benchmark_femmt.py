@@ -0,0 +1,250 @@
+"""
+Performance benchmarks of the canonical designs of basic_example.py (inductor, transformer, integrated transformer).
+
+Every design is simulated at several mesh accuracies, the time of the pipeline stages (geometry generation, meshing,
+solving, result ingestion and thermal simulation) is measured with femmt's profiler. The results are appended to a
+machine-readable history file and compared with the previous runs on the same machine. The script fails (exit code
+1), if a stage is slower than the median of the previous runs by more than the threshold.
+
+Needs gmsh and a configured onelab folder (GetDP), no network access. Usage:
+
+    python tests/benchmark/benchmark_femmt.py --repeat 3 --threshold 0.2
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+import numpy as np
+from typing import Dict, List, Optional
+
+import femmt as fmt
+
+benchmark_folder_path = os.path.dirname(os.path.abspath(__file__))
+default_history_path = os.path.join(benchmark_folder_path, "benchmark_history.json")
+
+# Stage of the benchmark -> (profiler stages which are added, profiler stages which are subtracted)
+benchmark_stages = {
+    "geometry": (["MagneticComponent.high_level_geo_gen"], []),
+    "meshing": (["MagneticComponent.Mesh.generate_hybrid_mesh", "MagneticComponent.Mesh.generate_electro_magnetic_mesh"],
+                []),
+    "solve": (["MagneticComponent.file_communication", "MagneticComponent.pre_simulate", "MagneticComponent.simulate"],
+              ["ResultStore.import_values"]),
+    "result_ingestion": (["ResultStore.import_values", "MagneticComponent.write_log"], []),
+    "thermal": (["MagneticComponent.thermal_simulation"], []),
+}
+
+mesh_accuracies = [0.5, 0.3]
+
+thermal_conductivity_dict = {
+    "air": 0.0263,
+    "case": {"top": 0.122, "top_right": 0.122, "right": 0.122, "bot_right": 0.122, "bot": 0.122},
+    "core": 5,
+    "winding": 400,
+    "air_gaps": 180,
+    "isolation": 0.42
+}
+boundary_temperatures = {"value_boundary_top": 20, "value_boundary_top_right": 20, "value_boundary_right_top": 20,
+                         "value_boundary_right": 20, "value_boundary_right_bottom": 20,
+                         "value_boundary_bottom_right": 20, "value_boundary_bottom": 20}
+boundary_flags = {"flag_boundary_top": 0, "flag_boundary_top_right": 0, "flag_boundary_right_top": 1,
+                  "flag_boundary_right": 1, "flag_boundary_right_bottom": 1, "flag_boundary_bottom_right": 1,
+                  "flag_boundary_bottom": 1}
+
+
+def create_inductor(working_directory: str):
+    geo = fmt.MagneticComponent(component_type="inductor", working_directory=working_directory)
+    core = fmt.core_database()["PQ 40/40"]
+    geo.core.update(core_w=core["core_w"], window_w=core["window_w"], window_h=core["window_h"],
+                    mu_rel=3100, phi_mu_deg=12, sigma=0.6)
+    geo.air_gaps.update(method="center", n_air_gaps=1, air_gap_h=[0.0005], position_tag=[0])
+    geo.update_conductors(n_turns=[[8]], conductor_type=["solid"], conductor_radii=[0.0015],
+                          winding=["primary"], scheme=["square"],
+                          core_cond_isolation=[0.001, 0.001, 0.002, 0.001], cond_cond_isolation=[0.0001],
+                          conductivity_sigma=["copper"])
+    return geo, {"freq": 100000, "current": [3], "phi_deg": [0]}
+
+
+def create_transformer(working_directory: str):
+    geo = fmt.MagneticComponent(component_type="transformer", working_directory=working_directory)
+    geo.core.update(window_h=0.0295, window_w=0.012, core_w=0.015, mu_rel=3100, phi_mu_deg=12, sigma=0.6)
+    geo.air_gaps.update(method="percent", n_air_gaps=1, air_gap_h=[0.0005], air_gap_position=[50], position_tag=[0])
+    geo.update_conductors(n_turns=[[10, 0], [0, 10]], conductor_type=["solid", "litz"],
+                          litz_para_type=['implicit_litz_radius', 'implicit_litz_radius'],
+                          ff=[None, 0.6], strands_numbers=[None, 600], strand_radii=[70e-6, 35.5e-6],
+                          conductor_radii=[0.0011, None],
+                          winding=["primary", "secondary"], scheme=["square", "square"],
+                          core_cond_isolation=[0.001, 0.001, 0.002, 0.001],
+                          cond_cond_isolation=[0.0002, 0.0002, 0.0005],
+                          conductivity_sigma=["copper", "copper"])
+    return geo, {"freq": 250000, "current": [4.14723021, 14.58960019], "phi_deg": [- 1.66257715 / np.pi * 180, 170]}
+
+
+def create_integrated_transformer(working_directory: str):
+    geo = fmt.MagneticComponent(component_type="integrated_transformer", working_directory=working_directory)
+    geo.core.update(window_h=0.03, window_w=0.011, mu_rel=3100, phi_mu_deg=12, sigma=0.6)
+    geo.stray_path.update(start_index=0, radius=geo.core.core_w / 2 + geo.core.window_w - 0.001)
+    geo.air_gaps.update(method="percent", n_air_gaps=2, position_tag=[0, 0], air_gap_h=[0.001, 0.001],
+                        air_gap_position=[30, 40])
+    geo.update_conductors(n_turns=[[1, 3], [2, 6]], conductor_type=["litz", "litz"],
+                          litz_para_type=['implicit_litz_radius', 'implicit_litz_radius'],
+                          ff=[0.5, 0.5], strands_numbers=[100, 100], strand_radii=[70e-6, 70e-6],
+                          winding=["interleaved", "interleaved"], scheme=["horizontal", "horizontal"],
+                          core_cond_isolation=[0.001, 0.001, 0.002, 0.001],
+                          cond_cond_isolation=[0.0002, 0.0002, 0.0005],
+                          conductivity_sigma=["copper", "copper"])
+    return geo, {"freq": 250000, "current": [8.0, 4.0], "phi_deg": [0, 180]}
+
+
+designs = {"inductor": create_inductor,
+           "transformer": create_transformer,
+           "integrated_transformer": create_integrated_transformer}
+
+
+def stage_times(records: List[Dict]) -> Dict[str, float]:
+    """
+    Sums up the profiler records to the stages of the benchmark.
+
+    :param records: records of fmt.profiler
+    :return: stage -> wall time in s
+    """
+    totals = {}
+    for record in records:
+        totals[record["name"]] = totals.get(record["name"], 0) + record["wall_time"]
+
+    times = {}
+    for stage, (added, subtracted) in benchmark_stages.items():
+        if any(name in totals for name in added):
+            times[stage] = sum(totals.get(name, 0) for name in added) - sum(totals.get(name, 0) for name in subtracted)
+    return times
+
+
+def run_case(design_name: str, accuracy: float, working_directory: str, thermal: bool = True) -> Dict[str, float]:
+    """
+    Simulates one design with the given mesh accuracy. The mesh cache is not used.
+
+    :return: stage -> wall time in s
+    """
+    if os.path.exists(working_directory):
+        shutil.rmtree(working_directory)
+    os.makedirs(working_directory)
+
+    geo, excitation = designs[design_name](working_directory)
+    geo.mesh.global_accuracy = accuracy
+    geo.mesh.use_cache = False
+
+    fmt.profiler.reset()
+    fmt.profiler.enable(quiet=True)
+    try:
+        geo.create_model(freq=excitation["freq"], visualize_before=False, save_png=False)
+        geo.single_simulation(freq=excitation["freq"], current=excitation["current"],
+                              phi_deg=excitation["phi_deg"], show_results=False)
+        if thermal:
+            geo.thermal_simulation(thermal_conductivity_dict, boundary_temperatures, boundary_flags,
+                                   0.002, 0.0025, 0.002, show_results=False)
+    finally:
+        fmt.profiler.disable()
+
+    return stage_times(fmt.profiler.to_dict()["stages"])
+
+
+def machine_id() -> str:
+    return f"{platform.node()}|{platform.machine()}|{platform.processor()}|python {platform.python_version()}"
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=benchmark_folder_path, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def load_history(history_path: str) -> List[Dict]:
+    if not os.path.isfile(history_path):
+        return []
+    with open(history_path, "r") as fd:
+        return json.load(fd)["runs"]
+
+
+def save_history(history_path: str, runs: List[Dict]):
+    temporary_path = f"{history_path}.tmp"
+    with open(temporary_path, "w") as fd:
+        json.dump({"version": 1, "runs": runs}, fd, indent=1)
+    os.replace(temporary_path, history_path)
+
+
+def find_regressions(results: Dict[str, Dict[str, float]], history: List[Dict], machine: str,
+                     threshold: float = 0.2, minimum_difference: float = 0.05,
+                     n_reference_runs: int = 5) -> List[str]:
+    """
+    Compares the results with the median of the last runs on the same machine.
+
+    :param results: case -> stage -> wall time in s
+    :param history: previous runs
+    :param machine: machine id of the results
+    :param threshold: allowed relative increase of a stage time
+    :param minimum_difference: increases smaller than this (in s) are regarded as noise
+    :param n_reference_runs: number of previous runs, which are used as reference
+    :return: descriptions of all regressions
+    """
+    reference_runs = [run for run in history if run["machine"] == machine][-n_reference_runs:]
+    regressions = []
+    for case, times in results.items():
+        for stage, wall_time in times.items():
+            previous = [run["results"][case][stage] for run in reference_runs
+                        if stage in run["results"].get(case, {})]
+            if not previous:
+                continue
+            reference = float(np.median(previous))
+            if wall_time > reference * (1 + threshold) and wall_time - reference > minimum_difference:
+                regressions.append(f"{case} / {stage}: {wall_time:.3f} s (reference {reference:.3f} s, "
+                                   f"+{(wall_time / reference - 1) * 100:.0f} %)")
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--designs", nargs="+", default=list(designs), choices=list(designs))
+    parser.add_argument("--accuracies", nargs="+", type=float, default=mesh_accuracies)
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions per case, the fastest one is used")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative increase of a stage time")
+    parser.add_argument("--history", default=default_history_path, help="path of the history file")
+    parser.add_argument("--no-thermal", action="store_true", help="skip the thermal simulation")
+    parser.add_argument("--no-save", action="store_true", help="do not append the results to the history")
+    parser.add_argument("--working-directory", default=os.path.join(benchmark_folder_path, "temp"))
+    arguments = parser.parse_args(arguments)
+
+    results = {}
+    for design_name in arguments.designs:
+        for accuracy in arguments.accuracies:
+            case = f"{design_name}@{accuracy}"
+            repetitions = [run_case(design_name, accuracy, os.path.join(arguments.working_directory, case),
+                                    thermal=not arguments.no_thermal)
+                           for _ in range(0, arguments.repeat)]
+            results[case] = {stage: min(repetition[stage] for repetition in repetitions)
+                             for stage in repetitions[0]}
+            print(f"{case:<35} " + "  ".join(f"{stage} {wall_time:7.3f} s" for stage, wall_time in
+                                            results[case].items()))
+
+    history = load_history(arguments.history)
+    machine = machine_id()
+    regressions = find_regressions(results, history, machine, threshold=arguments.threshold)
+
+    if not arguments.no_save:
+        history.append({"time": time.time(), "commit": git_commit(), "machine": machine,
+                        "femmt_version": getattr(fmt, "__version__", None), "results": results})
+        save_history(arguments.history, history)
+
+    if regressions:
+        print("\nPerformance regressions:\n" + "\n".join(regressions))
+        return 1
+    print("\nNo performance regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
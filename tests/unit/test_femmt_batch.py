@@ -0,0 +1,186 @@
+import copy
+import os
+import queue
+import pytest
+from femmt import femmt_batch
+from femmt.femmt_batch import design_geometry_key, split_designs_into_chunks, run_batch, WorkerPool
+
+
+inductor = {"component_type": "inductor",
+            "core": {"window_h": 0.03, "window_w": 0.011, "core_w": 0.02},
+            "air_gaps": {"method": "center", "n_air_gaps": 1, "air_gap_h": [0.0005], "position_tag": [0]},
+            "conductors": {"n_turns": [[9]], "conductor_type": ["solid"], "conductor_radii": [0.0015],
+                           "winding": ["primary"], "scheme": ["square"],
+                           "core_cond_isolation": [0.001, 0.001, 0.002, 0.001],
+                           "cond_cond_isolation": [0.0001], "conductivity_sigma": ["copper"]},
+            "frequency_list": [100000, 200000],
+            "current_list_list": [[3], [1]]}
+
+
+def design(name, air_gap_h=0.0005, current=3.0, frequency=100000):
+    new_design = copy.deepcopy(inductor)
+    new_design["name"] = name
+    new_design["air_gaps"]["air_gap_h"] = [air_gap_h]
+    new_design["current_list_list"] = [[current], [1]]
+    new_design["frequency_list"] = [frequency, 200000]
+    return new_design
+
+
+class FakeComponent:
+    def __init__(self, working_directory):
+        self.working_directory = working_directory
+        self.excited = []
+
+    def read_log(self):
+        return {"excited": self.excited}
+
+
+def fake_create_component(design, working_directory, onelab_client=None):
+    return FakeComponent(working_directory)
+
+
+def fake_mesh(geo, design):
+    # One file per mesh, so the test can count the meshes of every chunk
+    with open(os.path.join(geo.working_directory, f"mesh_{design['name']}"), "w") as fd:
+        fd.write(design_geometry_key(design))
+
+
+def fake_excite(geo, design):
+    if design["current_list_list"][0] == [2]:
+        raise Exception("solver error")
+    geo.excited.append(design["current_list_list"][0][0])
+
+
+def test_geometry_key():
+    # Excitations do not change the key, geometry and the mesh frequency do
+    assert design_geometry_key(design("a")) == design_geometry_key(design("b", current=5))
+    assert design_geometry_key(design("a")) != design_geometry_key(design("b", air_gap_h=0.001))
+    assert design_geometry_key(design("a")) != design_geometry_key(design("b", frequency=50000))
+    # The order of the keys does not matter
+    reordered = dict(reversed(list(design("a").items())))
+    assert design_geometry_key(reordered) == design_geometry_key(design("a"))
+
+
+def test_chunks_are_grouped_by_geometry():
+    designs = [design("a0"), design("b0", air_gap_h=0.001), design("a1", current=2), design("b1", air_gap_h=0.001),
+               design("a2", current=1)]
+    chunks = split_designs_into_chunks(designs, workers=1)
+    assert [[index for index, _ in chunk] for chunk in chunks] == [[0, 2, 4], [1, 3]]
+    assert all(chunk_design is designs[index] for chunk in chunks for index, chunk_design in chunk)
+
+
+def test_chunk_sizes():
+    designs = [design(f"a{i}", current=i) for i in range(0, 7)]
+    # Less groups than workers: the group is split into nearly equal chunks, the order is kept
+    chunks = split_designs_into_chunks(designs, workers=3)
+    assert [len(chunk) for chunk in chunks] == [3, 3, 1]
+    assert [index for chunk in chunks for index, _ in chunk] == list(range(0, 7))
+    # Never more chunks than designs
+    assert len(split_designs_into_chunks(designs[:2], workers=8)) == 2
+
+    designs += [design(f"b{i}", air_gap_h=0.001) for i in range(0, 3)]
+    chunks = split_designs_into_chunks(designs, workers=4)
+    assert [[index for index, _ in chunk] for chunk in chunks] == [[0, 1, 2, 3], [4, 5, 6], [7, 8], [9]]
+    assert split_designs_into_chunks([], workers=4) == []
+
+
+def test_run_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(femmt_batch, "create_component_from_design", fake_create_component)
+    monkeypatch.setattr(femmt_batch, "mesh_design", fake_mesh)
+    monkeypatch.setattr(femmt_batch, "excite_design", fake_excite)
+
+    infeasible = design("infeasible")
+    infeasible["conductors"]["n_turns"] = [[30]]
+    designs = [design("a0"), design("b0", air_gap_h=0.001), infeasible, design("fail", current=2),
+               design("a1", current=1), {key: value for key, value in design("").items() if key != "name"}]
+
+    results = run_batch(designs, workers=2, working_directory=str(tmp_path), onelab_folder_path="onelab")
+
+    # Same order as the designs, also for infeasible designs and designs without a name
+    assert [result["name"] for result in results] == ["a0", "b0", "infeasible", "fail", "a1", "job_5"]
+    assert [result["status"] for result in results] == \
+        ["success", "success", "infeasible", "failed", "success", "success"]
+    assert "solver error" in results[3]["error"]
+    assert results[2]["working_directory"] is None
+
+    # Designs with equal geometry share the mesh of their chunk
+    assert results[0]["working_directory"] == results[4]["working_directory"] == results[5]["working_directory"]
+    assert results[1]["working_directory"] != results[0]["working_directory"]
+    assert sorted(os.listdir(results[0]["working_directory"])) == ["config.json", "mesh_a0"]
+    assert results[5]["log"] == {"excited": [3, 1, 3]}
+
+
+class FakeProcess:
+    def __init__(self):
+        self.alive = True
+        self.exitcode = None
+
+    def is_alive(self):
+        return self.alive
+
+    def die(self):
+        self.alive = False
+        self.exitcode = -9
+
+
+class FakeQueue:
+    def __init__(self):
+        self.items = []
+
+    def put(self, item):
+        self.items.append(item)
+
+    def get(self, timeout=None):
+        if not self.items:
+            raise queue.Empty
+        return self.items.pop(0)
+
+
+@pytest.fixture
+def fake_pool(tmp_path, monkeypatch):
+    # Worker processes, which only exist as FakeProcess objects. Every (re)start creates a new process.
+    starts = []
+
+    def start_worker(pool, n_worker):
+        pool.processes[n_worker] = FakeProcess()
+        pool.job_queues[n_worker] = FakeQueue()
+        pool.running_jobs[n_worker] = None
+        starts.append(n_worker)
+
+    monkeypatch.setattr(WorkerPool, "start_worker", start_worker)
+    monkeypatch.setattr(WorkerPool, "poll_interval", 0.01)
+    pool = WorkerPool(workers=2, working_directory=str(tmp_path), onelab_folder_path="onelab")
+    pool.result_queue = FakeQueue()
+    pool.starts = starts
+    return pool
+
+
+def test_worker_pool_reports_dead_worker(fake_pool):
+    job_0, job_1 = fake_pool.submit(design("a")), fake_pool.submit(design("b"))
+    assert [job_queue.items for job_queue in fake_pool.job_queues] == [[(job_0, design("a"))], [(job_1, design("b"))]]
+
+    # Worker 0 dies, while the result of worker 1 is already waiting: the death is noticed without an empty queue
+    fake_pool.result_queue.put((1, job_1, {"name": "b", "status": "success"}))
+    fake_pool.processes[0].die()
+    result = fake_pool.result(job_0, timeout=1)
+    assert result["status"] == "failed" and "died" in result["error"]
+    assert fake_pool.starts == [0, 1, 0]
+    assert len(fake_pool.result_queue.items) == 1
+    assert fake_pool.result(job_1, timeout=1)["status"] == "success"
+
+
+def test_worker_pool_raises_if_workers_keep_dying(fake_pool, monkeypatch):
+    # Every worker dies right after its start, so map() must not wait forever
+    def die_at_start(pool, n_worker):
+        pool.processes[n_worker] = FakeProcess()
+        pool.processes[n_worker].die()
+        pool.job_queues[n_worker] = FakeQueue()
+        pool.running_jobs[n_worker] = None
+        fake_pool.starts.append(n_worker)
+
+    monkeypatch.setattr(WorkerPool, "start_worker", die_at_start)
+    for process in fake_pool.processes:
+        process.die()
+    with pytest.raises(Exception, match="died 4 times in a row"):
+        fake_pool.map([design(f"a{i}") for i in range(0, 20)])
+    assert fake_pool.starts.count(0) == 1 + WorkerPool.max_restarts
@@ -0,0 +1,230 @@
+import io
+import types
+import pytest
+import numpy as np
+from femmt.femmt_classes import MagneticComponent
+from femmt.femmt_results import ResultStore, result_dtype
+
+
+def parse_pro_lists(text):
+    # "Name() = {1, 2};" lines of a Parameter.pro file
+    lists = {}
+    for line in text.splitlines():
+        name, values = line.split("() = ")
+        values = values.strip("{};")
+        lists[name] = [float(value) for value in values.split(", ")] if values else []
+    return lists
+
+
+def test_multi_frequency_segments():
+    assert MagneticComponent.get_multi_frequency_segments([]) == []
+    assert MagneticComponent.get_multi_frequency_segments([1e5]) == [[0]]
+    assert MagneticComponent.get_multi_frequency_segments([1e5, 2e5, 3e5]) == [[0, 1, 2]]
+    # DC steps are solved on their own, the order of the steps is kept
+    assert MagneticComponent.get_multi_frequency_segments([0, 1e5, 2e5, 0, 0, 3e5]) == [[0], [1, 2], [3], [4], [5]]
+    assert MagneticComponent.get_multi_frequency_segments([3e5, 1e5, 0]) == [[0, 1], [2]]
+
+
+def test_sweep_lists():
+    sweep_steps = [{"current": [2.0, 0.5], "phase_tmp": [0, 1], "red_freq": [0.5, 0.7]},
+                   {"current": [4.0, 0], "phase_tmp": [1, 0], "red_freq": [1.5, 2.1]}]
+    for num, expected in enumerate([
+            {"Val_EE_1_List": [2, 4], "Phase_1_List": [0, np.pi], "Rr1_List": [0.5, 1.5],
+             "L_Factor_1_List": [0.5, -0.25], "E_Factor_1_List": [0.25, 1 / 16]},
+            {"Val_EE_2_List": [0.5, 0], "Phase_2_List": [np.pi, 0], "Rr2_List": [0.7, 2.1],
+             "L_Factor_2_List": [-2, 0], "E_Factor_2_List": [4, 0]}]):
+        text_file = io.StringIO()
+        MagneticComponent.write_electro_magnetic_sweep_lists(text_file, num, sweep_steps)
+        lists = parse_pro_lists(text_file.getvalue())
+        assert lists.keys() == expected.keys()
+        for name, values in expected.items():
+            assert np.allclose(lists[name], values)
+
+
+def test_impedance_matrix_of_two_windings(tmp_path):
+    frequencies = [100000, 200000]
+    rng = np.random.default_rng(0)
+    # Loss matrices (P = 1/2 I^H R I) of both windings and the core, inductance matrix per frequency
+    resistances = {}
+    for key in [("j2F", 1, 0), ("j2F", 2, 0), ("p_hyst", 0, 0)]:
+        a = rng.normal(size=(len(frequencies), 2, 2))
+        resistances[key] = a @ np.swapaxes(a, 1, 2)
+    inductances = np.array([[[100e-6, 40e-6], [40e-6, 30e-6]], [[98e-6, 39e-6], [39e-6, 29e-6]]])
+
+    # Component without gmsh: the solver is replaced by the synthetic results of every excitation step
+    geo = MagneticComponent.__new__(MagneticComponent)
+    geo.n_windings = 2
+    geo.core = types.SimpleNamespace(non_linear=False, permeability_type="custom")
+    geo.e_m_values_folder_path = str(tmp_path / "values")
+    (tmp_path / "values").mkdir()
+    geo.result_store = ResultStore(str(tmp_path / "store"))
+
+    def solve_excitation_steps(frequency_list, current_list_list, phi_deg_list_list, workers=1):
+        records = []
+        for step, (frequency, amplitudes, phases) in enumerate(zip(frequency_list, current_list_list,
+                                                                   phi_deg_list_list)):
+            f = frequencies.index(frequency)
+            currents = np.asarray(amplitudes) * np.exp(1j * np.deg2rad(phases))
+            for (quantity, winding, turn), matrix in resistances.items():
+                loss = np.real(np.conj(currents) @ matrix[f] @ currents) / 2
+                records.append((quantity, winding, turn, step, loss, 0))
+            for winding in [1, 2]:
+                flux_linkage = inductances[f, winding - 1] @ currents
+                records.append(("Flux_Linkage", winding, 0, step, flux_linkage.real, flux_linkage.imag))
+        records = np.array(records, dtype=result_dtype)
+        geo.result_store.write_run(geo.run_id, np.sort(records, order=["quantity", "winding", "turn", "step"]))
+
+    geo.solve_excitation_steps = solve_excitation_steps
+    impedance = geo.impedance_matrix(frequencies, workers=1, meshing=False)
+
+    assert impedance.shape == (2, 2, 2)
+    assert np.allclose(impedance, np.swapaxes(impedance, 1, 2))
+    omega = 2 * np.pi * np.array(frequencies)[:, None, None]
+    resistance = sum(resistances.values())
+    assert np.allclose(impedance.real, resistance)
+    assert np.allclose(impedance.imag, omega * inductances)
+    # Diagonal and mutual terms
+    assert np.allclose(impedance[:, 0, 0], resistance[:, 0, 0] + 1j * omega[:, 0, 0] * inductances[:, 0, 0])
+    assert np.allclose(impedance[:, 0, 1], resistance[:, 0, 1] + 1j * omega[:, 0, 0] * inductances[:, 0, 1])
+
+
+def output_component(tmp_path):
+    # Component without gmsh with the attributes of the output profile
+    geo = MagneticComponent.__new__(MagneticComponent)
+    geo.outputs = None
+    geo.plot_fields = "standard"
+    geo.write_fields = True
+    geo.e_m_fields_folder_path = str(tmp_path / "fields")
+    (tmp_path / "fields").mkdir()
+    return geo
+
+
+def test_set_outputs(tmp_path):
+    geo = output_component(tmp_path)
+    assert geo.get_field_outputs() == MagneticComponent.field_outputs
+    geo.plot_fields = False
+    assert "Magb" not in geo.get_field_outputs() and "p_hyst" in geo.get_field_outputs()
+
+    geo.set_outputs(values_only=True)
+    assert geo.outputs == {"fields": [], "steps": "last", "binary": False}
+    geo.set_outputs(fields="standard", steps=[0, 2], binary=True)
+    assert geo.outputs == {"fields": ["Magb", "j2F", "jH"], "steps": [0, 2], "binary": True}
+    assert geo.solver_output_options() == ["-bin"]
+    geo.set_outputs()
+    assert geo.get_field_outputs() == MagneticComponent.field_outputs and geo.solver_output_options() == []
+
+    with pytest.raises(Exception):
+        geo.set_outputs(fields=["Magb", "B_vector"])
+    with pytest.raises(Exception):
+        geo.set_outputs(steps="first")
+
+
+def test_field_output_steps(tmp_path):
+    geo = output_component(tmp_path)
+    assert geo.get_field_output_steps(5) == [4]
+    assert geo.get_field_output_steps(0) == []
+    geo.set_outputs(steps="all")
+    assert geo.get_field_output_steps(3) == [0, 1, 2]
+    # Negative indices count from the end, indices outside of the sweep are ignored, duplicates are removed
+    geo.set_outputs(steps=[3, -1, 0, 4, 7, -6])
+    assert geo.get_field_output_steps(5) == [0, 3, 4]
+    geo.set_outputs(values_only=True, steps="all")
+    assert geo.get_field_output_steps(5) == []
+
+
+def test_store_step_fields(tmp_path):
+    geo = output_component(tmp_path)
+    fields = tmp_path / "fields"
+
+    # Only the last step: the field maps stay in results/fields
+    (fields / "Magb.pos").write_text("step 0")
+    geo.store_step_fields(0)
+    assert sorted(path.name for path in fields.iterdir()) == ["Magb.pos"]
+
+    geo.set_outputs(fields=["Magb", "j2F"], steps=[1, 2])
+    (fields / "j2F.pos").write_text("step 1")
+    (fields / "jH.pos").write_text("not selected")
+    geo.store_step_fields(1)
+    assert (fields / "step_1" / "Magb.pos").read_text() == "step 0"
+    assert sorted(path.name for path in (fields / "step_1").iterdir()) == ["Magb.pos", "j2F.pos"]
+    assert (fields / "jH.pos").is_file() and not (fields / "Magb.pos").exists()
+
+    # No field maps written by the last solve
+    geo.write_fields = False
+    (fields / "Magb.pos").write_text("step 2")
+    geo.store_step_fields(2)
+    assert not (fields / "step_2").exists()
+
+
+def test_continuation_order():
+    # Smallest current first, then always the nearest remaining step
+    assert MagneticComponent.get_continuation_order([1e5] * 4, [[3], [1], [4], [2]]) == [1, 3, 0, 2]
+    assert MagneticComponent.get_continuation_order([1e5, 2e5, 1e5, 2e5], [[1], [1], [2], [2]]) == [0, 1, 3, 2]
+    # Several windings: the sum of the normalized amplitudes counts for the start
+    assert MagneticComponent.get_continuation_order([1e5, 1e5, 1e5], [[2, 0], [1, 1], [0, 0.5]])[0] == 2
+
+    rng = np.random.default_rng(0)
+    frequencies = rng.choice([0, 5e4, 1e5, 2e5], 12)
+    order = MagneticComponent.get_continuation_order(frequencies, rng.uniform(0, 10, (12, 2)))
+    assert sorted(order) == list(range(0, 12))
+
+
+def test_split_sweep_segments():
+    segments = [[0], [1, 2, 3, 4], [5, 6]]
+    assert MagneticComponent.split_sweep_segments(segments, []) == segments
+    # Steps at the end of a segment do not create empty segments
+    assert MagneticComponent.split_sweep_segments(segments, [0, 4, 6]) == segments
+    assert MagneticComponent.split_sweep_segments(segments, [2, 5]) == [[0], [1, 2], [3, 4], [5], [6]]
+    assert MagneticComponent.split_sweep_segments(segments, [1, 2, 3]) == [[0], [1], [2], [3], [4], [5, 6]]
+    # Segments of positions in a reordered sweep
+    assert MagneticComponent.split_sweep_segments([[3, 1, 0, 2]], [1]) == [[3, 1], [0, 2]]
+
+
+def sweep_component(tmp_path):
+    # Component without gmsh, the GetDP runs of the sweep are recorded
+    geo = output_component(tmp_path)
+    geo.valid = True
+    geo.core = types.SimpleNamespace(non_linear=True)
+    geo.nl_warm_start = False
+    geo.runs, geo.reordered = [], []
+    geo.start_result_run = lambda: None
+    geo.print_nonlinear_iterations = lambda frequency_list: None
+    geo.write_log = lambda **kwargs: None
+    geo.result_store = types.SimpleNamespace(reorder_steps=lambda run_id, order: geo.reordered.append(order))
+    geo.run_id = None
+    geo.multi_frequency_simulation = lambda frequency_list, current_list_list, phi_deg_list_list: \
+        geo.runs.append((frequency_list, [currents[0] for currents in current_list_list], geo.nl_warm_start,
+                         geo.write_fields))
+    return geo
+
+
+def test_sweep_segments_with_continuation(tmp_path):
+    geo = sweep_component(tmp_path)
+    frequencies, currents = [1e5, 1e5, 0, 1e5, 1e5], [[4], [1], [2], [3], [2]]
+    geo.excitation_sweep(frequencies, currents, [[0]] * 5, meshing=False, continuation=True)
+
+    # Ordered by the current with the distant DC step last, split after the field map step (last step of
+    # frequency_list) and before the DC step
+    assert geo.runs == [([1e5, 1e5], [1, 2], True, True), ([1e5, 1e5], [3, 4], True, False),
+                        ([0], [2], True, False)]
+    assert geo.reordered == [[1, 4, 3, 0, 2]]
+    assert geo.nl_warm_start is False and geo.write_fields is True
+
+
+def test_sweep_segments_without_warm_start(tmp_path):
+    geo = sweep_component(tmp_path)
+    geo.set_outputs(steps=[1])
+    frequencies, currents = [1e5, 2e5, 0, 1e5], [[4], [1], [2], [3]]
+    geo.excitation_sweep(frequencies, currents, [[0]] * 4, meshing=False, multi_frequency=True)
+
+    # Order of frequency_list, every run starts from zero
+    assert geo.runs == [([1e5, 2e5], [4, 1], False, True), ([0], [2], False, False), ([1e5], [3], False, False)]
+    assert geo.reordered == []
+
+
+def test_electro_thermal_simulation_needs_one_iteration():
+    geo = MagneticComponent.__new__(MagneticComponent)
+    for max_iterations in [0, -1]:
+        with pytest.raises(ValueError):
+            geo.electro_thermal_simulation(1e5, [1], [0], {}, {"value_boundary_top": 20}, {}, 0.002, 0.0025, 0.002,
+                                           max_iterations=max_iterations)
@@ -0,0 +1,125 @@
+import pytest
+import numpy as np
+from femmt.femmt_electro_thermal import AndersonAcceleration, conductivity_at_temperature, model_turn_values, \
+    core_regions, core_region_indices, core_region_means, core_region_getdp_conditions
+from femmt.femmt_fields import FieldResults, FieldData, mesh_element_dtype
+from femmt.femmt_materials import MaterialData
+
+
+def linear_fixed_point(n, seed):
+    # g(x) = A x + b with a contraction A, which is slow for the plain fixed point iteration
+    rng = np.random.default_rng(seed)
+    q, _ = np.linalg.qr(rng.normal(size=(n, n)))
+    A = q @ np.diag(np.linspace(0.5, 0.95, n)) @ q.T
+    b = rng.normal(size=n)
+    return A, b, np.linalg.solve(np.eye(n) - A, b)
+
+
+def iterate(anderson, g, x, n_iterations):
+    for _ in range(n_iterations):
+        x = anderson.update(x, g(x))
+    return x
+
+
+def test_anderson_without_history_is_fixed_point_iteration():
+    A, b, _ = linear_fixed_point(4, 0)
+    x = np.zeros(4)
+    anderson = AndersonAcceleration(depth=0, damping=0.5)
+    for _ in range(5):
+        x_next = anderson.update(x, A @ x + b)
+        assert np.allclose(x_next, x + 0.5 * (A @ x + b - x))
+        x = x_next
+    assert len(anderson.x_history) == len(anderson.residual_history) == 1
+
+
+def test_anderson_step_minimizes_the_linearized_residual():
+    A, b, _ = linear_fixed_point(5, 1)
+    anderson = AndersonAcceleration(depth=2)
+    xs = [np.zeros(5), np.ones(5), np.arange(5.0)]
+    for x in xs[:-1]:
+        anderson.update(x, A @ x + b)
+    x_next = anderson.update(xs[-1], A @ xs[-1] + b)
+
+    # Reference: combination of the g evaluations with coefficients summing up to one, which minimizes the residual
+    residuals = np.array([A @ x + b - x for x in xs]).T
+    g_values = np.array([A @ x + b for x in xs]).T
+    constraint = np.vstack([np.hstack([2 * residuals.T @ residuals, np.ones((3, 1))]), [1, 1, 1, 0]])
+    alpha = np.linalg.solve(constraint, [0, 0, 0, 1])[:3]
+    assert np.allclose(x_next, g_values @ alpha)
+
+
+def test_anderson_accelerates_linear_fixed_point():
+    A, b, solution = linear_fixed_point(6, 2)
+    fixed_point = iterate(AndersonAcceleration(depth=0), lambda x: A @ x + b, np.zeros(6), 8)
+    anderson = AndersonAcceleration(depth=6)
+    # Depth >= dimension: exact after dimension + 1 steps (up to round off)
+    accelerated = iterate(anderson, lambda x: A @ x + b, np.zeros(6), 8)
+    assert np.allclose(accelerated, solution, atol=1e-8)
+    assert np.max(np.abs(fixed_point - solution)) > 1e-2
+    assert len(anderson.x_history) == 7
+
+    anderson.reset()
+    assert anderson.x_history == [] and anderson.residual_history == []
+
+
+def test_anderson_on_nonlinear_temperature_iteration():
+    # Temperatures of two coupled bodies with temperature dependent (resistive) losses
+    def g(temperatures):
+        losses = 2 * (1 + 3.93e-3 * (temperatures - 20))
+        return 25 + np.array([[8, 2], [2, 6]]) @ losses
+
+    for depth in [0, 3]:
+        x = np.full(2, 25.0)
+        anderson = AndersonAcceleration(depth=depth)
+        for iteration in range(50):
+            new = g(x)
+            if np.max(np.abs(new - x)) < 1e-9:
+                break
+            x = anderson.update(x, new)
+        assert np.allclose(g(x), x, atol=1e-8)
+        if depth > 0:
+            assert iteration < 10
+
+
+def test_conductivity_and_turn_values():
+    assert np.isclose(conductivity_at_temperature(5.8e7, 20), 5.8e7)
+    assert np.allclose(conductivity_at_temperature(5.8e7, [120, 70], 4e-3), [5.8e7 / 1.4, 5.8e7 / 1.2])
+    assert np.allclose(model_turn_values([1, 2, 3, 4], None), [1, 2, 3, 4])
+    assert np.allclose(model_turn_values([1, 2, 3, 4], np.array([1, 0, 0, 1])), [2.5, 2.5])
+
+
+def test_core_regions():
+    core_w, window_w, window_h = 0.02, 0.01, 0.03
+    r = np.array([0.005, 0.025, 0.015, 0.015, 0.015, -0.005])
+    z = np.array([0.0, 0.0, 0.02, -0.02, 0.0, 0.02])
+    assert np.array_equal(core_region_indices(r, z, core_w, window_w, window_h), [0, 1, 2, 3, 4, 0])
+    assert len(core_region_getdp_conditions(core_w, window_w, window_h)) == len(core_regions) - 1
+
+
+def test_core_region_means(tmp_path):
+    fields = FieldResults(str(tmp_path / "thermal.msh"), str(tmp_path), use_cache=False)
+    elements = np.zeros(6, dtype=mesh_element_dtype)
+    elements["tag"] = np.arange(1, 7)
+    elements["region"] = [2000, 2000, 2000, 2000, 2000, 1000]
+    elements["x"] = [0.005, 0.005, 0.025, 0.015, 0.015, 0.015]
+    elements["y"] = [0.0, 0.01, 0.0, 0.02, -0.02, 0.0]
+    elements["area"] = [1, 3, 1, 1, 1, 1]
+    fields._elements = elements
+    temperatures = np.array([40.0, 60.0, 50.0, 45.0, 44.0, 30.0])
+    fields._fields["thermal"] = FieldData("thermal", elements["tag"], temperatures.reshape(6, 1, 1, 1))
+
+    means = core_region_means(fields, "thermal", 0.02, 0.01, 0.03)
+    assert np.allclose(means[:4], [55, 50, 45, 44])
+    # No core element in the window: mean of the core, the air element is ignored
+    assert np.isclose(means[4], fields.mean("thermal", "core"))
+
+
+def test_region_functions_of_the_material():
+    material = MaterialData("test", [25, 100], [1e5], [0, 0.1], np.full((2, 1, 2), 3000.0),
+                            np.array([[[100.0, 200.0]], [[300.0, 400.0]]]))
+    functions = material.getdp_region_functions([25, 100], ["X[] <= 0.01"])
+    assert "f_mu_data_imag[] = ((X[] <= 0.01) ? f_mu_data_region_0_imag[$1, $2] : " \
+           "f_mu_data_region_1_imag[$1, $2]);" in functions
+    assert "mu_data_region_1_imag_0 = {300.0, 400.0}" in functions
+    with pytest.raises(Exception):
+        material.getdp_region_functions([25, 100], [])
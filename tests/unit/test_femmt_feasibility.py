@@ -0,0 +1,108 @@
+import copy
+import numpy as np
+from femmt.femmt_feasibility import square_capacity, hexa_capacity, turns_fit, block_height, \
+    interleaved_turns_fit, air_gap_positions, air_gaps_overlap, air_gaps_inside, inductor_feasibility, \
+    check_design, feasible_designs
+from femmt.femmt_winding_placement import square_centers, hexa_centers, hexa_row_centers, interleaved_layer_centers
+
+
+def random_windows(seed, n=40):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        yield rng.uniform(0.002, 0.02), rng.uniform(0.002, 0.04), rng.uniform(2e-4, 1.5e-3), rng.uniform(0, 3e-4)
+
+
+def test_capacity_as_placement():
+    for width, height, radius, cond_cond in random_windows(0):
+        assert square_capacity(width, height, radius, cond_cond) == \
+            len(square_centers(0, width, 0, height, radius, cond_cond, 10 ** 6))
+        assert hexa_capacity(width, height, radius, cond_cond) == \
+            len(hexa_centers(0, width, 0, height, radius, cond_cond, 10 ** 6))
+
+
+def test_capacity_is_vectorized():
+    widths, heights = np.linspace(0.002, 0.02, 7), np.linspace(0.002, 0.04, 5)
+    capacity = square_capacity(widths[:, None], heights[None, :], 5e-4, 1e-4)
+    assert capacity.shape == (7, 5)
+    for i, width in enumerate(widths):
+        for j, height in enumerate(heights):
+            assert capacity[i, j] == square_capacity(width, height, 5e-4, 1e-4)
+    fit = turns_fit("hexa", widths[:, None], heights[None, :], 20, 5e-4, 1e-4)
+    assert np.array_equal(fit, hexa_capacity(widths[:, None], heights[None, :], 5e-4, 1e-4) >= 20)
+
+
+def test_block_height_as_placement():
+    rng = np.random.default_rng(1)
+    for width, height, radius, cond_cond in random_windows(2):
+        n_turns = int(rng.integers(1, 40))
+        for scheme, placement in [("square", lambda *args: square_centers(*args, column_wise=False)),
+                                  ("hexa", hexa_row_centers)]:
+            centers = placement(0, width, 0, 1, radius, cond_cond, n_turns)
+            if len(centers) < n_turns:
+                assert block_height(scheme, width, n_turns, radius, cond_cond) == np.inf
+            else:
+                assert np.isclose(block_height(scheme, width, n_turns, radius, cond_cond),
+                                  np.max(centers[:, 1]) - np.min(centers[:, 1]) + 2 * radius)
+
+
+def test_horizontal_interleaving_as_placement():
+    rng = np.random.default_rng(3)
+    for width, height, radius, cond_cond in random_windows(4, n=100):
+        turns = [int(rng.integers(1, 60)), int(rng.integers(0, 60))]
+        radii = [radius, rng.uniform(2e-4, 1.5e-3)]
+        isolations = [cond_cond, rng.uniform(0, 3e-4), rng.uniform(0, 5e-4)]
+        centers, _, _ = interleaved_layer_centers(turns, radii, isolations, (0, width), (height, 0))
+        placed_all = len(centers[0]) == turns[0] and len(centers[1]) == turns[1]
+        assert interleaved_turns_fit("horizontal", width, height, turns, radii, isolations) == placed_all
+
+
+def test_schemes_which_are_not_implemented_never_fit():
+    for scheme in ["vertical", "bifilar"]:
+        assert not interleaved_turns_fit(scheme, 0.1, 0.1, [1, 1], [1e-4, 1e-4], [0, 0, 0])
+        assert interleaved_turns_fit(scheme, np.ones(3), 0.1, [1, 1], [1e-4, 1e-4], [0, 0, 0]).shape == (3,)
+
+
+def test_air_gaps():
+    positions = air_gap_positions("percent", 0.03, [20, 50, 80])
+    assert np.allclose(positions, [-0.009, 0, 0.009])
+    assert not air_gaps_overlap(positions, [0.001, 0.001, 0.001])
+    assert air_gaps_overlap(positions, [0.001, 0.02, 0.001])
+    assert not air_gaps_overlap(positions, [0.001, 0.02, 0.001], position_tags=np.array([0, 1, -1]))
+    assert air_gaps_inside(positions, [0.001, 0.001, 0.001], 0.03)
+    assert not air_gaps_inside(positions, [0.001, 0.001, 0.013], 0.03)
+    assert np.allclose(air_gap_positions("center", np.array([0.03, 0.04])), 0)
+
+
+def test_inductor_feasibility_grid():
+    window_w, n_turns = np.meshgrid(np.linspace(0.005, 0.02, 4), np.arange(1, 100, 10), indexing="ij")
+    feasible = inductor_feasibility(0.02, window_w, 0.03, n_turns, 0.001, [0.001, 0.001, 0.002, 0.001], 0.0001,
+                                    air_gap_h=[0.0005])
+    assert feasible.shape == window_w.shape
+    # More turns never fit better, a wider window never worse
+    assert np.all(np.diff(feasible.astype(int), axis=1) <= 0)
+    assert np.all(np.diff(feasible.astype(int), axis=0) >= 0)
+    assert feasible[-1, 0] and not feasible[0, -1]
+
+
+inductor = {"component_type": "inductor",
+            "core": {"window_h": 0.03, "window_w": 0.011, "core_w": 0.02},
+            "air_gaps": {"method": "center", "n_air_gaps": 1, "air_gap_h": [0.0005], "position_tag": [0]},
+            "conductors": {"n_turns": [[9]], "conductor_type": ["solid"], "conductor_radii": [0.0015],
+                           "winding": ["primary"], "scheme": ["square"],
+                           "core_cond_isolation": [0.001, 0.001, 0.002, 0.001],
+                           "cond_cond_isolation": [0.0001], "conductivity_sigma": ["copper"]}}
+
+
+def test_check_design():
+    assert check_design(inductor) == []
+
+    too_many_turns = copy.deepcopy(inductor)
+    too_many_turns["conductors"]["n_turns"] = [[30]]
+    negative_isolation = copy.deepcopy(inductor)
+    negative_isolation["conductors"]["cond_cond_isolation"] = [-0.0001]
+    large_air_gap = copy.deepcopy(inductor)
+    large_air_gap["air_gaps"]["air_gap_h"] = [0.04]
+    for design in [too_many_turns, negative_isolation, large_air_gap]:
+        assert len(check_design(design)) == 1
+
+    assert np.array_equal(feasible_designs([inductor, too_many_turns]), [True, False])
@@ -0,0 +1,81 @@
+import numpy as np
+from femmt.femmt_frequency_response import vector_fit, evaluate_rational, FrequencyResponseModel, \
+    FrequencyResponseBuilder
+
+
+def example_response(frequencies):
+    """Rational function with one complex conjugate pole pair, one real pole, constant and proportional term."""
+    s = 1j * 2 * np.pi * np.asarray(frequencies, dtype=float)
+    pair, residue = -2e4 + 1j * 2 * np.pi * 1e5, 3e4 + 1e4j
+    real_pole, real_residue = -2 * np.pi * 2e4, 5e4
+    return residue / (s - pair) + np.conj(residue) / (s - np.conj(pair)) + real_residue / (s - real_pole) + 0.5 + \
+        s * 2e-6
+
+
+def example_impedance(frequencies):
+    """Impedance matrix of two coupled windings with frequency dependent (eddy current) resistance and inductance."""
+    frequencies = np.asarray(frequencies, dtype=float)
+    s = 1j * 2 * np.pi * frequencies[:, np.newaxis, np.newaxis]
+    inductance = np.array([[100e-6, 40e-6], [40e-6, 30e-6]])
+    resistance = np.array([[0.1, 0.01], [0.01, 0.05]])
+    eddy_inductance = np.array([[10e-6, 2e-6], [2e-6, 4e-6]])
+    # Eddy current branch: s L_e R_e / (s L_e + R_e) per entry with R_e = 2 pi 300 kHz L_e
+    eddy = s * eddy_inductance * 2 * np.pi * 3e5 / (s + 2 * np.pi * 3e5)
+    return resistance + s * (inductance - eddy_inductance) + eddy
+
+
+def test_vector_fit_recovers_rational_function():
+    frequencies = np.geomspace(1e3, 1e6, 80)
+    responses = example_response(frequencies)[:, np.newaxis]
+    poles, residues, d, e = vector_fit(frequencies, responses, n_poles=3, n_iterations=20)
+
+    check_frequencies = np.geomspace(1e3, 1e6, 333)
+    fitted = evaluate_rational(check_frequencies, poles, residues, d, e)[:, 0]
+    exact = example_response(check_frequencies)
+    assert np.max(np.abs(fitted - exact) / np.abs(exact)) < 1e-6
+    assert np.all(poles.real < 0)
+    assert np.isclose(d[0], 0.5, rtol=1e-4)
+    assert np.isclose(e[0].real, 2e-6, rtol=1e-4)
+
+
+def test_vector_fit_of_several_responses_with_common_poles():
+    frequencies = np.geomspace(1e3, 1e6, 60)
+    responses = np.stack([example_response(frequencies), 2 * example_response(frequencies) - 0.1], axis=1)
+    poles, residues, d, e = vector_fit(frequencies, responses, n_poles=3, n_iterations=20)
+    fitted = evaluate_rational(frequencies, poles, residues, d, e)
+    assert np.max(np.abs(fitted - responses) / np.abs(responses)) < 1e-6
+
+
+def test_impedance_model_is_accurate_reciprocal_and_passive():
+    frequencies = np.geomspace(1e3, 1e6, 40)
+    model = FrequencyResponseModel.fit(frequencies, example_impedance(frequencies), n_poles=2)
+
+    check_frequencies = np.geomspace(1e3, 1e6, 200)
+    impedance = model(check_frequencies)
+    exact = example_impedance(check_frequencies)
+    assert np.allclose(impedance, np.swapaxes(impedance, 1, 2))
+    assert np.allclose(impedance.imag, exact.imag, rtol=1e-3, atol=0)
+    assert np.allclose(impedance.real, exact.real, rtol=1e-2, atol=1e-4)
+    assert np.min(np.linalg.eigvalsh(impedance.real)) >= -1e-12
+    assert np.allclose(model.inductance([1e3])[0], np.array([[100e-6, 40e-6], [40e-6, 30e-6]]), rtol=1e-2)
+
+    currents = np.array([[1, -0.5]] * len(check_frequencies))
+    assert np.all(model.losses(check_frequencies, currents) > 0)
+
+
+def test_builder_adds_samples_until_tolerance():
+    evaluated = []
+
+    def evaluate(frequencies):
+        evaluated.extend(frequencies)
+        return example_impedance(frequencies)
+
+    builder = FrequencyResponseBuilder(evaluate, 1e3, 1e6, tolerance=1e-3, n_initial=5, max_samples=30)
+    model = builder.build()
+    assert builder.estimated_error <= 1e-3
+    assert len(evaluated) == len(set(evaluated)) <= 30
+
+    check_frequencies = np.geomspace(1e3, 1e6, 50)
+    deviation = FrequencyResponseBuilder.relative_deviation(model(check_frequencies),
+                                                            example_impedance(check_frequencies))
+    assert np.max(deviation) < 1e-2
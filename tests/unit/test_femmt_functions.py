@@ -39,3 +39,152 @@ def test_find_common_frequencies():
     common_phase = [[10, 50], [20, 60], [30, 70], [40, 90]]
     out_test = [common_f, common_a, common_phase]
     assert out == out_test
+
+
+def test_gauss_legendre_integral():
+    # n nodes integrate polynomials up to the degree 2 n - 1 exactly, the bounds broadcast
+    lower, upper = np.array([[0.0], [1.0]]), np.array([1.0, 2.0, 3.0])
+    integral = femmt.gauss_legendre_integral(lambda x: 3 * x ** 5 - x ** 2, lower, upper, order=3)
+    exact = (upper ** 6 - lower ** 6) / 2 - (upper ** 3 - lower ** 3) / 3
+    assert integral.shape == (2, 3)
+    assert np.allclose(integral, exact, rtol=1e-12)
+
+
+def test_gauss_legendre_integral_with_breakpoints():
+    # Piecewise linear integrand (as linearly interpolated material data) with different intervals per integral
+    kinks, values = np.array([0.1, 0.3, 0.35, 0.8]), np.array([1.0, 4.0, -2.0, 3.0])
+
+    def integrand(x):
+        return np.interp(x, kinks, values)
+
+    def exact(a, b):
+        grid = np.unique(np.concatenate([[a, b], kinks[(kinks > a) & (kinks < b)]]))
+        return np.sum((integrand(grid[1:]) + integrand(grid[:-1])) / 2 * np.diff(grid))
+
+    lower, upper = np.array([0.0, 0.2, 0.32, 0.5]), np.array([1.0, 0.4, 0.34, 0.9])
+    integral = femmt.gauss_legendre_integral(integrand, lower, upper, order=2, breakpoints=kinks)
+    assert np.allclose(integral, [exact(a, b) for a, b in zip(lower, upper)], rtol=1e-12)
+    assert not np.allclose(femmt.gauss_legendre_integral(integrand, lower, upper, order=16),
+                           [exact(a, b) for a, b in zip(lower, upper)], rtol=1e-6)
+
+    # Breakpoints per integral
+    breakpoints = np.stack([kinks, kinks + 0.05])
+    integral = femmt.gauss_legendre_integral(lambda x: np.interp(x - np.array([[0], [0.05]]), kinks, values),
+                                             0.0, 1.0, order=2, breakpoints=breakpoints)
+    assert np.allclose(integral, [exact(0, 1), exact(-0.05, 0.95)], rtol=1e-12)
+
+
+def test_hysteresis_loss_cylinder_as_adaptive_quadrature(tmp_path, monkeypatch):
+    from scipy.integrate import quad
+    from femmt import femmt_materials
+    from femmt.electro_magnetic.Analytical_Core_Data import f_N95_mu_imag
+    monkeypatch.setenv("FEMMT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(femmt_materials, "_material_databases", {})
+    flux_densities = femmt.material_database()["N95_measurement"].flux_densities
+
+    rng = np.random.default_rng(0)
+    frequency, mu_rel = 250000, 3000
+    r_inner, r_outer, width = rng.uniform(0.002, 0.01, 5), rng.uniform(0.01, 0.03, 5), rng.uniform(0.001, 0.01, 5)
+    Phi = rng.uniform(0.05, 0.43, 5) * 2 * np.pi * r_inner * width
+    losses = femmt.hysteresis_loss_cylinder_batched(Phi, width, r_inner, r_outer, frequency, mu_rel, f_N95_mu_imag,
+                                                    flux_density_breakpoints=flux_densities)
+
+    for i in range(5):
+        def loss_density(r):
+            b = Phi[i] / (2 * np.pi * r * width[i])
+            return 2 * np.pi * r * width[i] * np.pi * frequency * femmt.mu0 * f_N95_mu_imag(frequency, b) * \
+                (b / mu_rel / femmt.mu0) ** 2
+        radii = Phi[i] / (2 * np.pi * width[i] * flux_densities[1:])
+        radii = np.concatenate([[r_inner[i]], np.sort(radii[(radii > r_inner[i]) & (radii < r_outer[i])]),
+                                [r_outer[i]]])
+        reference = sum(quad(loss_density, a, b, epsabs=0, epsrel=1e-12)[0] for a, b in zip(radii[:-1], radii[1:]))
+        assert np.isclose(losses[i], reference, rtol=1e-8, atol=0)
+
+
+def test_batched_bisection_as_brentq():
+    from scipy.optimize import brentq
+
+    def function(x):
+        return x ** 3 + 2 * x
+
+    goals = np.array([0.5, 3.0, 12.0, -1.0, 100.0])
+    solutions = femmt.solve_increasing_function_batched(function, goals, 0.0, np.array([1.0, 2.0, 3.0, 1.0, 1.0]))
+    for goal, upper, solution in zip(goals, [1.0, 2.0, 3.0, 1.0, 1.0], solutions):
+        if function(0) - goal > 0 or function(upper) - goal < 0:
+            # No root in the bracket
+            assert np.isnan(solution)
+        else:
+            assert np.isclose(solution, brentq(lambda x: function(x) - goal, 0.0, upper), rtol=0, atol=1e-11)
+    assert np.isnan(solutions[3:]).all() and not np.isnan(solutions[:3]).any()
+
+
+def reference_air_gap_lengths(N, L_goal, currents, window_w, window_h, core_w, midpoint, real_core_width):
+    """Scalar air gap design of one design with brentq as in ReluctanceModel.calculate_air_gap_lengths_with_sct()."""
+    from scipy.optimize import brentq
+    R = femmt.calculate_reluctances(N, L_goal)
+    R_goal = [R[0, 0] + R[0, 1], R[1, 1] + R[0, 1], -R[0, 1]]
+
+    Phi = np.linalg.solve(N.T, L_goal @ currents)
+    Phi_top_peak, Phi_bot_peak = np.max(np.abs(Phi[0])), np.max(np.abs(Phi[1]))
+    Phi_stray_peak = np.max(np.abs(Phi[1] - Phi[0]))
+    b_stray_max = max(Phi_top_peak, Phi_bot_peak) / np.pi / (core_w / 2) ** 2
+    width = Phi_stray_peak / b_stray_max / (np.pi * core_w)
+    max_length = [window_h * (100 - midpoint) / 100, window_h * midpoint / 100, window_w / 2]
+
+    def r_round_inf(length, n):
+        basis = femmt.r_basis(length, core_w, max_length[n] - width / 2)
+        return femmt.r_round_inf(length, femmt.sigma(length, core_w / 2, basis), core_w / 2)
+
+    def stray_sigma(length):
+        return femmt.sigma(length, width, femmt.r_basis(length, width, window_w - length) / 2)
+
+    functions = [(lambda length: r_round_inf(length, 0), R_goal[0], 1e-6, max_length[0]),
+                 (lambda length: r_round_inf(length, 1), R_goal[1], 1e-6, max_length[1]),
+                 (lambda length: femmt.r_cyl_cyl(length, stray_sigma(length), width, window_w + core_w / 2),
+                  R_goal[2], 1e-6, max_length[2]),
+                 (lambda length: femmt.r_cyl_cyl_real(length, stray_sigma(length), width, window_w + core_w / 2,
+                                                      real_core_width), R_goal[2], 1e-9, max_length[2])]
+    lengths = []
+    for function, goal, lower, upper in functions:
+        with np.errstate(invalid="ignore"):
+            # No sign change or an invalid geometry (NaN reluctance, e.g. the stray path is wider than the leg)
+            out_of_bounds = not (function(lower) - goal) * (function(upper) - goal) <= 0
+        if out_of_bounds:
+            lengths.append(np.nan)
+        else:
+            lengths.append(brentq(lambda length: function(length) - goal, lower, upper))
+    return lengths
+
+
+def test_air_gap_lengths_batched_as_brentq():
+    rng = np.random.default_rng(3)
+    n_designs = 60
+    N = rng.integers(1, 30, (n_designs, 2, 2)).astype(float)
+    N[0] = [[5, 5], [5, 5]]  # singular winding matrix
+    L_goal = np.array([[600e-6, 100e-6], [100e-6, 150e-6]])
+    time = np.linspace(0, 1, 9)
+    max_current = [[time, 2 * np.sin(2 * np.pi * time)], [time, 4 * np.cos(2 * np.pi * time)]]
+    window_w, window_h = rng.uniform(0.005, 0.02, n_designs), rng.uniform(0.01, 0.04, n_designs)
+    core_w, midpoint = rng.uniform(0.01, 0.03, n_designs), rng.uniform(20, 80, n_designs)
+
+    result = femmt.air_gap_lengths_integrated_transformer_batched(
+        N, L_goal, max_current, window_w, window_h, core_w, midpoint, b_max=0.3, real_core_width=core_w)
+
+    # Batched reluctance matrices as the scalar ones
+    R_batched = femmt.calculate_reluctances_batched(N[1:], L_goal)
+    assert np.allclose(R_batched, [femmt.calculate_reluctances(N_i, L_goal) for N_i in N[1:]])
+
+    assert result["singular"][0] and not result["valid"][0] and not result["singular"][1:].any()
+    currents = np.array([max_current[0][1], -max_current[1][1]])
+    n_roots = np.zeros(4, dtype=int)
+    for i in range(1, n_designs):
+        reference = reference_air_gap_lengths(N[i], L_goal, currents, window_w[i], window_h[i], core_w[i],
+                                              midpoint[i], core_w[i])
+        for n, name in enumerate(["R_top", "R_bot", "R_stray", "R_stray_real"]):
+            if np.isnan(reference[n]):
+                assert np.isnan(result[name][i])
+            else:
+                assert np.isclose(result[name][i], reference[n], rtol=1e-9, atol=1e-11)
+                n_roots[n] += 1
+    # Both cases occur: designs with and without a root in the bracket
+    assert np.all(n_roots > 0) and np.all(n_roots < n_designs - 1)
@@ -0,0 +1,70 @@
+import os
+import pytest
+import numpy as np
+from femmt.femmt_litz_coefficients import LitzCoefficientLibrary, litz_coefficient_names, \
+    litz_coefficient_library_version
+
+
+def example_library():
+    fill_factors = np.array([0.3, 0.5, 0.7])
+    n_layers = np.array([3, 4])
+    reduced_frequencies = np.linspace(0, 1.25, 6)
+    # coefficient = (name + 1) * (10 * layers + ff + reduced frequency), linear in the fill factor
+    name_factor = np.arange(1, len(litz_coefficient_names) + 1)[:, None, None, None]
+    coefficients = name_factor * (10 * n_layers[None, :, None, None] + fill_factors[None, None, :, None] +
+                                  reduced_frequencies[None, None, None, :])
+    return LitzCoefficientLibrary(fill_factors, n_layers, reduced_frequencies, coefficients)
+
+
+def test_coefficients_at_grid_points():
+    library = example_library()
+    coefficients = library.coefficients_for(0.5, n_layers=4)
+    assert list(coefficients.keys()) == litz_coefficient_names
+    assert np.allclose(coefficients["pI"], 40.5 + library.reduced_frequencies)
+    assert np.allclose(coefficients["pB"], 4 * (40.5 + library.reduced_frequencies))
+    assert np.allclose(library.coefficients_for(0.3, n_layers=3)["qI"], 2 * (30.3 + library.reduced_frequencies))
+    assert np.allclose(library.coefficients_for(0.7, n_layers=3)["qI"], 2 * (30.7 + library.reduced_frequencies))
+
+
+def test_coefficients_interpolated_between_fill_factors():
+    library = example_library()
+    for ff in [0.31, 0.45, 0.613, 0.69]:
+        coefficients = library.coefficients_for(ff, n_layers=4)
+        assert np.allclose(coefficients["qB"], 3 * (40 + ff + library.reduced_frequencies))
+
+
+def test_coefficients_outside_of_library():
+    library = example_library()
+    with pytest.raises(Exception):
+        library.coefficients_for(0.8)
+    with pytest.raises(Exception):
+        library.coefficients_for(0.5, n_layers=5)
+
+
+def test_write_coefficient_files(tmp_path):
+    library = example_library()
+    library.write_coefficient_files(str(tmp_path), winding_number=2, ff=0.4, n_layers=4)
+    data = np.loadtxt(tmp_path / "qI_RS_winding2.dat")
+    assert np.allclose(data[:, 0], library.reduced_frequencies)
+    assert np.allclose(data[:, 1], 2 * (40.4 + library.reduced_frequencies))
+
+
+def test_save_and_load(tmp_path):
+    library_path = str(tmp_path / "library.npz")
+    assert not LitzCoefficientLibrary.exists(library_path)
+    assert example_library().save(library_path)
+
+    LitzCoefficientLibrary._loaded_libraries.pop(os.path.abspath(library_path))
+    assert LitzCoefficientLibrary.exists(library_path)
+    loaded = LitzCoefficientLibrary.load(library_path)
+    assert loaded.version == litz_coefficient_library_version
+    assert np.allclose(loaded.coefficients, example_library().coefficients)
+
+
+def test_save_to_unwritable_location_keeps_library_in_memory(tmp_path):
+    library_path = str(tmp_path / "missing_folder" / "library.npz")
+    library = example_library()
+    assert not library.save(library_path)
+    assert not os.path.exists(library_path)
+    assert LitzCoefficientLibrary.exists(library_path)
+    assert LitzCoefficientLibrary.load(library_path) is library
@@ -0,0 +1,134 @@
+import os
+import pytest
+import numpy as np
+from femmt import femmt_materials
+from femmt.femmt_material_import import measurement_file_pattern, read_measurement_directory, \
+    fit_grouped_polynomials, fit_measurements, import_measurements, measurement_parameters
+from femmt.femmt_materials import MaterialDatabase, material_database, user_material_database_path, \
+    default_material_database_path
+
+
+def mu_r(b, t):
+    return 3000 + 1000 * b - 2000 * b ** 2 - t
+
+
+def mu_phi(b, f, t):
+    return 1 + 10 * b + f / 1e5 + t / 100
+
+
+def write_measurements(directory, material="N95", temperatures=(30, 60), frequencies=(100, 200), n_points=8):
+    os.makedirs(directory, exist_ok=True)
+    b = np.linspace(0.04, 0.24, n_points)
+    for t in temperatures:
+        np.savetxt(os.path.join(directory, f"mu_r_300kHz_{material}_{t}C.txt"), np.column_stack([b, mu_r(b, t)]))
+        for f in frequencies:
+            np.savetxt(os.path.join(directory, f"mu_phi_{f}kHz_{material}_{t}C.txt"),
+                       np.column_stack([b, mu_phi(b, f * 1000, t)]))
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEMMT_CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(femmt_materials, "_material_databases", {})
+    return tmp_path / "cache"
+
+
+def test_file_name_pattern():
+    match = measurement_file_pattern.match("mu_phi_100kHz_N95_30C.txt")
+    assert (match["parameter"], match["frequency"], match["material"], match["temperature"]) == \
+        ("mu_phi", "100", "N95", "30")
+    match = measurement_file_pattern.match("mu_r_2.5kHz_N49_special_-20.5C.csv")
+    assert (match["frequency"], match["material"], match["temperature"]) == ("2.5", "N49_special", "-20.5")
+    for file_name in ["mu_i_100kHz_N95_30C.txt", "mu_r_100Hz_N95_30C.txt", "mu_r_100kHz_N95_30C.dat"]:
+        assert measurement_file_pattern.match(file_name) is None
+
+
+def test_read_measurement_directory(tmp_path):
+    write_measurements(str(tmp_path / "a"))
+    write_measurements(str(tmp_path / "b"), material="N49", temperatures=(25,), frequencies=(400,), n_points=3)
+    (tmp_path / "a" / "readme.txt").write_text("no measurement")
+
+    table = read_measurement_directory(str(tmp_path / "a"), material="N95")
+    assert len(table) == 2 * 8 + 4 * 8
+    phi = table[table["parameter"] == measurement_parameters.index("mu_phi")]
+    assert set(phi["frequency"]) == {100e3, 200e3} and set(phi["temperature"]) == {30, 60}
+    assert np.allclose(phi["value"], mu_phi(phi["flux_density"], phi["frequency"], phi["temperature"]))
+
+    table = read_measurement_directory([str(tmp_path / "a"), str(tmp_path / "b")])
+    assert len(table) == 48 + 2 * 3
+    with pytest.raises(Exception):
+        read_measurement_directory(str(tmp_path / "a"), material="N87")
+
+    (tmp_path / "b" / "mu_r_300kHz_N49_25C.txt").write_text("0.1\n0.2\n")
+    with pytest.raises(Exception):
+        read_measurement_directory(str(tmp_path / "b"))
+
+
+def test_fit_grouped_polynomials():
+    rng = np.random.default_rng(0)
+    group = rng.integers(0, 4, 200)
+    x = rng.uniform(0, 1, 200)
+    y = rng.normal(size=200)
+    coefficients = fit_grouped_polynomials(group, x, y, 4, 2)
+    for i in range(4):
+        assert np.allclose(coefficients[i], np.polyfit(x[group == i], y[group == i], 2)[::-1])
+
+
+def test_fit_measurements(tmp_path):
+    write_measurements(str(tmp_path))
+    table = read_measurement_directory(str(tmp_path))
+    material = fit_measurements(table, "N95_measured", mu_r_frequency=300000)
+    assert np.allclose(material.temperatures, [30, 60]) and np.allclose(material.frequencies, [100e3, 200e3])
+
+    # Polynomials of the fit degree are reproduced exactly on the flux density grid
+    b, t, f = material.flux_densities[10], 60, 200e3
+    phi = np.deg2rad(mu_phi(b, f, t))
+    assert np.isclose(material.get_mu_real(b, f, t), mu_r(b, t) * np.cos(phi))
+    assert np.isclose(material.get_mu_imag(b, f, t), mu_r(b, t) * np.sin(phi))
+    assert np.isclose(material.flux_densities[-1], 2 * 0.24)
+
+    # mu_r per operating point is missing, a point below the bounds does not count
+    with pytest.raises(Exception):
+        fit_measurements(table, "N95_measured")
+    with pytest.raises(Exception):
+        fit_measurements(table, "N95_measured", flux_density_bounds=(0.03, 0.05), mu_r_frequency=300000)
+
+
+def test_import_into_user_database(tmp_path, cache_directory):
+    write_measurements(str(tmp_path / "measurements"))
+    import_measurements(str(tmp_path / "measurements"), material="N95", name="N95_measured", mu_r_frequency=300000)
+
+    assert user_material_database_path().startswith(str(cache_directory))
+    assert MaterialDatabase.load(user_material_database_path()).names() == ["N95_measured"]
+    # The default database stays untouched, the shared database has both
+    assert "N95_measured" in material_database()
+    assert "N95_measured" not in MaterialDatabase.load(default_material_database_path())
+    assert "N95" in material_database()
+
+    # A second import keeps the first one
+    write_measurements(str(tmp_path / "other"), material="N49")
+    import_measurements(str(tmp_path / "other"), material="N49", mu_r_frequency=300000)
+    assert {"N95_measured", "N49"} <= set(material_database().names())
+
+
+def test_user_entries_of_outdated_database_are_kept(tmp_path, cache_directory, monkeypatch):
+    write_measurements(str(tmp_path / "measurements"))
+    table = read_measurement_directory(str(tmp_path / "measurements"))
+    imported = fit_measurements(table, "N95_old", mu_r_frequency=300000, source="old import")
+    replaced = fit_measurements(table, "N95_measured", mu_r_frequency=300000, source="old import")
+    outdated = MaterialDatabase(femmt_materials.default_materials() + [imported, replaced])
+    monkeypatch.setattr(femmt_materials, "material_database_version", 1)
+    outdated.save(default_material_database_path())
+    monkeypatch.setattr(femmt_materials, "material_database_version", 2)
+
+    # A material, which was imported into the user database later, is not replaced by the outdated one
+    newer = fit_measurements(table, "N95_measured", mu_r_frequency=300000, source="newer import")
+    femmt_materials.save_user_materials(MaterialDatabase([newer]))
+
+    database = material_database()
+    assert np.allclose(database["N95_old"].mu_imag, imported.mu_imag)
+    assert database["N95_measured"].source == "newer import"
+    assert database["N95"].source == MaterialDatabase(femmt_materials.default_materials())["N95"].source
+    user_database = MaterialDatabase.load(user_material_database_path())
+    assert set(user_database.names()) == {"N95_old", "N95_measured"}
+    assert "N95_old" not in MaterialDatabase.load(default_material_database_path())
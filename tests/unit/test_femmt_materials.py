@@ -0,0 +1,122 @@
+import pytest
+import numpy as np
+from scipy.interpolate import interp1d
+from femmt import femmt_materials
+from femmt.femmt_materials import MaterialData, MaterialDatabase, BHCurve, material_database, \
+    default_material_database_path, material_key
+from femmt.electro_magnetic import Analytical_Core_Data as data
+
+
+def multilinear(t, f, b):
+    # Trilinear interpolation reproduces functions, which are linear in every single variable, exactly
+    return 1000 + 2 * t + 1e-3 * f + 500 * b + 1e-5 * t * f * b
+
+
+def example_material():
+    temperatures, frequencies, flux_densities = [25, 60, 100], [100e3, 200e3, 400e3], [0, 0.05, 0.1, 0.2, 0.3]
+    t, f, b = np.meshgrid(temperatures, frequencies, flux_densities, indexing="ij")
+    return MaterialData("test", temperatures, frequencies, flux_densities, multilinear(t, f, b),
+                        -multilinear(t, f, b), source="test data")
+
+
+@pytest.fixture
+def cache_directory(tmp_path, monkeypatch):
+    monkeypatch.setenv("FEMMT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(femmt_materials, "_material_databases", {})
+    return tmp_path
+
+
+def test_trilinear_interpolation():
+    material = example_material()
+    rng = np.random.default_rng(0)
+    t, f, b = rng.uniform(25, 100, 50), rng.uniform(100e3, 400e3, 50), rng.uniform(0, 0.3, 50)
+    assert np.allclose(material.get_mu_real(b, f, t), multilinear(t, f, b))
+    assert np.allclose(material.get_mu_imag(-b, f, t), -multilinear(t, f, b))
+
+    # Broadcasting of a flux density array with scalar frequency and temperature
+    assert material.get_mu_real(b, 150e3, 40).shape == (50,)
+    assert np.allclose(material.get_mu_real(b[:, None], f[None, :5], 40), multilinear(40, f[None, :5], b[:, None]))
+
+
+def test_interpolation_outside_of_the_grid():
+    material = example_material()
+    # Clamped by default, linearly extrapolated in frequency and temperature on demand
+    assert np.isclose(material.get_mu_real(0.1, 500e3, 150), multilinear(100, 400e3, 0.1))
+    assert np.isclose(material.get_mu_real(0.1, 500e3, 150, extrapolate=True), multilinear(150, 500e3, 0.1))
+    assert np.isclose(material.get_mu_real(0.5, 200e3, 60), multilinear(60, 200e3, 0.3))
+    with pytest.raises(ValueError):
+        material.get_mu_real(0.5, 200e3, 60, bounds_error=True)
+    with pytest.raises(Exception):
+        material.interpolate("sigma", 0.1, 200e3)
+
+
+def test_from_curves_uses_common_flux_density_range():
+    material = MaterialData.from_curves("curves", [
+        {"temperature": 25, "frequency": 100e3, "flux_density": [0, 0.1, 0.2], "mu_real": [1, 2, 3],
+         "mu_imag": [0, 1, 2]},
+        {"temperature": 25, "frequency": 200e3, "flux_density": [0, 0.15, 0.3], "mu_real": [2, 3, 4],
+         "mu_imag": [0, 3, 6]}])
+    assert np.allclose(material.flux_densities, [0, 0.1, 0.15, 0.2])
+    assert np.allclose(material.mu_imag[0, 1], [0, 2, 3, 4])
+    with pytest.raises(Exception):
+        MaterialData.from_curves("incomplete", [
+            {"temperature": 25, "frequency": 100e3, "flux_density": [0, 1], "mu_real": [1, 1], "mu_imag": [0, 0]},
+            {"temperature": 100, "frequency": 200e3, "flux_density": [0, 1], "mu_real": [1, 1], "mu_imag": [0, 0]}])
+
+
+def test_bh_curve():
+    curve = BHCurve("test", [0, 0.1, 0.2, 0.3], [0, 10, 30, 90])
+    assert np.allclose(curve.reluctivity(), [100, 100, 150, 300])
+    assert np.allclose(curve.get_h([0, 0.1, 0.2, 0.3]), [0, 10, 30, 90])
+    functions = curve.getdp_functions()
+    for name in ["nu_bh_data[]", "h_bh_data[]", "dhdb_bh_data[]", "dhdb_bh_data_NL[]"]:
+        assert name in functions
+    with pytest.raises(Exception):
+        BHCurve("descending", [0, 0.2, 0.1], [0, 10, 20])
+
+
+def test_numeric_material_names():
+    assert [material_key(name) for name in [95, 95.0, np.int64(95100), np.float64(3), "N95", "3kW", 95.5]] == \
+        ["95", "95", "95100", "3", "N95", "3kW", "95.5"]
+    database = MaterialDatabase(bh_curves=[BHCurve("95", [0, 0.1], [0, 10])])
+    assert database.bh_curve(95.0) is database.bh_curve("95")
+    with pytest.raises(Exception):
+        database.bh_curve(95.5)
+
+
+def test_save_and_load(tmp_path):
+    database = MaterialDatabase([example_material()], [BHCurve("test", [0, 0.1, 0.2], [0, 10, 30], source="bh")])
+    database_path = str(tmp_path / "materials.npy")
+    database.save(database_path)
+
+    loaded = MaterialDatabase.load(database_path)
+    assert loaded.names() == ["test"]
+    assert loaded["test"].source == "test data"
+    assert np.allclose(loaded["test"].mu_imag, example_material().mu_imag)
+    assert np.allclose(loaded.bh_curve("test").field_strengths, [0, 10, 30])
+    with pytest.raises(Exception):
+        loaded["N95"]
+    with pytest.raises(Exception):
+        loaded.bh_curve("N95")
+
+
+def test_default_database_in_cache_directory(cache_directory):
+    database = material_database()
+    assert default_material_database_path().startswith(str(cache_directory))
+    assert MaterialDatabase.load(default_material_database_path()).names() == database.names()
+    assert {"N95", "N95_measurement"} <= set(database.names())
+    assert {"1", "3kW", "N95", "95", "95100"} <= set(database.bh_curves)
+
+
+def test_n95_measurement_as_before(cache_directory):
+    # Previous implementation of the reluctance model
+    f_200000 = interp1d(data.N95_b_200000, data.N95_mu_imag_200000)
+    f_300000 = interp1d(data.N95_b_300000, data.N95_mu_imag_300000)
+
+    b = np.linspace(0.001, 0.43, 50)
+    for f in [150000, 250000, 350000]:
+        old = f_200000(b) + (f_300000(b) - f_200000(b)) / 100000 * (f - 200000)
+        assert np.allclose(data.f_N95_mu_imag(f, b), old, rtol=1e-9)
+
+    with pytest.raises(ValueError):
+        data.f_N95_mu_imag(200000, 0.5)
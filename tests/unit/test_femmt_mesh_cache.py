@@ -0,0 +1,75 @@
+import os
+import shutil
+import numpy as np
+from femmt.femmt_mesh_cache import MeshCache
+
+
+description = {"core": {"core_w": 0.02, "window_w": 0.011, "window_h": 0.03}, "air_gaps": [[0.0, 0.0, 0.0005]],
+               "n_turns": [[9]], "mesh_accuracy": 0.5}
+
+
+def write_file(path, size):
+    with open(path, "wb") as fd:
+        fd.write(b"x" * size)
+    return path
+
+
+def test_key_is_stable():
+    key = MeshCache.key(description)
+    assert len(key) == 64
+    # Independent of the order of the keys and of numpy data types
+    reordered = dict(reversed(list(description.items())))
+    assert MeshCache.key(reordered) == key
+    with_numpy = dict(description, air_gaps=np.array([[0.0, 0.0, 0.0005]]), n_turns=[[np.int64(9)]],
+                      mesh_accuracy=np.float64(0.5))
+    assert MeshCache.key(with_numpy) == key
+    assert MeshCache.key(dict(description, mesh_accuracy=0.4)) != key
+
+
+def test_store_and_load(tmp_path):
+    cache = MeshCache(str(tmp_path / "cache"))
+    key = MeshCache.key(description)
+    assert not cache.has_file(key, "hybrid.msh")
+    assert not cache.load_file(key, "hybrid.msh", str(tmp_path / "loaded.msh"))
+
+    cache.store_file(key, write_file(str(tmp_path / "hybrid.msh"), 10))
+    assert cache.has_file(key, "hybrid.msh")
+    assert cache.load_file(key, "hybrid.msh", str(tmp_path / "loaded.msh"))
+    assert os.path.getsize(tmp_path / "loaded.msh") == 10
+    assert not any(file_name.endswith(".tmp") for file_name in os.listdir(cache.entry_path(key)))
+
+    # An entry deleted by another process is a cache miss
+    shutil.rmtree(cache.entry_path(key))
+    assert not cache.load_file(key, "hybrid.msh", str(tmp_path / "loaded_again.msh"))
+    assert cache.load_meta(key) is None
+
+
+def test_meta_round_trip(tmp_path):
+    cache = MeshCache(str(tmp_path))
+    key = MeshCache.key(description)
+    assert cache.load_meta(key) is None
+    tags = {"plane_surface_core": np.array([1, 2, 3]), "plane_surface_air": [np.int32(4)], "curve_packing": []}
+    cache.store_meta(key, {"geometry_tags": tags})
+    assert cache.load_meta(key) == {"geometry_tags": {"plane_surface_core": [1, 2, 3], "plane_surface_air": [4],
+                                                      "curve_packing": []}}
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = MeshCache(str(tmp_path / "cache"), max_size=250)
+    keys = [MeshCache.key(dict(description, mesh_accuracy=accuracy)) for accuracy in [0.1, 0.2, 0.3]]
+    for n, key in enumerate(keys[:2]):
+        cache.store_file(key, write_file(str(tmp_path / "mesh.msh"), 100))
+        os.utime(cache.entry_path(key), (1000 + n, 1000 + n))
+    # The older entry is used again and becomes the most recently used one
+    assert cache.load_file(keys[0], "mesh.msh", str(tmp_path / "loaded.msh"))
+
+    cache.store_file(keys[2], write_file(str(tmp_path / "mesh.msh"), 100))
+    assert [cache.has_file(key, "mesh.msh") for key in keys] == [True, False, True]
+    assert cache.size() == 200
+
+    # The newest entry is kept, even if it is larger than max_size
+    cache.store_file(keys[1], write_file(str(tmp_path / "mesh.msh"), 300))
+    assert [cache.has_file(key, "mesh.msh") for key in keys] == [False, True, False]
+
+    cache.clear()
+    assert cache.size() == 0
@@ -0,0 +1,64 @@
+import sys
+import types
+import threading
+import pytest
+from femmt import femmt_profiling
+from femmt.femmt_profiling import Profiler, run_sub_client
+
+
+def test_stage_records():
+    profiler = Profiler()
+    profiler.enable()
+    with profiler.stage("outer"):
+        with profiler.stage("inner", category="solver"):
+            data = bytearray(10 ** 6)
+    records = {record["name"]: record for record in profiler.records}
+    assert records["inner"]["depth"] == 1
+    assert records["outer"]["peak_rss_increase"] >= records["inner"]["peak_rss_increase"] >= 0
+    assert records["outer"]["process_peak_rss"] >= records["inner"]["process_peak_rss"]
+    del data
+
+
+def test_quiet_mode_restores_stdout_with_overlapping_threads():
+    profiler = Profiler()
+    profiler.enable(quiet=True)
+    stdout = sys.stdout
+    first_entered, second_entered, first_left = threading.Event(), threading.Event(), threading.Event()
+    quiet_in_second = []
+
+    def first():
+        with profiler.stage("first"):
+            first_entered.set()
+            second_entered.wait()
+        first_left.set()
+
+    def second():
+        first_entered.wait()
+        with profiler.stage("second"):
+            second_entered.set()
+            first_left.wait()
+            quiet_in_second.append(sys.stdout is not stdout)
+
+    threads = [threading.Thread(target=first), threading.Thread(target=second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert quiet_in_second == [True]
+    assert sys.stdout is stdout
+
+
+def test_run_sub_client(monkeypatch):
+    commands = []
+    onelab_client = types.SimpleNamespace(runSubClient=lambda name, command: commands.append((name, command)))
+    monkeypatch.setattr(femmt_profiling, "profiler", Profiler())
+    run_sub_client(onelab_client, "myGetDP", ["getdp", "solver.pro", "-solve", "Analysis"])
+    assert commands == [("myGetDP", "getdp solver.pro -solve Analysis")]
+
+    # Quiet mode: the solver runs without onelab and a failure is not ignored
+    femmt_profiling.profiler.enable(quiet=True)
+    run_sub_client(onelab_client, "myGetDP", [sys.executable, "-c", "print('solved')"])
+    with pytest.raises(Exception, match=r"(?s)exit code 3.*no mesh"):
+        run_sub_client(onelab_client, "myGetDP",
+                       [sys.executable, "-c", "import sys; sys.stderr.write('no mesh'); sys.exit(3)"])
+    assert len(commands) == 1
@@ -0,0 +1,82 @@
+import pytest
+import numpy as np
+from femmt.femmt_results import ResultStore
+
+
+def test_result_store_keeps_max_runs(tmp_path):
+    store = ResultStore(str(tmp_path), max_runs=3)
+    run_ids = [store.new_run() for _ in range(5)]
+
+    assert store.run_ids() == run_ids[-3:]
+    with pytest.raises(Exception):
+        store.load_run(run_ids[0])
+
+
+def test_result_store_keeps_all_runs_by_default(tmp_path):
+    store = ResultStore(str(tmp_path))
+    assert store.max_runs is None
+
+    run_ids = [store.new_run() for _ in range(25)]
+    assert store.run_ids() == run_ids
+
+
+def test_result_store_keeps_all_runs(tmp_path):
+    store = ResultStore(str(tmp_path), max_runs=None)
+    run_ids = [store.new_run() for _ in range(5)]
+    assert store.run_ids() == run_ids
+    assert len(store.load_run(run_ids[0]).quantities()) == 0
+    assert np.all(np.diff([int(run_id) for run_id in run_ids]) == 1)
+
+
+def write_values(values_folder, step_values):
+    """Writes .dat files as GetDP does for one solve: one line per sweep step."""
+    (values_folder / "Primary").mkdir(parents=True, exist_ok=True)
+    with open(values_folder / "j2F_1.dat", "w") as fd:
+        fd.writelines(f"0 0 {value} {-value}\n" for value in step_values)
+    with open(values_folder / "Primary" / "Losses_turn_2.dat", "w") as fd:
+        fd.writelines(f"0 0 {2 * value} 0\n" for value in step_values)
+    with open(values_folder / "ME.dat", "w") as fd:
+        fd.writelines(f"0 0 {10 * value}\n" for value in step_values)
+
+
+def test_result_store_round_trip(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    values_folder = tmp_path / "values"
+    run_id = store.new_run()
+
+    # Three solves of one sweep, the second solve with two steps
+    for step_values in [[1.0], [2.0, 3.0], [4.0]]:
+        write_values(values_folder, step_values)
+        store.import_values(run_id, str(values_folder))
+        assert not (values_folder / "j2F_1.dat").exists()
+
+    values = store.load_run(run_id)
+    assert np.allclose(values.get("j2F", winding=1), [1, 2, 3, 4])
+    assert np.allclose(values.get("j2F", winding=1, part="imaginary"), [-1, -2, -3, -4])
+    assert np.allclose(values.get("Losses_turn", winding=1, turn=2), [2, 4, 6, 8])
+    assert np.allclose(values.get("ME"), [10, 20, 30, 40])
+    assert np.all(np.isnan(values.get("ME", part="imaginary")))
+    assert np.allclose(store.load_run(run_id, last_n=2).get("j2F", winding=1), [3, 4])
+    assert store.block_paths(run_id) == []
+
+    # A new store instance continues the run after the stored steps
+    write_values(values_folder, [5.0])
+    ResultStore(str(tmp_path / "store")).import_values(run_id, str(values_folder))
+    assert np.allclose(store.load_run(run_id).get("j2F", winding=1), [1, 2, 3, 4, 5])
+
+
+def test_result_store_reorder_and_separate_runs(tmp_path):
+    store = ResultStore(str(tmp_path / "store"))
+    values_folder = tmp_path / "values"
+    first_run = store.new_run()
+    for value in [30.0, 10.0, 20.0]:
+        write_values(values_folder, [value])
+        store.import_values(first_run, str(values_folder))
+    store.reorder_steps(first_run, [2, 0, 1])
+    assert np.allclose(store.load_run(first_run).get("j2F", winding=1), [10, 20, 30])
+
+    second_run = store.new_run()
+    write_values(values_folder, [7.0])
+    store.import_values(second_run, str(values_folder))
+    assert np.allclose(store.load_run().get("j2F", winding=1), [7])
+    assert np.allclose(store.load_run(first_run).get("ME"), [100, 200, 300])
@@ -0,0 +1,81 @@
+import pytest
+import numpy as np
+from femmt.femmt_screening import skin_depth, dowell_factor, pareto_ranks, fem_budget, select_for_fem
+
+
+conductivity = 5.8e7
+
+
+def dowell_at(delta, layers):
+    # Conductor height for the ratio delta = h / skin depth at 100 kHz
+    return dowell_factor(1e5, np.asarray(delta) * skin_depth(1e5, conductivity), conductivity, layers)
+
+
+def test_dowell_factor_limits():
+    assert np.isclose(skin_depth(1e5, conductivity), 1 / np.sqrt(np.pi * 1e5 * 4e-7 * np.pi * conductivity))
+    # DC: no skin and proximity effect
+    assert dowell_factor(0, 1e-3, conductivity, 5) == 1
+
+    # Low frequency expansion: F_R = 1 + (5 m^2 - 1) / 45 * delta^4
+    for layers in [1, 3, 10]:
+        delta = np.array([0.05, 0.1, 0.2])
+        assert np.allclose(dowell_at(delta, layers), 1 + (5 * layers ** 2 - 1) / 45 * delta ** 4, rtol=1e-3)
+
+    # High frequency asymptote: F_R = delta * (2 m^2 + 1) / 3, continuous at the switch to the asymptotic form
+    layers = np.array([1, 2, 4])
+    for delta in [19.99, 20.01, 50]:
+        assert np.allclose(dowell_at(delta, layers), delta * (2 * layers ** 2 + 1) / 3, rtol=1e-6)
+    assert np.allclose(dowell_at(8, layers), 8 * (2 * layers ** 2 + 1) / 3, rtol=1e-3)
+
+    # More layers and higher frequencies increase the losses
+    factors = dowell_at(np.linspace(0.1, 5, 30)[:, None], np.arange(1, 6)[None, :])
+    assert np.all(np.diff(factors, axis=0) > 0) and np.all(np.diff(factors, axis=1) > 0)
+
+
+def brute_force_ranks(objectives):
+    ranks = np.full(len(objectives), -1)
+    rank = 0
+    while np.any(ranks < 0):
+        remaining = np.flatnonzero(ranks < 0)
+        for i in remaining:
+            others = objectives[remaining]
+            if not np.any(np.all(others <= objectives[i], axis=1) & np.any(others < objectives[i], axis=1)):
+                ranks[i] = rank
+        rank += 1
+    return ranks
+
+
+def test_pareto_ranks():
+    rng = np.random.default_rng(0)
+    objectives = rng.integers(0, 6, (80, 3)).astype(float)
+    ranks = pareto_ranks(objectives, chunk_size=7)
+    assert np.array_equal(ranks, brute_force_ranks(objectives))
+    # Ranks above max_rank are not sorted
+    limited = pareto_ranks(objectives, max_rank=1)
+    assert np.array_equal(limited, np.minimum(ranks, 2))
+
+
+def test_select_with_max_designs():
+    rng = np.random.default_rng(1)
+    objectives = rng.uniform(0, 1, (200, 2))
+    ranks = pareto_ranks(objectives)
+    n_front = np.sum(ranks == 0)
+
+    for max_designs in [1, n_front, n_front + 3, 50]:
+        selected = select_for_fem(objectives, max_designs=max_designs)
+        assert len(selected) == max_designs == len(set(selected))
+        # Whole fronts first: no selected candidate has a worse rank than a candidate left out
+        left_out = np.setdiff1d(np.arange(0, 200), selected)
+        assert ranks[selected].max() <= ranks[left_out].min()
+        assert np.all(np.diff(ranks[selected]) >= 0)
+
+    assert np.array_equal(np.sort(select_for_fem(objectives, max_designs=n_front)), np.flatnonzero(ranks == 0))
+    assert len(select_for_fem(objectives, max_designs=0)) == 0
+    assert len(select_for_fem(objectives, max_designs=500)) == 200
+    # The smaller limit counts
+    assert len(select_for_fem(objectives, max_designs=50, fraction=0.1)) == 20
+    assert fem_budget(200) == 20
+
+    for max_designs in [-1, 2.5, True]:
+        with pytest.raises(ValueError):
+            select_for_fem(objectives, max_designs=max_designs)
@@ -0,0 +1,75 @@
+import pytest
+import numpy as np
+from femmt.femmt_superposition import SuperpositionModel, superposition_basis, quadratic_design_matrix, \
+    hermitian_from_parameters, currents_from_amplitudes
+
+
+def random_hermitian(rng, n_windings):
+    matrix = rng.normal(size=(n_windings, n_windings)) + 1j * rng.normal(size=(n_windings, n_windings))
+    return matrix @ np.conj(matrix.T)
+
+
+def quadratic_form(currents, matrix):
+    return np.einsum("ma,ab,mb->m", np.conj(currents), matrix, currents).real
+
+
+@pytest.mark.parametrize("n_windings", [1, 2, 3])
+def test_basis_identifies_hermitian_matrix(n_windings):
+    basis = superposition_basis(n_windings)
+    assert basis.shape == (n_windings ** 2, n_windings)
+    # The basis determines all n_windings ** 2 real parameters of a hermitian matrix
+    assert np.linalg.matrix_rank(quadratic_design_matrix(basis)) == n_windings ** 2
+
+
+def test_design_matrix_parametrization():
+    rng = np.random.default_rng(0)
+    n_windings = 3
+    parameters = rng.normal(size=n_windings ** 2)
+    matrix = hermitian_from_parameters(parameters, n_windings)
+    assert np.allclose(matrix, np.conj(matrix.T))
+
+    currents = rng.normal(size=(5, n_windings)) + 1j * rng.normal(size=(5, n_windings))
+    assert np.allclose(quadratic_design_matrix(currents) @ parameters, quadratic_form(currents, matrix))
+
+
+def test_model_reproduces_quadratic_and_linear_results():
+    rng = np.random.default_rng(1)
+    n_windings = 2
+    frequencies = [100000, 200000]
+    loss_matrices = np.array([random_hermitian(rng, n_windings) for _ in frequencies])
+    flux_coefficients = rng.normal(size=(len(frequencies), n_windings)) + \
+        1j * rng.normal(size=(len(frequencies), n_windings))
+
+    basis = superposition_basis(n_windings)
+    model = SuperpositionModel.from_samples(
+        frequencies, basis,
+        {("j2F", 1, 0): np.array([quadratic_form(basis, matrix) for matrix in loss_matrices])},
+        {("Flux_Linkage", 1, 0): flux_coefficients @ basis.T})
+
+    amplitudes = [[4, 14.5], [3, 11.2], [0, 1]]
+    phases_deg = [[0, 176], [0, 172], [0, 45]]
+    currents = currents_from_amplitudes(amplitudes, phases_deg)
+    results = model.evaluate(200000, amplitudes, phases_deg)
+    assert np.allclose(results[("j2F", 1, 0)], quadratic_form(currents, loss_matrices[1]))
+    assert np.allclose(results[("Flux_Linkage", 1, 0)], currents @ flux_coefficients[1])
+    assert np.allclose(model.losses(200000, amplitudes, phases_deg)["total"], results[("j2F", 1, 0)])
+
+    with pytest.raises(Exception):
+        model.evaluate(150000, amplitudes, phases_deg)
+
+
+def test_too_few_excitations():
+    with pytest.raises(Exception):
+        SuperpositionModel.from_samples([100000], np.eye(2), {}, {})
+
+
+def test_save_and_load(tmp_path):
+    rng = np.random.default_rng(2)
+    model = SuperpositionModel([100000], {("ME", 0, 0): random_hermitian(rng, 2)[np.newaxis]},
+                               {("Voltage", 2, 0): rng.normal(size=(1, 2)) + 0j})
+    file_path = str(tmp_path / "model.npz")
+    model.save(file_path)
+    loaded = SuperpositionModel.load(file_path)
+    assert np.allclose(loaded.frequencies, model.frequencies)
+    assert np.allclose(loaded.quadratic[("ME", 0, 0)], model.quadratic[("ME", 0, 0)])
+    assert np.allclose(loaded.linear[("Voltage", 2, 0)], model.linear[("Voltage", 2, 0)])
@@ -0,0 +1,52 @@
+import numpy as np
+from femmt.femmt_symmetry import half_model_turn_map, upper_half_conductors, number_of_model_turns, \
+    points_per_conductor
+from femmt.femmt_winding_placement import round_conductor_points, rectangular_conductor_points
+
+
+def test_points_per_conductor():
+    assert points_per_conductor("solid") == points_per_conductor("litz") == 5
+    assert points_per_conductor("stacked") == points_per_conductor("foil") == 4
+
+
+def test_turn_map_of_symmetric_round_conductors():
+    # Column wise placement from the bottom: the lower conductors come first
+    centers = np.array([[1, -3], [1, -1], [1, 1], [1, 3], [3, -1], [3, 1]], dtype=float) * 1e-3
+    points = round_conductor_points(centers, 0.5e-3, 0.1, 0.1)
+    assert np.array_equal(upper_half_conductors(points, "solid"), [2, 3, 5])
+
+    turn_map = half_model_turn_map(points, "solid")
+    assert np.array_equal(turn_map, [1, 0, 0, 1, 2, 2])
+    assert number_of_model_turns(6, turn_map) == 3
+    assert number_of_model_turns(6, None) == 6
+
+
+def test_turn_map_of_symmetric_rectangular_conductors():
+    y_min = np.array([-2, 0.5, -4, 2.5]) * 1e-3
+    points = rectangular_conductor_points(1e-3, 2e-3, y_min, y_min + 1.5e-3, 0.1)
+    assert np.array_equal(half_model_turn_map(points, "stacked"), [0, 0, 1, 1])
+
+
+def test_asymmetric_conductors():
+    # Missing mirror image
+    points = round_conductor_points(np.array([[1, -1], [1, 1], [1, 3]]) * 1e-3, 0.5e-3, 0.1, 0.1)
+    assert half_model_turn_map(points, "solid") is None
+    # Mirror image at another radius
+    points = round_conductor_points(np.array([[1, -1], [2, 1]]) * 1e-3, 0.5e-3, 0.1, 0.1)
+    assert half_model_turn_map(points, "solid") is None
+    # Conductor crossing the symmetry plane
+    points = round_conductor_points(np.array([[1, 0]]) * 1e-3, 0.5e-3, 0.1, 0.1)
+    assert half_model_turn_map(points, "solid") is None
+    # Full window conductor
+    assert half_model_turn_map(rectangular_conductor_points(1e-3, 2e-3, -1e-3, 1e-3, 0.1), "full") is None
+
+
+def test_tolerance():
+    points = round_conductor_points(np.array([[1, -1], [1, 1 + 1e-12]]) * 1e-3, 0.5e-3, 0.1, 0.1)
+    assert np.array_equal(half_model_turn_map(points, "solid"), [0, 0])
+    points = round_conductor_points(np.array([[1, -1], [1, 1 + 1e-5]]) * 1e-3, 0.5e-3, 0.1, 0.1)
+    assert half_model_turn_map(points, "solid") is None
+
+
+def test_empty_winding():
+    assert len(half_model_turn_map(np.zeros((0, 4)), "solid")) == 0
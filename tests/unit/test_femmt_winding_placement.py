@@ -0,0 +1,156 @@
+import pytest
+import numpy as np
+from femmt.femmt_winding_placement import square_centers, hexa_centers, hexa_row_centers, \
+    interleaved_layer_centers, round_conductor_points, rectangular_conductor_points
+
+# The reference functions below are the conductor placement loops of draw_conductors before the vectorization.
+
+
+def old_square(left, right, bot, top, radius, cond_cond, n_turns):
+    centers, x, i = [], left + radius, 0
+    while x < right - radius and i < n_turns:
+        y = bot + radius
+        while y < top - radius and i < n_turns:
+            centers.append([x, y])
+            i += 1
+            y += radius * 2 + cond_cond
+        x += radius * 2 + cond_cond
+    return centers
+
+
+def old_square_full_width(left, right, bot, top, radius, cond_cond, n_turns, from_top=False):
+    sign = -1 if from_top else 1
+    centers, y, i = [], top - radius if from_top else bot + radius, 0
+    while (y > bot + radius if from_top else y < top - radius) and i < n_turns:
+        x = left + radius
+        while x < right - radius and i < n_turns:
+            centers.append([x, y])
+            i += 1
+            x += radius * 2 + cond_cond
+        y += sign * (radius * 2 + cond_cond)
+    return centers
+
+
+def old_hexa(left, right, bot, top, radius, cond_cond, n_turns):
+    centers, x, y, i, base_line = [], left + radius, bot + radius, 0, True
+    while x < right - radius and i < n_turns:
+        while y < top - radius and i < n_turns:
+            centers.append([x, y])
+            i += 1
+            y += radius * 2 + cond_cond
+        x += 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2)
+        base_line = not base_line
+        y = bot + radius if base_line else bot + 2 * radius + cond_cond / 2
+    return centers
+
+
+def old_hexa_rows(left, right, bot, top, radius, cond_cond, n_turns, from_top=False):
+    sign = -1 if from_top else 1
+    centers, x, y, i = [], left + radius, top - radius if from_top else bot + radius, 0
+    while (y > bot + radius if from_top else y < top - radius) and i < n_turns:
+        base_line = True
+        while x < right - radius and i < n_turns:
+            centers.append([x, y])
+            i += 1
+            x += 2 * np.cos(np.pi / 6) * (radius + cond_cond / 2)
+            base_line = not base_line
+            y += -sign * (radius + cond_cond) if base_line else sign * (radius + cond_cond)
+        # Undo the last shift and go to the next row
+        y += sign * (radius + cond_cond) if base_line else -sign * (radius + cond_cond)
+        x = left + radius
+        y += sign * (radius + cond_cond)
+    return centers
+
+
+def old_horizontal(left, right, bot, top, radii, cond_cond, turns, from_top):
+    sign = -1 if from_top else 1
+    start = top if from_top else bot
+    centers, completed, iso_counter = [[], []], [0, 0], 0
+    col_cond = 0 if turns[0] >= turns[1] else 1
+    x, y = left + radii[col_cond], start + sign * radii[col_cond]
+    while turns[0] - completed[0] != 0 or turns[1] - completed[1] != 0:
+        if turns[col_cond] - completed[col_cond] != 0:
+            if x < right - radii[col_cond]:
+                while (y > bot + radii[col_cond] if from_top else y < top - radii[col_cond]) and \
+                        completed[col_cond] < turns[col_cond]:
+                    centers[col_cond].append([x, y])
+                    completed[col_cond] += 1
+                    y += sign * (radii[col_cond] * 2 + cond_cond[col_cond])
+                x += radii[col_cond] + radii[(col_cond + 1) % 2] + cond_cond[2]
+                col_cond = (col_cond + 1) % 2
+                y = start + sign * radii[col_cond]
+                iso_counter += 1
+            else:
+                break
+        else:
+            col_cond = (col_cond + 1) % 2
+            x += radii[col_cond] - radii[(col_cond + 1) % 2] - cond_cond[2] + cond_cond[col_cond]
+            y = start + sign * radii[col_cond]
+            iso_counter -= 1
+    return centers, iso_counter
+
+
+def random_windows(seed, n=30):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        left, bot = rng.uniform(0.001, 0.01), rng.uniform(-0.02, 0)
+        yield left, left + rng.uniform(0.002, 0.02), bot, bot + rng.uniform(0.002, 0.04), \
+            rng.uniform(2e-4, 1.5e-3), rng.uniform(0, 3e-4), int(rng.integers(1, 60))
+
+
+def assert_same_centers(new, old):
+    old = np.asarray(old, dtype=float).reshape(-1, 2)
+    assert new.shape == old.shape
+    assert np.allclose(new, old, rtol=0, atol=1e-12)
+
+
+def test_square_schemes_as_old_loops():
+    for left, right, bot, top, radius, cond_cond, n_turns in random_windows(0):
+        assert_same_centers(square_centers(left, right, bot, top, radius, cond_cond, n_turns),
+                            old_square(left, right, bot, top, radius, cond_cond, n_turns))
+        for from_top in [False, True]:
+            assert_same_centers(square_centers(left, right, bot, top, radius, cond_cond, n_turns, column_wise=False,
+                                               from_top=from_top),
+                                old_square_full_width(left, right, bot, top, radius, cond_cond, n_turns, from_top))
+
+
+def test_hexa_schemes_as_old_loops():
+    for left, right, bot, top, radius, cond_cond, n_turns in random_windows(1):
+        assert_same_centers(hexa_centers(left, right, bot, top, radius, cond_cond, n_turns),
+                            old_hexa(left, right, bot, top, radius, cond_cond, n_turns))
+        for from_top in [False, True]:
+            assert_same_centers(hexa_row_centers(left, right, bot, top, radius, cond_cond, n_turns, from_top),
+                                old_hexa_rows(left, right, bot, top, radius, cond_cond, n_turns, from_top))
+
+
+@pytest.mark.parametrize("from_top", [True, False])
+def test_horizontal_interleaving_as_old_loops(from_top):
+    rng = np.random.default_rng(2)
+    for left, right, bot, top, radius, cond_cond, n_turns in random_windows(3, n=50):
+        radii = [radius, rng.uniform(2e-4, 1.5e-3)]
+        isolations = [cond_cond, rng.uniform(0, 3e-4), rng.uniform(0, 5e-4)]
+        turns = [n_turns, int(rng.integers(0, 60))]
+        line_bounds = (top, bot) if from_top else (bot, top)
+        centers, start, iso_counter = interleaved_layer_centers(turns, radii, isolations, (left, right), line_bounds)
+        old_centers, old_iso_counter = old_horizontal(left, right, bot, top, radii, isolations, turns, from_top)
+        assert start == (0 if turns[0] >= turns[1] else 1)
+        assert iso_counter == old_iso_counter
+        for num in range(0, 2):
+            assert_same_centers(centers[num], old_centers[num])
+
+
+def test_turns_which_do_not_fit_are_not_placed():
+    centers = square_centers(0, 0.01, 0, 0.01, 1e-3, 0, 100)
+    assert len(centers) == 16
+    centers, _, _ = interleaved_layer_centers([100, 3], [1e-3, 1e-3], [0, 0, 0], (0, 0.01), (0.01, 0))
+    assert len(centers[0]) + len(centers[1]) < 103
+
+
+def test_conductor_points():
+    points = round_conductor_points(np.array([[1.0, 2.0]]), 0.5, 0.1, 0.2)
+    assert np.allclose(points[:, :2], [[1, 2], [0.5, 2], [1, 2.5], [1.5, 2], [1, 1.5]])
+    assert np.allclose(points[:, 3], [0.1, 0.2, 0.2, 0.2, 0.2])
+
+    points = rectangular_conductor_points([0, 1], [0.5, 1.5], 0, 2, 0.3)
+    assert points.shape == (8, 4)
+    assert np.allclose(points[4:, :2], [[1, 0], [1.5, 0], [1, 2], [1.5, 2]])